@@ -0,0 +1,275 @@
+# app/core/admission.py
+"""
+추정 연산 비용 기반 admission control / load shedding (ASR 단계).
+
+요청 비용 = 오디오 길이 × 엔진 RTF(실측 EWMA) × beam 계수.
+진행 중(대기 + 실행) 비용 합이 ADMISSION_BUDGET_S를 넘거나, 예상 대기 + 비용이 요청 deadline을
+넘으면 순서대로 강등을 시도하고 그래도 안 되면 거절(503 + Retry-After)한다.
+
+  1) 요청 그대로
+  2) beam_size → 1            (FW, beam > 1일 때)
+  3) 작은 모델(fw_small)       (ASR_CASCADE로 small 엔진이 로드되어 있을 때)
+
+실행은 엔진별 WFQ 슬롯(app.core.scheduler, ADMISSION_CONCURRENCY)을 우선순위 클래스 순서로 거치며,
+슬롯을 기다리다 deadline이 지나면 모델을 돌리지 않고 버린다(아무도 기다리지 않는 결과를 계산하지 않음).
+ADMISSION_ENABLED=0이면 거절/강등 없이 슬롯과 RTF 측정만 동작한다. 이때 ADMISSION_DEADLINE_S도 적용하지 않고
+클라이언트가 X-Deadline-Ms를 준 요청만 그 시간까지 슬롯을 기다린다.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.core.scheduler import SchedulerTimeout, current_priority, get_scheduler
+from app.core.tracing import span
+
+
+class AdmissionRejected(Exception):
+    """예산 초과로 거절 (HTTP 503 + Retry-After)."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(AdmissionRejected):
+    """대기 중 deadline 초과로 실행하지 않고 버림."""
+
+
+def beam_factor(beam: int) -> float:
+    # beam이 클수록 디코딩 비용이 대략 선형으로 늘어난다 (stub 엔진과 같은 근사)
+    return 1.0 + 0.15 * (max(1, int(beam)) - 1)
+
+
+def _parse_rtf(spec: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in spec.split(","):
+        k, _, v = part.partition(":")
+        if k.strip() and v.strip():
+            out[k.strip()] = float(v)
+    return out
+
+
+class Ticket:
+    """admit()된 요청 하나. with 블록을 벗어나면 예산에서 비용을 돌려준다."""
+
+    def __init__(
+        self, ctl: "AdmissionController", engine: str, beam: int, audio_sec: float,
+        cost_s: float, deadline: float, degraded: Optional[str],
+    ):
+        self.ctl = ctl
+        self.engine = engine
+        self.beam = beam
+        self.audio_sec = audio_sec
+        self.cost_s = cost_s
+        self.deadline = deadline      # time.monotonic() 기준 (inf = 제한 없음)
+        self.degraded = degraded      # None | "beam" | "model"
+        self._released = False
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """엔진 슬롯을 deadline까지 (우선순위 순서로) 기다렸다가 fn 실행 (블로킹, 워커 스레드에서 호출)."""
+        t_wait = time.perf_counter()
+
+        def _timed() -> Any:
+            sp.set("wait_ms", round((time.perf_counter() - t_wait) * 1000, 2))
+            t0 = time.perf_counter()
+            out = fn(*args, **kwargs)
+            self.ctl.observe(self.engine, self.beam, self.audio_sec, time.perf_counter() - t0)
+            return out
+
+        with span("admission.wait", engine=self.engine, priority=current_priority()) as sp:
+            try:
+                remaining = self.remaining()
+                timeout = None if math.isinf(remaining) else max(0.0, remaining)
+                return get_scheduler(self.engine).run(_timed, cost=self.cost_s, timeout=timeout)
+            except SchedulerTimeout:
+                self.ctl._expired()
+                raise DeadlineExceeded("deadline exceeded while queued", retry_after=self.ctl.retry_after())
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.ctl._release(self)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        budget_s: Optional[float] = None,
+        deadline_s: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        rtf: Optional[Dict[str, float]] = None,
+        alpha: Optional[float] = None,
+    ):
+        self.enabled = settings.ADMISSION_ENABLED if enabled is None else bool(enabled)
+        self.budget_s = settings.ADMISSION_BUDGET_S if budget_s is None else float(budget_s)
+        self.deadline_s = settings.ADMISSION_DEADLINE_S if deadline_s is None else float(deadline_s)
+        self.concurrency = max(1, settings.ADMISSION_CONCURRENCY if concurrency is None else int(concurrency))
+        self.alpha = settings.ADMISSION_RTF_ALPHA if alpha is None else float(alpha)
+        # beam 1 기준 RTF (실측으로 갱신)
+        self._rtf: Dict[str, float] = dict(rtf if rtf is not None else _parse_rtf(settings.ADMISSION_RTF))
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, float] = Counter()
+        self._counts: Counter = Counter()
+        self._degraded: Counter = Counter()
+
+    # ---------- cost model ----------
+
+    def rtf(self, engine: str) -> float:
+        return self._rtf.get(engine, self._rtf.get("fw", 0.15))
+
+    def estimate(self, engine: str, audio_sec: float, beam: int = 1) -> float:
+        return float(audio_sec) * self.rtf(engine) * (beam_factor(beam) if engine != "ow" else 1.0)
+
+    def observe(self, engine: str, beam: int, audio_sec: float, elapsed_s: float) -> None:
+        if audio_sec <= 0:
+            return
+        sample = elapsed_s / audio_sec / (beam_factor(beam) if engine != "ow" else 1.0)
+        with self._lock:
+            prev = self._rtf.get(engine)
+            self._rtf[engine] = sample if prev is None else (1 - self.alpha) * prev + self.alpha * sample
+            self._counts["completed"] += 1
+
+    # ---------- admission ----------
+
+    def retry_after(self) -> float:
+        """현재 진행 중 작업이 예산 절반 아래로 빠질 때까지의 대략적인 시간."""
+        with self._lock:
+            total = sum(self._inflight.values())
+        return max(1.0, (total - self.budget_s / 2) / self.concurrency)
+
+    def admit(
+        self,
+        engine: str,
+        audio_sec: float,
+        beam: int = 1,
+        deadline_s: Optional[float] = None,
+        small_available: bool = False,
+    ) -> Ticket:
+        if self.enabled:
+            deadline_s = self.deadline_s if deadline_s is None else min(float(deadline_s), self.deadline_s)
+        else:
+            # 꺼져 있으면 서버 기본 deadline으로 버리지 않는다 (클라이언트가 명시한 X-Deadline-Ms만)
+            deadline_s = math.inf if deadline_s is None else float(deadline_s)
+        candidates: List[Tuple[str, int, Optional[str]]] = [(engine, beam, None)]
+        if engine != "ow" and beam > 1:
+            candidates.append((engine, 1, "beam"))
+        if engine == "fw" and small_available:
+            candidates.append(("fw_small", 1, "model"))
+
+        with self._lock:
+            total = sum(self._inflight.values())
+            chosen = None
+            for eng, b, why in candidates:
+                cost = self.estimate(eng, audio_sec, b)
+                wait = self._inflight[eng] / self.concurrency
+                if not self.enabled or (total + cost <= self.budget_s and wait + cost <= deadline_s):
+                    chosen = (eng, b, why, cost)
+                    break
+            if chosen is None:
+                self._counts["rejected"] += 1
+                eng, b, _ = candidates[-1]
+                cost = self.estimate(eng, audio_sec, b)
+                retry = max(1.0, (total + cost - self.budget_s) / self.concurrency)
+                raise AdmissionRejected(
+                    f"over capacity (inflight {total:.1f}s + {cost:.1f}s > budget {self.budget_s:.1f}s)",
+                    retry_after=retry,
+                )
+            eng, b, why, cost = chosen
+            self._inflight[eng] += cost
+            self._counts["admitted"] += 1
+            if why:
+                self._degraded[why] += 1
+        return Ticket(self, eng, b, audio_sec, cost, time.monotonic() + deadline_s, why)
+
+    def _release(self, ticket: Ticket) -> None:
+        with self._lock:
+            self._inflight[ticket.engine] = max(0.0, self._inflight[ticket.engine] - ticket.cost_s)
+
+    def _expired(self) -> None:
+        with self._lock:
+            self._counts["expired"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            admitted = self._counts["admitted"]
+            offered = admitted + self._counts["rejected"]
+            return {
+                "enabled": self.enabled,
+                "budget_s": self.budget_s,
+                "deadline_s": self.deadline_s,
+                "concurrency": self.concurrency,
+                "inflight_cost_s": {k: round(v, 3) for k, v in self._inflight.items()},
+                "rtf": {k: round(v, 4) for k, v in self._rtf.items()},
+                "admitted": admitted,
+                "rejected": self._counts["rejected"],
+                "expired": self._counts["expired"],
+                "completed": self._counts["completed"],
+                "degraded": dict(self._degraded),
+                # 들어온 요청 중 실제로 결과를 돌려준 비율
+                "goodput": round(self._counts["completed"] / offered, 4) if offered else None,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_admission() -> AdmissionController:
+    return AdmissionController()
+
+
+def request_deadline(headers: Mapping[str, str]) -> Optional[float]:
+    """클라이언트가 `X-Deadline-Ms`로 더 짧은 대기 한도를 줄 수 있다 (초 단위로 반환)."""
+    v = headers.get("x-deadline-ms")
+    try:
+        return float(v) / 1000.0 if v else None
+    except ValueError:
+        return None
+
+
+async def transcribe_admitted(
+    engines: Mapping[str, Any],
+    engine: str,
+    wav: Any,
+    audio_sec: float,
+    language: Optional[str] = None,
+    beam_size: Optional[int] = None,
+    domain: Optional[str] = None,
+    deadline_s: Optional[float] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    engines: {"fw": ..., "ow": ..., ("fw_small": ...)} ASR 백엔드.
+    admit → 워커 스레드에서 엔진 슬롯 대기 + transcribe. 거절/만료 시 AdmissionRejected.
+    meta["admission"]에 실제로 쓴 엔진/beam/강등 사유를 남긴다.
+    """
+    ctl = get_admission()
+    asr = engines[engine]
+    beam = int(beam_size or getattr(asr, "beam_size", None) or settings.FW_BEAM)
+    with span("admission", engine=engine, audio_sec=round(audio_sec, 3)) as sp:
+        ticket = ctl.admit(engine, audio_sec, beam, deadline_s=deadline_s, small_available="fw_small" in engines)
+        sp.set("cost_s", round(ticket.cost_s, 3))
+        if ticket.degraded:
+            sp.set("degraded", ticket.degraded)
+    with ticket:
+        kwargs: Dict[str, Any] = {"language": language, "domain": domain}
+        if ticket.engine != "ow":
+            kwargs["beam_size"] = ticket.beam
+        text, meta = await asyncio.to_thread(ticket.run, engines[ticket.engine].transcribe, wav, **kwargs)
+    meta = {**meta, "admission": {"engine": ticket.engine, "beam": ticket.beam, "degraded": ticket.degraded}}
+    return text, meta
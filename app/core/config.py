@@ -32,6 +32,7 @@ class Settings:
     LANGUAGE = os.getenv("ASR_LANGUAGE", "ko")
     FW_BEAM = int(os.getenv("ASR_FW_BEAM", "1"))
     MAX_AUDIO_SEC = int(os.getenv("ASR_MAX_AUDIO_SEC", "15"))
+    MAX_UPLOAD_MB = float(os.getenv("ASR_MAX_UPLOAD_MB", "10"))   # Content-Length 한도 (본문을 읽기 전에 413)
 
     # ---- Paths (기존 경로 체계 유지) ----
     BASE_DIR = os.getenv("ASR_BASE_DIR", "/root/asr-service")
@@ -42,8 +43,34 @@ class Settings:
     OW_MODEL_DIR = os.getenv("OW_MODEL_DIR", f"{MODEL_DIR}/whisper/medium")
 
     # ---- FW 실행 옵션 (신규) ----
-    FW_DEVICE = os.getenv("FW_DEVICE", "cuda")          # "cuda" | "cpu"
-    FW_COMPUTE = os.getenv("FW_COMPUTE", "float16")     # "float32" | "float16" | "int8_float16"
+    FW_DEVICE = os.getenv("FW_DEVICE", "auto")          # "auto" | "cuda" | "cpu"
+    FW_COMPUTE = os.getenv("FW_COMPUTE", "auto")        # "auto" | "float32" | "float16" | "int8_float16" | "int8"
+    FW_CPU_THREADS = int(os.getenv("FW_CPU_THREADS", "0"))   # 0 = 자동 (CPU 코어 수 / 튜닝 결과)
+    FW_NUM_WORKERS = int(os.getenv("FW_NUM_WORKERS", "1"))   # WhisperModel 동시 transcribe 수
+
+    # ---- FW CPU auto-tuning (신규) ----
+    FW_AUTOTUNE = os.getenv("FW_AUTOTUNE", "0") == "1"       # CPU에서 compute type/스레드 분할 측정 후 선택
+    FW_AUTOTUNE_PROFILE = os.getenv("FW_AUTOTUNE_PROFILE", f"{MODEL_DIR}/fw_autotune_profile.json")
+    FW_AUTOTUNE_CLIP = os.getenv("FW_AUTOTUNE_CLIP", "")     # 보정 클립 (같은 이름 .txt = 정답 전사)
+    FW_AUTOTUNE_WER_TOL = float(os.getenv("FW_AUTOTUNE_WER_TOL", "0.02"))  # 최고 정확도 대비 허용 WER 차이
+    FW_AUTOTUNE_OBJECTIVE = os.getenv("FW_AUTOTUNE_OBJECTIVE", "throughput")  # "throughput" | "latency"
+    FW_AUTOTUNE_REPEATS = int(os.getenv("FW_AUTOTUNE_REPEATS", "2"))
+
+    # ---- ASR cascade (신규) ----
+    ASR_CASCADE = os.getenv("ASR_CASCADE", "0") == "1"             # small 모델 먼저, 신뢰도 낮으면 large-v3
+    FW_SMALL_MODEL = os.getenv("FW_SMALL_MODEL", "small")          # faster-whisper 모델명 (small | distil-large-v3 ...)
+    FW_SMALL_MODEL_DIR = os.getenv("FW_SMALL_MODEL_DIR", f"{MODEL_DIR}/faster-whisper/small")
+    CASCADE_LOGPROB_MIN = float(os.getenv("CASCADE_LOGPROB_MIN", "-0.6"))     # 세그먼트 avg_logprob 하한
+    CASCADE_NO_SPEECH_MAX = float(os.getenv("CASCADE_NO_SPEECH_MAX", "0.5"))  # 세그먼트 no_speech_prob 상한
+
+    # ---- ASR catalog biasing (신규) ----
+    ASR_BIASING = os.getenv("ASR_BIASING", "0") == "1"                    # 서비스명/tags로 initial_prompt + hotwords
+    ASR_BIAS_DOMAIN_COLUMN = os.getenv("ASR_BIAS_DOMAIN_COLUMN", "지원유형")  # 도메인별 prompt를 나눌 CSV 컬럼 ("" = 전체만)
+    ASR_BIAS_PROMPT_MAX_TOKENS = int(os.getenv("ASR_BIAS_PROMPT_MAX_TOKENS", "160"))  # Whisper prompt 한도(223) 이내
+    ASR_BIAS_HOTWORDS = int(os.getenv("ASR_BIAS_HOTWORDS", "20"))         # 도메인별 상위 tags 수
+    QUERY_FUZZY_CORRECT = os.getenv("QUERY_FUZZY_CORRECT", "0") == "1"    # 검색 전 STT 결과를 카탈로그 용어로 보정
+    QUERY_FUZZY_THRESHOLD = float(os.getenv("QUERY_FUZZY_THRESHOLD", "0.8"))  # 자모 유사도 하한
+    QUERY_FUZZY_MIN_CHARS = int(os.getenv("QUERY_FUZZY_MIN_CHARS", "3"))  # 이보다 짧은 어절은 보정하지 않음
 
     # ---- Policy Search (신규) ----
     POLICY_CSV_PATH = os.getenv("POLICY_CSV_PATH", f"{BASE_DIR}/data/csv/gov24_services_with_tags.csv")
@@ -51,8 +78,122 @@ class Settings:
     EMBED_MODEL = os.getenv("EMBED_MODEL", "BAAI/bge-m3")
     TOPK_DEFAULT = int(os.getenv("TOPK_DEFAULT", "3"))
 
+    # ---- Compact vector index (신규) ----
+    POLICY_INDEX_COMPACT = os.getenv("POLICY_INDEX_COMPACT", "0") == "1"  # Qdrant: int8 양자화 + 원본 벡터 on_disk + ID만 payload
+    SNAPSHOT_QUANT = os.getenv("POLICY_SNAPSHOT_QUANT", "none")          # 스냅샷 export 시 양자화: none | int8 | pq
+    SNAPSHOT_PQ_M = int(os.getenv("POLICY_SNAPSHOT_PQ_M", "64"))         # PQ 부분공간 수 (임베딩 차원의 약수)
+    SNAPSHOT_RESCORE = float(os.getenv("POLICY_SNAPSHOT_RESCORE", "4"))  # 근사 점수 상위 limit×N개를 float32로 재채점
+
+    # ---- ASR backend (신규) ----
+    ASR_BACKEND = os.getenv("ASR_BACKEND", "local")            # "local" | "remote"
+    ASR_REMOTE_WORKERS = [w.strip() for w in os.getenv("ASR_REMOTE_WORKERS", "").split(",") if w.strip()]
+    ASR_REMOTE_POOL_SIZE = int(os.getenv("ASR_REMOTE_POOL_SIZE", "4"))   # 워커당 유지할 연결 수
+    ASR_REMOTE_TIMEOUT_S = float(os.getenv("ASR_REMOTE_TIMEOUT_S", "60"))   # 응답 대기 기본 (+ 오디오 길이 비례분)
+    ASR_REMOTE_TIMEOUT_PER_AUDIO_S = float(os.getenv("ASR_REMOTE_TIMEOUT_PER_AUDIO_S", "1.0"))  # 오디오 1초당 추가 대기
+    ASR_REMOTE_CONNECT_TIMEOUT_S = float(os.getenv("ASR_REMOTE_CONNECT_TIMEOUT_S", "3"))
+    ASR_REMOTE_RETRY_AFTER_S = float(os.getenv("ASR_REMOTE_RETRY_AFTER_S", "5"))  # 실패한 워커 제외 시간
+
+    # ---- Multi-process serving (신규) ----
+    SERVING_MODE = os.getenv("ASR_SERVING_MODE", "single")     # "single" | "multiproc"
+    SERVING_WORKERS = int(os.getenv("ASR_SERVING_WORKERS", "4"))  # 요청 워커 수 (multiproc)
+    INFERENCE_PROCS = int(os.getenv("ASR_INFERENCE_PROCS", "1"))  # 모델 전용 프로세스 수 (multiproc)
+    INFERENCE_TIMEOUT_S = float(os.getenv("ASR_INFERENCE_TIMEOUT_S", "120"))
+    SNAPSHOT_DIR = os.getenv("POLICY_SNAPSHOT_DIR", f"{BASE_DIR}/data/policy_snapshot")
+
     # ---- TTS (신규) ----
     TTS_VOICE_DEFAULT = os.getenv("TTS_VOICE_DEFAULT", "ko-KR-SunHiNeural")
+    EDGE_TTS_WSS_URL = os.getenv("EDGE_TTS_WSS_URL", "")   # 비우면 기본 MS 엔드포인트, 벤치/테스트 시 fake 서버 주소
+    EDGE_TTS_VOICES_URL = os.getenv("EDGE_TTS_VOICES_URL", "")   # 비우면 기본 MS 보이스 목록, 테스트 시 fake 서버 /voices
+    EDGE_TTS_REUSE = os.getenv("EDGE_TTS_REUSE", "1") == "1"    # WebSocket 연결을 turn 간에 재사용
+    EDGE_TTS_POOL_SIZE = int(os.getenv("EDGE_TTS_POOL_SIZE", "4"))          # 보관할 유휴 연결 수
+    EDGE_TTS_IDLE_S = float(os.getenv("EDGE_TTS_IDLE_S", "30"))             # 이보다 오래 쉰 연결은 버림
+    EDGE_TTS_TIMEOUT_S = float(os.getenv("EDGE_TTS_TIMEOUT_S", "8"))        # 호출 전체 deadline
+    EDGE_TTS_HEDGE_PCT = float(os.getenv("EDGE_TTS_HEDGE_PCT", "95"))       # 첫 바이트가 이 백분위수를 넘으면 중복 요청 (0=끔)
+    EDGE_TTS_HEDGE_MIN_MS = float(os.getenv("EDGE_TTS_HEDGE_MIN_MS", "300"))
+    EDGE_TTS_FALLBACK = os.getenv("EDGE_TTS_FALLBACK", "1") == "1"          # 장애 시 SpeechT5로 합성
+    EDGE_TTS_BREAKER_FAILS = int(os.getenv("EDGE_TTS_BREAKER_FAILS", "3"))  # 연속 실패 N회 → cooldown 동안 바로 fallback
+    EDGE_TTS_BREAKER_COOLDOWN_S = float(os.getenv("EDGE_TTS_BREAKER_COOLDOWN_S", "30"))
+    EDGE_TTS_VOICES_TTL_S = float(os.getenv("EDGE_TTS_VOICES_TTL_S", "86400"))
+    SPEECHT5_SPEAKER = os.getenv("SPEECHT5_SPEAKER", "default")         # 프리셋 이름 또는 .npy 경로
+    SPEECHT5_SPEAKER_DIR = os.getenv("SPEECHT5_SPEAKER_DIR", f"{MODEL_DIR}/speecht5_speakers")  # <이름>.npy 프리셋
+    SPEECHT5_BATCH_SIZE = int(os.getenv("SPEECHT5_BATCH_SIZE", "8"))    # 한 번에 생성할 문장 수
+    SPEECHT5_MAX_CHARS = int(os.getenv("SPEECHT5_MAX_CHARS", "200"))    # 문장 조각 최대 길이
+    SPEECHT5_ENGINE = os.getenv("SPEECHT5_ENGINE", "torch")             # "torch" | "onnx" (CPU 노드용 ONNX Runtime)
+    SPEECHT5_ONNX_DIR = os.getenv("SPEECHT5_ONNX_DIR", f"{MODEL_DIR}/speecht5_onnx")
+    SPEECHT5_ONNX_INT8 = os.getenv("SPEECHT5_ONNX_INT8", "1") == "1"     # encoder/decoder dynamic int8 양자화본 사용
+    SPEECHT5_ONNX_THREADS = int(os.getenv("SPEECHT5_ONNX_THREADS", "4")) # intra-op 스레드 수
+    TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "mp3")             # "mp3" | "ogg_opus" | "wav" (SpeechT5 기본 출력)
+    TTS_COMPRESSION_LEVEL = float(os.getenv("TTS_COMPRESSION_LEVEL", "0.8"))  # 프로세스 내 인코딩 (0=최고 비트레이트, 1=최저)
+    TTS_MP3_BITRATE = os.getenv("TTS_MP3_BITRATE", "32k")               # ffmpeg fallback 비트레이트
+    TTS_OPUS_BITRATE = os.getenv("TTS_OPUS_BITRATE", "24k")
+
+    # ---- Admission control (신규) ----
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "0") == "1"         # 예산 초과 시 강등/거절(503)
+    ADMISSION_BUDGET_S = float(os.getenv("ADMISSION_BUDGET_S", "30"))      # 진행 중 추정 연산 초 합계 한도
+    ADMISSION_DEADLINE_S = float(os.getenv("ADMISSION_DEADLINE_S", "30"))  # 대기 + 처리 한도 (X-Deadline-Ms로 더 짧게)
+    ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", "1"))   # 엔진별 동시 실행 슬롯
+    ADMISSION_RTF = os.getenv("ADMISSION_RTF", "fw:0.15,fw_small:0.05,ow:0.5")  # 초기 RTF (beam 1, 실측 EWMA로 갱신)
+    ADMISSION_RTF_ALPHA = float(os.getenv("ADMISSION_RTF_ALPHA", "0.2"))
+
+    # ---- Priority scheduling (신규) ----
+    SCHED_WEIGHTS = os.getenv("SCHED_WEIGHTS", "interactive:4,bulk:1")        # WFQ 클래스 가중치
+    SCHED_INTERACTIVE_MIN_SHARE = float(os.getenv("SCHED_INTERACTIVE_MIN_SHARE", "0.5"))  # interactive 최소 몫 (0~1)
+    SCHED_BULK_PATHS = os.getenv("SCHED_BULK_PATHS", "/transcribe")           # 기본 bulk 클래스 경로 (쉼표 구분)
+    SCHED_API_KEYS = os.getenv("SCHED_API_KEYS", "")                          # "키:bulk,키:interactive" (X-API-Key)
+    SCHED_EMBED_BATCH = os.getenv("SCHED_EMBED_BATCH", "1") == "1"            # 쿼리 임베딩 마이크로배치
+    SCHED_EMBED_MAX_BATCH = int(os.getenv("SCHED_EMBED_MAX_BATCH", "16"))
+    SCHED_EMBED_MAX_WAIT_MS = float(os.getenv("SCHED_EMBED_MAX_WAIT_MS", "3"))
+
+    # ---- Startup (신규) ----
+    IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))   # app.server import 시간 예산 (초과 시 경고, 0=끔)
+
+    # ---- Single-flight (신규) ----
+    SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1") == "1"   # 동일 in-flight 디코드/STT/검색/TTS 합치기
+
+    # ---- Bulk transcription jobs (신규) ----
+    JOBS_ENABLED = os.getenv("JOBS_ENABLED", "1") == "1"
+    JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", f"{BASE_DIR}/data/jobs.sqlite3")   # 영속 큐 (재시작 후 이어서 처리)
+    JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "2"))      # 동시 처리 파일 수 (디코드/ASR 파이프라인)
+    JOBS_MAX_FILES = int(os.getenv("JOBS_MAX_FILES", "1000"))       # job 하나의 최대 파일 수
+    JOBS_MAX_UPLOAD_MB = float(os.getenv("JOBS_MAX_UPLOAD_MB", "2048"))  # /jobs 업로드 Content-Length 한도
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    JOBS_POLL_S = float(os.getenv("JOBS_POLL_S", "5"))
+    JOBS_LEASE_S = float(os.getenv("JOBS_LEASE_S", "60"))          # 처리 중 항목 lease (만료되면 다른 프로세스가 다시 처리)
+    JOBS_KEEP_UPLOADS = os.getenv("JOBS_KEEP_UPLOADS", "0") == "1"  # 처리 후 spool 파일 보존
+    JOBS_CALLBACK_TIMEOUT_S = float(os.getenv("JOBS_CALLBACK_TIMEOUT_S", "10"))
+    JOBS_CALLBACK_RETRIES = int(os.getenv("JOBS_CALLBACK_RETRIES", "3"))
+
+    # ---- Policy summaries (신규) ----
+    SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "openai")          # "openai" | "stub" (STUB_ENGINES=1이면 stub)
+    SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    SUMMARY_PROMPT_VERSION = os.getenv("SUMMARY_PROMPT_VERSION", "1")  # 프롬프트를 바꾸면 올림 (캐시 키에 포함)
+    SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", f"{BASE_DIR}/data/summaries")
+    SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))   # 동시 생성 호출 수
+    SUMMARY_TIMEOUT_S = float(os.getenv("SUMMARY_TIMEOUT_S", "30"))
+    SUMMARY_MAX_ITEMS = int(os.getenv("SUMMARY_MAX_ITEMS", "20"))      # /summaries 요청당 최대 정책 수
+
+    # ---- Response encoding (신규) ----
+    RESPONSE_GZIP = os.getenv("RESPONSE_GZIP", "1") == "1"                 # Accept-Encoding: gzip 응답 압축
+    RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))       # 1(빠름) ~ 9(작음)
+
+    # ---- Warmup (신규) ----
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+    WARMUP_STAGES = os.getenv("WARMUP_STAGES", "fw,ow,policy,speecht5,edge_tts")
+    WARMUP_STRICT = os.getenv("WARMUP_STRICT", "0") == "1"      # 1이면 실패한 단계가 있으면 /readyz 계속 503
+    WARMUP_EDGE_TIMEOUT_S = float(os.getenv("WARMUP_EDGE_TIMEOUT_S", "10"))
+
+    # ---- Stub engines (벤치마크/오프라인 테스트용, 신규) ----
+    STUB_ENGINES = os.getenv("STUB_ENGINES", "0") == "1"
+    STUB_ASR_RTF = float(os.getenv("STUB_ASR_RTF", "0.05"))     # 오디오 1초당 모의 디코딩 시간(초)
+    STUB_SEARCH_MS = float(os.getenv("STUB_SEARCH_MS", "20"))   # 모의 검색 지연(ms)
+
+    # ---- Tracing (신규) ----
+    TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0") == "1"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))   # 0.0 ~ 1.0
+    TRACE_SINK = os.getenv("TRACE_SINK", "jsonl")                       # "jsonl" | "otlp"
+    TRACE_PATH = os.getenv("TRACE_PATH", f"{LOG_DIR}/traces.jsonl")
 
     @classmethod
     def ensure_dirs(cls):
@@ -76,4 +217,4 @@ class Settings:
         return {k: getattr(cls, k) for k in dir(cls) if k.isupper()}
 
 settings = Settings()
-Settings.ensure_dirs()
\ No newline at end of file
+# 디렉토리 생성은 import 시점이 아니라 서버 startup(app.server)에서 수행
\ No newline at end of file
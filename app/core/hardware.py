@@ -0,0 +1,79 @@
+# app/core/hardware.py
+"""
+하드웨어 감지 (FW_DEVICE=auto 해석, FW 자동 튜닝 프로파일 키).
+
+- resolve_device(): "auto" -> CUDA 장치가 있으면 "cuda", 없으면 "cpu"
+- detect_hardware(): CPU 모델/코어 수, CUDA 장치 수, CTranslate2 지원 compute type
+"""
+from __future__ import annotations
+
+import os
+import platform
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def cuda_device_count() -> int:
+    try:
+        import ctranslate2
+        return int(ctranslate2.get_cuda_device_count())
+    except Exception:
+        pass
+    try:
+        import torch
+        return int(torch.cuda.device_count()) if torch.cuda.is_available() else 0
+    except Exception:
+        return 0
+
+
+def resolve_device(device: Optional[str] = None) -> str:
+    """설정값("cuda" | "cuda:1" | "cpu" | "auto")을 실제 장치 문자열로."""
+    dev = (device or settings.FW_DEVICE or "cpu").lower()
+    if dev == "auto":
+        return "cuda" if cuda_device_count() > 0 else "cpu"
+    return dev
+
+
+def usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # 컨테이너 cpuset 반영
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _ct2_compute_types(device: str) -> List[str]:
+    try:
+        import ctranslate2
+        return sorted(ctranslate2.get_supported_compute_types(device))
+    except Exception:
+        return []
+
+
+@lru_cache(maxsize=1)
+def detect_hardware() -> Dict[str, Any]:
+    try:
+        import ctranslate2
+        ct2_version = ctranslate2.__version__
+    except Exception:
+        ct2_version = None
+    return {
+        "cpu_model": _cpu_model(),
+        "cpus": usable_cpus(),
+        "cuda_devices": cuda_device_count(),
+        "ctranslate2": ct2_version,
+        "cpu_compute_types": _ct2_compute_types("cpu"),
+    }
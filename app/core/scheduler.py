@@ -0,0 +1,360 @@
+# app/core/scheduler.py
+"""
+우선순위 클래스 + weighted fair queuing 스케줄러 (ASR / 임베딩 / SpeechT5 앞단).
+
+키오스크의 대화형 요청(/stt_search_tts)과 QA·백필용 대량 요청(/transcribe)이 같은 모델을 쓰므로,
+엔진마다 클래스별 큐를 두고 가상 finish tag(= 시작 tag + 비용 / 가중치)가 가장 작은 요청부터 실행한다.
+
+  - 클래스: "interactive" | "bulk"
+      API 키 매핑(SCHED_API_KEYS, X-API-Key) → X-Priority 헤더 → 경로 기본값(SCHED_BULK_PATHS) 순으로 결정하고,
+      미들웨어가 contextvar에 넣어 두면 asyncio.to_thread 안에서도 그대로 보인다 (tracing과 같은 방식)
+  - 가중치: SCHED_WEIGHTS. interactive 몫은 SCHED_INTERACTIVE_MIN_SHARE 이상이 되도록 보정하고,
+      동시 실행 슬롯이 여러 개면 bulk는 최소 몫만큼의 슬롯을 비워 둔다
+  - WFQScheduler  : 슬롯(동시 실행 수) 단위 실행 (ASR, SpeechT5)
+  - BatchScheduler: 대기 중인 항목을 finish tag 순으로 골라 한 번에 실행 (쿼리 임베딩)
+                    → 배치를 채울 때도 interactive가 먼저 들어가고 bulk는 남는 자리만 쓴다
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+CLASSES = (INTERACTIVE, BULK)
+
+_PRIORITY: ContextVar[str] = ContextVar("sched_priority", default=INTERACTIVE)
+
+
+# -----------------------------
+# Priority class
+# -----------------------------
+def _parse_map(spec: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for part in spec.split(","):
+        k, _, v = part.partition(":")
+        if k.strip() and v.strip():
+            out[k.strip()] = v.strip()
+    return out
+
+
+def priority_for(headers: Mapping[str, str], path: str) -> str:
+    """API 키 매핑 → X-Priority 헤더 → 경로 기본값."""
+    key = headers.get("x-api-key")
+    if key:
+        cls = _parse_map(settings.SCHED_API_KEYS).get(key)
+        if cls in CLASSES:
+            return cls
+    hdr = (headers.get("x-priority") or "").strip().lower()
+    if hdr in CLASSES:
+        return hdr
+    bulk_paths = [p.strip() for p in settings.SCHED_BULK_PATHS.split(",") if p.strip()]
+    return BULK if path in bulk_paths else INTERACTIVE
+
+
+def set_priority(cls: str):
+    return _PRIORITY.set(cls if cls in CLASSES else INTERACTIVE)
+
+
+def reset_priority(token) -> None:
+    _PRIORITY.reset(token)
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+def class_weights(weights: Optional[Dict[str, float]] = None, min_share: Optional[float] = None) -> Dict[str, float]:
+    """interactive 가중치를 전체의 min_share 이상이 되도록 올린다."""
+    w = {c: 1.0 for c in CLASSES}
+    w.update(weights if weights is not None else {k: float(v) for k, v in _parse_map(settings.SCHED_WEIGHTS).items()})
+    share = settings.SCHED_INTERACTIVE_MIN_SHARE if min_share is None else float(min_share)
+    others = sum(v for k, v in w.items() if k != INTERACTIVE)
+    if 0.0 < share < 1.0 and others > 0:
+        w[INTERACTIVE] = max(w[INTERACTIVE], share / (1.0 - share) * others)
+    return w
+
+
+# -----------------------------
+# Fair queue (finish tags)
+# -----------------------------
+class _Req:
+    __slots__ = ("cls", "finish", "start", "enqueued", "granted", "cancelled", "payload", "future")
+
+    def __init__(self, cls: str, start: float, finish: float, payload: Any = None):
+        self.cls = cls
+        self.start = start
+        self.finish = finish
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.cancelled = False
+        self.payload = payload
+        self.future: Optional[Future] = None
+
+
+class _FairQueue:
+    """클래스별 가상 시간 기반 finish tag 힙 + 클래스별 통계. 호출자가 lock을 잡는다."""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+        self._vtime = 0.0
+        self._last_finish: Dict[str, float] = {c: 0.0 for c in CLASSES}
+        self.queued: Counter = Counter()
+        self.served: Counter = Counter()
+        self.expired: Counter = Counter()
+        self._waits: Dict[str, Deque[float]] = {c: deque(maxlen=1000) for c in CLASSES}
+
+    def push(self, cls: str, cost: float, payload: Any = None) -> _Req:
+        start = max(self._vtime, self._last_finish.get(cls, 0.0))
+        finish = start + max(cost, 1e-6) / self.weights.get(cls, 1.0)
+        self._last_finish[cls] = finish
+        req = _Req(cls, start, finish, payload)
+        heapq.heappush(self._heap, (finish, next(self._seq), req))
+        self.queued[cls] += 1
+        return req
+
+    def pop(self, allow: Callable[[str], bool] = lambda _c: True) -> Optional[_Req]:
+        """allow(cls)를 만족하는 가장 작은 finish tag 요청."""
+        skipped = []
+        found = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            req = item[2]
+            if req.cancelled:
+                continue
+            if allow(req.cls):
+                found = req
+                break
+            skipped.append(item)
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+        if found is not None:
+            self._vtime = max(self._vtime, found.start)
+            self.queued[found.cls] -= 1
+            self.served[found.cls] += 1
+            self._waits[found.cls].append(time.perf_counter() - found.enqueued)
+        return found
+
+    def cancel(self, req: _Req) -> None:
+        req.cancelled = True
+        self.queued[req.cls] -= 1
+        self.expired[req.cls] += 1
+
+    def __bool__(self) -> bool:
+        return any(not item[2].cancelled for item in self._heap)
+
+    def class_stats(self) -> Dict[str, Any]:
+        out = {}
+        for c in CLASSES:
+            waits = sorted(self._waits[c])
+            out[c] = {
+                "weight": round(self.weights.get(c, 1.0), 3),
+                "queued": self.queued[c],
+                "served": self.served[c],
+                "expired": self.expired[c],
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else None,
+                "wait_p95_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else None,
+            }
+        return out
+
+
+class SchedulerTimeout(Exception):
+    """deadline 안에 실행 슬롯을 받지 못함."""
+
+
+# -----------------------------
+# Slot scheduler
+# -----------------------------
+class WFQScheduler:
+    """동시 실행 슬롯 concurrency개를 클래스별 WFQ 순서로 나눠 준다."""
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+        min_share: Optional[float] = None,
+    ):
+        self.name = name
+        self.concurrency = max(1, settings.ADMISSION_CONCURRENCY if concurrency is None else int(concurrency))
+        self._cv = threading.Condition()
+        self._q = _FairQueue(class_weights(weights, min_share))
+        self._busy: Counter = Counter()
+        share = settings.SCHED_INTERACTIVE_MIN_SHARE if min_share is None else float(min_share)
+        # 슬롯이 여러 개면 bulk가 interactive 최소 몫만큼의 슬롯은 남겨 둔다
+        self.bulk_slots = max(1, self.concurrency - math.ceil(self.concurrency * share))
+
+    def _allow(self, cls: str) -> bool:
+        return cls != BULK or self._busy[BULK] < self.bulk_slots
+
+    def _dispatch(self) -> None:
+        while sum(self._busy.values()) < self.concurrency:
+            req = self._q.pop(self._allow)
+            if req is None:
+                return
+            req.granted = True
+            self._busy[req.cls] += 1
+        self._cv.notify_all()
+
+    def run(
+        self, fn: Callable[..., Any], *args: Any,
+        cost: float = 1.0, timeout: Optional[float] = None, priority: Optional[str] = None, **kwargs: Any,
+    ) -> Any:
+        """슬롯을 받을 때까지 기다렸다가 fn 실행 (블로킹). timeout 안에 못 받으면 SchedulerTimeout."""
+        cls = priority or current_priority()
+        with self._cv:
+            req = self._q.push(cls, cost)
+            self._dispatch()
+            if not self._cv.wait_for(lambda: req.granted, timeout=timeout):
+                self._q.cancel(req)
+                raise SchedulerTimeout(f"{self.name}: no slot within {timeout:.2f}s")
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._cv:
+                self._busy[cls] -= 1
+                self._dispatch()
+                self._cv.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            return {
+                "concurrency": self.concurrency,
+                "bulk_slots": self.bulk_slots,
+                "busy": dict(self._busy),
+                "classes": self._q.class_stats(),
+            }
+
+
+# -----------------------------
+# Batch scheduler
+# -----------------------------
+class BatchScheduler:
+    """
+    submit(item) → Future. 디스패처 스레드가 첫 항목 도착 후 max_wait_ms 동안 모아
+    finish tag 순으로 최대 max_batch개를 골라 batch_fn(items) 한 번으로 처리한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[Sequence[Any]], Sequence[Any]],
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, settings.SCHED_EMBED_MAX_BATCH if max_batch is None else int(max_batch))
+        self.max_wait_s = (settings.SCHED_EMBED_MAX_WAIT_MS if max_wait_ms is None else float(max_wait_ms)) / 1000.0
+        self._cv = threading.Condition()
+        self._q = _FairQueue(class_weights(weights))
+        self._batches = 0
+        self._items = 0
+        self._thread = threading.Thread(target=self._loop, name=f"batch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, cost: float = 1.0, priority: Optional[str] = None) -> Future:
+        fut: Future = Future()
+        with self._cv:
+            req = self._q.push(priority or current_priority(), cost, payload=item)
+            req.future = fut
+            self._cv.notify_all()
+        return fut
+
+    def _loop(self) -> None:
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: bool(self._q))
+                # 첫 항목 이후 잠깐 더 모은다 (가득 차면 바로 실행)
+                t_end = time.monotonic() + self.max_wait_s
+                while sum(self._q.queued.values()) < self.max_batch:
+                    left = t_end - time.monotonic()
+                    if left <= 0 or not self._cv.wait(timeout=left):
+                        break
+                batch: List[_Req] = []
+                while len(batch) < self.max_batch:
+                    req = self._q.pop()
+                    if req is None:
+                        break
+                    batch.append(req)
+            if not batch:
+                continue
+            try:
+                outs = self.batch_fn([r.payload for r in batch])
+                for r, out in zip(batch, outs):
+                    r.future.set_result(out)
+            except Exception as e:
+                for r in batch:
+                    r.future.set_exception(e)
+            with self._cv:
+                self._batches += 1
+                self._items += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            return {
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "avg_batch": round(self._items / self._batches, 2) if self._batches else None,
+                "classes": self._q.class_stats(),
+            }
+
+
+def batched_encoder(
+    name: str, encode_fn: Callable[[Sequence[str]], Any],
+) -> Callable[[Sequence[str]], np.ndarray]:
+    """
+    encode_fn(texts) → (n, D)를 BatchScheduler로 감싼 같은 시그니처의 함수.
+    동시에 들어온 쿼리 임베딩을 한 번의 encode로 묶는다. SCHED_EMBED_BATCH=0이면 encode_fn 그대로.
+    """
+    if not settings.SCHED_EMBED_BATCH:
+        return encode_fn
+    batcher = BatchScheduler(name, lambda texts: list(np.asarray(encode_fn(texts), dtype=np.float32)))
+    register(name, batcher)
+
+    def encode(texts: Sequence[str]) -> np.ndarray:
+        futures = [batcher.submit(t) for t in texts]
+        return np.stack([f.result() for f in futures])
+
+    return encode
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+_REGISTRY: Dict[str, Any] = {}
+_REG_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_scheduler(name: str) -> WFQScheduler:
+    """엔진 이름("fw" | "fw_small" | "ow" | "speecht5")별 슬롯 스케줄러."""
+    sched = WFQScheduler(name)
+    register(name, sched)
+    return sched
+
+
+def register(name: str, sched: Any) -> None:
+    with _REG_LOCK:
+        _REGISTRY[name] = sched
+
+
+def stats() -> Dict[str, Any]:
+    with _REG_LOCK:
+        items = list(_REGISTRY.items())
+    return {name: s.stats() for name, s in items}
@@ -0,0 +1,120 @@
+# app/core/singleflight.py
+"""
+동일한 in-flight 작업 합치기 (single-flight).
+
+같은 키(내용 해시 + 옵션)의 작업이 이미 진행 중이면 새로 실행하지 않고 그 결과를 같이 기다린다.
+결과는 캐시하지 않는다 — 완료되면 키를 지우므로 "동시에" 들어온 중복만 합쳐진다.
+
+  - 실행은 별도 태스크라서 먼저 온 요청이 끊겨도(클라이언트 disconnect) 나머지 대기자는 결과를 받는다
+  - 예외도 모든 대기자에게 그대로 전달된다
+  - 태스크는 먼저 온 요청의 context(우선순위 클래스, trace)를 물려받는다
+  - 따라서 태스크는 요청 수명에 묶인 자원(UploadFile 등)을 직접 쓰면 안 된다 → own_file()
+
+    sf = get_flight("stt")
+    text, meta = await sf.do(key, lambda: transcribe_admitted(...))
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Hashable, TypeVar
+
+from app.core.config import settings
+from app.core.tracing import span
+
+T = TypeVar("T")
+
+_NAMES: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._counts: Counter = Counter()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await fn()
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counts["coalesced"] += 1
+            with span("singleflight.join", stage=self.name):
+                return await asyncio.shield(task)
+        self._counts["executions"] += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # 대기자가 모두 끊긴 경우에도 "exception was never retrieved" 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        ex, co = self._counts["executions"], self._counts["coalesced"]
+        return {
+            "executions": ex,
+            "coalesced": co,
+            "inflight": len(self._inflight),
+            "coalesced_ratio": round(co / (ex + co), 4) if ex + co else None,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_flight(name: str) -> SingleFlight:
+    """단계 이름("stt" | "search" | "tts" | "edge_tts" ...)별 인스턴스 (이벤트 루프 스레드 전용)."""
+    sf = SingleFlight(name, enabled=settings.SINGLEFLIGHT_ENABLED)
+    _NAMES[name] = sf
+    return sf
+
+
+def stats() -> Dict[str, Any]:
+    return {name: sf.stats() for name, sf in _NAMES.items()}
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def digest_file(f: BinaryIO, chunk: int = 1024 * 1024) -> str:
+    """업로드 파일 내용 해시 (읽은 뒤 처음 위치로 되돌린다, 블로킹)."""
+    h = hashlib.blake2b(digest_size=16)
+    pos = f.tell()
+    while True:
+        b = f.read(chunk)
+        if not b:
+            break
+        h.update(b)
+    f.seek(pos)
+    return h.hexdigest()
+
+
+def digest_text(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# -----------------------------
+# Uploads
+# -----------------------------
+def own_file(f: BinaryIO) -> BinaryIO:
+    """
+    업로드 파일(SpooledTemporaryFile)을 요청과 독립적으로 읽을 수 있는 핸들 (처음 위치부터).
+
+    공유 태스크가 먼저 온 요청의 UploadFile.file을 그대로 읽으면, 그 요청이 끝날 때
+    FastAPI가 파일을 닫아 나머지 대기자의 디코드가 중간에 잘린다. 디스크로 넘어간 파일은
+    fd를 dup해 같은 (이름 없는) 임시 파일을 계속 열어 두고, 메모리에 있는 작은 파일은 복사한다.
+    호출한 쪽(공유 태스크)이 닫는다.
+    """
+    inner = getattr(f, "_file", f)  # SpooledTemporaryFile → 실제 BytesIO / 임시 파일
+    if isinstance(inner, io.BytesIO):
+        return io.BytesIO(inner.getvalue())
+    dup = os.fdopen(os.dup(inner.fileno()), "rb")
+    dup.seek(0)
+    return dup
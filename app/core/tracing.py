@@ -0,0 +1,283 @@
+# app/core/tracing.py
+"""
+경량 요청 트레이싱.
+
+- 요청마다 request ID를 부여하고, 샘플링된 요청에 대해서만 span을 기록한다.
+- span은 contextvars로 전파되므로 async 핸들러/`asyncio.to_thread` 안에서도 중첩이 유지된다.
+- 완료된 trace는 백그라운드 스레드가 JSON-lines 파일로 기록한다.
+    * TRACE_SINK=jsonl : span 1개당 1줄 (grep/jq 친화적)
+    * TRACE_SINK=otlp  : trace 1개당 1줄, OTLP/JSON(ExportTraceServiceRequest) 형태
+      (OpenTelemetry Collector의 otlpjsonfile receiver로 그대로 읽을 수 있음)
+
+샘플링되지 않은 요청에서 `span()`은 공유 no-op 컨텍스트를 반환하므로 오버헤드는
+ContextVar 조회 1회 수준이다.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SERVICE_NAME = "asr-service"
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attrs")
+
+    def __init__(self, name: str, span_id: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attrs = attrs
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+
+class Trace:
+    """한 요청 동안 기록된 span 모음."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.trace_id = uuid.uuid4().hex
+        # perf_counter 기준 상대 시각을 wall-clock(ns)로 환산하기 위한 기준점
+        self.wall0_ns = time.time_ns()
+        self.perf0_ns = time.perf_counter_ns()
+        self.spans: List[Span] = []
+
+    def _new_span_id(self) -> str:
+        return os.urandom(8).hex()
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """완료된 span을 응답용 dict 리스트로 변환 (시작 순)."""
+        out: List[Dict[str, Any]] = []
+        for s in sorted(self.spans, key=lambda x: x.start_ns):
+            if s.end_ns is None:
+                continue
+            out.append({
+                "name": s.name,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "start_ms": round((s.start_ns - self.perf0_ns) / 1e6, 3),
+                "duration_ms": round((s.end_ns - s.start_ns) / 1e6, 3),
+                "attrs": dict(s.attrs),
+            })
+        return out
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("asr_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("asr_span", default=None)
+
+
+# -----------------------------
+# Span context managers
+# -----------------------------
+class _NoopSpan:
+    """샘플링되지 않은 요청용 공유 컨텍스트."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _SpanCtx:
+    __slots__ = ("_trace", "_name", "_attrs", "_span", "_token")
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any]):
+        self._trace = trace
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        self._span = Span(
+            self._name,
+            self._trace._new_span_id(),
+            parent.span_id if parent is not None else None,
+            self._attrs,
+        )
+        self._trace.spans.append(self._span)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._span.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self._span.attrs["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        return False
+
+
+def span(name: str, **attrs: Any):
+    """
+    현재 trace에 중첩 span을 기록한다.
+
+        with span("asr.fw", beam=5) as sp:
+            ...
+            sp.set("text_len", len(text))
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _SpanCtx(trace, name, attrs)
+
+
+# -----------------------------
+# Trace lifecycle
+# -----------------------------
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def start_trace(request_id: Optional[str] = None, force: bool = False) -> Optional[Trace]:
+    """
+    샘플링 판정 후 trace를 시작한다. 샘플링되지 않으면 None.
+    force=True면 TRACE_ENABLED/샘플링과 무관하게 기록한다(예: X-Trace 헤더).
+    """
+    if not force:
+        if not settings.TRACE_ENABLED:
+            return None
+        rate = settings.TRACE_SAMPLE_RATE
+        if rate <= 0.0 or (rate < 1.0 and random.random() >= rate):
+            return None
+    trace = Trace(request_id or new_request_id())
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def finish_trace(trace: Optional[Trace]) -> None:
+    """
+    trace를 현재 컨텍스트에서 분리하고 sink로 넘긴다.
+    start_trace가 돌려준 trace는 샘플링됐거나 강제(X-Trace)된 것이므로 TRACE_ENABLED와 무관하게 기록한다.
+    """
+    if trace is None:
+        return
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+        _current_span.set(None)
+    _sink().submit(trace)
+
+
+# -----------------------------
+# Sink (background JSON-lines writer)
+# -----------------------------
+def _otlp_attrs(attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    out = []
+    for k, v in attrs.items():
+        if isinstance(v, bool):
+            val = {"boolValue": v}
+        elif isinstance(v, int):
+            val = {"intValue": str(v)}
+        elif isinstance(v, float):
+            val = {"doubleValue": v}
+        else:
+            val = {"stringValue": str(v)}
+        out.append({"key": k, "value": val})
+    return out
+
+
+def _to_jsonl(trace: Trace) -> List[str]:
+    return [
+        json.dumps({"request_id": trace.request_id, "trace_id": trace.trace_id, **t}, ensure_ascii=False)
+        for t in trace.timings()
+    ]
+
+
+def _to_otlp(trace: Trace) -> List[str]:
+    def _abs(ns: int) -> str:
+        return str(trace.wall0_ns + (ns - trace.perf0_ns))
+
+    spans = []
+    for s in trace.spans:
+        if s.end_ns is None:
+            continue
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": _abs(s.start_ns),
+            "endTimeUnixNano": _abs(s.end_ns),
+            "attributes": _otlp_attrs({"request.id": trace.request_id, **s.attrs}),
+        })
+    doc = {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attrs({"service.name": _SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+    return [json.dumps(doc, ensure_ascii=False)]
+
+
+class _TraceSink:
+    """요청 경로에서 파일 I/O를 하지 않도록 별도 스레드가 기록한다."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._q: "queue.SimpleQueue[Trace]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace) -> None:
+        self._q.put(trace)
+
+    def _run(self) -> None:
+        encode = _to_otlp if self.fmt == "otlp" else _to_jsonl
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        while True:
+            batch = [self._q.get()]
+            # 밀려 있는 trace는 한 번에 기록
+            while True:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for tr in batch:
+                        for line in encode(tr):
+                            f.write(line + "\n")
+            except Exception as e:
+                logger.warning(f"trace sink write failed: {e}")
+
+
+_SINK: Optional[_TraceSink] = None
+_SINK_LOCK = threading.Lock()
+
+
+def _sink() -> _TraceSink:
+    global _SINK
+    if _SINK is None:
+        with _SINK_LOCK:
+            if _SINK is None:
+                _SINK = _TraceSink(settings.TRACE_PATH, settings.TRACE_SINK)
+    return _SINK
@@ -0,0 +1,103 @@
+# app/routers/jobs.py
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import uuid
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, UploadFile
+
+from app.core.config import settings
+from app.services.job_runner import spool_upload
+
+router = APIRouter(tags=["jobs"])
+
+
+def _store(request: Request):
+    runner = getattr(request.app.state, "jobs", None)
+    if runner is None:
+        raise HTTPException(status_code=503, detail="Job API disabled (JOBS_ENABLED=0)")
+    return runner
+
+
+# --------------------------------------------------------------------
+# Bulk transcription jobs
+# --------------------------------------------------------------------
+@router.post("/jobs", status_code=202)
+async def create_job(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    engine: Literal["fw", "ow"] = Form(settings.ENGINE_DEFAULT),
+    language: Optional[str] = Form(None),
+    beam_size: Optional[int] = Form(None),
+    domain: Optional[str] = Form(None),
+    callback_url: Optional[str] = Form(None),
+):
+    """
+    여러 오디오 파일(또는 zip/tar 아카이브)을 받아 UPLOAD_DIR에 저장하고 백그라운드 전사 job을 만든다.
+
+    Parameters:
+    - files: 오디오 파일들 / 아카이브 (아카이브는 오디오 확장자 항목만 사용)
+    - engine, language, beam_size, domain: /transcribe와 동일
+    - callback_url: 모든 파일이 끝나면 결과 JSON을 POST할 주소 (없으면 GET /jobs/{id}로 폴링)
+    """
+    runner = _store(request)
+    job_id = uuid.uuid4().hex
+    job_dir = os.path.join(settings.UPLOAD_DIR, job_id)
+    spooled = []
+    try:
+        for up in files:
+            spooled += await asyncio.to_thread(spool_upload, up.file, up.filename or "audio", job_dir, len(spooled))
+            if len(spooled) > settings.JOBS_MAX_FILES:
+                raise HTTPException(status_code=413, detail=f"Too many files (> {settings.JOBS_MAX_FILES})")
+        if not spooled:
+            raise HTTPException(status_code=422, detail="No audio files in upload")
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    await asyncio.to_thread(
+        runner.store.create_job, spooled, engine,
+        language=language, beam_size=beam_size, domain=domain, callback_url=callback_url, job_id=job_id,
+    )
+    runner.notify()
+    return {"job_id": job_id, "status": "queued", "total": len(spooled)}
+
+
+@router.get("/jobs")
+def list_jobs(request: Request, limit: int = Query(50, ge=1, le=500)):
+    return {"jobs": _store(request).store.list_jobs(limit)}
+
+
+@router.get("/jobs/{job_id}")
+def get_job(request: Request, job_id: str):
+    job = _store(request).store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/results")
+def job_results(
+    request: Request,
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """파일별 상태/전사 결과 (idx 순, 페이지 단위)."""
+    store = _store(request).store
+    job = store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "status": job["status"], "total": job["total"],
+            "offset": offset, "items": store.items(job_id, offset, limit)}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(request: Request, job_id: str):
+    runner = _store(request)
+    if await asyncio.to_thread(runner.store.get_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "cancelled": await runner.cancel(job_id)}
@@ -1,33 +1,81 @@
 # app/routers/pipeline.py
 from __future__ import annotations
 
+import asyncio
 import base64
 import time
 from functools import lru_cache
 from typing import Optional, Literal
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, Response
 
+from app.core.admission import request_deadline, transcribe_admitted
 from app.core.config import settings
+from app.core.scheduler import batched_encoder, get_scheduler
+from app.core.singleflight import digest_file, digest_text, get_flight, own_file
+from app.core.tracing import span
 from app.schemas.pipeline import (
     PipelineResponse,
     STTResult, SearchResult, SearchItem, TTSResult,
 )
-from app.services.audio_io import to_f32_16k_mono, seconds_from_f32_16k
-from app.services.policy_search import PolicySearch
-from app.services.edge_tts import synthesize_mp3 as edge_synthesize
-from app.services.tts_speecht5 import synthesize_mp3 as speecht5_synthesize
+from app.services.asr_biasing import correct_query
+from app.services.audio_io import decode_stream, seconds_from_f32_16k
+from app.services.audio_encode import MIME_TYPES, negotiate_format
+from app.services.policy_filters import filters_key, parse_filters
+from app.services.response_codec import negotiate_response, parse_fields, project_results, pack
 
 router = APIRouter(tags=["pipeline"])
 
 # --------------------------------------------------------------------
 # Lazy singletons
 # --------------------------------------------------------------------
+# 엔진 모듈(pandas/sentence_transformers/qdrant, torch/transformers, edge_tts)은 처음 쓸 때 import
 @lru_cache(maxsize=1)
-def _policy() -> PolicySearch:
+def _policy():
+    if settings.STUB_ENGINES:
+        from app.services.stub_engines import StubPolicySearch
+        return StubPolicySearch()  # type: ignore[return-value]
+    if settings.SERVING_MODE == "multiproc":
+        # 워커 간 공유되는 mmap 스냅샷 + inference 프로세스의 임베더
+        from app.services.policy_snapshot import SnapshotPolicySearch
+        from app.services.inference_pool import pooled_encode
+        return SnapshotPolicySearch(encode_fn=batched_encoder("embed", pooled_encode))  # type: ignore[return-value]
     # settings에서 csv/qdrant/embed_model 설정을 읽어 초기화(영속 인덱스)
+    from app.services.policy_search import PolicySearch
     return PolicySearch()
 
+
+@lru_cache(maxsize=1)
+def _speecht5_impl():
+    if settings.STUB_ENGINES:
+        from app.services.stub_engines import stub_speecht5_audio
+        return stub_speecht5_audio
+    if settings.SERVING_MODE == "multiproc":
+        from app.services.inference_pool import pooled_speecht5_audio
+        return pooled_speecht5_audio
+    from app.services.tts_speecht5 import synthesize_audio
+    return synthesize_audio
+
+
+def speecht5_synthesize(text: str, **kwargs) -> bytes:
+    return _speecht5_impl()(text, **kwargs)
+
+
+async def speecht5_fallback(text: str) -> bytes:
+    """Edge TTS 장애 시 로컬 SpeechT5로 MP3 합성 (speecht5 스케줄러 슬롯 사용)."""
+    return await asyncio.to_thread(
+        get_scheduler("speecht5").run, speecht5_synthesize, text,
+        audio_format="mp3", cost=max(1.5, len(text) / 8.0),
+    )
+
+
+async def edge_synthesize(text: str, **kwargs) -> bytes:
+    from app.services.edge_tts import synthesize_mp3
+    if settings.EDGE_TTS_FALLBACK:
+        kwargs.setdefault("fallback", speecht5_fallback)
+    return await synthesize_mp3(text, **kwargs)
+
 # 더 이상 사용하지 않음 - 예전 프로토타입 방식으로 변경
 
 # --------------------------------------------------------------------
@@ -40,9 +88,15 @@ async def stt_search_tts(
     engine: Literal["fw", "ow"] = Form(settings.ENGINE_DEFAULT),
     language: Optional[str] = Form(None),
     beam_size: Optional[int] = Form(None),
+    domain: Optional[str] = Form(None),
     topk: Optional[int] = Form(None),
+    filters: Optional[str] = Form(None),
     voice: Optional[str] = Form(None),
     tts_engine: Literal["edge_tts", "speecht5"] = Form("edge_tts"),
+    audio_format: Optional[Literal["mp3", "ogg_opus", "wav"]] = Form(None),
+    response_format: Optional[Literal["json", "msgpack", "multipart"]] = Form(None),
+    fields: Optional[str] = Form(None),
+    timings: bool = Form(False),
 ):
     """
     Audio → STT → Vector Search(Top-K) → Summary(Top-1) → TTS(MP3)
@@ -51,27 +105,51 @@ async def stt_search_tts(
     - engine: STT 엔진 ("fw" | "ow")
     - language: 언어 코드 (기본: "ko")
     - beam_size: Faster-Whisper beam size (기본: 1)
+    - domain: ASR 바이어싱 도메인 (ASR_BIAS_DOMAIN_COLUMN 값, 예: "현금"). 없으면 전체 카탈로그
     - topk: 검색 결과 개수 (기본: 3)
+    - filters: 검색 필터 JSON (필드 안은 OR, 필드 간은 AND), 예:
+      {"support_type": ["현금"], "receiving_agency": "서울", "target_group": ["청년"]}
+      접수기관명 등은 정확히 일치하는 값이 없으면 부분 일치로 찾는다
     - voice: TTS 음성 (Edge TTS만 지원)
     - tts_engine: TTS 엔진 ("edge_tts" | "speecht5")
+    - audio_format: SpeechT5 출력 포맷 ("mp3" | "ogg_opus" | "wav"). 없으면 Accept 헤더 → TTS_AUDIO_FORMAT
+      (Edge TTS는 서비스가 MP3만 반환하므로 항상 "mp3")
+    - response_format: 응답 포맷 ("json" | "msgpack" | "multipart"). 없으면 Accept 헤더 → "json"
+      (msgpack/multipart는 오디오를 base64 없이 raw 바이트로 담는다)
+    - fields: search.results 항목에 남길 필드 (쉼표 구분, 예: "service_name,url"). rank는 항상 포함
+    - timings: True면 단계별 span을 응답의 `timings`에 포함 (트레이싱된 요청만)
     """
-    raw = await audio.read()
-
-    # 1) 디코드 & 길이 제한
-    wav = to_f32_16k_mono(raw)
-    audio_sec = seconds_from_f32_16k(wav)
-    if audio_sec > settings.MAX_AUDIO_SEC:
-        raise HTTPException(status_code=413, detail=f"Audio too long (> {settings.MAX_AUDIO_SEC}s)")
+    resp_fmt = negotiate_response(response_format, request.headers.get("accept"))
+    try:
+        flt = parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    # 2) STT (서버 싱글톤 재사용)
+    # 1) 디코드 & 길이 제한: spool된 업로드를 ffmpeg로 스트리밍, 한도 초과는 디코딩 도중 413
+    # 2) STT (서버 싱글톤 재사용): 비용 추정 → admit/강등/거절 → 엔진 슬롯 대기(deadline) → 워커 스레드에서 디코딩
+    #    beam_size는 호출 단위로 전달 (공유 싱글톤 상태를 바꾸지 않음)
+    #    같은 오디오(내용 해시) + 옵션으로 동시에 들어온 요청은 디코드/STT를 한 번만 실행 (single-flight)
     t0 = time.time()
     lang = language or settings.LANGUAGE
-    if engine == "ow":
-        text, meta = request.app.state.OW.transcribe(wav, language=lang)
-    else:
-        if beam_size:
-            request.app.state.FW.beam_size = int(beam_size)
-        text, meta = request.app.state.FW.transcribe(wav, language=lang)
+    audio_key = await asyncio.to_thread(digest_file, audio.file)
+
+    async def _decode_stt(src):
+        # src는 공유 태스크 소유 (먼저 온 요청이 끝나 UploadFile이 닫혀도 디코드가 계속된다)
+        try:
+            wav = await asyncio.to_thread(decode_stream, src, settings.MAX_AUDIO_SEC)
+        finally:
+            src.close()
+        audio_sec = seconds_from_f32_16k(wav)
+        text, meta = await transcribe_admitted(
+            request.app.state.ASR_ENGINES, engine, wav, audio_sec,
+            language=lang, beam_size=beam_size, domain=domain, deadline_s=request_deadline(request.headers),
+        )
+        return text, meta, audio_sec
+
+    with span("stt", engine=engine):
+        text, meta, audio_sec = await get_flight("stt").do(
+            (audio_key, engine, lang, beam_size, domain), lambda: _decode_stt(own_file(audio.file)),
+        )
     decode_s = round(time.time() - t0, 3)
 
     stt = STTResult(
@@ -81,12 +159,18 @@ async def stt_search_tts(
         audio_sec=audio_sec,
     )
 
-    # 3) 검색
+    # 3) 검색 (QUERY_FUZZY_CORRECT=1이면 거의 맞은 사업명을 카탈로그 용어로 보정한 뒤 검색)
+    #    워커 스레드에서 실행 → 동시 요청의 쿼리 임베딩이 우선순위 순서로 한 배치에 묶인다
+    #    필터는 색인 시 만든 속성 posting으로 후보를 먼저 줄인 뒤 점수를 계산한다
     k = topk or settings.TOPK_DEFAULT
-    pol = _policy()
-    results_dicts = pol.search(text, topk=k)
+    query, corrections = correct_query(text)
+    with span("search", topk=k, filtered=bool(flt)):
+        pol = _policy()
+        results_dicts = await get_flight("search").do(
+            (query, k, filters_key(flt)), lambda: asyncio.to_thread(pol.search, query, topk=k, filters=flt or None),
+        )
     items = [SearchItem(**r) for r in results_dicts]
-    search = SearchResult(query=text, topk=k, results=items)
+    search = SearchResult(query=query, corrections=corrections, topk=k, filters=flt, results=items)
 
     # 4) TTS용 자연스러운 문장 생성 (예전 프로토타입 방식)
     if items:
@@ -96,16 +180,30 @@ async def stt_search_tts(
     else:
         spoken_text = "적합한 정책을 찾지 못했습니다. 더 구체적으로 말씀해 주세요."
 
-    # 5) TTS 합성 (MP3) - 엔진 선택
-    if tts_engine == "edge_tts":
-        v = voice or settings.TTS_VOICE_DEFAULT
-        mp3_bytes = await edge_synthesize(spoken_text, voice=v)
-        tts_voice = v
-    else:  # speecht5
-        mp3_bytes = speecht5_synthesize(spoken_text)
-        tts_voice = "SpeechT5"
-    
-    mp3_b64 = base64.b64encode(mp3_bytes).decode("ascii")
+    # 5) TTS 합성 - 엔진 선택 (같은 문장 + 음성/포맷의 동시 합성은 single-flight로 한 번만)
+    tts_flight = get_flight("tts")
+    text_key = digest_text(spoken_text)
+    with span("tts", engine=tts_engine, chars=len(spoken_text)):
+        if tts_engine == "edge_tts":
+            v = voice or settings.TTS_VOICE_DEFAULT
+            audio_bytes = await tts_flight.do(
+                ("edge_tts", text_key, v), lambda: edge_synthesize(spoken_text, voice=v),
+            )
+            tts_voice = v
+            fmt = "mp3"
+        else:  # speecht5 (PCM -> 프로세스 내 인코딩), 우선순위 클래스 순서로 엔진 슬롯 대기
+            fmt = negotiate_format(audio_format, request.headers.get("accept"))
+            audio_bytes = await tts_flight.do(
+                ("speecht5", text_key, fmt),
+                lambda: asyncio.to_thread(
+                    get_scheduler("speecht5").run, speecht5_synthesize, spoken_text,
+                    audio_format=fmt, cost=max(1.5, len(spoken_text) / 8.0),
+                ),
+            )
+            tts_voice = "SpeechT5"
+
+    # 바이너리 포맷은 오디오를 raw로 따로 담으므로 base64 인코딩을 건너뛴다
+    mp3_b64 = base64.b64encode(audio_bytes).decode("ascii") if resp_fmt == "json" else ""
     # 대략적 길이 추정(문자수 기반; UI 힌트용)
     dur_est = max(1.5, len(spoken_text) / 8.0)
 
@@ -113,11 +211,25 @@ async def stt_search_tts(
         voice=tts_voice,
         mp3_b64=mp3_b64,
         duration_est_s=round(dur_est, 2),
+        audio_format=fmt,
+        mime_type=MIME_TYPES[fmt],
     )
 
-    return PipelineResponse(
+    trace = getattr(request.state, "trace", None)
+    resp = PipelineResponse(
         stt=stt,
         search=search,
         summary=spoken_text,
         tts=tts,
+        request_id=getattr(request.state, "request_id", None),
+        timings=trace.timings() if (timings and trace is not None) else None,
     )
+
+    field_list = parse_fields(fields)
+    if resp_fmt == "json":
+        if field_list:
+            return JSONResponse(project_results(resp.model_dump(mode="json"), field_list))
+        return resp
+    body = project_results(resp.model_dump(mode="json"), field_list)
+    data, ctype = pack(body, audio_bytes, resp_fmt, tts.mime_type)
+    return Response(content=data, media_type=ctype)
@@ -0,0 +1,46 @@
+# app/routers/summaries.py
+from __future__ import annotations
+
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.config import settings
+from app.schemas.summaries import SummariesRequest, SummariesResponse, SummaryItem
+from app.services.summaries import KINDS, get_summaries
+
+router = APIRouter(tags=["summaries"])
+
+
+# --------------------------------------------------------------------
+# Policy summaries (디스크 캐시 + 병렬 생성)
+# --------------------------------------------------------------------
+@router.post("/summaries", response_model=SummariesResponse)
+async def summaries(req: SummariesRequest):
+    """
+    정책별 요약을 한 번에 돌려준다. 캐시에 있으면 즉시, 없으면 SUMMARY_CONCURRENCY 범위에서 병렬 생성 후 저장.
+
+    Parameters:
+    - items: 정책 필드 (service_name, support, target_beneficiaries, ...)
+    - kinds: "policy" | "tts" | "field:<필드>" 목록
+    """
+    if len(req.items) > settings.SUMMARY_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {settings.SUMMARY_MAX_ITEMS})")
+    unknown = [k for k in req.kinds if k not in KINDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown kinds {unknown} (expected one of {list(KINDS)})")
+
+    svc = get_summaries()
+    t0 = time.perf_counter()
+    records = [it.model_dump() for it in req.items]
+    rows = await asyncio.to_thread(svc.summarize, records, req.kinds)
+    return SummariesResponse(
+        items=[
+            SummaryItem(service_id=r["service_id"], service_name=r["service_name"], summaries=row)
+            for r, row in zip(records, rows)
+        ],
+        backend=svc.backend.name,
+        version=settings.SUMMARY_PROMPT_VERSION,
+        elapsed_s=round(time.perf_counter() - t0, 3),
+    )
@@ -1,7 +1,7 @@
 # app/schemas/pipeline.py
 from __future__ import annotations
 
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 
 
@@ -42,8 +42,16 @@ class SearchItem(BaseModel):
 
 class SearchResult(BaseModel):
     """Top-K retrieval result for a given query text."""
-    query: str = Field(..., description="Query text (typically STT output).")
+    query: str = Field(..., description="Query text (STT output, after catalog fuzzy correction if enabled).")
+    corrections: List[Dict[str, str]] = Field(
+        default_factory=list,
+        description="Catalog corrections applied to the STT text before search ([{'from': ..., 'to': ...}]).",
+    )
     topk: int = Field(..., ge=1, description="Requested number of results.")
+    filters: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Structured filters applied before vector scoring (support_type / receiving_agency / target_group).",
+    )
     results: List[SearchItem] = Field(default_factory=list, description="Ranked retrieval results.")
 
 
@@ -59,10 +67,25 @@ class TTSRequest(BaseModel):
     pitch: Optional[str] = Field(default=None, description="Speech pitch (e.g., '+0Hz', '+2st').")
 
 class TTSResult(BaseModel):
-    """Edge TTS synthesis result."""
+    """TTS synthesis result."""
     voice: str = Field(..., description="Voice name used for synthesis (e.g., 'ko-KR-SunHiNeural').")
-    mp3_b64: str = Field(..., description="Base64-encoded MP3 bytes of the synthesized speech.")
+    mp3_b64: str = Field(..., description="Base64-encoded audio bytes of the synthesized speech (format given by `audio_format`; MP3 by default).")
     duration_est_s: float = Field(..., ge=0.0, description="Estimated playback duration in seconds.")
+    audio_format: Literal["mp3", "ogg_opus", "wav"] = Field("mp3", description="Encoding of the audio bytes in `mp3_b64`.")
+    mime_type: str = Field("audio/mpeg", description="MIME type of the audio bytes (e.g., 'audio/mpeg', 'audio/ogg').")
+
+
+# -----------------------------
+# Tracing
+# -----------------------------
+class SpanTiming(BaseModel):
+    """One recorded span of the request trace."""
+    name: str = Field(..., description="Span name (e.g., 'audio.decode', 'asr.fw', 'tts.edge.chunk').")
+    span_id: str = Field(..., description="Span ID (16 hex chars).")
+    parent_id: Optional[str] = Field(None, description="Parent span ID (None for root spans).")
+    start_ms: float = Field(..., description="Start offset from the beginning of the request in milliseconds.")
+    duration_ms: float = Field(..., ge=0.0, description="Span duration in milliseconds.")
+    attrs: Dict[str, Any] = Field(default_factory=dict, description="Span attributes.")
 
 
 # -----------------------------
@@ -78,3 +101,5 @@ class PipelineResponse(BaseModel):
     search: SearchResult
     summary: str = Field(..., description="Short summary text derived from the top-1 policy.")
     tts: TTSResult
+    request_id: Optional[str] = Field(None, description="Request ID (also returned in the X-Request-ID header).")
+    timings: Optional[List[SpanTiming]] = Field(None, description="Per-stage spans (only when requested and the request was traced).")
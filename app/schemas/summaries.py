@@ -0,0 +1,41 @@
+# app/schemas/summaries.py
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class PolicyFields(BaseModel):
+    """요약 입력이 되는 정책 필드 (SearchItem과 같은 이름, 나머지 필드는 무시)."""
+    service_id: str = Field("", description="Service ID (응답에서 항목 식별용).")
+    service_name: str = Field("", description="서비스명")
+    support: str = Field("", description="지원내용")
+    target_beneficiaries: str = Field("", description="지원대상")
+    application_deadline: str = Field("", description="신청기한")
+    application_method: str = Field("", description="신청방법")
+    required_documents: str = Field("", description="구비서류")
+    contact: str = Field("", description="문의처")
+
+
+class SummariesRequest(BaseModel):
+    items: List[PolicyFields] = Field(..., min_length=1, description="요약할 정책들 (/stt_search_tts 결과 항목 그대로 가능).")
+    kinds: List[str] = Field(
+        default_factory=lambda: ["policy", "tts"],
+        description='요약 종류: "policy", "tts", "field:<support|target_beneficiaries|application_deadline|'
+                    'application_method|required_documents|contact>"',
+    )
+
+
+class SummaryItem(BaseModel):
+    service_id: str = ""
+    service_name: str = ""
+    summaries: Dict[str, Optional[str]] = Field(
+        default_factory=dict, description="kind → 요약 (입력 필드가 비었거나 생성 실패 시 null)."
+    )
+
+
+class SummariesResponse(BaseModel):
+    items: List[SummaryItem]
+    backend: str
+    version: str
+    elapsed_s: float
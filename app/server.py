@@ -1,15 +1,26 @@
 # app/server.py
 import time
+_IMPORT_T0 = time.perf_counter()   # import 시간 예산 보고용 (startup에서 기록)
+import asyncio
 import logging
-from fastapi import FastAPI, UploadFile, File, Form
+import sys
+from typing import Optional
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 
 from app.core.config import settings
-from app.services.asr_fw import FasterWhisperASR
-from app.services.asr_ow import OpenAIWhisperASR
-from app.services.edge_tts import synthesize_mp3
+from app.core import scheduler, singleflight, tracing
+from app.core.admission import AdmissionRejected, get_admission, request_deadline, transcribe_admitted
+from app.services.audio_io import decode_stream, seconds_from_f32_16k
+from app.services.engine_registry import asr_engines, import_report
+from app.services.job_runner import JobRunner
+from app.services.job_store import JobStore
+from app.services import summaries
+from app.services.response_codec import negotiate_response, pack
 from app.schemas.pipeline import TTSRequest, TTSResult
+from app.services.warmup import run_warmup, parse_stages
 
 # 로깅 설정 (가장 먼저)
 try:
@@ -21,6 +32,8 @@ except ImportError:
 
 # 라우터
 from app.routers.pipeline import router as pipeline_router
+from app.routers.jobs import router as jobs_router
+from app.routers.summaries import router as summaries_router
 
 # ------------------------------------------------------------------------------
 # FastAPI app
@@ -35,29 +48,169 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (Accept-Encoding: gzip인 클라이언트만, 작은 응답은 그대로)
+if settings.RESPONSE_GZIP:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.RESPONSE_GZIP_MIN_BYTES,
+        compresslevel=settings.RESPONSE_GZIP_LEVEL,
+    )
+
 # ------------------------------------------------------------------------------
-# Singleton ASR instances (재활용)
+# Upload size limit
 # ------------------------------------------------------------------------------
-FW = FasterWhisperASR(
-    model_dir=settings.FW_MODEL_DIR,
-    device=settings.FW_DEVICE,
-    compute_type=settings.FW_COMPUTE,   # 기존엔 "float32" 고정이었으나 설정 반영
-    beam_size=settings.FW_BEAM,
-)
-OW = OpenAIWhisperASR(
-    model_dir=settings.OW_MODEL_DIR,
-    device=settings.FW_DEVICE,          # whisper.load_model에 전달
-)
+class UploadLimitMiddleware:
+    """
+    업로드 크기 한도 ASR_MAX_UPLOAD_MB(/jobs는 JOBS_MAX_UPLOAD_MB).
+    Content-Length가 한도를 넘으면 본문을 받기 전에 413. Content-Length가 없는(chunked) 본문은
+    받는 동안 바이트 수를 세다가 한도를 넘는 순간 413 (multipart 파싱 / spool이 거기서 멈춘다).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit_mb = settings.JOBS_MAX_UPLOAD_MB if scope["path"].startswith("/jobs") else settings.MAX_UPLOAD_MB
+        limit = int(limit_mb * 1024 * 1024)
+        detail = f"Upload too large (> {limit_mb:g}MB)"
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            return await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # 라우트의 본문 파싱 중에 올라가므로 ExceptionMiddleware가 413 응답으로 바꾼다
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(UploadLimitMiddleware)
+
+# ------------------------------------------------------------------------------
+# Request ID / tracing
+# ------------------------------------------------------------------------------
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    모든 요청에 request ID를 부여하고(X-Request-ID 헤더 우선), 샘플링된 요청은 trace를 기록한다.
+    `X-Trace: 1` 헤더가 있으면 샘플링과 무관하게 해당 요청을 트레이싱한다.
+    """
+    rid = request.headers.get("x-request-id") or tracing.new_request_id()
+    trace = tracing.start_trace(rid, force=request.headers.get("x-trace") == "1")
+    request.state.request_id = rid
+    request.state.trace = trace
+    # 우선순위 클래스 (interactive / bulk) → 하위 스케줄러가 contextvar로 읽는다
+    priority = scheduler.priority_for(request.headers, request.url.path)
+    token = scheduler.set_priority(priority)
+    try:
+        with tracing.span(f"{request.method} {request.url.path}", priority=priority):
+            response = await call_next(request)
+    finally:
+        scheduler.reset_priority(token)
+        tracing.finish_trace(trace)
+    response.headers["X-Request-ID"] = rid
+    return response
+
+# ------------------------------------------------------------------------------
+# Singleton ASR instances (재활용, lazy)
+# ------------------------------------------------------------------------------
+# 백엔드(local / remote / multiproc / stub)는 설정에 따라 app.services.asr_backend가 선택
+# 엔진 모듈 import와 모델 로드는 처음 접근할 때(보통 startup 워밍업) 일어난다
+# FastAPI 앱 state에 등록 → 라우터에서 request.app.state.ASR_ENGINES로 접근
+app.state.ASR_ENGINES = asr_engines()
 
-# FastAPI 앱 state에 등록 → 라우터에서 request.app.state로 접근
-app.state.FW = FW
-app.state.OW = OW
+# admission 거절 / 대기 중 deadline 초과 → 503 + Retry-After
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        {"detail": f"Server busy: {exc.reason}"},
+        status_code=503,
+        headers={"Retry-After": str(int(exc.retry_after + 0.999))},
+    )
 
 # ------------------------------------------------------------------------------
 # Routers
 # ------------------------------------------------------------------------------
 # 엔드투엔드 파이프라인: /stt_search_tts
 app.include_router(pipeline_router, prefix="")
+# 비동기 대량 전사: /jobs
+app.include_router(jobs_router, prefix="")
+# 정책 요약 (디스크 캐시): /summaries
+app.include_router(summaries_router, prefix="")
+
+# ------------------------------------------------------------------------------
+# Startup warmup → /readyz
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+app.state.ready = False
+app.state.warmup = {}
+
+@app.on_event("startup")
+async def prepare_dirs():
+    """데이터/로그/모델 디렉토리 생성 + app import 시간 보고 (IMPORT_BUDGET_MS)."""
+    settings.ensure_dirs()
+    app.state.import_report = import_report(_IMPORT_DONE - _IMPORT_T0)
+
+@app.on_event("startup")
+async def start_warmup():
+    """
+    합성 요청을 모든 단계(FW/OW/검색/SpeechT5/Edge TTS)에 흘려 첫 요청 지연을 없앤다.
+    백그라운드 스레드에서 돌기 때문에 그동안 /healthz는 응답하고 /readyz만 503을 반환한다.
+    """
+    if not settings.WARMUP_ENABLED:
+        app.state.ready = True
+        return
+
+    def _on_stage(name, res):
+        app.state.warmup[name] = res
+
+    async def _run():
+        t0 = time.time()
+        report = await asyncio.to_thread(
+            run_warmup, None, None, parse_stages(settings.WARMUP_STAGES), _on_stage, app.state.ASR_ENGINES,
+            asyncio.get_running_loop(),
+        )
+        failed = [k for k, v in report.items() if not v["ok"]]
+        logger.info(f"warmup finished in {time.time() - t0:.2f}s (failed: {failed or 'none'})")
+        app.state.ready = not (settings.WARMUP_STRICT and failed)
+
+    app.state.warmup_task = asyncio.create_task(_run())
+
+# ------------------------------------------------------------------------------
+# Bulk transcription jobs (SQLite 큐, 재시작 시 이어서 처리)
+# ------------------------------------------------------------------------------
+app.state.jobs = None
+
+@app.on_event("startup")
+async def start_jobs():
+    if not settings.JOBS_ENABLED:
+        return
+    app.state.jobs = JobRunner(JobStore(), app.state.ASR_ENGINES)
+    await app.state.jobs.start()
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    if app.state.jobs is not None:
+        await app.state.jobs.stop()
+        app.state.jobs.store.close()
+
+@app.on_event("shutdown")
+async def close_edge_tts():
+    # edge_tts 모듈은 처음 합성할 때 import되므로, 로드된 경우에만 유휴 연결을 닫는다
+    mod = sys.modules.get("app.services.edge_tts")
+    if mod is not None:
+        await mod.get_client().close()
 
 # ------------------------------------------------------------------------------
 # Basic endpoints
@@ -66,23 +219,65 @@ app.include_router(pipeline_router, prefix="")
 def healthz():
     return {"ok": True}
 
+@app.get("/readyz")
+def readyz():
+    """워밍업이 끝나 첫 요청 페널티 없이 처리 가능한지 (로드밸런서 readiness probe용)."""
+    body = {"ready": bool(app.state.ready), "warmup": app.state.warmup}
+    return JSONResponse(body, status_code=200 if app.state.ready else 503)
+
+@app.get("/stats")
+def stats():
+    """런타임 통계 (ASR cascade 에스컬레이션 비율, 원격 워커 상태, 클래스별 큐 등)."""
+    asr = {}
+    for name in ("fw", "ow"):
+        eng = app.state.ASR_ENGINES.peek(name)
+        if hasattr(eng, "stats"):
+            asr[name] = eng.stats()
+    jobs = app.state.jobs.store.stats() if app.state.jobs is not None else None
+    return {
+        "startup": getattr(app.state, "import_report", None),
+        "engines": app.state.ASR_ENGINES.stats(),
+        "asr": asr,
+        "admission": get_admission().stats(),
+        "scheduler": scheduler.stats(),
+        "singleflight": singleflight.stats(),
+        "jobs": jobs,
+        "summaries": summaries.stats(),
+        "edge_tts": sys.modules["app.services.edge_tts"].stats() if "app.services.edge_tts" in sys.modules else None,
+    }
+
 @app.post("/transcribe")
 async def transcribe(
+    request: Request,
     audio: UploadFile = File(...),
     engine: str = Form(settings.ENGINE_DEFAULT),
     language: str = Form(settings.LANGUAGE),
     beam_size: int = Form(settings.FW_BEAM),
+    domain: Optional[str] = Form(None),
 ):
-    data = await audio.read()
     t0 = time.time()
+    eng = "ow" if engine == "ow" else "fw"
+    audio_key = await asyncio.to_thread(singleflight.digest_file, audio.file)
 
-    if engine == "fw":
-        app.state.FW.beam_size = beam_size
-        text, meta = app.state.FW.transcribe_bytes(data, language=language)
-        duration = meta.get("duration")
-    else:
-        text, meta = app.state.OW.transcribe_bytes(data, language=language)
-        duration = meta.get("duration")
+    async def _decode_stt(src):
+        # 업로드 전체를 bytes로 읽지 않고 ffmpeg로 스트리밍 디코드
+        # 오디오 길이 제한은 없고, 업로드 크기는 UploadLimitMiddleware가 ASR_MAX_UPLOAD_MB로 막는다 (더 큰 파일은 /jobs)
+        # src는 공유 태스크 소유 (먼저 온 요청이 끝나 UploadFile이 닫혀도 디코드가 계속된다)
+        try:
+            wav = await asyncio.to_thread(decode_stream, src)
+        finally:
+            src.close()
+        # 오디오 길이 제한이 없으므로 추정 비용으로 admit / 강등 / 503
+        return await transcribe_admitted(
+            app.state.ASR_ENGINES, eng, wav, seconds_from_f32_16k(wav),
+            language=language, beam_size=beam_size, domain=domain, deadline_s=request_deadline(request.headers),
+        )
+
+    # 같은 파일 + 옵션의 동시 요청(재시도 폭주 등)은 한 번만 디코드/전사
+    text, meta = await singleflight.get_flight("transcribe").do(
+        (audio_key, eng, language, beam_size, domain), lambda: _decode_stt(singleflight.own_file(audio.file)),
+    )
+    duration = meta.get("duration")
 
     return JSONResponse(
         {
@@ -90,11 +285,16 @@ async def transcribe(
             "decode_s": round(time.time() - t0, 3),
             "engine": engine,
             "audio_sec": duration,
+            "admission": meta.get("admission"),
         }
     )
 
 @app.post("/synthesize", response_model=TTSResult)
-async def synthesize(request: TTSRequest):
+async def synthesize(
+    request: TTSRequest,
+    http_request: Request,
+    response_format: Optional[str] = Query(None),
+):
     """
     텍스트를 받아서 Edge TTS로 음성을 합성합니다.
     
@@ -104,26 +304,43 @@ async def synthesize(request: TTSRequest):
     - rate: 말하기 속도 (예: "+10%", "-5%")
     - volume: 음량 (예: "+0%", "+3dB")
     - pitch: 음조 (예: "+0Hz", "+2st")
+    - response_format (query): "json" | "msgpack" | "multipart". 없으면 Accept 헤더 → "json"
     """
+    resp_fmt = negotiate_response(response_format, http_request.headers.get("accept"))
+
     import base64
+    from app.routers.pipeline import edge_synthesize
     
-    # Edge TTS로 음성 합성
-    mp3_bytes = await synthesize_mp3(
-        text=request.text,
-        voice=request.voice,
-        rate=request.rate if request.rate else None,
-        volume=request.volume if request.volume else None,
-        pitch=request.pitch if request.pitch else None
+    # Edge TTS로 음성 합성 (같은 텍스트 + 음성 옵션의 동시 요청은 한 번만, 장애 시 SpeechT5 fallback)
+    mp3_bytes = await singleflight.get_flight("tts").do(
+        ("edge_tts", singleflight.digest_text(request.text), request.voice, request.rate, request.volume, request.pitch),
+        lambda: edge_synthesize(
+            text=request.text,
+            voice=request.voice,
+            rate=request.rate if request.rate else None,
+            volume=request.volume if request.volume else None,
+            pitch=request.pitch if request.pitch else None
+        ),
     )
     
-    # Base64 인코딩
-    mp3_b64 = base64.b64encode(mp3_bytes).decode("ascii")
-    
     # 대략적 길이 추정 (문자수 기반)
     duration_est = max(1.5, len(request.text) / 8.0)
+
+    if resp_fmt != "json":
+        # msgpack / multipart: base64 없이 MP3 바이트 그대로
+        body = {"voice": request.voice, "duration_est_s": round(duration_est, 2),
+                "audio_format": "mp3", "mime_type": "audio/mpeg"}
+        data, ctype = pack(body, mp3_bytes, resp_fmt, "audio/mpeg")
+        return Response(content=data, media_type=ctype)
+
+    # Base64 인코딩
+    mp3_b64 = base64.b64encode(mp3_bytes).decode("ascii")
     
     return TTSResult(
         voice=request.voice,
         mp3_b64=mp3_b64,
         duration_est_s=round(duration_est, 2)
     )
+
+# 모듈 끝: 여기까지가 app.server import 시간
+_IMPORT_DONE = time.perf_counter()
@@ -0,0 +1,105 @@
+# app/services/asr_backend.py
+"""
+ASR 백엔드 인터페이스 + 팩토리.
+
+라우터/서버는 app.state.ASR_ENGINES(app.services.engine_registry, 처음 접근할 때 빌드)로 아래 인터페이스만 사용한다.
+
+    transcribe(wav: np.ndarray, language=None, beam_size=None, domain=None) -> (text, meta)
+    transcribe_bytes(raw: bytes, language=None, beam_size=None, domain=None) -> (text, meta)
+
+domain은 카탈로그 바이어싱(ASR_BIASING=1) 도메인. 모델을 가진 프로세스(로컬/워커/inference)에서 해석한다.
+
+구현체
+  - local    : FasterWhisperASR / OpenAIWhisperASR (프로세스 내 모델)
+  - remote   : RemoteASRBackend (scripts/asr_worker.py 워커 풀, ASR_REMOTE_WORKERS)
+  - multiproc: PooledASR (scripts/serve_multiproc.py의 inference 프로세스)
+  - stub     : StubASR (STUB_ENGINES=1, 벤치마크/오프라인 테스트)
+
+ASR_CASCADE=1이면 FW는 위 백엔드로 만든 small/large 두 엔진을 CascadeASR로 감싼다.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class ASRBackend(Protocol):
+    beam_size: int
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]: ...
+
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]: ...
+
+
+def backend_kind() -> str:
+    if settings.STUB_ENGINES:
+        return "stub"
+    if settings.SERVING_MODE == "multiproc":
+        return "multiproc"
+    return settings.ASR_BACKEND
+
+
+def _build_single(kind: str, engine: str) -> ASRBackend:
+    """engine: "fw" | "fw_small" | "ow" 하나를 kind 백엔드로 만든다."""
+    if kind == "stub":
+        from app.services.stub_engines import StubASR
+        if engine == "ow":
+            return StubASR(rtf=settings.STUB_ASR_RTF * 2)
+        if engine == "fw_small":
+            return StubASR(rtf=settings.STUB_ASR_RTF * 0.25, beam_size=settings.FW_BEAM)
+        return StubASR(beam_size=settings.FW_BEAM)
+    if kind == "multiproc":
+        from app.services.inference_pool import PooledASR
+        return PooledASR(engine, beam_size=settings.FW_BEAM if engine != "ow" else None)
+    if kind == "remote":
+        from app.services.asr_remote import RemoteASRBackend
+        return RemoteASRBackend(engine=engine)
+    if kind != "local":
+        raise ValueError(f"unknown ASR_BACKEND: {kind}")
+
+    if engine in ("fw", "fw_small"):
+        from app.services.asr_fw import FasterWhisperASR
+        if engine == "fw_small":
+            return FasterWhisperASR(
+                model_dir=settings.FW_SMALL_MODEL_DIR,
+                model_name=settings.FW_SMALL_MODEL,
+                beam_size=settings.FW_BEAM,
+            )
+        return FasterWhisperASR(
+            model_dir=settings.FW_MODEL_DIR,
+            device=settings.FW_DEVICE,
+            compute_type=settings.FW_COMPUTE,   # 기존엔 "float32" 고정이었으나 설정 반영
+            beam_size=settings.FW_BEAM,
+        )
+    from app.services.asr_ow import OpenAIWhisperASR
+    return OpenAIWhisperASR(
+        model_dir=settings.OW_MODEL_DIR,
+        device=settings.FW_DEVICE,              # whisper.load_model에 전달
+    )
+
+
+def build_asr(engine: str) -> ASRBackend:
+    """
+    engine: "fw" | "ow". 설정에 따라 알맞은 백엔드를 만든다.
+    ASR_CASCADE=1이면 "fw"는 작은 모델 → large-v3 cascade(CascadeASR)로 감싼다.
+    """
+    kind = backend_kind()
+    if engine == "fw" and settings.ASR_CASCADE:
+        from app.services.asr_cascade import CascadeASR
+        return CascadeASR(small=_build_single(kind, "fw_small"), large=_build_single(kind, "fw"))
+    return _build_single(kind, engine)
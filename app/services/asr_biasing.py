@@ -0,0 +1,293 @@
+# app/services/asr_biasing.py
+"""
+정책 카탈로그 기반 ASR 바이어싱 + 검색 쿼리 보정.
+
+Whisper는 한국어 복지 사업명(예: "청년월세 한시 특별지원")을 자주 틀리게 받아쓰고,
+그러면 벡터 검색이 빗나간다. PolicySearch가 읽는 CSV의 `서비스명` / `tags` 컬럼으로
+
+  1) 도메인별 initial_prompt / hotwords 세트 (ASR_BIASING=1)
+     - 도메인 = ASR_BIAS_DOMAIN_COLUMN(기본 "지원유형") 값, 지정이 없으면 전체 카탈로그
+     - hotwords  : 도메인 안에서 가장 많은 서비스에 달린 tags 상위 ASR_BIAS_HOTWORDS개
+     - prompt    : 나머지 tags + 서비스명을 ASR_BIAS_PROMPT_MAX_TOKENS 토큰 이내로 (용어 중간에서 자르지 않음)
+     - 토큰화된 prompt는 엔진 인스턴스별로 캐시되어 요청마다 다시 토큰화하지 않는다
+  2) 쿼리 보정 (QUERY_FUZZY_CORRECT=1)
+     - 카탈로그 용어의 음절 bigram 역색인으로 후보를 좁히고, 자모 단위 유사도로 검증해
+       "청년월쇄" → "청년월세"처럼 거의 맞은 전사를 카탈로그 용어로 바꾼다
+
+무거운 의존성(pandas 등) 없이 표준 csv 모듈로 읽으므로 멀티 프로세스/원격 워커에서도 쓸 수 있다.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+NAME_COLUMN = "서비스명"
+TAGS_COLUMN = "tags"
+ALL_DOMAIN = "all"
+
+# 어절 끝에서 떼어 보고 다시 붙이는 조사 (긴 것부터)
+_JOSA = ("에서는", "으로", "에서", "에게", "까지", "부터", "이나", "을", "를", "이", "가", "은", "는",
+         "에", "의", "도", "로", "와", "과", "나")
+_MAX_WINDOW = 6  # 어절 창 상한 (실제 창 크기는 가장 긴 용어의 어절 수 + 1)
+
+
+# -----------------------------
+# Hangul helpers
+# -----------------------------
+def to_jamo(s: str) -> str:
+    """완성형 한글 음절을 초/중/종성 코드로 풀어쓴다 (그 외 문자는 그대로)."""
+    out: List[str] = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            cho, rest = divmod(code, 588)
+            jung, jong = divmod(rest, 28)
+            out.append(chr(0x1100 + cho))
+            out.append(chr(0x1161 + jung))
+            if jong:
+                out.append(chr(0x11A7 + jong))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _key(term: str) -> str:
+    # 띄어쓰기는 전사마다 달라지므로 비교 키에서 제거
+    return "".join(term.split()).lower()
+
+
+def _bigrams(s: str) -> Set[str]:
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+def _split_josa(word: str) -> Tuple[str, str]:
+    for j in _JOSA:
+        if len(word) > len(j) + 1 and word.endswith(j):
+            return word[: -len(j)], j
+    return word, ""
+
+
+# -----------------------------
+# Catalog lexicon
+# -----------------------------
+class CatalogLexicon:
+    """서비스명/tags 용어집 + 도메인별 용어 순위 + 퍼지 보정 색인."""
+
+    def __init__(self, rows: Sequence[Dict[str, str]], domain_column: Optional[str] = None):
+        domain_column = settings.ASR_BIAS_DOMAIN_COLUMN if domain_column is None else domain_column
+        names: Dict[str, List[str]] = defaultdict(list)
+        tag_df: Dict[str, Counter] = defaultdict(Counter)
+        for row in rows:
+            name = (row.get(NAME_COLUMN) or "").strip()
+            tags = [t.strip() for t in (row.get(TAGS_COLUMN) or "").split(",") if t.strip()]
+            domains = [ALL_DOMAIN]
+            dom = (row.get(domain_column) or "").strip() if domain_column else ""
+            if dom:
+                domains.append(dom)
+            for d in domains:
+                if name:
+                    names[d].append(name)
+                tag_df[d].update(set(tags))
+        self._names = dict(names)
+        self._tag_df = dict(tag_df)
+
+        # 보정 대상 용어: 비교 키 -> 표기 (서비스명이 tags보다 우선)
+        self.terms: Dict[str, str] = {}
+        for t in list(self._tag_df.get(ALL_DOMAIN, {})) + self._names.get(ALL_DOMAIN, []):
+            k = _key(t)
+            if len(k) >= settings.QUERY_FUZZY_MIN_CHARS:
+                self.terms[k] = t
+        self._keys = list(self.terms)
+        # 띄어쓰기가 용어보다 한 번 더 쪼개진 전사까지 한 창으로 비교
+        self.max_window = min(_MAX_WINDOW, 1 + max((len(t.split()) for t in self.terms.values()), default=1))
+        self._jamo = [to_jamo(k) for k in self._keys]
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        for i, k in enumerate(self._keys):
+            for bg in _bigrams(k):
+                self._index[bg].append(i)
+
+    @classmethod
+    def from_csv(cls, path: str, domain_column: Optional[str] = None) -> "CatalogLexicon":
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return cls(list(csv.DictReader(f)), domain_column=domain_column)
+
+    @property
+    def domains(self) -> List[str]:
+        return sorted(self._names.keys() | self._tag_df.keys())
+
+    def resolve_domain(self, domain: Optional[str]) -> str:
+        """알 수 없는 도메인/None은 전체 카탈로그."""
+        if domain and domain in self._tag_df:
+            return domain
+        return ALL_DOMAIN
+
+    # ---------- biasing ----------
+
+    def hotwords(self, domain: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        limit = settings.ASR_BIAS_HOTWORDS if limit is None else int(limit)
+        return [t for t, _ in self._tag_df.get(self.resolve_domain(domain), Counter()).most_common(limit)]
+
+    def prompt_terms(self, domain: Optional[str] = None) -> List[str]:
+        """initial_prompt 후보 용어 (우선순위 순): hotwords 다음 순위 tags → 서비스명."""
+        d = self.resolve_domain(domain)
+        skip = set(self.hotwords(d))
+        seen: Set[str] = set()
+        out: List[str] = []
+        for t in [t for t, _ in self._tag_df.get(d, Counter()).most_common()] + self._names.get(d, []):
+            if t not in skip and t not in seen:
+                seen.add(t)
+                out.append(t)
+        return out
+
+    # ---------- fuzzy correction ----------
+
+    def match(self, text: str) -> Optional[str]:
+        """text와 자모 유사도가 QUERY_FUZZY_THRESHOLD 이상인 가장 가까운 용어 (정확히 일치하면 None)."""
+        k = _key(text)
+        if len(k) < settings.QUERY_FUZZY_MIN_CHARS or k in self.terms:
+            return None
+        grams = _bigrams(k)
+        hits: Counter = Counter()
+        for bg in grams:
+            for i in self._index.get(bg, ()):
+                hits[i] += 1
+        if not hits:
+            return None
+        jk = to_jamo(k)
+        thr = settings.QUERY_FUZZY_THRESHOLD
+        best, best_score = None, thr
+        # 공유 bigram이 많은 상위 후보만 자모 유사도로 검증
+        for i, _ in hits.most_common(32):
+            cand = self._jamo[i]
+            if abs(len(cand) - len(jk)) > max(len(cand), len(jk)) * (1.0 - thr):
+                continue
+            sm = SequenceMatcher(None, jk, cand, autojunk=False)
+            if sm.quick_ratio() < best_score:
+                continue
+            score = sm.ratio()
+            if score >= best_score and (best is None or score > best_score):
+                best, best_score = i, score
+        return self.terms[self._keys[best]] if best is not None else None
+
+    def correct(self, query: str) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        어절 창(긴 것 우선)을 카탈로그 용어로 보정한다.
+        Returns: (보정된 쿼리, [{"from": 원문, "to": 용어}, ...])
+        """
+        words = query.split()
+        out: List[str] = []
+        fixes: List[Dict[str, str]] = []
+        i = 0
+        while i < len(words):
+            windows = [" ".join(words[i:i + n]) for n in range(min(_MAX_WINDOW, len(words) - i), 0, -1)]
+            # 정확히 일치하는 용어(띄어쓰기 무시)가 있으면 더 짧은 퍼지 매칭보다 우선
+            exact = next((w for w in windows if _key(_split_josa(w)[0]) in self.terms), None)
+            if exact is not None:
+                out.append(exact)
+                i += len(exact.split())
+                continue
+            for span_text in windows[-self.max_window:]:
+                stem, josa = _split_josa(span_text)
+                term = self.match(stem)
+                if term is not None:
+                    out.append(term + josa)
+                    fixes.append({"from": span_text, "to": term + josa})
+                    i += len(span_text.split())
+                    break
+            else:
+                out.append(words[i])
+                i += 1
+        return " ".join(out), fixes
+
+
+@lru_cache(maxsize=4)
+def _load_lexicon(path: str, mtime: float, domain_column: str) -> CatalogLexicon:
+    lex = CatalogLexicon.from_csv(path, domain_column=domain_column)
+    logger.info(f"ASR biasing lexicon: {len(lex.terms)} terms, domains={len(lex.domains) - 1} ({path})")
+    return lex
+
+
+def get_lexicon(path: Optional[str] = None) -> Optional[CatalogLexicon]:
+    """CSV가 바뀌면(mtime) 다시 컴파일. CSV가 없으면 None (바이어싱/보정 비활성)."""
+    path = path or settings.POLICY_CSV_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        logger.warning(f"policy CSV not found; ASR biasing disabled ({path})")
+        return None
+    return _load_lexicon(path, mtime, settings.ASR_BIAS_DOMAIN_COLUMN)
+
+
+def correct_query(query: str) -> Tuple[str, List[Dict[str, str]]]:
+    """검색 직전 STT 결과 보정 (QUERY_FUZZY_CORRECT=0이거나 카탈로그가 없으면 그대로)."""
+    if not settings.QUERY_FUZZY_CORRECT or not query.strip():
+        return query, []
+    lex = get_lexicon()
+    if lex is None:
+        return query, []
+    with span("search.correct", chars=len(query)) as sp:
+        fixed, fixes = lex.correct(query)
+        sp.set("corrections", len(fixes))
+    return fixed, fixes
+
+
+# -----------------------------
+# Compiled prompts (per engine)
+# -----------------------------
+class PromptCache:
+    """
+    엔진 인스턴스별 도메인 → (prompt, hotwords) 캐시.
+
+    encode 함수(예: WhisperModel.hf_tokenizer)를 주면 prompt를 토큰 id로 미리 변환해 두고,
+    토큰 수 예산을 용어 단위로 채운다. encode가 없으면(openai-whisper) 문자 수로 근사한다.
+    """
+
+    def __init__(self, encode: Optional[Callable[[str], List[int]]] = None, max_tokens: Optional[int] = None):
+        self.encode = encode
+        self.max_tokens = settings.ASR_BIAS_PROMPT_MAX_TOKENS if max_tokens is None else int(max_tokens)
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, int], Tuple[object, Optional[str]]] = {}
+
+    def get(self, domain: Optional[str] = None) -> Tuple[Optional[object], Optional[str]]:
+        """Returns: (initial_prompt: 토큰 id 리스트 또는 문자열, hotwords 문자열). 바이어싱 꺼짐 → (None, None)."""
+        if not settings.ASR_BIASING:
+            return None, None
+        lex = get_lexicon()
+        if lex is None:
+            return None, None
+        d = lex.resolve_domain(domain)
+        key = (d, id(lex))  # CSV가 바뀌면 새 lexicon 객체 → 다시 컴파일
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        compiled = self._compile(lex, d)
+        with self._lock:
+            self._cache[key] = compiled
+        return compiled
+
+    def _compile(self, lex: CatalogLexicon, domain: str) -> Tuple[object, Optional[str]]:
+        hot = " ".join(lex.hotwords(domain)) or None
+        terms: List[str] = []
+        used = 0
+        for t in lex.prompt_terms(domain):
+            cost = len(self.encode(" " + t)) if self.encode else len(t)
+            if used + cost + 1 > self.max_tokens:
+                break
+            terms.append(t)
+            used += cost + 1  # 구분자 ", "
+        if not terms:
+            return None, hot
+        prompt = ", ".join(terms)
+        return (self.encode(" " + prompt) if self.encode else prompt), hot
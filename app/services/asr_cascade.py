@@ -0,0 +1,127 @@
+# app/services/asr_cascade.py
+"""
+모델 크기 cascade ASR (ASR_CASCADE=1).
+
+작은 모델(FW_SMALL_MODEL, 예: small / distil-large-v3)로 먼저 디코딩하고,
+세그먼트 신뢰도가 낮을 때만 large-v3로 다시 디코딩한다.
+
+에스컬레이션 조건 (하나라도 해당하면 large 모델 사용)
+  - 결과가 비어 있음 (세그먼트 0개)
+  - 가장 낮은 세그먼트 avg_logprob < CASCADE_LOGPROB_MIN
+  - 가장 높은 세그먼트 no_speech_prob > CASCADE_NO_SPEECH_MAX (무음/환각 의심)
+
+FW 백엔드(local / remote / multiproc / stub) 무엇이든 small/large로 감쌀 수 있으며,
+stats()는 /stats 엔드포인트에서 에스컬레이션 비율과 모델별 디코딩 시간을 보여준다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+from .audio_io import TARGET_SR
+
+
+class CascadeASR:
+    """FasterWhisperASR와 같은 transcribe 인터페이스."""
+
+    def __init__(
+        self,
+        small: Any,
+        large: Any,
+        logprob_min: Optional[float] = None,
+        no_speech_max: Optional[float] = None,
+    ):
+        self.small = small
+        self.large = large
+        self.beam_size = getattr(large, "beam_size", settings.FW_BEAM)
+        self.logprob_min = settings.CASCADE_LOGPROB_MIN if logprob_min is None else float(logprob_min)
+        self.no_speech_max = settings.CASCADE_NO_SPEECH_MAX if no_speech_max is None else float(no_speech_max)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._escalated = 0
+        self._reasons: Counter = Counter()
+        self._small_s = 0.0
+        self._large_s = 0.0
+        self._audio_s = 0.0
+
+    def escalation_reason(self, text: str, meta: Dict[str, Any]) -> Optional[str]:
+        if not meta.get("segments") or not text:
+            return "empty"
+        lp = meta.get("avg_logprob")
+        if lp is not None and lp < self.logprob_min:
+            return "low_logprob"
+        ns = meta.get("no_speech_prob")
+        if ns is not None and ns > self.no_speech_max:
+            return "no_speech"
+        return None
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        with span("asr.cascade", samples=int(wav.shape[0])) as sp:
+            t0 = time.perf_counter()
+            text, meta = self.small.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+            t1 = time.perf_counter()
+            reason = self.escalation_reason(text, meta)
+            sp.set("escalated", reason is not None)
+            if reason is None:
+                self._record(wav, t1 - t0, 0.0, None)
+                return text, {**meta, "cascade": "small"}
+
+            sp.set("reason", reason)
+            text, large_meta = self.large.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+            self._record(wav, t1 - t0, time.perf_counter() - t1, reason)
+            return text, {
+                **large_meta,
+                "cascade": "large",
+                "escalation": reason,
+                "small_avg_logprob": meta.get("avg_logprob"),
+                "small_no_speech_prob": meta.get("no_speech_prob"),
+            }
+
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        from .audio_io import to_f32_16k_mono
+        wav = to_f32_16k_mono(audio_bytes)
+        return self.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+
+    def _record(self, wav: np.ndarray, small_s: float, large_s: float, reason: Optional[str]) -> None:
+        with self._lock:
+            self._requests += 1
+            self._small_s += small_s
+            self._large_s += large_s
+            self._audio_s += float(wav.shape[0]) / TARGET_SR
+            if reason is not None:
+                self._escalated += 1
+                self._reasons[reason] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self._requests
+            return {
+                "requests": n,
+                "escalated": self._escalated,
+                "escalation_rate": round(self._escalated / n, 4) if n else None,
+                "reasons": dict(self._reasons),
+                "thresholds": {"logprob_min": self.logprob_min, "no_speech_max": self.no_speech_max},
+                "small_decode_s": round(self._small_s, 3),
+                "large_decode_s": round(self._large_s, 3),
+                # 오디오 1초당 평균 디코딩 시간 (small + 에스컬레이션된 large 포함)
+                "rtf": round((self._small_s + self._large_s) / self._audio_s, 4) if self._audio_s else None,
+            }
@@ -1,18 +1,24 @@
+import inspect
 import os
 from typing import Tuple, Dict, Any, Optional
 import numpy as np
 from faster_whisper import WhisperModel
 
 from app.core.config import settings
+from app.core.tracing import span
+from .asr_biasing import PromptCache
 from .audio_io import to_f32_16k_mono
+from .fw_autotune import resolve_profile
 
 class FasterWhisperASR:
     """
     Unified FW wrapper:
-      - transcribe(wav: np.ndarray) -> (text, info)
-      - transcribe_bytes(raw: bytes) -> (text, info)
+      - transcribe(wav: np.ndarray, language, beam_size, domain) -> (text, info)
+      - transcribe_bytes(raw: bytes, language, beam_size, domain) -> (text, info)
 
-    info = {"duration": float, "language": str}
+    info = {"duration": float, "language": str, "segments": int, "avg_logprob": float, "no_speech_prob": float}
+    beam_size를 호출마다 넘기면 공유 인스턴스의 self.beam_size를 바꾸지 않는다.
+    ASR_BIASING=1이면 domain별로 컴파일된 initial_prompt(토큰 id)/hotwords를 넘긴다 (app.services.asr_biasing).
     """
 
     def __init__(
@@ -21,41 +27,91 @@ class FasterWhisperASR:
         device: Optional[str] = None,
         compute_type: Optional[str] = None,
         beam_size: Optional[int] = None,
+        cpu_threads: Optional[int] = None,
+        num_workers: Optional[int] = None,
+        model_name: str = "large-v3",
     ):
         self.model_dir = model_dir or settings.FW_MODEL_DIR
-        self.device = device or settings.FW_DEVICE           # "cuda" | "cpu"
-        self.compute_type = compute_type or settings.FW_COMPUTE  # "float16" | "int8_float16" | "float32"
         self.beam_size = beam_size or settings.FW_BEAM
 
-        # 로컬 디렉토리에 모델이 있으면 그 경로를, 아니면 "large-v3"를 사용
-        model_id = self.model_dir if (os.path.isdir(self.model_dir) and os.listdir(self.model_dir)) else "large-v3"
+        # 로컬 디렉토리에 모델이 있으면 그 경로를, 아니면 model_name(기본 "large-v3")을 사용
+        model_id = self.model_dir if (os.path.isdir(self.model_dir) and os.listdir(self.model_dir)) else model_name
+        download_root = os.path.dirname(self.model_dir)
+
+        # "auto"는 하드웨어 감지(+ CPU면 자동 튜닝 프로파일)로 결정
+        profile = resolve_profile(
+            model_id,
+            download_root,
+            device=device or settings.FW_DEVICE,                    # "auto" | "cuda" | "cpu"
+            compute_type=compute_type or settings.FW_COMPUTE,       # "auto" | "float16" | "int8" | "float32" ...
+            cpu_threads=settings.FW_CPU_THREADS if cpu_threads is None else cpu_threads,
+            num_workers=settings.FW_NUM_WORKERS if num_workers is None else num_workers,
+        )
+        self.device = profile["device"]
+        self.compute_type = profile["compute_type"]
+        self.cpu_threads = int(profile["cpu_threads"] or 0)
+        self.num_workers = int(profile["num_workers"] or 1)
 
         self.model = WhisperModel(
             model_id,
             device=self.device,
             compute_type=self.compute_type,
-            download_root=os.path.dirname(self.model_dir),
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,
+            download_root=download_root,
         )
 
-    def transcribe(self, wav: np.ndarray, language: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        # 카탈로그 바이어싱: prompt는 모델 토크나이저로 한 번만 토큰화해 캐시
+        self._bias = PromptCache(encode=self._encode_prompt)
+        self._hotwords_ok = "hotwords" in inspect.signature(self.model.transcribe).parameters
+
+    def _encode_prompt(self, text: str):
+        return self.model.hf_tokenizer.encode(text, add_special_tokens=False).ids
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         """Input: float32 mono PCM @16kHz"""
         if wav.dtype != np.float32:
             wav = wav.astype(np.float32, copy=False)
         lang = language or settings.LANGUAGE
+        beam = int(beam_size or self.beam_size)
+        prompt, hotwords = self._bias.get(domain)
+        bias: Dict[str, Any] = {"initial_prompt": prompt} if prompt is not None else {}
+        if hotwords and self._hotwords_ok:
+            bias["hotwords"] = hotwords
 
-        segments, info = self.model.transcribe(
-            wav,
-            language=lang,
-            beam_size=self.beam_size,
-            vad_filter=False,
-        )
-        text = "".join(s.text for s in segments).strip()
+        with span("asr.fw.transcribe", beam=beam, samples=int(wav.shape[0]), biased=bool(bias)):
+            segments, info = self.model.transcribe(
+                wav,
+                language=lang,
+                beam_size=beam,
+                vad_filter=False,
+                **bias,
+            )
+            # segments는 lazy generator → 실제 디코딩은 list() 시점에 일어난다
+            segs = list(segments)
+            text = "".join(s.text for s in segs).strip()
         meta = {
             "duration": float(getattr(info, "duration", 0.0) or 0.0),
             "language": getattr(info, "language", lang) or lang,
+            # 세그먼트 신뢰도 요약 (cascade 판단용): 가장 낮은 avg_logprob / 가장 높은 no_speech_prob
+            "segments": len(segs),
+            "avg_logprob": round(min(s.avg_logprob for s in segs), 4) if segs else None,
+            "no_speech_prob": round(max(s.no_speech_prob for s in segs), 4) if segs else None,
         }
         return text, meta
 
-    def transcribe_bytes(self, audio_bytes: bytes, language: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         wav = to_f32_16k_mono(audio_bytes)
-        return self.transcribe(wav, language=language)
+        return self.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
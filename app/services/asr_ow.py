@@ -4,6 +4,9 @@ import numpy as np
 import whisper  # openai-whisper
 
 from app.core.config import settings
+from app.core.hardware import resolve_device
+from app.core.tracing import span
+from .asr_biasing import PromptCache
 from .audio_io import to_f32_16k_mono
 
 class OpenAIWhisperASR:
@@ -22,7 +25,7 @@ class OpenAIWhisperASR:
         device: Optional[str] = None,
     ):
         self.model_dir = model_dir or settings.OW_MODEL_DIR
-        self.device = device or settings.FW_DEVICE  # whisper.load_model의 device 파라미터에 전달
+        self.device = resolve_device(device)  # whisper.load_model의 device 파라미터에 전달 ("auto" 해석)
         # 로컬 모델 경로 지원(있으면 우선), 없으면 사이즈명으로 다운로드
         model_id = self.model_dir if (os.path.isdir(self.model_dir) and os.listdir(self.model_dir)) else model_size
 
@@ -31,15 +34,25 @@ class OpenAIWhisperASR:
             device=self.device,
             download_root=os.path.dirname(self.model_dir),
         )
+        # openai-whisper는 hotwords가 없으므로 initial_prompt 문자열만 사용
+        self._bias = PromptCache()
 
-    def transcribe(self, wav: np.ndarray, language: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,  # FW 인터페이스 호환용 (OW는 greedy 디코딩 유지)
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         if wav.dtype != np.float32:
             wav = wav.astype(np.float32, copy=False)
         lang = language or settings.LANGUAGE
 
         # GPU일 때 fp16 사용이 기본적으로 유리
         fp16 = (self.device == "cuda")
-        result = self.model.transcribe(wav, language=lang, fp16=fp16)
+        prompt, _ = self._bias.get(domain)
+        with span("asr.ow.transcribe", samples=int(wav.shape[0]), biased=prompt is not None):
+            result = self.model.transcribe(wav, language=lang, fp16=fp16, initial_prompt=prompt)
         text = (result.get("text") or "").strip()
         meta = {
             "duration": None,  # openai-whisper는 별도 duration 제공 안 함
@@ -47,6 +60,12 @@ class OpenAIWhisperASR:
         }
         return text, meta
 
-    def transcribe_bytes(self, audio_bytes: bytes, language: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         wav = to_f32_16k_mono(audio_bytes)
-        return self.transcribe(wav, language=language)
+        return self.transcribe(wav, language=language, domain=domain)
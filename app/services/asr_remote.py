@@ -0,0 +1,252 @@
+# app/services/asr_remote.py
+"""
+원격 ASR inference 워커 프로토콜 + 클라이언트.
+
+Wire format (TCP 또는 Unix 소켓, 요청/응답 동일):
+
+    [u32 header_len][u32 payload_len][header: UTF-8 JSON][payload: raw bytes]   (big-endian)
+
+  요청 header : {"op": "transcribe", "engine": "fw", "language": "ko", "beam_size": 1, "domain": null, "sr": 16000}
+  요청 payload: float32 little-endian mono PCM (base64 없이 그대로)
+  응답 header : {"ok": true, "text": "...", "meta": {...}, "inflight": 2}  /  {"ok": false, "error": "..."}
+
+한 연결에서 요청-응답을 순차로 주고받으며(keep-alive), 클라이언트는 엔드포인트별 연결 풀을 둔다.
+라우팅은 엔드포인트별 in-flight 수(+ 워커가 마지막으로 보고한 in-flight)가 가장 적은 곳으로 보낸다.
+
+타임아웃은 둘로 나뉜다: 연결은 ASR_REMOTE_CONNECT_TIMEOUT_S(짧게), 응답 대기는
+ASR_REMOTE_TIMEOUT_S + 오디오 길이 × ASR_REMOTE_TIMEOUT_PER_AUDIO_S (긴 /transcribe도 정상 워커에서 끝나도록).
+응답 대기 시간 초과는 워커 장애가 아니므로 제외/재시도하지 않는다 (같은 오디오를 두 번 디코딩하지 않음).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+_HDR = struct.Struct(">II")
+MAX_HEADER = 1 << 20
+MAX_PAYLOAD = 1 << 30
+
+
+# -----------------------------
+# Framing
+# -----------------------------
+def recv_exact_into(sock: socket.socket, buf: memoryview) -> None:
+    got = 0
+    n = len(buf)
+    while got < n:
+        k = sock.recv_into(buf[got:], n - got)
+        if k == 0:
+            raise ConnectionError("connection closed")
+        got += k
+
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], payload: Any = b"") -> None:
+    h = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    mv = memoryview(payload).cast("B") if len(payload) else memoryview(b"")
+    sock.sendall(_HDR.pack(len(h), len(mv)) + h)
+    if len(mv):
+        sock.sendall(mv)  # PCM 버퍼를 복사 없이 전송
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytearray]:
+    pre = bytearray(_HDR.size)
+    recv_exact_into(sock, memoryview(pre))
+    hlen, plen = _HDR.unpack(pre)
+    if hlen > MAX_HEADER or plen > MAX_PAYLOAD:
+        raise ValueError(f"frame too large (header={hlen}, payload={plen})")
+    h = bytearray(hlen)
+    recv_exact_into(sock, memoryview(h))
+    payload = bytearray(plen)
+    if plen:
+        recv_exact_into(sock, memoryview(payload))
+    return json.loads(h.decode("utf-8")), payload
+
+
+def connect(endpoint: str, timeout: float) -> socket.socket:
+    """endpoint: 'host:port' 또는 'unix:/path/to.sock'"""
+    if endpoint.startswith("unix:"):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        s.connect(endpoint[len("unix:"):])
+        return s
+    host, port = endpoint.rsplit(":", 1)
+    s = socket.create_connection((host, int(port)), timeout=timeout)
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return s
+
+
+# -----------------------------
+# Client
+# -----------------------------
+class _Endpoint:
+    def __init__(self, address: str, pool_size: int):
+        self.address = address
+        self.pool: "queue.LifoQueue[socket.socket]" = queue.LifoQueue(maxsize=pool_size)
+        self.inflight = 0
+        self.reported_inflight = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def load(self) -> int:
+        return self.inflight + self.reported_inflight
+
+
+class RemoteASRBackend:
+    """
+    FasterWhisperASR와 같은 transcribe 인터페이스로 원격 워커(scripts/asr_worker.py)에 위임.
+    연결 실패 시 해당 엔드포인트를 잠시 제외하고 다른 워커로 1회 재시도한다 (응답 대기 시간 초과는 제외).
+    """
+
+    def __init__(
+        self,
+        endpoints: Optional[List[str]] = None,
+        engine: str = "fw",
+        pool_size: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+        beam_size: Optional[int] = None,
+        connect_timeout_s: Optional[float] = None,
+    ):
+        eps = endpoints if endpoints is not None else settings.ASR_REMOTE_WORKERS
+        if not eps:
+            raise ValueError("RemoteASRBackend requires at least one endpoint (ASR_REMOTE_WORKERS)")
+        size = int(pool_size or settings.ASR_REMOTE_POOL_SIZE)
+        self.endpoints = [_Endpoint(e, size) for e in eps]
+        self.engine = engine
+        self.timeout_s = float(timeout_s or settings.ASR_REMOTE_TIMEOUT_S)
+        self.connect_timeout_s = float(connect_timeout_s or settings.ASR_REMOTE_CONNECT_TIMEOUT_S)
+        self.beam_size = beam_size or settings.FW_BEAM
+        self._lock = threading.Lock()
+
+    # ---------- routing ----------
+
+    def _pick(self, exclude: Optional[_Endpoint] = None) -> _Endpoint:
+        now = time.monotonic()
+        with self._lock:
+            alive = [e for e in self.endpoints if e.down_until <= now and e is not exclude]
+            cands = alive or [e for e in self.endpoints if e is not exclude] or self.endpoints
+            best = min(e.load() for e in cands)
+            ep = random.choice([e for e in cands if e.load() == best])
+            ep.inflight += 1
+            ep.requests += 1
+            return ep
+
+    def _release(self, ep: _Endpoint, sock: Optional[socket.socket], failed: bool) -> None:
+        with self._lock:
+            ep.inflight -= 1
+            if failed:
+                ep.errors += 1
+                ep.down_until = time.monotonic() + settings.ASR_REMOTE_RETRY_AFTER_S
+        if sock is None:
+            return
+        if failed:
+            sock.close()
+            return
+        try:
+            ep.pool.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+
+    def _checkout(self, ep: _Endpoint) -> socket.socket:
+        try:
+            return ep.pool.get_nowait()
+        except queue.Empty:
+            return connect(ep.address, self.connect_timeout_s)
+
+    # ---------- public API ----------
+
+    def read_timeout(self, audio_sec: float) -> float:
+        return self.timeout_s + audio_sec * settings.ASR_REMOTE_TIMEOUT_PER_AUDIO_S
+
+    def _call(self, ep: _Endpoint, header: Dict[str, Any], payload: Any, read_timeout: float) -> Dict[str, Any]:
+        try:
+            sock = self._checkout(ep)
+        except OSError:
+            self._release(ep, None, failed=True)
+            raise
+        try:
+            sock.settimeout(read_timeout)
+            send_frame(sock, header, payload)
+            resp, _ = recv_frame(sock)
+        except socket.timeout:
+            # 워커가 느린 것일 뿐 → 제외하지 않는다. 응답이 늦게 올 수 있는 연결은 재사용하지 않음
+            sock.close()
+            self._release(ep, None, failed=False)
+            raise
+        except (OSError, ConnectionError, ValueError):
+            self._release(ep, sock, failed=True)
+            raise
+        ep.reported_inflight = int(resp.get("inflight", 0))
+        self._release(ep, sock, failed=False)
+        return resp
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        wav = np.ascontiguousarray(wav, dtype="<f4")
+        header = {
+            "op": "transcribe",
+            "engine": self.engine,
+            "language": language or settings.LANGUAGE,
+            "beam_size": int(beam_size or self.beam_size),
+            "domain": domain,
+            "sr": 16000,
+        }
+        read_timeout = self.read_timeout(wav.shape[0] / 16000)
+        ep = self._pick()
+        with span(f"asr.{self.engine}.remote", endpoint=ep.address, samples=int(wav.shape[0])):
+            try:
+                resp = self._call(ep, header, wav, read_timeout)
+            except socket.timeout:
+                raise
+            except (OSError, ConnectionError, ValueError) as e:
+                logger.warning(f"ASR worker {ep.address} failed ({e}); retrying on another worker")
+                ep = self._pick(exclude=ep)
+                resp = self._call(ep, header, wav, read_timeout)
+        if not resp.get("ok"):
+            raise RuntimeError(f"remote ASR failed on {ep.address}: {resp.get('error')}")
+        return resp.get("text", ""), resp.get("meta", {})
+
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        from .audio_io import to_f32_16k_mono
+        wav = to_f32_16k_mono(audio_bytes)
+        return self.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "endpoint": e.address,
+                    "inflight": e.inflight,
+                    "reported_inflight": e.reported_inflight,
+                    "requests": e.requests,
+                    "errors": e.errors,
+                    "pooled_connections": e.pool.qsize(),
+                    "down": e.down_until > time.monotonic(),
+                }
+                for e in self.endpoints
+            ]
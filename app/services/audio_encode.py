@@ -0,0 +1,127 @@
+# app/services/audio_encode.py
+"""
+float32 PCM -> 압축 오디오 바이트 인코더 (TTS 응답용).
+
+- ogg_opus: libsndfile(soundfile)의 OGG/OPUS로 프로세스 내 인코딩
+- mp3     : libsndfile >= 1.1 의 MPEG Layer III로 프로세스 내 인코딩 (저비트레이트)
+- wav     : PCM_16 WAV (무손실, 디버깅용)
+
+libsndfile이 해당 포맷을 지원하지 않으면 ffmpeg에 raw f32le PCM을 stdin으로 넘겨 인코딩한다
+(WAV 컨테이너 중간 복사 없음).
+"""
+from __future__ import annotations
+
+import io
+import subprocess
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+from .audio_io import FFMPEG_BIN
+
+FORMATS = ("mp3", "ogg_opus", "wav")
+
+MIME_TYPES: Dict[str, str] = {
+    "mp3": "audio/mpeg",
+    "ogg_opus": "audio/ogg",
+    "wav": "audio/wav",
+}
+
+# Accept 헤더 -> 포맷 (앞에 있는 것이 우선)
+_ACCEPT_MAP = (
+    ("audio/ogg", "ogg_opus"),
+    ("audio/opus", "ogg_opus"),
+    ("audio/mpeg", "mp3"),
+    ("audio/mp3", "mp3"),
+    ("audio/wav", "wav"),
+    ("audio/x-wav", "wav"),
+)
+
+# Opus가 허용하는 입력 샘플레이트
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str] = None) -> str:
+    """명시 요청 > Accept 헤더 > TTS_AUDIO_FORMAT 순으로 출력 포맷을 결정."""
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"unsupported audio_format: {requested} (supported: {', '.join(FORMATS)})")
+        return requested
+    if accept:
+        a = accept.lower()
+        for mime, fmt in _ACCEPT_MAP:
+            if mime in a:
+                return fmt
+    return settings.TTS_AUDIO_FORMAT
+
+
+@lru_cache(maxsize=None)
+def native_support(fmt: str) -> bool:
+    """libsndfile로 프로세스 내 인코딩이 가능한지."""
+    if fmt == "wav":
+        return True
+    import soundfile as sf  # libsndfile 로드는 첫 인코딩 때 (app import를 가볍게)
+    if fmt == "ogg_opus":
+        return "OPUS" in sf.available_subtypes("OGG")
+    if fmt == "mp3":
+        return "MP3" in sf.available_formats()
+    return False
+
+
+def _encode_soundfile(wav: np.ndarray, sr: int, fmt: str) -> bytes:
+    import soundfile as sf
+
+    buf = io.BytesIO()
+    if fmt == "wav":
+        sf.write(buf, wav, samplerate=sr, format="WAV", subtype="PCM_16")
+        return buf.getvalue()
+
+    if fmt == "ogg_opus":
+        kw = dict(format="OGG", subtype="OPUS")
+    else:
+        kw = dict(format="MP3", subtype="MPEG_LAYER_III")
+    try:
+        # soundfile >= 0.13: 압축 수준(0=최고 비트레이트, 1=최저) 지정 가능
+        sf.write(buf, wav, samplerate=sr, compression_level=settings.TTS_COMPRESSION_LEVEL, **kw)
+    except TypeError:
+        buf = io.BytesIO()
+        sf.write(buf, wav, samplerate=sr, **kw)
+    return buf.getvalue()
+
+
+def _encode_ffmpeg(wav: np.ndarray, sr: int, fmt: str, bitrate: Optional[str] = None) -> bytes:
+    if fmt == "ogg_opus":
+        codec = ["-c:a", "libopus", "-b:a", bitrate or settings.TTS_OPUS_BITRATE, "-application", "voip", "-f", "ogg"]
+    else:
+        codec = ["-c:a", "libmp3lame", "-b:a", bitrate or settings.TTS_MP3_BITRATE, "-f", "mp3"]
+    p = subprocess.Popen(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
+         "-f", "f32le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0", *codec, "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    out, _ = p.communicate(input=memoryview(wav).cast("B"))
+    if p.returncode != 0 or not out:
+        raise RuntimeError(f"ffmpeg {fmt} encode failed (check ffmpeg codecs).")
+    return out
+
+
+def encode_pcm(wav: np.ndarray, sr: int, fmt: str = "mp3", bitrate: Optional[str] = None) -> bytes:
+    """
+    float32 mono PCM을 fmt("mp3" | "ogg_opus" | "wav")로 인코딩한 바이트를 반환.
+    Opus는 8/12/16/24/48kHz만 허용하므로 다른 샘플레이트는 ffmpeg 경로로 보낸다.
+    - bitrate: ffmpeg 경로의 비트레이트 (기본 TTS_MP3_BITRATE / TTS_OPUS_BITRATE).
+      libsndfile 경로는 비트레이트를 직접 받지 않으므로 TTS_COMPRESSION_LEVEL을 따른다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported audio_format: {fmt}")
+    wav = np.ascontiguousarray(wav, dtype=np.float32)
+    if wav.size == 0:
+        return b""
+    native = native_support(fmt) and (fmt != "ogg_opus" or sr in _OPUS_RATES)
+    with span("tts.encode", format=fmt, native=native, samples=int(wav.shape[0])) as sp:
+        out = _encode_soundfile(wav, sr, fmt) if native else _encode_ffmpeg(wav, sr, fmt, bitrate)
+        sp.set("bytes", len(out))
+    return out
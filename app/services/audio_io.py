@@ -3,9 +3,16 @@ from __future__ import annotations
 
 import os
 import shutil
+import struct
+import subprocess
+import threading
+from typing import BinaryIO, List, Optional
+
 import numpy as np
 import ffmpeg
 
+from app.core.tracing import span
+
 # FastAPI가 없는 환경에서도 동작하도록 선택적 임포트
 try:
     from fastapi import HTTPException
@@ -17,6 +24,7 @@ except Exception:
 # Config
 # -----------------------------
 TARGET_SR = int(os.getenv("AUDIO_TARGET_SR", "16000"))
+STREAM_CHUNK = int(os.getenv("AUDIO_STREAM_CHUNK", str(64 * 1024)))  # 업로드 → ffmpeg stdin 청크 크기
 
 def _pick_ffmpeg_bin() -> str:
     """
@@ -52,6 +60,12 @@ def _raise_decode_error(detail: str):
     raise RuntimeError(detail)
 
 
+def _raise_too_long(max_sec: float):
+    if _HAS_FASTAPI:
+        raise HTTPException(status_code=413, detail=f"Audio too long (> {max_sec:g}s)")
+    raise RuntimeError(f"Audio too long (> {max_sec:g}s)")
+
+
 # -----------------------------
 # Public API
 # -----------------------------
@@ -75,23 +89,24 @@ def to_f32_16k_mono(raw: bytes, target_sr: int = TARGET_SR) -> np.ndarray:
         dtype=float32, shape=(n_samples,)
     """
     try:
-        out, err = (
-            ffmpeg
-            .input("pipe:0")
-            .output(
-                "pipe:1",
-                format="f32le",
-                acodec="pcm_f32le",
-                ac=1,
-                ar=str(int(target_sr)),
-            )
-            .run(
-                input=raw,
-                capture_stdout=True,
-                capture_stderr=True,
-                cmd=FFMPEG_BIN,
+        with span("audio.decode", bytes=len(raw)):
+            out, err = (
+                ffmpeg
+                .input("pipe:0")
+                .output(
+                    "pipe:1",
+                    format="f32le",
+                    acodec="pcm_f32le",
+                    ac=1,
+                    ar=str(int(target_sr)),
+                )
+                .run(
+                    input=raw,
+                    capture_stdout=True,
+                    capture_stderr=True,
+                    cmd=FFMPEG_BIN,
+                )
             )
-        )
     except ffmpeg.Error as e:
         # stderr를 조금 잘라서 힌트 제공
         stderr = e.stderr.decode("utf-8", errors="ignore") if isinstance(e.stderr, (bytes, bytearray)) else str(e.stderr)
@@ -109,6 +124,132 @@ def to_f32_16k_mono(raw: bytes, target_sr: int = TARGET_SR) -> np.ndarray:
     return wav
 
 
+def wav_header_duration(head: bytes) -> Optional[float]:
+    """
+    RIFF/WAVE 헤더에서 (data 청크 크기 / byte rate)로 길이를 구한다.
+    WAV가 아니거나 크기가 기록되지 않은 스트리밍 WAV(0 / 0xFFFFFFFF)면 None.
+    """
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    pos, byte_rate = 12, 0
+    while pos + 8 <= len(head):
+        cid, size = head[pos:pos + 4], struct.unpack_from("<I", head, pos + 4)[0]
+        if cid == b"fmt " and pos + 16 <= len(head):
+            byte_rate = struct.unpack_from("<I", head, pos + 16)[0]
+        elif cid == b"data":
+            if not byte_rate or size in (0, 0xFFFFFFFF):
+                return None
+            return size / float(byte_rate)
+        pos += 8 + size + (size & 1)  # 청크는 짝수 바이트 정렬
+    return None
+
+
+def decode_stream(
+    src: BinaryIO,
+    max_sec: Optional[float] = None,
+    target_sr: int = TARGET_SR,
+    chunk_size: int = STREAM_CHUNK,
+) -> np.ndarray:
+    """
+    파일 객체(예: UploadFile.file - starlette가 1MB 넘으면 디스크에 spool)를 청크 단위로
+    ffmpeg stdin에 흘리고, stdout의 PCM을 미리 할당한 float32 버퍼에 바로 readinto 한다.
+    업로드 전체 bytes / ffmpeg 출력 bytes 복사본을 만들지 않으므로 요청당 메모리는
+    (max_sec × target_sr × 4) + 청크 크기 정도로 일정하다.
+    업로드 본문은 핸들러가 호출되기 전에 starlette가 이미 전부 받아 spool해 두므로,
+    본문 크기 자체는 여기가 아니라 server.UploadLimitMiddleware가 받는 동안 막는다.
+
+    max_sec 초과는 디코딩을 끝까지 기다리지 않고 거절(413)한다.
+      - WAV: 첫 청크의 헤더로 길이를 계산해 ffmpeg를 띄우기 전에 거절
+      - 그 외: 출력 샘플이 한도를 넘는 순간 ffmpeg를 종료 (spool된 나머지는 디코딩하지 않음)
+    max_sec=None이면 버퍼를 두 배씩 늘린다.
+    """
+    head = src.read(chunk_size)
+    if not head:
+        _raise_decode_error("Empty audio upload.")
+    if max_sec is not None:
+        dur = wav_header_duration(head)
+        if dur is not None and dur > max_sec:
+            _raise_too_long(max_sec)
+
+    # 한도 + 1 샘플: 버퍼가 가득 차면 한도를 넘었다는 뜻
+    cap = int(max_sec * target_sr) + 1 if max_sec is not None else 60 * target_sr
+    buf = np.empty(cap, dtype=np.float32)
+
+    with span("audio.decode", streamed=True) as sp:
+        proc = subprocess.Popen(
+            [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+             "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(int(target_sr)), "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        fed = [0]
+        err: List[bytes] = []
+
+        def _feed() -> None:
+            try:
+                chunk = head
+                while chunk:
+                    proc.stdin.write(chunk)
+                    fed[0] += len(chunk)
+                    chunk = src.read(chunk_size)
+            except (BrokenPipeError, ValueError, OSError):
+                pass  # ffmpeg가 먼저 끝남 (한도 초과로 종료 / 디코드 오류)
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        def _drain_stderr() -> None:
+            err.append(proc.stderr.read())
+
+        feeder = threading.Thread(target=_feed, daemon=True)
+        drainer = threading.Thread(target=_drain_stderr, daemon=True)
+        feeder.start()
+        drainer.start()
+
+        n = 0  # 채운 바이트 수
+        too_long = False
+        try:
+            while True:
+                view = memoryview(buf).cast("B")
+                while n < len(view):
+                    k = proc.stdout.readinto(view[n:])
+                    if not k:
+                        break
+                    n += k
+                view.release()
+                if n < buf.nbytes:
+                    break  # EOF
+                if max_sec is not None:
+                    too_long = True
+                    break
+                buf = _grow(buf)
+        finally:
+            if too_long:
+                proc.kill()
+            proc.stdout.close()
+            rc = proc.wait()
+            feeder.join()
+            drainer.join()
+        sp.set("bytes", fed[0])
+
+    if too_long:
+        _raise_too_long(max_sec)
+    if rc != 0:
+        tail = b"".join(err).decode("utf-8", errors="ignore").strip().splitlines()[-5:]
+        _raise_decode_error(f"Audio decode failed (ffmpeg). Hint: {' | '.join(tail)}")
+    samples = n // 4
+    if samples == 0:
+        _raise_decode_error("Audio decode produced empty output.")
+    return buf[:samples]
+
+
+def _grow(buf: np.ndarray) -> np.ndarray:
+    out = np.empty(buf.shape[0] * 2, dtype=np.float32)
+    out[: buf.shape[0]] = buf
+    return out
+
+
 def seconds_from_f32_16k(wav: np.ndarray, sr: int = TARGET_SR) -> float:
     """
     float32 mono PCM 배열의 길이를 초 단위로 반환.
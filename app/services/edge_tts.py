@@ -1,12 +1,101 @@
 # app/services/edge_tts.py
+"""
+Edge TTS 관리형 클라이언트.
+
+edge_tts.Communicate는 호출마다 새 aiohttp 세션 + WebSocket(TLS) 핸드셰이크를 만든다.
+여기서는 edge_tts의 SSML/DRM 헬퍼를 그대로 쓰되 연결을 직접 관리한다.
+
+  - 연결 재사용: 한 WebSocket에서 turn(speech.config → ssml → ... → turn.end)을 이어서 보낸다.
+    유휴 연결은 EDGE_TTS_POOL_SIZE개까지 EDGE_TTS_IDLE_S 동안 보관한다 (EDGE_TTS_REUSE=0이면 매번 새 연결).
+    재사용한 연결이 끊겨 있으면 새 연결로 한 번 더 시도한다.
+  - deadline: 호출 전체가 EDGE_TTS_TIMEOUT_S 안에 끝나야 한다.
+  - hedging: 첫 오디오 바이트가 최근 TTFB의 EDGE_TTS_HEDGE_PCT 백분위수(최소 EDGE_TTS_HEDGE_MIN_MS)를
+    넘도록 오지 않으면 같은 요청을 한 번 더 보내 먼저 끝난 쪽을 쓴다.
+  - fallback: 실패/시간 초과 시 호출자가 준 fallback(로컬 SpeechT5)으로 합성한다.
+    연속 EDGE_TTS_BREAKER_FAILS회 실패하면 EDGE_TTS_BREAKER_COOLDOWN_S 동안 Edge를 건너뛴다.
+  - 보이스 목록: EDGE_TTS_VOICES_TTL_S 동안 캐시 (갱신 실패 시 이전 목록 사용).
+
+EDGE_TTS_WSS_URL / EDGE_TTS_VOICES_URL로 scripts/fake_edge_tts_server.py를 지정하면 오프라인으로 동작한다.
+
+edge_tts의 공개 API가 아닌 내부 헬퍼(TTSConfig, mkssml, DRM ...)를 쓰므로 버전 차이는 여기서 흡수하고
+(_tts_config / _ws_headers), 모양이 예상과 다르면 import 시점에 ImportError로 바로 실패한다 (_check_edge_api).
+"""
 from __future__ import annotations
 
 import asyncio
+import inspect
+import logging
 import re
-from typing import List, Optional
+import ssl
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from xml.sax.saxutils import escape
 
+import aiohttp
+import certifi
 import edge_tts
+from edge_tts.communicate import (
+    TTSConfig,
+    connect_id,
+    date_to_string,
+    mkssml,
+    remove_incompatible_characters,
+    ssml_headers_plus_data,
+)
+from edge_tts.constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from edge_tts.drm import DRM
+
 from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# edge_tts 내부 API 호환
+# -----------------------------
+_EDGE_VERSION = getattr(edge_tts, "__version__", "?")
+_TTS_FIELDS = inspect.signature(TTSConfig).parameters  # 7.2+: boundary 필드 추가 (필수)
+
+
+def _check_edge_api() -> None:
+    """쓰는 내부 헬퍼의 시그니처가 알려진 모양인지 확인. 아니면 요청마다 500이 나기 전에 import에서 실패."""
+    problems = []
+    base = {"voice", "rate", "volume", "pitch"}
+    required = {n for n, p in _TTS_FIELDS.items() if p.default is inspect.Parameter.empty}
+    if not base <= set(_TTS_FIELDS) or required - base - {"boundary"}:
+        problems.append(f"TTSConfig{inspect.signature(TTSConfig)}")
+    if len(inspect.signature(mkssml).parameters) != 2:
+        problems.append(f"mkssml{inspect.signature(mkssml)}")
+    if len(inspect.signature(ssml_headers_plus_data).parameters) != 3:
+        problems.append(f"ssml_headers_plus_data{inspect.signature(ssml_headers_plus_data)}")
+    if not all(hasattr(DRM, a) for a in ("generate_sec_ms_gec", "handle_client_response_error")):
+        problems.append("DRM")
+    if problems:
+        raise ImportError(
+            f"edge-tts {_EDGE_VERSION}: unsupported internal API ({', '.join(problems)}); "
+            "install a version from requirements.txt"
+        )
+
+
+_check_edge_api()
+
+
+def _tts_config(voice: str, rate: str, volume: str, pitch: str) -> TTSConfig:
+    if "boundary" in _TTS_FIELDS:
+        # speech.config는 직접 보내므로(경계 메타데이터 끔) 값은 SSML에 영향이 없다
+        return TTSConfig(voice, rate, volume, pitch, boundary="SentenceBoundary")
+    return TTSConfig(voice, rate, volume, pitch)
+
+
+def _ws_headers() -> Dict[str, str]:
+    # 7.x는 연결마다 MUID 쿠키를 붙인다
+    if hasattr(DRM, "headers_with_muid"):
+        return DRM.headers_with_muid(WSS_HEADERS)
+    return dict(WSS_HEADERS)
+
+
+Fallback = Callable[[str], Awaitable[bytes]]
 
 # -----------------------------
 # Helpers
@@ -54,6 +143,368 @@ def _chunk_by_chars(text: str, max_chars: int = 4000) -> List[str]:
                 fixed.append(ch[i : i + max_chars])
     return [c for c in fixed if c]
 
+def _clean_voice(voice: Optional[str]) -> str:
+    v = voice or settings.TTS_VOICE_DEFAULT
+    # "voice=ko-KR-SunHiNeural" 형태의 문자열에서 실제 voice 값만 추출
+    if v and isinstance(v, str):
+        if v.startswith("voice="):
+            v = v.replace("voice=", "")
+        v = v.strip()
+    return v or "ko-KR-SunHiNeural"
+
+def _percentile(xs, pct: float) -> Optional[float]:
+    if not xs:
+        return None
+    s = sorted(xs)
+    return s[min(len(s) - 1, int(len(s) * pct / 100.0))]
+
+
+class EdgeTTSError(RuntimeError):
+    """Edge 응답 이상 (오디오 없음 / turn.end 전에 연결 종료)."""
+
+
+# 업스트림 장애로 보는 예외 (fallback / breaker 대상). 잘못된 voice 등 입력 오류(ValueError)는 제외.
+_UPSTREAM_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError, EdgeTTSError)
+
+
+# -----------------------------
+# Connection
+# -----------------------------
+class _Conn:
+    __slots__ = ("ws", "born", "last_used", "turns")
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse):
+        self.ws = ws
+        self.born = self.last_used = time.monotonic()
+        self.turns = 0
+
+    async def close(self) -> None:
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+
+class _FirstByte(asyncio.Event):
+    """attempt별 첫 오디오 바이트 이벤트. 처음 set될 때 attempt 시작부터의 TTFB를 sink에 기록한다."""
+
+    def __init__(self, sink: Deque[float]):
+        super().__init__()
+        self.t0 = time.monotonic()
+        self._sink = sink
+
+    def set(self) -> None:
+        if not self.is_set():
+            self._sink.append(time.monotonic() - self.t0)
+        super().set()
+
+
+async def _turn(conn: _Conn, tc: TTSConfig, text: str, first_byte: asyncio.Event) -> bytes:
+    """연결 하나에서 turn 한 번: speech.config + ssml 전송 → turn.end까지 오디오 수집."""
+    ws = conn.ws
+    await ws.send_str(
+        f"X-Timestamp:{date_to_string()}\r\n"
+        "Content-Type:application/json; charset=utf-8\r\n"
+        "Path:speech.config\r\n\r\n"
+        '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+        '"sentenceBoundaryEnabled":false,"wordBoundaryEnabled":false},'
+        '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
+        "}}}}\r\n"
+    )
+    ssml = mkssml(tc, escape(remove_incompatible_characters(text)))
+    await ws.send_str(ssml_headers_plus_data(connect_id(), date_to_string(), ssml))
+
+    audio = bytearray()
+    async for msg in ws:
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            head = msg.data.split("\r\n\r\n", 1)[0]
+            if "Path:turn.end" in head:
+                conn.turns += 1
+                conn.last_used = time.monotonic()
+                if not audio:
+                    raise EdgeTTSError("no audio received")
+                return bytes(audio)
+        elif msg.type == aiohttp.WSMsgType.BINARY:
+            data = msg.data
+            if len(data) < 2:
+                continue
+            n = int.from_bytes(data[:2], "big")
+            if b"Path:audio" not in data[2 : 2 + n]:
+                continue
+            body = data[2 + n :]
+            if body:
+                audio += body
+                first_byte.set()
+        elif msg.type == aiohttp.WSMsgType.ERROR:
+            raise EdgeTTSError(f"websocket error: {ws.exception()}")
+    raise EdgeTTSError("connection closed before turn.end")
+
+
+# -----------------------------
+# Client
+# -----------------------------
+class EdgeTTSClient:
+    def __init__(
+        self,
+        wss_url: Optional[str] = None,
+        voices_url: Optional[str] = None,
+        reuse: Optional[bool] = None,
+        pool_size: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+        hedge_pct: Optional[float] = None,
+    ):
+        self.wss_url = wss_url or settings.EDGE_TTS_WSS_URL or WSS_URL
+        self.voices_url = voices_url if voices_url is not None else settings.EDGE_TTS_VOICES_URL
+        self.reuse = settings.EDGE_TTS_REUSE if reuse is None else bool(reuse)
+        self.pool_size = int(settings.EDGE_TTS_POOL_SIZE if pool_size is None else pool_size)
+        self.timeout_s = float(timeout_s or settings.EDGE_TTS_TIMEOUT_S)
+        self.hedge_pct = float(settings.EDGE_TTS_HEDGE_PCT if hedge_pct is None else hedge_pct)
+        self._ssl = ssl.create_default_context(cafile=certifi.where()) if self.wss_url.startswith("wss:") else None
+
+        # aiohttp 세션/연결은 이벤트 루프에 묶인다 (다른 루프에서 호출되면 새로 만든다)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle: List[_Conn] = []
+
+        self._ttfb: Deque[float] = deque(maxlen=256)
+        self._fails = 0
+        self.down_until = 0.0
+        self._voices: Optional[List[dict]] = None
+        self._voices_at = 0.0
+        self._voices_lock: Optional[asyncio.Lock] = None
+        self.counts: Dict[str, int] = dict.fromkeys(
+            ("requests", "connects", "reused", "hedged", "hedge_wins", "timeouts", "errors", "fallbacks", "skipped"), 0
+        )
+
+    # ---------- connections ----------
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이전 루프의 세션/연결은 이 루프에서 쓸 수 없으므로 버린다
+            self._loop, self._session, self._idle = loop, None, []
+            self._voices_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # 세션 하나를 공유 → DNS 캐시 / TLS 세션 재개를 연결 간에 재사용
+            self._session = aiohttp.ClientSession(
+                trust_env=True, timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout_s),
+            )
+        return self._session
+
+    async def _connect(self) -> _Conn:
+        sess = self._get_session()
+        for attempt in range(2):
+            url = (f"{self.wss_url}&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+                   f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}&ConnectionId={connect_id()}")
+            try:
+                ws = await sess.ws_connect(url, compress=15, headers=_ws_headers(), ssl=self._ssl)
+            except aiohttp.WSServerHandshakeError as e:
+                # 403 = 시계 오차로 DRM 토큰 거절 → 서버 시각으로 보정 후 한 번 더
+                if e.status != 403 or attempt:
+                    raise
+                DRM.handle_client_response_error(e)
+                continue
+            self.counts["connects"] += 1
+            return _Conn(ws)
+        raise EdgeTTSError("unreachable")
+
+    def _checkout(self) -> Optional[_Conn]:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.ws.closed and now - conn.last_used < settings.EDGE_TTS_IDLE_S:
+                return conn
+            asyncio.ensure_future(conn.close())
+        return None
+
+    async def _release(self, conn: _Conn, ok: bool) -> None:
+        if ok and self.reuse and not conn.ws.closed and len(self._idle) < self.pool_size:
+            self._idle.append(conn)
+        else:
+            await conn.close()
+
+    async def _attempt(self, tc: TTSConfig, text: str, first_byte: asyncio.Event) -> bytes:
+        conn = self._checkout() if self.reuse else None
+        reused = conn is not None
+        if conn is None:
+            conn = await self._connect()
+        else:
+            self.counts["reused"] += 1
+        try:
+            audio = await _turn(conn, tc, text, first_byte)
+        except _UPSTREAM_ERRORS:
+            await conn.close()
+            if not reused or first_byte.is_set():
+                raise
+            # 유휴 중 서버가 닫은 연결 → 새 연결로 한 번 더
+            conn = await self._connect()
+            try:
+                audio = await _turn(conn, tc, text, first_byte)
+            except BaseException:
+                await conn.close()
+                raise
+        except BaseException:
+            # 취소(hedge 패자/deadline) 포함: turn 중간인 연결은 재사용할 수 없다
+            await conn.close()
+            raise
+        await self._release(conn, ok=True)
+        return audio
+
+    # ---------- hedging ----------
+
+    def hedge_delay(self) -> Optional[float]:
+        if self.hedge_pct <= 0 or len(self._ttfb) < 20:
+            return None
+        p = _percentile(self._ttfb, self.hedge_pct)
+        return max(p, settings.EDGE_TTS_HEDGE_MIN_MS / 1000.0)
+
+    async def _chunk(self, tc: TTSConfig, text: str) -> bytes:
+        # TTFB는 attempt마다(hedge 패자 포함) 첫 바이트 시점에 기록된다 (_FirstByte)
+        fb1 = _FirstByte(self._ttfb)
+        first = asyncio.ensure_future(self._attempt(tc, text, fb1))
+        tasks = [first]
+        delay = self.hedge_delay()
+        try:
+            if delay is not None:
+                waiter = asyncio.ensure_future(fb1.wait())
+                await asyncio.wait({first, waiter}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if not first.done() and not fb1.is_set():
+                    # 첫 바이트가 p{hedge_pct}를 넘도록 안 옴 → 같은 요청을 하나 더
+                    self.counts["hedged"] += 1
+                    fb2 = _FirstByte(self._ttfb)
+                    tasks.append(asyncio.ensure_future(self._attempt(tc, text, fb2)))
+            pending = set(tasks)
+            err: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is not first:
+                            self.counts["hedge_wins"] += 1
+                        return t.result()
+                    err = t.exception()
+            raise err  # type: ignore[misc]
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    # ---------- public ----------
+
+    async def synthesize(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        rate: Optional[str] = None,
+        volume: Optional[str] = None,
+        pitch: Optional[str] = None,
+        max_chars: int = 4000,
+        fallback: Optional[Fallback] = None,
+    ) -> bytes:
+        self._bind_loop()
+        chunks = _chunk_by_chars(text, max_chars=max_chars)
+        if not chunks:
+            return b""
+        # 입력 검증(잘못된 voice/rate 등)은 업스트림 장애가 아니므로 fallback 없이 그대로 올린다
+        tc = _tts_config(_clean_voice(voice), rate or "+0%", volume or "+0%", pitch or "+0Hz")
+        self.counts["requests"] += 1
+
+        if fallback is not None and self.down_until > time.monotonic():
+            self.counts["skipped"] += 1
+            return await self._fallback(fallback, text, "breaker open")
+
+        try:
+            audio = await asyncio.wait_for(self._synthesize_chunks(tc, chunks), timeout=self.timeout_s)
+        except _UPSTREAM_ERRORS as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.counts["timeouts"] += 1
+            self.counts["errors"] += 1
+            self._fails += 1
+            if self._fails >= settings.EDGE_TTS_BREAKER_FAILS:
+                self.down_until = time.monotonic() + settings.EDGE_TTS_BREAKER_COOLDOWN_S
+            reason = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if fallback is None:
+                raise
+            return await self._fallback(fallback, text, reason)
+        self._fails = 0
+        self.down_until = 0.0
+        return audio
+
+    async def _synthesize_chunks(self, tc: TTSConfig, chunks: List[str]) -> bytes:
+        audio = bytearray()
+        for i, ch in enumerate(chunks):
+            with span("tts.edge.chunk", index=i, chars=len(ch)) as sp:
+                data = await self._chunk(tc, ch)
+                sp.set("bytes", len(data))
+            audio += data
+        return bytes(audio)
+
+    async def _fallback(self, fallback: Fallback, text: str, reason: str) -> bytes:
+        self.counts["fallbacks"] += 1
+        logger.warning(f"Edge TTS unavailable ({reason}); falling back to SpeechT5")
+        with span("tts.edge.fallback", reason=reason):
+            return await fallback(text)
+
+    async def list_voices(self) -> List[dict]:
+        """보이스 목록 (TTL 캐시, 동시 갱신은 한 번만, 갱신 실패 시 이전 목록)."""
+        self._bind_loop()
+        if self._voices is not None and time.monotonic() - self._voices_at < settings.EDGE_TTS_VOICES_TTL_S:
+            return self._voices
+        async with self._voices_lock:
+            if self._voices is not None and time.monotonic() - self._voices_at < settings.EDGE_TTS_VOICES_TTL_S:
+                return self._voices
+            try:
+                if self.voices_url:
+                    async with self._get_session().get(self.voices_url, raise_for_status=True) as r:
+                        voices = await r.json(content_type=None)
+                else:
+                    voices = await asyncio.wait_for(edge_tts.list_voices(), timeout=self.timeout_s)
+            except _UPSTREAM_ERRORS as e:
+                if self._voices is None:
+                    raise
+                logger.warning(f"voice list refresh failed ({type(e).__name__}: {e}); using cached list")
+                self._voices_at = time.monotonic()   # 다음 TTL까지 재시도하지 않음
+                return self._voices
+            self._voices, self._voices_at = voices, time.monotonic()
+            return voices
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = _percentile(self._ttfb, 50)
+        p95 = _percentile(self._ttfb, 95)
+        delay = self.hedge_delay()
+        return {
+            **self.counts,
+            "idle_connections": len(self._idle),
+            "down": self.down_until > time.monotonic(),
+            "ttfb_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "ttfb_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedge_after_ms": round(delay * 1000, 1) if delay is not None else None,
+            "voices_cached": len(self._voices) if self._voices is not None else None,
+        }
+
+
+_client: Optional[EdgeTTSClient] = None
+
+def get_client() -> EdgeTTSClient:
+    global _client
+    if _client is None:
+        _client = EdgeTTSClient()
+    return _client
+
+def stats() -> Optional[Dict[str, Any]]:
+    return _client.stats() if _client is not None else None
+
 # -----------------------------
 # Public API
 # -----------------------------
@@ -64,49 +515,21 @@ async def synthesize_mp3(
     volume: Optional[str] = None,  # e.g., "+0%", "+3dB"
     pitch: Optional[str] = None,   # e.g., "+0Hz", "+2st"
     max_chars: int = 4000,
+    fallback: Optional[Fallback] = None,
 ) -> bytes:
     """
     Edge TTS로 MP3 바이트를 합성해 반환합니다 (비동기).
+    fallback(text) → MP3 bytes를 주면 Edge 장애/시간 초과 시 그것으로 합성합니다.
     """
-    v = voice or settings.TTS_VOICE_DEFAULT
-    
-    # Voice 파라미터 검증 및 정리
-    if v and isinstance(v, str):
-        # "voice=ko-KR-SunHiNeural" 형태의 문자열에서 실제 voice 값만 추출
-        if v.startswith("voice="):
-            v = v.replace("voice=", "").strip()
-        # 공백 제거
-        v = v.strip()
-    
-    # 기본값 설정
-    if not v:
-        v = "ko-KR-SunHiNeural"
-    chunks = _chunk_by_chars(text, max_chars=max_chars)
-    if not chunks:
-        return b""
-
-    audio = bytearray()
-    for ch in chunks:
-        # Edge TTS 파라미터 검증 - None 값 제거
-        params = {"text": ch, "voice": v}
-        if rate and isinstance(rate, str):
-            params["rate"] = rate
-        if volume and isinstance(volume, str):
-            params["volume"] = volume
-        if pitch and isinstance(pitch, str):
-            params["pitch"] = pitch
-        
-        comm = edge_tts.Communicate(**params)
-        async for msg in comm.stream():
-            if msg["type"] == "audio":
-                audio += msg["data"]
-    return bytes(audio)
+    return await get_client().synthesize(
+        text, voice=voice, rate=rate, volume=volume, pitch=pitch, max_chars=max_chars, fallback=fallback,
+    )
 
 async def list_voices(locale_prefix: Optional[str] = None) -> List[dict]:
     """
-    사용 가능한 보이스 목록을 반환합니다. (필요시 locale prefix 필터)
+    사용 가능한 보이스 목록을 반환합니다. (필요시 locale prefix 필터, EDGE_TTS_VOICES_TTL_S 캐시)
     """
-    voices = await edge_tts.list_voices()
+    voices = await get_client().list_voices()
     if locale_prefix:
         lp = locale_prefix.lower()
         return [v for v in voices if str(v.get("Locale", "")).lower().startswith(lp)]
@@ -128,6 +551,11 @@ def synthesize_mp3_sync(
         raise RuntimeError("synthesize_mp3_sync는 이벤트 루프 밖에서만 호출하세요.")
     except RuntimeError:
         pass
-    return asyncio.run(
-        synthesize_mp3(text=text, voice=voice, rate=rate, volume=volume, pitch=pitch, max_chars=max_chars)
-    )
+
+    async def _run() -> bytes:
+        try:
+            return await synthesize_mp3(text=text, voice=voice, rate=rate, volume=volume, pitch=pitch, max_chars=max_chars)
+        finally:
+            await get_client().close()
+
+    return asyncio.run(_run())
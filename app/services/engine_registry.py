@@ -0,0 +1,120 @@
+# app/services/engine_registry.py
+"""
+엔진 lazy 레지스트리.
+
+`import app.server`가 faster_whisper / whisper / torch / transformers / sentence_transformers 같은
+무거운 모듈을 끌어오지 않도록, 엔진은 이름 → factory로만 등록해 두고 처음 접근할 때 만든다.
+(factory 안에서 엔진 모듈을 import하므로 모듈 로드도 그때 일어난다.)
+
+    engines = asr_engines()
+    engines["fw"]             # 이때 build_asr("fw") (스레드 안전, 한 번만)
+    "fw_small" in engines     # 만들지 않고 등록 여부만 확인
+
+서버는 기동 워밍업(WARMUP_ENABLED)에서 미리 채우므로 첫 요청이 빌드 비용을 치르지 않는다.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# import 여부를 보고할 무거운 모듈
+HEAVY_MODULES = (
+    "torch", "transformers", "faster_whisper", "ctranslate2", "whisper",
+    "sentence_transformers", "qdrant_client", "pandas", "soundfile", "edge_tts", "onnxruntime",
+)
+
+
+class EngineRegistry(Mapping[str, Any]):
+    """이름 → 엔진. Mapping이라 기존 engines dict 자리에 그대로 넘길 수 있다."""
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], Any]]] = None):
+        self._factories: Dict[str, Callable[[], Any]] = dict(factories or {})
+        self._engines: Dict[str, Any] = {}
+        self._build_s: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._engines.pop(name, None)
+
+    def __getitem__(self, name: str) -> Any:
+        eng = self._engines.get(name)
+        if eng is not None:
+            return eng
+        with self._lock:
+            eng = self._engines.get(name)
+            if eng is None:
+                factory = self._factories[name]     # 미등록이면 KeyError
+                t0 = time.perf_counter()
+                eng = factory()
+                self._build_s[name] = round(time.perf_counter() - t0, 3)
+                self._engines[name] = eng
+                logger.info(f"engine {name} built in {self._build_s[name]:.2f}s")
+            return eng
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """이미 만들어진 엔진만 (없으면 None, 빌드하지 않음)."""
+        return self._engines.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"loaded": name in self._engines, "build_s": self._build_s.get(name)}
+            for name in self._factories
+        }
+
+
+def asr_engines() -> EngineRegistry:
+    """
+    admission / job에서 쓰는 ASR 엔진 이름 → 백엔드.
+    ASR_CASCADE=1이면 "fw"는 CascadeASR이고 그 small 엔진을 "fw_small"로 노출한다.
+    """
+    from app.services.asr_backend import build_asr
+
+    reg = EngineRegistry()
+    reg.register("fw", lambda: build_asr("fw"))
+    reg.register("ow", lambda: build_asr("ow"))
+    if settings.ASR_CASCADE:
+        reg.register("fw_small", lambda: reg["fw"].small)
+    return reg
+
+
+# -----------------------------
+# Import-time budget
+# -----------------------------
+def heavy_modules_loaded() -> List[str]:
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def import_report(import_s: float) -> Dict[str, Any]:
+    """기동 시 import 시간과 이미 로드된 무거운 모듈. 예산(IMPORT_BUDGET_MS)을 넘으면 경고."""
+    report = {
+        "import_ms": round(import_s * 1000.0, 1),
+        "budget_ms": settings.IMPORT_BUDGET_MS,
+        "heavy_modules": heavy_modules_loaded(),
+    }
+    if settings.IMPORT_BUDGET_MS and report["import_ms"] > settings.IMPORT_BUDGET_MS:
+        logger.warning(
+            f"app import took {report['import_ms']:.0f}ms (> budget {settings.IMPORT_BUDGET_MS:g}ms); "
+            f"heavy modules at import: {report['heavy_modules'] or 'none'} "
+            f"(profile: PYTHONPATH=. python scripts/import_budget.py)"
+        )
+    else:
+        logger.info(f"app import took {report['import_ms']:.0f}ms (heavy modules: {report['heavy_modules'] or 'none'})")
+    return report
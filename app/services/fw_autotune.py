@@ -0,0 +1,292 @@
+# app/services/fw_autotune.py
+"""
+Faster-Whisper CPU 프로파일 자동 선택.
+
+FW_DEVICE / FW_COMPUTE가 "auto"면 하드웨어를 보고 설정을 고른다.
+  - CUDA 장치가 있으면 cuda + float16 (기존 기본값과 동일)
+  - CPU 전용이면 FW_AUTOTUNE=1일 때 짧은 보정 클립(FW_AUTOTUNE_CLIP)으로
+    compute type(int8 / float32) × (cpu_threads, num_workers) 분할을 측정하고,
+    가장 정확한 설정의 WER + FW_AUTOTUNE_WER_TOL 이내에서 가장 빠른 설정을 고른다.
+    FW_CPU_THREADS를 명시하면 (FW_CPU_THREADS, FW_NUM_WORKERS)는 그대로 두고 compute type만 측정한다.
+    FW_AUTOTUNE=0이면 int8 + 사용 가능한 코어 수 전체.
+
+측정 결과는 FW_AUTOTUNE_PROFILE(JSON)에 (CPU 모델, 코어 수, CTranslate2 버전, 모델, 클립) 키로 저장되어
+다음 기동부터는 측정을 건너뛴다.
+"""
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.hardware import detect_hardware, resolve_device, usable_cpus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPUTE_TYPES = ("int8", "float32")
+# 정밀도 순위 (낮을수록 정확) - 정답 전사가 없을 때 기준 설정을 고르는 데 사용
+_PRECISION = {"float32": 0, "int8_float32": 1, "int8": 2}
+_GPU_ONLY_COMPUTE = ("float16", "int8_float16", "bfloat16", "int8_bfloat16")
+_SR = 16000
+
+
+# -----------------------------
+# Candidates / cache
+# -----------------------------
+def thread_splits(cpus: int) -> List[Tuple[int, int]]:
+    """(cpu_threads, num_workers) 후보: 코어를 워커 1/2/4개로 나눈다."""
+    out: List[Tuple[int, int]] = []
+    for workers in (1, 2, 4):
+        threads = cpus // workers
+        if threads >= 1 and (threads, workers) not in out:
+            out.append((threads, workers))
+    return out
+
+
+def _clip_fingerprint(clip: Optional[str]) -> str:
+    if clip and os.path.exists(clip):
+        st = os.stat(clip)
+        return f"{os.path.abspath(clip)}:{st.st_size}:{st.st_mtime_ns}"
+    return "synthetic"
+
+
+def profile_key(
+    model_id: str, clip: Optional[str], compute_types: Sequence[str],
+    splits: Optional[Sequence[Tuple[int, int]]] = None,
+) -> str:
+    hw = detect_hardware()
+    doc = {
+        "cpu_model": hw["cpu_model"],
+        "cpus": hw["cpus"],
+        "ctranslate2": hw["ctranslate2"],
+        "model": model_id,
+        "clip": _clip_fingerprint(clip),
+        "compute_types": list(compute_types),
+        "beam": settings.FW_BEAM,
+        "objective": settings.FW_AUTOTUNE_OBJECTIVE,
+        "wer_tol": settings.FW_AUTOTUNE_WER_TOL,
+    }
+    if splits:
+        # 스레드 분할이 고정된 측정은 전체 분할 측정과 다른 프로파일 (기존 키는 그대로 유지)
+        doc["splits"] = [list(s) for s in splits]
+    raw = json.dumps(doc, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def load_cached_profile(key: str, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    path = path or settings.FW_AUTOTUNE_PROFILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
+
+
+def save_profile(key: str, profile: Dict[str, Any], path: Optional[str] = None) -> None:
+    path = path or settings.FW_AUTOTUNE_PROFILE
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    try:
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        doc = {}
+    doc[key] = profile
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)  # 여러 프로세스가 동시에 써도 깨진 파일이 남지 않도록
+
+
+# -----------------------------
+# Probe
+# -----------------------------
+def _load_clip(clip: Optional[str]) -> Tuple[np.ndarray, Optional[str]]:
+    """보정 클립과 (있으면) 정답 전사. 클립이 없으면 속도만 비교 가능한 합성 신호."""
+    if clip and os.path.exists(clip):
+        from .audio_io import to_f32_16k_mono
+        with open(clip, "rb") as f:
+            wav = to_f32_16k_mono(f.read())
+        txt = os.path.splitext(clip)[0] + ".txt"
+        ref = None
+        if os.path.exists(txt):
+            with open(txt, encoding="utf-8") as f:
+                ref = f.read().strip()
+        return wav, ref
+    logger.warning("FW_AUTOTUNE_CLIP not set; probing with a synthetic clip (speed only, WER not meaningful)")
+    t = np.arange(int(_SR * 8.0), dtype=np.float32) / _SR
+    wav = 0.1 * np.sin(2 * np.pi * 220.0 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 2.0 * t))
+    return wav.astype(np.float32), None
+
+
+def _wer(ref: str, hyp: str) -> float:
+    if not ref.strip():
+        return 0.0 if not hyp.strip() else 1.0
+    import jiwer
+    return float(jiwer.wer(ref, hyp))
+
+
+def _probe_one(
+    model_id: str, download_root: str, compute: str, threads: int, workers: int,
+    wav: np.ndarray, repeats: int,
+) -> Dict[str, Any]:
+    from faster_whisper import WhisperModel
+
+    t0 = time.perf_counter()
+    model = WhisperModel(
+        model_id, device="cpu", compute_type=compute,
+        cpu_threads=threads, num_workers=workers, download_root=download_root,
+    )
+    load_s = time.perf_counter() - t0
+
+    def run(_: Any = None) -> str:
+        segments, _info = model.transcribe(wav, language=settings.LANGUAGE, beam_size=settings.FW_BEAM, vad_filter=False)
+        return "".join(s.text for s in segments).strip()
+
+    text = run()  # 워밍업 겸 가설 전사
+    lat = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        run()
+        lat.append(time.perf_counter() - t)
+
+    # 처리량: 워커 수만큼 동시 요청
+    n = workers * repeats
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(run, range(n)))
+    wall = time.perf_counter() - t
+
+    audio_s = float(wav.shape[0]) / _SR
+    del model
+    gc.collect()
+    return {
+        "compute_type": compute,
+        "cpu_threads": threads,
+        "num_workers": workers,
+        "load_s": round(load_s, 2),
+        "rtf": round(float(np.median(lat)) / audio_s, 4),
+        "throughput": round(n * audio_s / wall, 3),   # 초당 처리한 오디오 초
+        "text": text,
+    }
+
+
+def run_probe(
+    model_id: str,
+    download_root: str,
+    clip: Optional[str] = None,
+    compute_types: Optional[Sequence[str]] = None,
+    repeats: Optional[int] = None,
+    splits: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Dict[str, Any]:
+    """splits: 측정할 (cpu_threads, num_workers) 목록. 없으면 thread_splits(코어 수)."""
+    hw = detect_hardware()
+    clip = clip if clip is not None else settings.FW_AUTOTUNE_CLIP
+    repeats = int(repeats or settings.FW_AUTOTUNE_REPEATS)
+    supported = hw["cpu_compute_types"]
+    computes = [c for c in (compute_types or DEFAULT_COMPUTE_TYPES) if not supported or c in supported]
+    wav, ref = _load_clip(clip)
+
+    rows: List[Dict[str, Any]] = []
+    for compute in computes:
+        for threads, workers in (splits or thread_splits(hw["cpus"])):
+            logger.info(f"FW autotune probe: compute={compute} threads={threads} workers={workers}")
+            try:
+                rows.append(_probe_one(model_id, download_root, compute, threads, workers, wav, repeats))
+            except Exception as e:
+                logger.warning(f"FW autotune probe failed ({compute}, {threads}x{workers}): {e}")
+                rows.append({"compute_type": compute, "cpu_threads": threads, "num_workers": workers, "error": str(e)})
+
+    ok = [r for r in rows if "error" not in r]
+    if not ok:
+        raise RuntimeError("FW autotune: every probe configuration failed")
+
+    # 정답 전사가 없으면 가장 정밀한 compute type의 전사를 기준으로 삼는다
+    if ref is None:
+        baseline = min(ok, key=lambda r: (_PRECISION.get(r["compute_type"], 9), -r["cpu_threads"]))
+        ref, reference = baseline["text"], f"{baseline['compute_type']} transcript"
+    else:
+        reference = "clip transcript"
+    for r in ok:
+        r["wer"] = round(_wer(ref, r["text"]), 4)
+
+    best_wer = min(r["wer"] for r in ok)
+    allowed = [r for r in ok if r["wer"] <= best_wer + settings.FW_AUTOTUNE_WER_TOL]
+    if settings.FW_AUTOTUNE_OBJECTIVE == "latency":
+        chosen = min(allowed, key=lambda r: r["rtf"])
+    else:
+        chosen = max(allowed, key=lambda r: r["throughput"])
+
+    return {
+        "device": "cpu",
+        "compute_type": chosen["compute_type"],
+        "cpu_threads": chosen["cpu_threads"],
+        "num_workers": chosen["num_workers"],
+        "wer": chosen["wer"],
+        "rtf": chosen["rtf"],
+        "throughput": chosen["throughput"],
+        "objective": settings.FW_AUTOTUNE_OBJECTIVE,
+        "reference": reference,
+        "hardware": hw,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "probe": [{k: v for k, v in r.items() if k != "text"} for r in rows],
+    }
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def resolve_profile(
+    model_id: str,
+    download_root: str,
+    device: str,
+    compute_type: str,
+    cpu_threads: int = 0,
+    num_workers: int = 1,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    FasterWhisperASR 생성 인자(device, compute_type, cpu_threads, num_workers)를 결정한다.
+    명시된 값은 그대로 두고 "auto"(와 CPU에서 쓸 수 없는 GPU 전용 compute type)만 채운다.
+    cpu_threads가 0(자동)이 아니면 num_workers와 함께 고정하고 compute type만 측정한다.
+    """
+    dev = resolve_device(device)
+    base = {"device": dev, "compute_type": compute_type, "cpu_threads": cpu_threads, "num_workers": num_workers}
+    if dev.startswith("cuda"):
+        if compute_type == "auto":
+            base["compute_type"] = "float16"
+        return base
+
+    if compute_type in _GPU_ONLY_COMPUTE:
+        logger.warning(f"FW_COMPUTE={compute_type} is not supported on CPU; selecting automatically")
+        compute_type = "auto"
+
+    if compute_type != "auto" and cpu_threads:
+        base["compute_type"] = compute_type  # 모두 명시됨 -> 고를 것이 없음
+        return base
+    if not settings.FW_AUTOTUNE:
+        base["compute_type"] = "int8" if compute_type == "auto" else compute_type
+        base["cpu_threads"] = cpu_threads or usable_cpus()
+        return base
+
+    computes = DEFAULT_COMPUTE_TYPES if compute_type == "auto" else (compute_type,)
+    splits = [(cpu_threads, num_workers)] if cpu_threads else None
+    key = profile_key(model_id, settings.FW_AUTOTUNE_CLIP, computes, splits)
+    prof = None if force else load_cached_profile(key)
+    if prof is None:
+        t0 = time.perf_counter()
+        prof = run_probe(model_id, download_root, compute_types=computes, splits=splits)
+        save_profile(key, prof)
+        logger.info(f"FW autotune finished in {time.perf_counter() - t0:.1f}s -> {settings.FW_AUTOTUNE_PROFILE}")
+    logger.info(
+        f"FW CPU profile: compute={prof['compute_type']} threads={prof['cpu_threads']} "
+        f"workers={prof['num_workers']} (wer={prof['wer']}, rtf={prof['rtf']})"
+    )
+    return {k: prof[k] for k in ("device", "compute_type", "cpu_threads", "num_workers")}
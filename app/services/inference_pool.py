@@ -0,0 +1,214 @@
+# app/services/inference_pool.py
+"""
+전용 inference 프로세스 풀 (멀티 프로세스 서빙용).
+
+무거운 모델(FW / OW / 임베더 / SpeechT5)은 요청 워커마다 올리지 않고,
+supervisor가 띄운 K개의 inference 프로세스에만 올린다.
+
+  요청 워커 i ──(공유 request queue)──▶ inference 프로세스 1..K  (먼저 비는 프로세스가 가져감)
+             ◀──(워커 i 전용 response queue)──
+
+- inference_main : inference 프로세스 본체. 엔진은 첫 사용 시 lazy 로드
+- InferenceClient: 요청 워커 쪽 클라이언트. 응답 수신 스레드가 Future를 완료시킨다
+- PooledASR      : FasterWhisperASR와 같은 transcribe 인터페이스의 프록시
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Inference process
+# -----------------------------
+class _Engines:
+    """inference 프로세스 안에서만 쓰는 lazy 엔진 모음."""
+
+    def __init__(self):
+        self._cache: Dict[str, Any] = {}
+
+    def get(self, name: str):
+        eng = self._cache.get(name)
+        if eng is not None:
+            return eng
+        if name == "fw":
+            from app.services.asr_fw import FasterWhisperASR
+            eng = FasterWhisperASR()
+        elif name == "fw_small":
+            from app.services.asr_fw import FasterWhisperASR
+            eng = FasterWhisperASR(model_dir=settings.FW_SMALL_MODEL_DIR, model_name=settings.FW_SMALL_MODEL)
+        elif name == "ow":
+            from app.services.asr_ow import OpenAIWhisperASR
+            eng = OpenAIWhisperASR()
+        elif name == "embed":
+            from sentence_transformers import SentenceTransformer
+            from app.core.hardware import resolve_device
+            dev = "cuda" if resolve_device().startswith("cuda") else "cpu"
+            eng = SentenceTransformer(settings.EMBED_MODEL, device=dev)
+        else:
+            raise ValueError(f"unknown engine: {name}")
+        self._cache[name] = eng
+        return eng
+
+
+def _handle(engines: _Engines, op: str, payload: Dict[str, Any]) -> Any:
+    if op == "asr":
+        asr = engines.get(payload["engine"])
+        return asr.transcribe(
+            payload["wav"], language=payload.get("language"), beam_size=payload.get("beam_size"),
+            domain=payload.get("domain"),
+        )
+    if op == "embed":
+        model = engines.get("embed")
+        return np.asarray(
+            model.encode(list(payload["texts"]), normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32,
+        )
+    if op == "speecht5":
+        from app.services.tts_speecht5 import synthesize_audio
+        return synthesize_audio(payload["text"], audio_format=payload.get("audio_format"))
+    if op == "ping":
+        return os.getpid()
+    raise ValueError(f"unknown op: {op}")
+
+
+def inference_main(req_q, resp_qs: List[Any], proc_idx: int) -> None:
+    """inference 프로세스 엔트리포인트. (req_id, client_id, op, payload)를 처리한다."""
+    engines = _Engines()
+    logger.info(f"inference process {proc_idx} started (pid={os.getpid()})")
+    while True:
+        msg = req_q.get()
+        if msg is None:  # 종료 신호
+            break
+        req_id, client_id, op, payload = msg
+        try:
+            result: Tuple[bool, Any] = (True, _handle(engines, op, payload))
+        except Exception as e:
+            result = (False, f"{type(e).__name__}: {e}")
+        resp_qs[client_id].put((req_id, *result))
+
+
+# -----------------------------
+# Client (request worker side)
+# -----------------------------
+class InferenceClient:
+    """
+    요청 id는 "<pid>-<난수>:<일련번호>" 형식으로 클라이언트마다 고유하다.
+    재시작된 워커는 같은 response queue(client_id)를 물려받으므로, 죽은 클라이언트 앞으로 늦게 도착한
+    응답이 새 요청과 id가 겹치지 않도록 한다 (모르는 id의 응답은 버림).
+    """
+
+    def __init__(self, req_q, resp_q, client_id: int):
+        self.req_q = req_q
+        self.resp_q = resp_q
+        self.client_id = client_id
+        self._prefix = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._ids = itertools.count()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name="inference-client", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        while True:
+            req_id, ok, value = self.resp_q.get()
+            with self._lock:
+                fut = self._pending.pop(req_id, None)
+            if fut is None:
+                continue  # 타임아웃으로 이미 포기한 요청 / 이전 클라이언트(재시작 전 워커)의 응답
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(RuntimeError(f"inference failed: {value}"))
+
+    def submit(self, op: str, payload: Dict[str, Any]) -> Future:
+        fut: Future = Future()
+        req_id = f"{self._prefix}:{next(self._ids)}"
+        fut.req_id = req_id  # type: ignore[attr-defined]
+        with self._lock:
+            self._pending[req_id] = fut
+        self.req_q.put((req_id, self.client_id, op, payload))
+        return fut
+
+    def call(self, op: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        fut = self.submit(op, payload)
+        try:
+            return fut.result(timeout=timeout or settings.INFERENCE_TIMEOUT_S)
+        except FutureTimeout:
+            # 포기한 요청은 대기 목록에서 뺀다 (늦은 응답은 read loop가 버림)
+            with self._lock:
+                self._pending.pop(fut.req_id, None)  # type: ignore[attr-defined]
+            raise
+
+
+_CLIENT: Optional[InferenceClient] = None
+
+
+def install_client(client: InferenceClient) -> None:
+    """fork된 요청 워커에서 자신의 클라이언트를 등록한다."""
+    global _CLIENT
+    _CLIENT = client
+
+
+def get_client() -> InferenceClient:
+    if _CLIENT is None:
+        raise RuntimeError("InferenceClient not installed (SERVING_MODE=multiproc requires scripts/serve_multiproc.py)")
+    return _CLIENT
+
+
+# -----------------------------
+# Engine proxies
+# -----------------------------
+class PooledASR:
+    """FasterWhisperASR/OpenAIWhisperASR와 같은 인터페이스로 inference 프로세스에 위임."""
+
+    def __init__(self, engine: str, beam_size: Optional[int] = None):
+        self.engine = engine
+        self.beam_size = beam_size or settings.FW_BEAM
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        if wav.dtype != np.float32:
+            wav = wav.astype(np.float32, copy=False)
+        beam = int(beam_size or self.beam_size)
+        with span(f"asr.{self.engine}.pooled", beam=beam, samples=int(wav.shape[0])):
+            return get_client().call("asr", {
+                "engine": self.engine, "wav": wav, "language": language, "beam_size": beam, "domain": domain,
+            })
+
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        from .audio_io import to_f32_16k_mono
+        wav = to_f32_16k_mono(audio_bytes)
+        return self.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+
+
+def pooled_encode(texts: Sequence[str]) -> np.ndarray:
+    return get_client().call("embed", {"texts": list(texts)})
+
+
+def pooled_speecht5_audio(text: str, audio_format: Optional[str] = None, **_: Any) -> bytes:
+    with span("tts.speecht5.pooled", chars=len(text)):
+        return get_client().call("speecht5", {"text": text, "audio_format": audio_format})
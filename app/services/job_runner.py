@@ -0,0 +1,257 @@
+# app/services/job_runner.py
+"""
+대량 전사 job: 업로드 spool + 백그라운드 처리 + 완료 콜백.
+
+  spool_upload : 업로드(개별 오디오 또는 zip/tar 아카이브)를 UPLOAD_DIR/<job_id>/ 아래 파일로 복사
+  JobRunner    : JOBS_CONCURRENCY개의 워커 태스크가 JobStore에서 항목을 꺼내
+                 디코드(워커 스레드) → ASR을 파이프라인으로 돌린다. 한 워커가 디코딩하는 동안
+                 다른 워커의 파일이 엔진 슬롯을 쓰므로 파일 간에 엔진이 쉬지 않는다.
+
+ASR은 항상 bulk 클래스로 엔진 스케줄러(app.core.scheduler)를 거치므로 interactive 요청이 먼저 슬롯을 받는다.
+admission 예산/deadline은 대화형 요청용이라 job에는 적용하지 않는다 (대신 RTF 실측은 공유).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from app.core.admission import get_admission
+from app.core.config import settings
+from app.core.scheduler import BULK, get_scheduler
+from app.services.audio_io import decode_stream, seconds_from_f32_16k
+from app.services.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".wma")
+_ARCHIVE_EXTS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+# -----------------------------
+# Spooling
+# -----------------------------
+def _safe_name(i: int, name: str) -> str:
+    base = os.path.basename(name.replace("\\", "/")) or "audio"
+    return f"{i:05d}_{base}"
+
+
+def spool_upload(src: BinaryIO, filename: str, job_dir: str, start: int = 0) -> List[Tuple[str, str]]:
+    """
+    업로드 하나를 job_dir에 저장한다. 아카이브면 오디오 확장자 항목만 풀어서 저장.
+    Returns: [(원본 이름, 저장 경로)] (블로킹, 워커 스레드에서 호출)
+    """
+    os.makedirs(job_dir, exist_ok=True)
+    lower = filename.lower()
+    out: List[Tuple[str, str]] = []
+    if lower.endswith(_ARCHIVE_EXTS):
+        tmp = os.path.join(job_dir, f".upload_{start:05d}")
+        with open(tmp, "wb") as f:
+            shutil.copyfileobj(src, f, 1024 * 1024)
+        try:
+            if lower.endswith(".zip"):
+                with zipfile.ZipFile(tmp) as zf:
+                    for info in zf.infolist():
+                        if info.is_dir() or not info.filename.lower().endswith(AUDIO_EXTS):
+                            continue
+                        path = os.path.join(job_dir, _safe_name(start + len(out), info.filename))
+                        with zf.open(info) as s, open(path, "wb") as d:
+                            shutil.copyfileobj(s, d, 1024 * 1024)
+                        out.append((info.filename, path))
+            else:
+                with tarfile.open(tmp) as tf:
+                    for m in tf:
+                        if not m.isfile() or not m.name.lower().endswith(AUDIO_EXTS):
+                            continue
+                        path = os.path.join(job_dir, _safe_name(start + len(out), m.name))
+                        with tf.extractfile(m) as s, open(path, "wb") as d:
+                            shutil.copyfileobj(s, d, 1024 * 1024)
+                        out.append((m.name, path))
+        finally:
+            os.remove(tmp)
+        return out
+    path = os.path.join(job_dir, _safe_name(start, filename))
+    with open(path, "wb") as f:
+        shutil.copyfileobj(src, f, 1024 * 1024)
+    return [(filename, path)]
+
+
+# -----------------------------
+# Callback
+# -----------------------------
+def _post_callback(url: str, payload: Dict[str, Any]) -> str:
+    """완료 알림 POST (블로킹). 지수 백오프로 JOBS_CALLBACK_RETRIES회까지 재시도."""
+    import requests
+
+    err = ""
+    attempts = settings.JOBS_CALLBACK_RETRIES + 1
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(min(30.0, 2.0 ** (attempt - 1)))
+        try:
+            r = requests.post(url, json=payload, timeout=settings.JOBS_CALLBACK_TIMEOUT_S)
+            if r.status_code < 300:
+                return f"ok {r.status_code}"
+            err = f"http {r.status_code}"
+        except Exception as e:
+            err = f"error {type(e).__name__}: {e}"
+    logger.warning(f"job callback failed ({url}): {err}")
+    return f"failed {err}"[:200]
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+class JobRunner:
+    def __init__(self, store: JobStore, engines: Dict[str, Any], concurrency: Optional[int] = None):
+        self.store = store
+        self.engines = engines
+        self.concurrency = max(1, settings.JOBS_CONCURRENCY if concurrency is None else int(concurrency))
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._callbacks: set = set()
+        self._inflight: set = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        # 다른 워커 프로세스가 처리 중인 항목(lease 유효)은 건드리지 않는다
+        n = await asyncio.to_thread(self.store.requeue_expired)
+        if n:
+            logger.info(f"job runner: resumed {n} interrupted item(s)")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def cancel(self, job_id: str) -> int:
+        """대기 중 항목 취소. 실행 중인 항목이 없으면 바로 정리/콜백."""
+        n, finished = await asyncio.to_thread(self.store.cancel, job_id)
+        if finished:
+            self._spawn_done(job_id)
+        return n
+
+    def notify(self) -> None:
+        """새 job이 들어왔음을 대기 중인 워커에 알린다."""
+        self._wake.set()
+
+    async def _idle(self) -> None:
+        ready_in = await asyncio.to_thread(self.store.next_ready_in)
+        timeout = settings.JOBS_POLL_S if ready_in is None else min(settings.JOBS_POLL_S, ready_in + 0.01)
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _heartbeat(self) -> None:
+        """처리 중인 항목의 lease를 JOBS_LEASE_S/3마다 갱신."""
+        while not self._stopping:
+            await asyncio.sleep(settings.JOBS_LEASE_S / 3)
+            try:
+                await asyncio.to_thread(self.store.renew, list(self._inflight))
+            except Exception:
+                logger.exception("job lease renewal failed")
+
+    async def _worker(self, wid: int) -> None:
+        while not self._stopping:
+            try:
+                claimed = await asyncio.to_thread(self.store.claim, 1)
+                if not claimed:
+                    await self._idle()
+                    continue
+                await self._process(claimed[0])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"job worker {wid} crashed; continuing")
+                await asyncio.sleep(1.0)
+
+    def _transcribe(self, item: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """디코드 + bulk 클래스로 엔진 슬롯 대기 + 전사 (블로킹)."""
+        engine = "ow" if item["engine"] == "ow" else "fw"
+        asr = self.engines[engine]
+        with open(item["path"], "rb") as f:
+            wav = decode_stream(f)
+        audio_sec = seconds_from_f32_16k(wav)
+        beam = int(item["beam_size"] or getattr(asr, "beam_size", None) or settings.FW_BEAM)
+        kwargs: Dict[str, Any] = {"language": item["language"] or settings.LANGUAGE, "domain": item["domain"]}
+        if engine != "ow":
+            kwargs["beam_size"] = beam
+        ctl = get_admission()
+
+        def _run() -> Tuple[str, Dict[str, Any]]:
+            t0 = time.perf_counter()
+            out = asr.transcribe(wav, **kwargs)
+            ctl.observe(engine, beam, audio_sec, time.perf_counter() - t0)
+            return out
+
+        text, meta = get_scheduler(engine).run(
+            _run, cost=ctl.estimate(engine, audio_sec, beam), priority=BULK,
+        )
+        return text, {**meta, "audio_sec": round(audio_sec, 3)}
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        self._inflight.add(item["id"])
+        try:
+            try:
+                text, meta = await asyncio.to_thread(self._transcribe, item)
+            except Exception as e:
+                msg = getattr(e, "detail", None) or f"{type(e).__name__}: {e}"
+                # item["attempts"]는 이번 시도 전 값
+                if item["attempts"] + 1 < settings.JOBS_MAX_ATTEMPTS and not hasattr(e, "status_code"):
+                    # 일시적 오류(원격 워커 등)는 지연 후 재시도, 디코드 실패(HTTPException)는 바로 실패 처리
+                    await asyncio.to_thread(self.store.retry, item["id"], 2.0 ** item["attempts"], str(msg))
+                    return
+                recorded, finished = await asyncio.to_thread(self.store.fail, item["id"], str(msg))
+            else:
+                recorded, finished = await asyncio.to_thread(self.store.complete, item["id"], text, meta)
+        finally:
+            self._inflight.discard(item["id"])
+        if not recorded:
+            # lease가 끝나 다른 프로세스가 가져간 항목: 파일/집계는 그쪽이 처리
+            logger.warning(f"job item {item['id']}: lease lost, result discarded")
+            return
+        if not settings.JOBS_KEEP_UPLOADS:
+            try:
+                os.remove(item["path"])
+            except OSError:
+                pass
+        if finished:
+            self._spawn_done(finished)
+
+    def _spawn_done(self, job_id: str) -> None:
+        # 콜백 재시도가 워커를 붙잡지 않도록 별도 태스크로
+        task = asyncio.create_task(self._on_job_done(job_id))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _on_job_done(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get_job, job_id)
+        if not settings.JOBS_KEEP_UPLOADS:
+            shutil.rmtree(os.path.join(settings.UPLOAD_DIR, job_id), ignore_errors=True)
+        if not job or not job.get("callback_url"):
+            return
+        items = await asyncio.to_thread(self.store.items, job_id, 0, job["total"])
+        payload = {
+            "job_id": job_id,
+            "status": job["status"],
+            "total": job["total"],
+            "done": job["done"],
+            "failed": job["failed"],
+            "results": [
+                {"idx": it["idx"], "filename": it["filename"], "status": it["status"],
+                 "text": it["text"], "error": it["error"]}
+                for it in items
+            ],
+        }
+        status = await asyncio.to_thread(_post_callback, job["callback_url"], payload)
+        await asyncio.to_thread(self.store.set_callback_status, job_id, status)
@@ -0,0 +1,278 @@
+# app/services/job_store.py
+"""
+비동기 대량 전사 job의 영속 큐 (SQLite, WAL).
+
+  jobs : job 단위 설정(engine/language/beam/domain/callback)과 진행 카운트
+  items: 파일 단위 작업. queued → running → done | failed (| cancelled)
+
+여러 프로세스(serve_multiproc 워커)가 같은 DB를 공유하므로, claim한 항목에는 소유자와 lease 만료 시각을 기록하고
+처리 중에는 lease를 갱신한다 (renew). lease가 끝난 running 항목(죽은 프로세스의 것)만 queued로 되돌린다
+(requeue_expired). 완료/실패/재시도는 아직 소유한 항목에만 반영되므로 같은 파일이 두 번 집계되지 않는다.
+모든 메서드는 짧은 트랜잭션이며 여러 스레드에서 호출해도 된다 (연결 하나 + lock).
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    status TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    language TEXT,
+    beam_size INTEGER,
+    domain TEXT,
+    callback_url TEXT,
+    callback_status TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    idx INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    text TEXT,
+    meta TEXT,
+    error TEXT,
+    started REAL,
+    finished REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS items_queue ON items(status, not_before, id);
+CREATE INDEX IF NOT EXISTS items_job ON items(job_id, idx);
+"""
+
+# 더 이상 처리할 것이 없는 항목 상태
+TERMINAL = ("done", "failed", "cancelled")
+
+
+class JobStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.JOBS_DB_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        cols = {r["name"] for r in self._db.execute("PRAGMA table_info(items)").fetchall()}
+        for col, typ in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if col not in cols:
+                # lease 이전 스키마
+                self._db.execute(f"ALTER TABLE items ADD COLUMN {col} {typ}")
+        # 프로세스마다 고유 (pid 재사용에도 겹치지 않도록 난수 포함)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ---------- jobs ----------
+
+    def create_job(
+        self,
+        files: Sequence[Tuple[str, str]],
+        engine: str,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+        callback_url: Optional[str] = None,
+        job_id: Optional[str] = None,
+    ) -> str:
+        """files: [(원본 파일명, spool 경로)]"""
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO jobs(id, created, updated, status, engine, language, beam_size, domain, callback_url, total)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, now, now, engine, language, beam_size, domain, callback_url, len(files)),
+            )
+            self._db.executemany(
+                "INSERT INTO items(job_id, idx, filename, path, status) VALUES (?, ?, ?, ?, 'queued')",
+                [(job_id, i, name, path) for i, (name, path) in enumerate(files)],
+            )
+            self._db.execute("COMMIT")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def items(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, filename, status, attempts, text, meta, error, started, finished"
+                " FROM items WHERE job_id = ? ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, limit, offset),
+            ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["meta"] = json.loads(d["meta"]) if d["meta"] else None
+            out.append(d)
+        return out
+
+    def cancel(self, job_id: str) -> Tuple[int, bool]:
+        """
+        대기 중 항목을 취소한다. 실행 중인 항목은 끝까지 처리된다.
+        Returns: (취소한 항목 수, 지금 job이 끝났는지). 실행 중 항목이 남아 있으면 마지막 항목의 완료가 job을 끝낸다.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            n = self._db.execute(
+                "UPDATE items SET status = 'cancelled', finished = ? WHERE job_id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            ).rowcount
+            changed = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            ).rowcount
+            left = self._db.execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN ('queued', 'running')", (job_id,),
+            ).fetchone()[0]
+            self._db.execute("COMMIT")
+        return n, bool(changed) and left == 0
+
+    def set_callback_status(self, job_id: str, status: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+
+    # ---------- queue ----------
+
+    def requeue_expired(self) -> int:
+        """복구: lease가 끝난 running 항목(죽은 프로세스가 처리하던 것)을 다시 대기열로."""
+        with self._lock:
+            return self._requeue_expired(time.time())
+
+    def _requeue_expired(self, now: float) -> int:
+        return self._db.execute(
+            "UPDATE items SET status = 'queued', owner = NULL"
+            " WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+            (now,),
+        ).rowcount
+
+    def renew(self, item_ids: Sequence[int]) -> None:
+        """처리 중인 항목의 lease 연장 (JOBS_LEASE_S)."""
+        if not item_ids:
+            return
+        marks = ",".join("?" * len(item_ids))
+        with self._lock:
+            self._db.execute(
+                f"UPDATE items SET lease_until = ? WHERE owner = ? AND status = 'running' AND id IN ({marks})",
+                (time.time() + settings.JOBS_LEASE_S, self.owner, *item_ids),
+            )
+
+    def claim(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """가장 오래된 실행 가능 항목 limit개를 running으로 바꿔(소유자 + lease) job 설정과 함께 반환."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(now)
+            rows = self._db.execute(
+                "SELECT items.id, items.job_id, items.idx, items.filename, items.path, items.attempts,"
+                "       jobs.engine, jobs.language, jobs.beam_size, jobs.domain"
+                " FROM items JOIN jobs ON jobs.id = items.job_id"
+                " WHERE items.status = 'queued' AND items.not_before <= ?"
+                " ORDER BY items.id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for r in rows:
+                self._db.execute(
+                    "UPDATE items SET status = 'running', started = ?, attempts = attempts + 1,"
+                    " owner = ?, lease_until = ? WHERE id = ?",
+                    (now, self.owner, now + settings.JOBS_LEASE_S, r["id"]),
+                )
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', updated = ? WHERE id = ? AND status = 'queued'",
+                    (now, r["job_id"]),
+                )
+            self._db.execute("COMMIT")
+        return [dict(r) for r in rows]
+
+    def complete(self, item_id: int, text: str, meta: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        완료 기록. Returns: (기록했는지, job의 모든 항목이 끝났으면(취소된 job 포함) job_id - 콜백/정리 트리거용).
+        lease가 끝나 다른 프로세스로 넘어간 항목이면 아무것도 기록하지 않는다 (False, None).
+        """
+        return self._finish(item_id, "done", text=text, meta=json.dumps(meta, ensure_ascii=False, default=str))
+
+    def fail(self, item_id: int, error: str) -> Tuple[bool, Optional[str]]:
+        return self._finish(item_id, "failed", error=error[:2000])
+
+    def retry(self, item_id: int, delay_s: float, error: Optional[str] = None, count_attempt: bool = True) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE items SET status = 'queued', not_before = ?, error = ?, owner = NULL,"
+                " attempts = attempts - ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + delay_s, error, 0 if count_attempt else 1, item_id, self.owner),
+            )
+
+    def _finish(self, item_id: int, status: str, text: Optional[str] = None,
+                meta: Optional[str] = None, error: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        now = time.time()
+        col = "done" if status == "done" else "failed"
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            job_id = self._db.execute("SELECT job_id FROM items WHERE id = ?", (item_id,)).fetchone()["job_id"]
+            owned = self._db.execute(
+                "UPDATE items SET status = ?, text = ?, meta = ?, error = ?, finished = ?"
+                " WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, text, meta, error, now, item_id, self.owner),
+            ).rowcount
+            if not owned:
+                self._db.execute("COMMIT")
+                return False, None
+            self._db.execute(f"UPDATE jobs SET {col} = {col} + 1, updated = ? WHERE id = ?", (now, job_id))
+            left = self._db.execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN ('queued', 'running')", (job_id,),
+            ).fetchone()[0]
+            finished = False
+            if left == 0:
+                finished = self._db.execute(
+                    "UPDATE jobs SET status = 'done', updated = ? WHERE id = ? AND status = 'running'", (now, job_id),
+                ).rowcount > 0
+                # 취소된 job은 상태를 유지한 채 마지막 실행 항목이 끝난 시점에 정리/콜백
+                finished = finished or self._db.execute(
+                    "SELECT status FROM jobs WHERE id = ?", (job_id,),
+                ).fetchone()["status"] == "cancelled"
+            self._db.execute("COMMIT")
+        return True, (job_id if finished else None)
+
+    def next_ready_in(self) -> Optional[float]:
+        """다음 대기 항목까지 남은 초 (없으면 None)."""
+        with self._lock:
+            row = self._db.execute("SELECT MIN(not_before) FROM items WHERE status = 'queued'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = dict(self._db.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+            jobs = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"jobs": jobs, "items": items}
@@ -0,0 +1,202 @@
+# app/services/policy_filters.py
+"""
+정책 검색 구조화 필터 (지원유형 / 접수기관명 / 대상 그룹).
+
+색인 시점에 레코드마다 속성 값을 뽑아 값별 posting 배열(정렬된 행 번호, int32)을 만들어 둔다.
+검색 시 필터는 posting을 합쳐(필드 안은 OR, 필드 간은 AND) 후보 행 집합을 만들고,
+벡터 점수 계산은 그 행들에만 한다 (스냅샷/인메모리 백엔드). Qdrant 백엔드는 같은 값을
+keyword payload 인덱스로 걸러낸다.
+
+  filters = {"support_type": ["현금"], "receiving_agency": ["서울"], "target_group": ["청년"]}
+
+값은 정확히 일치하는 값이 있으면 그것만, 없으면 그 문자열을 포함하는 값 전체로 풀린다
+(예: "서울" → "서울특별시", "서울특별시 강남구" ...).
+
+저장 형식 (스냅샷 디렉토리):
+  attrs.json           {field: {value: [start, end]}}   postings.npy 안의 구간
+  attrs_postings.npy   int32, 모든 posting을 이어붙인 배열 (mmap)
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+
+ATTR_FILE = "attrs.json"
+POSTINGS_FILE = "attrs_postings.npy"
+
+# 필터 필드 → 레코드(SearchItem) 필드. target_group은 지원대상/tags/서비스명에서 키워드로 유도
+FILTER_FIELDS = ("support_type", "receiving_agency", "target_group")
+
+# 대상 그룹 → 지원대상/tags/서비스명에서 찾을 키워드
+TARGET_GROUPS: Dict[str, tuple] = {
+    "청년": ("청년", "대학생", "취업준비생"),
+    "노인": ("노인", "어르신", "65세", "고령"),
+    "아동": ("아동", "영유아", "어린이", "유아", "초등학생"),
+    "청소년": ("청소년", "학생"),
+    "장애인": ("장애인", "장애아", "장애"),
+    "임산부": ("임산부", "임신", "출산", "산모"),
+    "한부모": ("한부모", "조손"),
+    "저소득": ("저소득", "기초생활", "차상위", "수급자", "중위소득"),
+    "다문화": ("다문화", "결혼이민", "외국인"),
+    "농어민": ("농업인", "어업인", "농어민", "농가", "어가"),
+    "구직자": ("구직자", "실업자", "미취업"),
+    "소상공인": ("소상공인", "자영업"),
+    "보훈": ("국가유공자", "보훈"),
+}
+
+_VALUE_SPLIT = re.compile(r"\s*[,/·|]\s*")
+
+Filters = Dict[str, List[str]]
+
+
+def _norm(s: str) -> str:
+    return re.sub(r"\s+", " ", str(s or "")).strip()
+
+
+def record_attributes(rec: Mapping[str, Any]) -> Dict[str, List[str]]:
+    """레코드 하나의 필터 속성 값들."""
+    tags = rec.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    haystack = " ".join([str(rec.get("target_beneficiaries") or ""), " ".join(tags), str(rec.get("service_name") or "")])
+    return {
+        "support_type": [v for v in _VALUE_SPLIT.split(_norm(rec.get("support_type"))) if v],
+        "receiving_agency": [v for v in [_norm(rec.get("receiving_agency"))] if v],
+        "target_group": [g for g, kws in TARGET_GROUPS.items() if any(k in haystack for k in kws)],
+    }
+
+
+def parse_filters(raw: Union[None, str, Mapping[str, Any]]) -> Filters:
+    """
+    JSON 문자열 또는 dict → {field: [values]}. 값은 문자열 하나 또는 리스트.
+    모르는 필드/형식이면 ValueError.
+    """
+    if raw is None or raw == "":
+        return {}
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"filters must be a JSON object: {e}") from None
+    if not isinstance(raw, Mapping):
+        raise ValueError("filters must be a JSON object")
+    out: Filters = {}
+    for field, vals in raw.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"unknown filter field: {field} (expected one of {FILTER_FIELDS})")
+        if isinstance(vals, str):
+            vals = [vals]
+        if not isinstance(vals, (list, tuple)) or not all(isinstance(v, str) for v in vals):
+            raise ValueError(f"filter {field} must be a string or a list of strings")
+        vals = [_norm(v) for v in vals if _norm(v)]
+        if vals:
+            out[field] = sorted(set(vals))
+    return out
+
+
+def filters_key(filters: Optional[Filters]) -> str:
+    """single-flight/캐시 키용 정규화 문자열."""
+    return json.dumps(filters or {}, ensure_ascii=False, sort_keys=True)
+
+
+class AttributeIndex:
+    """필드별 값 → posting(정렬된 행 번호) 배열."""
+
+    def __init__(self, count: int, spans: Dict[str, Dict[str, List[int]]], postings: np.ndarray):
+        self.count = int(count)
+        self.spans = spans
+        self.postings = postings
+
+    # ---------- build / persist ----------
+
+    @classmethod
+    def build(cls, records: Iterable[Mapping[str, Any]]) -> "AttributeIndex":
+        lists: Dict[str, Dict[str, List[int]]] = {f: {} for f in FILTER_FIELDS}
+        n = 0
+        for i, rec in enumerate(records):
+            n = i + 1
+            for field, vals in record_attributes(rec).items():
+                for v in vals:
+                    lists[field].setdefault(v, []).append(i)
+        spans: Dict[str, Dict[str, List[int]]] = {f: {} for f in FILTER_FIELDS}
+        chunks: List[np.ndarray] = []
+        pos = 0
+        for field in FILTER_FIELDS:
+            for v in sorted(lists[field]):
+                rows = np.asarray(lists[field][v], dtype=np.int32)
+                spans[field][v] = [pos, pos + len(rows)]
+                chunks.append(rows)
+                pos += len(rows)
+        postings = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        return cls(n, spans, postings)
+
+    def save(self, out_dir: str) -> None:
+        tmp = os.path.join(out_dir, POSTINGS_FILE + ".tmp.npy")
+        np.save(tmp, self.postings)
+        os.replace(tmp, os.path.join(out_dir, POSTINGS_FILE))
+        tmp = os.path.join(out_dir, ATTR_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"count": self.count, "spans": self.spans}, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(out_dir, ATTR_FILE))
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> Optional["AttributeIndex"]:
+        """없으면 None (필터 이전에 만든 스냅샷)."""
+        path = os.path.join(snapshot_dir, ATTR_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        postings = np.load(os.path.join(snapshot_dir, POSTINGS_FILE), mmap_mode="r")
+        return cls(doc["count"], doc["spans"], postings)
+
+    # ---------- query ----------
+
+    def resolve(self, field: str, value: str) -> List[str]:
+        """필터 값 → 색인된 값들 (정확히 일치 우선, 없으면 부분 일치)."""
+        vocab = self.spans.get(field, {})
+        if value in vocab:
+            return [value]
+        return [v for v in vocab if value in v]
+
+    def expand(self, filters: Filters) -> Filters:
+        """각 필터 값을 색인된 값으로 풀어쓴 결과 (Qdrant MatchAny용)."""
+        return {f: sorted({r for v in vals for r in self.resolve(f, v)}) for f, vals in filters.items()}
+
+    def rows(self, filters: Optional[Filters]) -> Optional[np.ndarray]:
+        """
+        필터를 만족하는 행 번호 (정렬된 int32). 필터가 없으면 None(전체).
+        필드 안은 OR(posting 합집합), 필드 간은 AND(교집합) - 작은 집합부터 교차한다.
+        """
+        if not filters:
+            return None
+        per_field: List[np.ndarray] = []
+        for field, vals in filters.items():
+            spans = self.spans.get(field, {})
+            parts = [self.postings[slice(*spans[r])] for v in vals for r in self.resolve(field, v)]
+            if not parts:
+                return np.zeros(0, dtype=np.int32)
+            per_field.append(parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts)))
+        per_field.sort(key=len)
+        rows = np.asarray(per_field[0])
+        for other in per_field[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows.astype(np.int32, copy=False)
+
+    def mask(self, filters: Optional[Filters]) -> Optional[np.ndarray]:
+        """rows()의 bool 마스크 버전 (N,)."""
+        rows = self.rows(filters)
+        if rows is None:
+            return None
+        m = np.zeros(self.count, dtype=bool)
+        m[rows] = True
+        return m
+
+    def stats(self) -> Dict[str, Any]:
+        return {"count": self.count, **{f: len(v) for f, v in self.spans.items()}}
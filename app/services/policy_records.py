@@ -0,0 +1,55 @@
+# app/services/policy_records.py
+"""
+정책 레코드 ↔ SearchItem 변환 및 키워드 재랭킹 보너스.
+
+PolicySearch(Qdrant)와 SnapshotPolicySearch(mmap) 양쪽에서 공유하며,
+무거운 의존성(pandas / sentence_transformers / qdrant_client)을 import하지 않는다.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+# SearchItem 필드 → CSV 컬럼
+FIELD_COLUMNS: Dict[str, str] = {
+    "service_id": "서비스명",
+    "service_name": "서비스명",
+    "support": "지원내용",
+    "url": "URL",
+    "application_deadline": "신청기한",
+    "contact": "문의처",
+    "application_method": "신청방법",
+    "receiving_agency": "접수기관명",
+    "support_type": "지원유형",
+    "target_beneficiaries": "지원대상",
+    "selection_criteria": "선정기준",
+    "required_documents": "구비서류",
+}
+TAGS_COLUMN = "tags"
+
+
+def query_tokens(query: str) -> List[str]:
+    q = query.lower()
+    return [t for t in q.replace(",", " ").split() if t]
+
+
+def keyword_bonus(tokens: List[str], tags: str, support: str) -> float:
+    """쿼리 토큰이 tags/지원내용에 포함되면 가산점 (tags 0.08, 지원내용 0.04)."""
+    t = (tags or "").lower()
+    s = (support or "").lower()
+    b = 0.0
+    for tok in tokens:
+        if tok in t:
+            b += 0.08
+        if tok in s:
+            b += 0.04
+    return b
+
+
+def record_from_row(get: Callable[[str, Any], Any]) -> Dict[str, Any]:
+    """
+    CSV 한 행(get(column, default))을 SearchItem 필드 dict로 변환 (rank/score 제외).
+    """
+    rec: Dict[str, Any] = {field: str(get(col, "")) for field, col in FIELD_COLUMNS.items()}
+    rec["url"] = rec["url"] or None
+    rec["tags"] = [t.strip() for t in str(get(TAGS_COLUMN, "")).split(",") if t.strip()]
+    return rec
@@ -1,6 +1,7 @@
 # app/services/policy_search.py
 from __future__ import annotations
 
+import json
 import os
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Iterable
@@ -10,9 +11,17 @@ import numpy as np
 
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
+from qdrant_client.models import (
+    VectorParams, Distance, PointStruct, PayloadSchemaType, Filter, FieldCondition, MatchAny,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, QuantizationSearchParams,
+)
 
 from app.core.config import settings
+from app.core.hardware import resolve_device
+from app.core.scheduler import batched_encoder
+from app.core.tracing import span
+from .policy_filters import FILTER_FIELDS, AttributeIndex, Filters, record_attributes
+from .policy_records import query_tokens, keyword_bonus, record_from_row
 
 
 @dataclass
@@ -37,15 +46,17 @@ def _ensure_columns(df: pd.DataFrame) -> None:
 
 
 def _default_embed_device() -> str:
-    # SentenceTransformer device: "cuda" if FW_DEVICE startswith cuda, else "cpu"
-    dev = (settings.FW_DEVICE or "cpu").lower()
-    return "cuda" if dev.startswith("cuda") else "cpu"
+    # SentenceTransformer device: "cuda" if FW_DEVICE (auto 해석 후) startswith cuda, else "cpu"
+    return "cuda" if resolve_device().startswith("cuda") else "cpu"
 
 
 class PolicySearch:
     """
     CSV -> embeddings (SentenceTransformer) -> Qdrant persisted index
-    search(query, topk): returns list[dict] with keys matching SearchItem schema.
+    search(query, topk, filters): returns list[dict] with keys matching SearchItem schema.
+    filters(지원유형/접수기관명/대상 그룹)는 keyword payload 인덱스로 벡터 검색 중에 적용한다.
+    compact(POLICY_INDEX_COMPACT=1): int8 스칼라 양자화 벡터만 RAM에, 원본 float32는 디스크에 두고
+    상위 후보를 원본으로 재채점한다. payload는 ID와 필터 속성만 저장 (본문은 CSV DataFrame에서 읽음).
     """
 
     def __init__(
@@ -55,12 +66,14 @@ class PolicySearch:
         embed_model: Optional[str] = None,
         collection_name: str = "gov_services",
         batch_size: int = 256,
+        compact: Optional[bool] = None,
     ):
         self.csv_path = csv_path or settings.POLICY_CSV_PATH
         self.qdrant_path = qdrant_path or settings.QDRANT_PATH
         self.embed_model_name = embed_model or settings.EMBED_MODEL
         self.collection = collection_name
         self.batch_size = int(os.getenv("POLICY_INDEX_BATCH", str(batch_size)))
+        self.compact = settings.POLICY_INDEX_COMPACT if compact is None else compact
 
         # Load CSV
         if not os.path.exists(self.csv_path):
@@ -72,9 +85,18 @@ class PolicySearch:
         # Compose text with simple weighting: (name + tags)*3 + support + requirement
         self.df[_Cols.COMBINED] = self._compose_texts(self.df)
 
+        # 필터 속성 (값 → 행 posting). Qdrant payload와 같은 값을 쓰며, 필터 값 풀이(부분 일치)에 사용
+        records = [record_from_row(row.get) for row in self.df.to_dict("records")]
+        self._attrs = [record_attributes(r) for r in records]
+        self.attrs = AttributeIndex.build(records)
+
         # Init embedder
         device = _default_embed_device()
         self.model = SentenceTransformer(self.embed_model_name, device=device)
+        # 동시 쿼리 임베딩은 우선순위 순서로 마이크로배치 (app.core.scheduler)
+        self._encode_query = batched_encoder(
+            "embed", lambda texts: self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False),
+        )
 
         # Init Qdrant (persisted)
         os.makedirs(self.qdrant_path, exist_ok=True)
@@ -85,65 +107,53 @@ class PolicySearch:
 
     # ---------- public API ----------
 
-    def search(self, query: str, topk: int = None) -> List[Dict[str, Any]]:
+    def search(self, query: str, topk: int = None, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
         """
         Vector search with simple keyword-aware reranking.
+        filters: {field: [values]} (필드 안은 OR, 필드 간은 AND). 만족하는 정책이 없으면 [].
         Returns: list of dicts containing {rank, service_id, service_name, score, tags, support, url}
         """
         if not query or not query.strip():
             return []
         topk = topk or settings.TOPK_DEFAULT
+        query_filter = None
+        if filters:
+            expanded = self.attrs.expand(filters)
+            if not all(expanded.values()):
+                return []
+            query_filter = Filter(must=[FieldCondition(key=f, match=MatchAny(any=v)) for f, v in expanded.items()])
         # embed query
-        vec = self.model.encode([query], normalize_embeddings=True)[0].tolist()
+        with span("search.embed", chars=len(query)):
+            vec = self._encode_query([query])[0].tolist()
 
         # retrieve >= topk to allow reranking
         limit = max(10, int(topk))
-        hits = self.client.search(collection_name=self.collection, query_vector=vec, limit=limit)
-
-        # rerank by simple keyword bonus
-        q = query.lower()
-        tokens = [t for t in q.replace(",", " ").split() if t]
-        def _bonus(payload: Dict[str, Any]) -> float:
-            t = (payload.get(_Cols.TAGS, "") or "").lower()
-            s = (payload.get(_Cols.SUPPORT, "") or "").lower()
-            b = 0.0
-            for tok in tokens:
-                if tok in t:
-                    b += 0.08
-                if tok in s:
-                    b += 0.04
-            return b
-
-        reranked = sorted(hits, key=lambda h: (float(h.score) + _bonus(h.payload)), reverse=True)[:topk]
+        search_params = None
+        if self.compact:
+            # 양자화 점수로 limit × SNAPSHOT_RESCORE개를 고른 뒤 원본 벡터로 재채점
+            search_params = SearchParams(
+                quantization=QuantizationSearchParams(rescore=True, oversampling=settings.SNAPSHOT_RESCORE),
+            )
+        with span("search.qdrant", limit=limit, filtered=query_filter is not None, compact=self.compact):
+            hits = self.client.search(
+                collection_name=self.collection, query_vector=vec, limit=limit, query_filter=query_filter,
+                search_params=search_params, with_payload=False,
+            )
+        hits = [h for h in hits if h.id < len(self.df)]
+
+        # rerank by simple keyword bonus (본문은 payload가 아니라 DataFrame에서 - compact 색인은 payload가 ID뿐)
+        tokens = query_tokens(query)
+        def _bonus(idx: int) -> float:
+            return keyword_bonus(tokens, str(self.df.at[idx, _Cols.TAGS]), str(self.df.at[idx, _Cols.SUPPORT]))
+
+        reranked = sorted(hits, key=lambda h: (float(h.score) + _bonus(h.id)), reverse=True)[:topk]
 
         results: List[Dict[str, Any]] = []
         for rank, h in enumerate(reranked, start=1):
             # 벡터 검색 결과의 인덱스를 사용해 원본 CSV에서 모든 데이터 가져오기
             idx = h.id  # Qdrant에서 반환된 인덱스
-            if idx < len(self.df):
-                row = self.df.iloc[idx]
-                # tags -> list[str]
-                tags_list = [t.strip() for t in str(row.get("tags", "")).split(",") if t.strip()]
-                
-                results.append({
-                    "rank": rank,
-                    "service_id": str(row.get("서비스명", "")),
-                    "service_name": str(row.get("서비스명", "")),
-                    "score": float(h.score),
-                    "tags": tags_list,
-                    "support": str(row.get("지원내용", "")),
-                    "url": str(row.get("URL", "")) or None,
-                    
-                    # 추가된 모든 CSV 필드들
-                    "application_deadline": str(row.get("신청기한", "")),
-                    "contact": str(row.get("문의처", "")),
-                    "application_method": str(row.get("신청방법", "")),
-                    "receiving_agency": str(row.get("접수기관명", "")),
-                    "support_type": str(row.get("지원유형", "")),
-                    "target_beneficiaries": str(row.get("지원대상", "")),
-                    "selection_criteria": str(row.get("선정기준", "")),
-                    "required_documents": str(row.get("구비서류", "")),
-                })
+            row = self.df.iloc[idx]
+            results.append({"rank": rank, "score": float(h.score), **record_from_row(row.get)})
         return results
 
     def rebuild(self) -> None:
@@ -169,18 +179,45 @@ class PolicySearch:
             try:
                 info = self.client.get_collection(self.collection)
                 have_dim = int(info.vectors_count) and int(info.config.params.vectors.size)  # type: ignore[attr-defined]
+                have_compact = info.config.quantization_config is not None  # type: ignore[attr-defined]
             except Exception:
-                have_dim = None
-            if have_dim != want_dim:
-                # dimension mismatch -> recreate
+                have_dim, have_compact = None, self.compact
+            if have_dim != want_dim or have_compact != self.compact:
+                # dimension mismatch / compact 모드 변경 -> recreate
                 self._recreate_collection(want_dim)
                 self._upsert_all()
-            else:
-                # collection present; assume already indexed (no-ops)
-                pass
+            elif not self._has_filter_payload():
+                # 필터 이전 색인: 벡터는 그대로 두고 필터 payload만 추가
+                self._set_filter_payloads()
         else:
             self._recreate_collection(want_dim)
             self._upsert_all()
+        self._ensure_payload_indexes()
+
+    def _has_filter_payload(self) -> bool:
+        try:
+            points = self.client.retrieve(self.collection, ids=[0], with_payload=True, with_vectors=False)
+        except Exception:
+            return False
+        return not points or all(f in (points[0].payload or {}) for f in FILTER_FIELDS)
+
+    def _set_filter_payloads(self) -> None:
+        # 같은 속성 조합끼리 묶어 set_payload 호출 수를 줄인다
+        groups: Dict[str, List[int]] = {}
+        for i, attrs in enumerate(self._attrs):
+            groups.setdefault(json.dumps(attrs, ensure_ascii=False, sort_keys=True), []).append(i)
+        for payload, ids in groups.items():
+            self.client.set_payload(collection_name=self.collection, payload=json.loads(payload), points=ids)
+
+    def _ensure_payload_indexes(self) -> None:
+        for field in FILTER_FIELDS:
+            try:
+                self.client.create_payload_index(
+                    collection_name=self.collection, field_name=field, field_schema=PayloadSchemaType.KEYWORD,
+                )
+            except Exception:
+                # 로컬 모드는 payload 인덱스를 지원하지 않음 (필터는 그대로 동작)
+                pass
 
     def _collection_exists(self) -> bool:
         try:
@@ -195,9 +232,15 @@ class PolicySearch:
 
     def _recreate_collection(self, dim: Optional[int] = None) -> None:
         dim = dim or self.model.get_sentence_embedding_dimension()
+        quantization = None
+        if self.compact:
+            quantization = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True),
+            )
         self.client.recreate_collection(
             collection_name=self.collection,
-            vectors_config=VectorParams(size=int(dim), distance=Distance.COSINE),
+            vectors_config=VectorParams(size=int(dim), distance=Distance.COSINE, on_disk=self.compact),
+            quantization_config=quantization,
         )
 
     def _batched(self, iterable: Iterable[Any], n: int) -> Iterable[List[Any]]:
@@ -224,15 +267,22 @@ class PolicySearch:
                 PointStruct(
                     id=int(i),  # integer ID in Qdrant
                     vector=embs[j].tolist(),
-                    payload={
-                        _Cols.SERVICE_ID: str(self.df.at[i, _Cols.SERVICE_ID]),
-                        _Cols.SERVICE_NAME: str(self.df.at[i, _Cols.SERVICE_NAME]),
-                        _Cols.TAGS: str(self.df.at[i, _Cols.TAGS]),
-                        _Cols.SUPPORT: str(self.df.at[i, _Cols.SUPPORT]),
-                        _Cols.REQUIREMENT: str(self.df.at[i, _Cols.REQUIREMENT]),
-                        _Cols.URL: str(self.df.at[i, _Cols.URL]),
-                    },
+                    payload=self._payload(i),
                 )
                 for j, i in enumerate(batch_ids)
             ]
             self.client.upsert(collection_name=self.collection, points=points)
+
+    def _payload(self, i: int) -> Dict[str, Any]:
+        if self.compact:
+            # ID + 필터 속성만 (본문 텍스트는 CSV에 이미 있으므로 색인에 중복 저장하지 않음)
+            return {_Cols.SERVICE_ID: str(self.df.at[i, _Cols.SERVICE_ID]), **self._attrs[i]}
+        return {
+            _Cols.SERVICE_ID: str(self.df.at[i, _Cols.SERVICE_ID]),
+            _Cols.SERVICE_NAME: str(self.df.at[i, _Cols.SERVICE_NAME]),
+            _Cols.TAGS: str(self.df.at[i, _Cols.TAGS]),
+            _Cols.SUPPORT: str(self.df.at[i, _Cols.SUPPORT]),
+            _Cols.REQUIREMENT: str(self.df.at[i, _Cols.REQUIREMENT]),
+            _Cols.URL: str(self.df.at[i, _Cols.URL]),
+            **self._attrs[i],
+        }
@@ -0,0 +1,258 @@
+# app/services/policy_snapshot.py
+"""
+읽기 전용 정책 스냅샷 (멀티 프로세스 서빙용).
+
+Qdrant 로컬 모드는 디렉토리 lock 때문에 한 프로세스만 열 수 있고, pandas DataFrame은
+워커마다 따로 파싱·복제된다. 스냅샷은 이를 mmap 가능한 파일로 한 번만 내보내고,
+각 요청 워커는 같은 파일을 mmap 하므로 페이지 캐시를 통해 물리 메모리를 공유한다.
+
+  <dir>/embeddings.npy   float32 (N, D), L2 정규화됨
+  <dir>/records.bin      레코드별 UTF-8 JSON을 이어붙인 blob
+  <dir>/records_idx.npy  int64 (N+1,) 오프셋
+  <dir>/meta.json        {count, dim, embed_model, csv_path, csv_mtime}
+  <dir>/attrs*.{json,npy} 필터용 속성 posting (app.services.policy_filters)
+  <dir>/quant_*.npy      (선택) int8 / PQ 양자화 코드 (app.services.vector_quant)
+
+검색은 mmap된 행렬에 대한 brute-force 내적(정규화 벡터 → cosine)이며,
+쿼리 임베딩은 주입된 encode 함수(예: 전용 inference 프로세스)로 계산한다.
+필터가 있으면 posting으로 후보 행을 먼저 고르고 그 행들만 점수를 계산한다.
+양자화 코드가 있으면 근사 점수로 limit × SNAPSHOT_RESCORE개 후보를 고른 뒤 float32 행으로 재채점한다.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+from .policy_filters import AttributeIndex, Filters
+from .policy_records import query_tokens, keyword_bonus, record_from_row
+from .vector_quant import QUANT_KINDS, Quantizer, build_quantizer, load_quantizer
+
+EMB_FILE = "embeddings.npy"
+REC_FILE = "records.bin"
+IDX_FILE = "records_idx.npy"
+META_FILE = "meta.json"
+
+EncodeFn = Callable[[Sequence[str]], np.ndarray]
+
+# 필터 통과 행이 전체의 이 비율 이하일 때만 해당 행을 gather해서 점수 계산 (그 이상은 전체 스캔 + 마스크)
+_GATHER_MAX_FRACTION = 0.15
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_snapshot(policy, out_dir: Optional[str] = None, quant: Optional[str] = None) -> str:
+    """
+    PolicySearch(Qdrant에 색인 완료 상태)에서 벡터와 레코드를 내보낸다.
+    벡터는 Qdrant에서 그대로 읽으므로 재임베딩하지 않는다.
+    임시 파일에 쓴 뒤 rename하므로 서빙 중인 워커가 반쯤 쓰인 파일을 보지 않는다.
+    quant: "none" | "int8" | "pq" (기본 SNAPSHOT_QUANT)
+    """
+    out_dir = out_dir or settings.SNAPSHOT_DIR
+    quant = quant or settings.SNAPSHOT_QUANT
+    if quant not in QUANT_KINDS:
+        raise ValueError(f"unknown quantization: {quant} (expected one of {QUANT_KINDS})")
+    os.makedirs(out_dir, exist_ok=True)
+    n = len(policy.df)
+    dim = int(policy.model.get_sentence_embedding_dimension())
+
+    emb = np.zeros((n, dim), dtype=np.float32)
+    offset = None
+    while True:
+        points, offset = policy.client.scroll(
+            collection_name=policy.collection, limit=1024, offset=offset,
+            with_vectors=True, with_payload=False,
+        )
+        for p in points:
+            if int(p.id) < n:
+                emb[int(p.id)] = np.asarray(p.vector, dtype=np.float32)
+        if offset is None:
+            break
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    records = []
+    tmp_rec = os.path.join(out_dir, REC_FILE + ".tmp")
+    with open(tmp_rec, "wb") as f:
+        for i in range(n):
+            row = policy.df.iloc[i]
+            rec = record_from_row(row.get)
+            records.append(rec)
+            blob = json.dumps(rec, ensure_ascii=False).encode("utf-8")
+            f.write(blob)
+            offsets[i + 1] = offsets[i] + len(blob)
+
+    _save_npy_atomic(os.path.join(out_dir, EMB_FILE), emb)
+    _save_npy_atomic(os.path.join(out_dir, IDX_FILE), offsets)
+    os.replace(tmp_rec, os.path.join(out_dir, REC_FILE))
+    AttributeIndex.build(records).save(out_dir)
+    _save_quantizer(out_dir, emb, quant)
+
+    meta = {
+        "count": n,
+        "dim": dim,
+        "embed_model": policy.embed_model_name,
+        "csv_path": policy.csv_path,
+        "csv_mtime": os.path.getmtime(policy.csv_path),
+        "quant": quant,
+    }
+    _write_meta(out_dir, meta)
+    return out_dir
+
+
+def quantize_snapshot(snapshot_dir: Optional[str] = None, quant: Optional[str] = None) -> str:
+    """기존 스냅샷의 embeddings.npy로 양자화 코드만 (재)생성하고 meta.json의 quant를 바꾼다."""
+    snapshot_dir = snapshot_dir or settings.SNAPSHOT_DIR
+    quant = quant or settings.SNAPSHOT_QUANT
+    emb = np.load(os.path.join(snapshot_dir, EMB_FILE), mmap_mode="r")
+    _save_quantizer(snapshot_dir, emb, quant)
+    with open(os.path.join(snapshot_dir, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["quant"] = quant
+    _write_meta(snapshot_dir, meta)
+    return snapshot_dir
+
+
+def _save_quantizer(out_dir: str, emb: np.ndarray, quant: str) -> None:
+    kwargs = {"m": settings.SNAPSHOT_PQ_M} if quant == "pq" else {}
+    q = build_quantizer(quant, emb, **kwargs)
+    if q is not None:
+        q.save(out_dir)
+
+
+def _write_meta(out_dir: str, meta: Dict[str, Any]) -> None:
+    tmp = os.path.join(out_dir, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(out_dir, META_FILE))
+
+
+def _save_npy_atomic(path: str, arr: np.ndarray) -> None:
+    tmp = path + ".tmp.npy"
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+def snapshot_exists(snapshot_dir: Optional[str] = None) -> bool:
+    d = snapshot_dir or settings.SNAPSHOT_DIR
+    return all(os.path.exists(os.path.join(d, f)) for f in (EMB_FILE, REC_FILE, IDX_FILE, META_FILE))
+
+
+# -----------------------------
+# Read side
+# -----------------------------
+class RecordStore:
+    """mmap된 JSON blob + 오프셋 배열. 레코드는 접근 시점에만 디코딩한다."""
+
+    def __init__(self, snapshot_dir: str):
+        self.offsets = np.load(os.path.join(snapshot_dir, IDX_FILE), mmap_mode="r")
+        self._f = open(os.path.join(snapshot_dir, REC_FILE), "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0]) - 1
+
+    def get(self, i: int) -> Dict[str, Any]:
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        return json.loads(self._mm[a:b].decode("utf-8"))
+
+
+class SnapshotPolicySearch:
+    """
+    PolicySearch와 같은 search(query, topk) 인터페이스를 가진 mmap 기반 검색기.
+    encode_fn: 문장 리스트 → (n, D) 정규화 임베딩.
+    quant: 사용할 양자화 코드 ("none" | "int8" | "pq"). 기본은 export 시 meta.json에 기록된 값.
+    """
+
+    def __init__(self, encode_fn: EncodeFn, snapshot_dir: Optional[str] = None, quant: Optional[str] = None):
+        self.snapshot_dir = snapshot_dir or settings.SNAPSHOT_DIR
+        if not snapshot_exists(self.snapshot_dir):
+            raise FileNotFoundError(
+                f"Policy snapshot not found: {self.snapshot_dir} "
+                f"(run: python scripts/build_policy_index.py --snapshot)"
+            )
+        with open(os.path.join(self.snapshot_dir, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.encode = encode_fn
+        self.emb = np.load(os.path.join(self.snapshot_dir, EMB_FILE), mmap_mode="r")
+        self.records = RecordStore(self.snapshot_dir)
+        self.attrs = AttributeIndex.load(self.snapshot_dir)
+        if self.attrs is None:
+            # 필터 이전 스냅샷: 레코드에서 바로 만든다 (재export 전까지 워커마다 메모리에)
+            self.attrs = AttributeIndex.build(self.records.get(i) for i in range(len(self.records)))
+        self.quant_kind = quant or self.meta.get("quant", "none")
+        self.quant: Optional[Quantizer] = load_quantizer(self.snapshot_dir, self.quant_kind)
+        if self.quant_kind != "none" and self.quant is None:
+            raise FileNotFoundError(
+                f"Quantized codes ({self.quant_kind}) not found in {self.snapshot_dir} "
+                f"(run: POLICY_SNAPSHOT_QUANT={self.quant_kind} python scripts/build_policy_index.py --snapshot)"
+            )
+
+    def search(self, query: str, topk: int = None, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        if not query or not query.strip():
+            return []
+        topk = topk or settings.TOPK_DEFAULT
+        rows = self.attrs.rows(filters)
+        n = self.emb.shape[0] if rows is None else len(rows)
+        if n == 0:
+            # 빈 스냅샷 또는 필터 결과 없음 (argpartition은 k=-1에서 ValueError)
+            return []
+        with span("search.embed", chars=len(query)):
+            q = np.asarray(self.encode([query]), dtype=np.float32)[0]
+
+        limit = min(max(10, int(topk)), n)
+        narrow = rows is not None and len(rows) <= _GATHER_MAX_FRACTION * self.emb.shape[0]
+        if self.quant is None or narrow:
+            # 좁은 필터는 float32 행을 바로 gather해도 싸므로 양자화 없이 정확히 계산
+            with span("search.scan", rows=int(n), limit=limit, filtered=rows is not None):
+                cand, cand_scores = self._scan(lambda r: self.emb @ q if r is None else self.emb[r] @ q, rows, limit)
+        else:
+            # 양자화 코드로 넉넉히 고른 뒤 후보 행만 float32로 정확히 재채점 (점수는 비양자화와 같은 cosine)
+            shortlist = min(n, max(limit, int(limit * settings.SNAPSHOT_RESCORE)))
+            with span("search.scan", rows=int(n), limit=shortlist, filtered=rows is not None, quant=self.quant_kind):
+                cand, _ = self._scan(lambda r: self.quant.scores(q, r), rows, shortlist)
+            with span("search.rescore", rows=len(cand)):
+                cand = np.sort(cand)   # mmap 페이지를 순서대로 읽도록
+                exact = self.emb[cand] @ q
+                top = np.argpartition(-exact, limit - 1)[:limit]
+                cand, cand_scores = cand[top], exact[top]
+
+        tokens = query_tokens(query)
+        scored = []
+        for i, s in zip(cand.tolist(), cand_scores.tolist()):
+            rec = self.records.get(i)
+            bonus = keyword_bonus(tokens, ",".join(rec["tags"]), rec["support"])
+            scored.append((s + bonus, s, rec))
+        scored.sort(key=lambda x: x[0], reverse=True)
+
+        return [
+            {"rank": rank, "score": s, **rec}
+            for rank, (_, s, rec) in enumerate(scored[:topk], start=1)
+        ]
+
+    def _scan(self, score: Callable[[Optional[np.ndarray]], np.ndarray], rows: Optional[np.ndarray], k: int):
+        """상위 k개 (행 번호, 점수). score(None) → 전체 (N,), score(rows) → 해당 행들 점수."""
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if rows is None or len(rows) > _GATHER_MAX_FRACTION * self.emb.shape[0]:
+            # 전체 스캔 (넓은 필터는 행 gather 복사가 순차 내적보다 비싸므로 점수에 마스크만 적용)
+            scores = score(None)
+            if rows is not None:
+                masked = np.full_like(scores, -np.inf)
+                masked[rows] = scores[rows]
+                scores = masked
+            cand = np.argpartition(-scores, k - 1)[:k]
+            return cand, scores[cand]
+        # 필터를 통과한 행만 gather해서 점수 계산 → 행 번호로 되돌린다
+        sub = score(rows)
+        top = np.argpartition(-sub, k - 1)[:k]
+        return rows[top], sub[top]
+
+    def rebuild(self) -> None:
+        raise RuntimeError("Snapshot is read-only; rebuild with scripts/build_policy_index.py --snapshot")
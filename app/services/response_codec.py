@@ -0,0 +1,138 @@
+# app/services/response_codec.py
+"""
+파이프라인 응답 포맷 협상 + 직렬화.
+
+  json      : 기존 PipelineResponse / TTSResult JSON (오디오는 base64 `mp3_b64`)
+  msgpack   : 같은 구조를 msgpack으로. 오디오는 base64 없이 `tts.audio`(bin)로 담는다
+  multipart : multipart/mixed - 1부 application/json(오디오 제외), 2부 raw 오디오 바이트
+
+형식은 명시 파라미터(response_format) → Accept 헤더 → "json" 순으로 정한다.
+`fields`(쉼표 구분)를 주면 search.results 항목을 해당 필드(+ rank)만 남기도록 줄인다.
+응답 압축은 서버의 GZipMiddleware(RESPONSE_GZIP)가 담당한다.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.tracing import span
+
+RESPONSE_FORMATS = ("json", "msgpack", "multipart")
+MSGPACK_MIME = "application/msgpack"
+
+_ACCEPT_MAP = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    "multipart/mixed": "multipart",
+    "application/json": "json",
+}
+
+try:
+    import msgpack
+    _HAS_MSGPACK = True
+except ImportError:
+    _HAS_MSGPACK = False
+
+
+def _unsupported(detail: str):
+    from fastapi import HTTPException
+    raise HTTPException(status_code=406, detail=detail)
+
+
+def negotiate_response(requested: Optional[str], accept: Optional[str]) -> str:
+    """명시 포맷 → Accept 헤더(q 값 순) → "json". msgpack 미설치 시 Accept에서는 건너뛴다."""
+    if requested:
+        fmt = requested.lower()
+        if fmt not in RESPONSE_FORMATS:
+            _unsupported(f"Unsupported response_format: {requested} (expected one of {RESPONSE_FORMATS})")
+        if fmt == "msgpack" and not _HAS_MSGPACK:
+            _unsupported("msgpack is not installed on this server")
+        return fmt
+    if accept:
+        prefs: List[Tuple[float, int, str]] = []
+        for i, part in enumerate(accept.split(",")):
+            mime, _, params = part.strip().partition(";")
+            q = 1.0
+            for p in params.split(";"):
+                k, _, v = p.strip().partition("=")
+                if k == "q":
+                    try:
+                        q = float(v)
+                    except ValueError:
+                        q = 0.0
+            fmt = _ACCEPT_MAP.get(mime.strip().lower())
+            if fmt and q > 0 and (fmt != "msgpack" or _HAS_MSGPACK):
+                prefs.append((-q, i, fmt))
+        if prefs:
+            return min(prefs)[2]
+    return "json"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    out = [f.strip() for f in fields.split(",") if f.strip()]
+    return out or None
+
+
+def project_results(body: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """search.results 각 항목을 fields(+ rank)만 남긴다 (제자리 수정)."""
+    if not fields:
+        return body
+    keep = set(fields) | {"rank"}
+    search = body.get("search")
+    if search and search.get("results"):
+        search["results"] = [{k: v for k, v in r.items() if k in keep} for r in search["results"]]
+    return body
+
+
+def pack(body: Dict[str, Any], audio: bytes, fmt: str, mime_type: str) -> Tuple[bytes, str]:
+    """
+    body: 오디오를 뺀 응답 dict (tts.mp3_b64는 무시됨). Returns: (바이트, Content-Type)
+    """
+    with span("response.pack", format=fmt) as sp:
+        if fmt == "msgpack":
+            out = _pack_msgpack(body, audio)
+            ctype = MSGPACK_MIME
+        elif fmt == "multipart":
+            out, ctype = _pack_multipart(body, audio, mime_type)
+        else:
+            raise ValueError(f"unsupported binary format: {fmt}")
+        sp.set("bytes", len(out))
+    return out, ctype
+
+
+def _strip_b64(body: Dict[str, Any]) -> Dict[str, Any]:
+    tts = body.get("tts")
+    if isinstance(tts, dict) and "mp3_b64" in tts:
+        body = {**body, "tts": {k: v for k, v in tts.items() if k != "mp3_b64"}}
+    elif "mp3_b64" in body:
+        body = {k: v for k, v in body.items() if k != "mp3_b64"}
+    return body
+
+
+def _pack_msgpack(body: Dict[str, Any], audio: bytes) -> bytes:
+    body = _strip_b64(body)
+    if isinstance(body.get("tts"), dict):
+        body["tts"]["audio"] = audio
+    else:
+        body["audio"] = audio
+    return msgpack.packb(body, use_bin_type=True)
+
+
+def _pack_multipart(body: Dict[str, Any], audio: bytes, mime_type: str) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    meta = json.dumps(_strip_b64(body), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    parts = [
+        f"--{boundary}\r\nContent-Type: application/json; charset=utf-8\r\n"
+        f"Content-Disposition: inline; name=\"meta\"\r\n\r\n".encode("ascii"),
+        meta,
+        f"\r\n--{boundary}\r\nContent-Type: {mime_type}\r\n"
+        f"Content-Disposition: inline; name=\"audio\"\r\n"
+        f"Content-Length: {len(audio)}\r\n\r\n".encode("ascii"),
+        audio,
+        f"\r\n--{boundary}--\r\n".encode("ascii"),
+    ]
+    return b"".join(parts), f"multipart/mixed; boundary={boundary}"
@@ -0,0 +1,147 @@
+# app/services/stub_engines.py
+"""
+GPU/모델 없이 서버 전체 경로를 돌려보기 위한 stub 엔진들 (STUB_ENGINES=1).
+
+- StubASR          : FW/OW와 같은 인터페이스. 오디오 길이 × STUB_ASR_RTF 만큼 블로킹 후 고정 문장 반환
+- StubPolicySearch : PolicySearch.search와 같은 반환 형식의 고정 카탈로그 검색
+- stub_speecht5_audio: SpeechT5 대체. 문자수에 비례한 지연 후 더미 오디오 바이트 반환
+
+오디오 디코드(ffmpeg)와 Edge TTS 클라이언트는 실제 코드를 그대로 사용한다.
+Edge TTS는 EDGE_TTS_WSS_URL을 scripts/fake_edge_tts_server.py로 지정하면 오프라인으로 동작한다.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracing import span
+from .audio_io import to_f32_16k_mono, TARGET_SR
+from .policy_filters import AttributeIndex, Filters
+
+_STUB_TEXT = "청년 주거 지원 정책 알려줘"
+
+_STUB_CATALOG: List[Dict[str, Any]] = [
+    {
+        "service_name": "청년월세 한시 특별지원",
+        "tags": "청년,주거,월세",
+        "support": "무주택 청년에게 월 최대 20만원의 월세를 최장 12개월간 지원합니다.",
+        "support_type": "현금",
+        "receiving_agency": "주민센터",
+    },
+    {
+        "service_name": "긴급복지 주거지원",
+        "tags": "긴급,주거,위기가구",
+        "support": "위기사유의 발생으로 생계유지가 곤란한 저소득 가구에 임시거소를 제공합니다.",
+        "support_type": "현물",
+        "receiving_agency": "시군구",
+    },
+    {
+        "service_name": "기초연금",
+        "tags": "노인,연금",
+        "support": "만 65세 이상 소득하위 70% 어르신에게 기초연금을 지급합니다.",
+        "support_type": "현금",
+        "receiving_agency": "국민연금공단",
+    },
+    {
+        "service_name": "아동수당",
+        "tags": "아동,수당,양육",
+        "support": "8세 미만 아동에게 월 10만원의 아동수당을 지급합니다.",
+        "support_type": "현금",
+        "receiving_agency": "주민센터",
+    },
+]
+
+
+class StubASR:
+    """FasterWhisperASR / OpenAIWhisperASR 대체용."""
+
+    def __init__(
+        self,
+        rtf: Optional[float] = None,
+        text: str = _STUB_TEXT,
+        beam_size: Optional[int] = None,
+        avg_logprob: float = -0.25,
+    ):
+        self.rtf = settings.STUB_ASR_RTF if rtf is None else float(rtf)
+        self.text = text
+        self.beam_size = beam_size or settings.FW_BEAM
+        self.avg_logprob = avg_logprob
+
+    def transcribe(
+        self,
+        wav: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        duration = float(wav.shape[0]) / float(TARGET_SR)
+        beam = int(beam_size or self.beam_size)
+        # beam이 클수록 느려지는 경향을 대략 반영
+        cost = duration * self.rtf * (1.0 + 0.15 * (max(1, beam) - 1))
+        with span("asr.stub.transcribe", beam=beam, samples=int(wav.shape[0])):
+            time.sleep(cost)
+        return self.text, {
+            "duration": duration,
+            "language": language or settings.LANGUAGE,
+            "segments": 1,
+            "avg_logprob": self.avg_logprob,
+            "no_speech_prob": 0.02,
+        }
+
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        wav = to_f32_16k_mono(audio_bytes)
+        return self.transcribe(wav, language=language, beam_size=beam_size, domain=domain)
+
+
+class StubPolicySearch:
+    """PolicySearch 대체용 (임베딩/Qdrant 없음)."""
+
+    def __init__(self, latency_ms: Optional[float] = None):
+        self.latency_s = (settings.STUB_SEARCH_MS if latency_ms is None else float(latency_ms)) / 1000.0
+        self.attrs = AttributeIndex.build({**row, "tags": row["tags"].split(",")} for row in _STUB_CATALOG)
+
+    def search(self, query: str, topk: int = None, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        if not query or not query.strip():
+            return []
+        topk = topk or settings.TOPK_DEFAULT
+        rows = self.attrs.rows(filters)
+        catalog = _STUB_CATALOG if rows is None else [_STUB_CATALOG[i] for i in rows]
+        with span("search.stub", topk=topk):
+            time.sleep(self.latency_s)
+        results: List[Dict[str, Any]] = []
+        for rank, row in enumerate(catalog[:topk], start=1):
+            results.append({
+                "rank": rank,
+                "service_id": row["service_name"],
+                "service_name": row["service_name"],
+                "score": round(0.8 - 0.05 * rank, 3),
+                "tags": row["tags"].split(","),
+                "support": row["support"],
+                "url": None,
+                "support_type": row["support_type"],
+                "receiving_agency": row["receiving_agency"],
+            })
+        return results
+
+    def rebuild(self) -> None:
+        pass
+
+
+def stub_speecht5_audio(text: str, audio_format: Optional[str] = None, **_: Any) -> bytes:
+    """SpeechT5 대체: 문자당 약 10ms 지연, 24kbps 상당 크기의 더미 바이트 (포맷별 매직 바이트)."""
+    if not text or not text.strip():
+        return b""
+    with span("tts.speecht5.stub", chars=len(text)):
+        time.sleep(0.01 * len(text))
+    est_sec = max(1.5, len(text) / 8.0)
+    magic = {"ogg_opus": b"OggS", "wav": b"RIFF"}.get(audio_format or settings.TTS_AUDIO_FORMAT, b"\xff\xf3")
+    return magic + b"\x00" * int(est_sec * 3000)
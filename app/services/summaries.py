@@ -0,0 +1,343 @@
+# app/services/summaries.py
+"""
+정책 요약 생성 서비스 (webui_v3의 OpenAI 요약을 서버로 이동).
+
+요약 종류(kind)
+  - "field:<필드>" : 필드 하나 요약 (support / target_beneficiaries / application_deadline /
+                     application_method / required_documents / contact)
+  - "policy"       : 6가지 핵심 정보 요약
+  - "tts"          : 음성 안내용 4줄 요약
+
+한 번 만든 요약은 (입력 내용 해시, kind, 프롬프트 버전, 백엔드 모델) 키로 디스크에 저장해
+같은 정책을 보는 모든 사용자/요청이 재사용한다. 프롬프트를 바꾸면 SUMMARY_PROMPT_VERSION을 올린다.
+
+생성은 SUMMARY_CONCURRENCY개 스레드로 병렬 실행하고, 같은 키의 동시 생성은 하나로 합친다.
+백엔드는 교체 가능: "openai"(gpt-4o-mini 등) | "stub"(네트워크 없이 결정적 출력, 테스트용).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Protocol, Sequence
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+FIELD_LABELS: Dict[str, str] = {
+    "support": "지원내용",
+    "target_beneficiaries": "신청대상",
+    "application_deadline": "신청기간",
+    "application_method": "신청방법",
+    "required_documents": "필요서류",
+    "contact": "문의처",
+}
+KINDS = tuple(f"field:{f}" for f in FIELD_LABELS) + ("policy", "tts")
+
+_POLICY_FIELDS = ("service_name", "support", "target_beneficiaries", "application_deadline",
+                  "application_method", "contact", "required_documents")
+_TTS_FIELDS = ("service_name", "support", "target_beneficiaries", "application_method",
+               "required_documents", "contact")
+
+
+# -----------------------------
+# Prompts (webui_v3와 같은 문구)
+# -----------------------------
+class Prompt:
+    __slots__ = ("system", "user", "max_tokens", "temperature")
+
+    def __init__(self, system: str, user: str, max_tokens: int, temperature: float):
+        self.system = system
+        self.user = user
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+
+def _v(rec: Mapping[str, Any], key: str) -> str:
+    return str(rec.get(key) or "N/A")
+
+
+def _inputs(rec: Mapping[str, Any], kind: str) -> Optional[Dict[str, str]]:
+    """kind가 실제로 읽는 필드만. 요약할 내용이 없으면 None."""
+    if kind.startswith("field:"):
+        field = kind.split(":", 1)[1]
+        value = str(rec.get(field) or "")
+        return {field: value} if value and value != "N/A" else None
+    fields = _POLICY_FIELDS if kind == "policy" else _TTS_FIELDS
+    return {f: _v(rec, f) for f in fields}
+
+
+def build_prompt(kind: str, inp: Mapping[str, str]) -> Prompt:
+    if kind.startswith("field:"):
+        field = kind.split(":", 1)[1]
+        label = FIELD_LABELS.get(field, field)
+        user = f"""
+다음 정보를 간결하고 이해하기 쉽게 요약해주세요:
+
+{inp[field]}
+
+요구사항:
+1. 핵심 내용만 간결하게 정리
+2. 이해하기 쉬운 문장으로 작성
+3. 불필요한 반복 제거
+4. 한국어로 작성
+
+요약:
+"""
+        return Prompt(f"당신은 {label} 정보를 간결하게 요약하는 전문가입니다.", user, 150, 0.3)
+    if kind == "policy":
+        user = f"""
+다음 정책 정보를 핵심 내용만 요약해서 설명해주세요:
+
+서비스명: {inp['service_name']}
+지원내용: {inp['support']}
+신청대상: {inp['target_beneficiaries']}
+신청기간: {inp['application_deadline']}
+신청방법: {inp['application_method']}
+문의처: {inp['contact']}
+필요서류: {inp['required_documents']}
+
+요구사항:
+1. 어떤 정책인지 (지원내용)
+2. 신청 대상
+3. 신청 기간
+4. 신청 방법
+5. 필요한 서류
+6. 문의처
+이 6가지 핵심 정보를 간결하게 정리해서 설명
+
+핵심 요약:
+"""
+        return Prompt("당신은 정부 정책의 핵심 정보를 명확하게 정리하는 전문가입니다.", user, 300, 0.5)
+    if kind == "tts":
+        user = f"""
+다음 정책 정보를 4줄 이내의 자연스러운 문장으로 요약해주세요:
+
+서비스명: {inp['service_name']}
+지원내용: {inp['support']}
+신청대상: {inp['target_beneficiaries']}
+신청방법: {inp['application_method']}
+필요서류: {inp['required_documents']}
+문의처: {inp['contact']}
+
+요구사항:
+0. []안에는 정책 정보 채워넣기
+1. "추천하는 정책은 [정책명]입니다."로 시작
+2. "대상은 [신청대상]이며"로 이어짐
+3. "신청 방법은 [신청방법]이고"로 이어짐
+4. "[필요서류]를 통해 [신청방법]으로 신청하면 됩니다. 문의처는 [문의처]입니다."로 마무리
+5. 4줄 이내의 자연스러운 문장으로 작성
+6. 음성으로 읽기 좋게 작성
+
+요약:
+"""
+        return Prompt("당신은 정책 정보를 음성으로 읽기 좋은 자연스러운 문장으로 요약하는 전문가입니다.", user, 200, 0.7)
+    raise ValueError(f"unknown summary kind: {kind} (expected one of {KINDS})")
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class SummaryBackend(Protocol):
+    name: str     # 캐시 키에 포함 (모델이 바뀌면 새로 생성)
+
+    def generate(self, prompt: Prompt) -> str: ...
+
+
+class OpenAIBackend:
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None):
+        from openai import OpenAI
+
+        self.model = model or settings.SUMMARY_MODEL
+        self.name = f"openai:{self.model}"
+        self.client = OpenAI(api_key=api_key or settings.OPENAI_API_KEY or None, timeout=settings.SUMMARY_TIMEOUT_S)
+
+    def generate(self, prompt: Prompt) -> str:
+        resp = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": prompt.user},
+            ],
+            max_tokens=prompt.max_tokens,
+            temperature=prompt.temperature,
+        )
+        return resp.choices[0].message.content.strip()
+
+
+class StubSummaryBackend:
+    """네트워크 없이 결정적인 요약 (프롬프트의 입력 부분을 한 줄로 잘라 붙임). 테스트/벤치마크용."""
+
+    name = "stub"
+
+    def generate(self, prompt: Prompt) -> str:
+        lines = [ln.strip() for ln in prompt.user.split("요구사항:", 1)[0].splitlines() if ln.strip()]
+        return " ".join(lines[1:])[: prompt.max_tokens]
+
+
+def build_backend(kind: Optional[str] = None) -> SummaryBackend:
+    kind = kind or ("stub" if settings.STUB_ENGINES else settings.SUMMARY_BACKEND)
+    if kind == "stub":
+        return StubSummaryBackend()
+    if kind == "openai":
+        return OpenAIBackend()
+    raise ValueError(f"unknown SUMMARY_BACKEND: {kind}")
+
+
+# -----------------------------
+# Disk cache
+# -----------------------------
+class SummaryCache:
+    """<dir>/<key[:2]>/<key>.json. 쓰기는 임시 파일 + os.replace로 원자적."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.SUMMARY_CACHE_DIR
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, text: str, meta: Mapping[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"text": text, **meta}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def cache_key(kind: str, inp: Mapping[str, str], backend_name: str, version: Optional[str] = None) -> str:
+    raw = json.dumps(
+        {"kind": kind, "v": version or settings.SUMMARY_PROMPT_VERSION, "backend": backend_name, "in": inp},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# Service
+# -----------------------------
+class SummaryService:
+    def __init__(
+        self,
+        backend: Optional[SummaryBackend] = None,
+        cache: Optional[SummaryCache] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.backend = backend or build_backend()
+        self.cache = cache or SummaryCache()
+        self.concurrency = max(1, settings.SUMMARY_CONCURRENCY if concurrency is None else int(concurrency))
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="summary")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._counts: Counter = Counter()
+
+    def _generate(self, key: str, kind: str, inp: Dict[str, str]) -> Optional[str]:
+        try:
+            with span("summary.generate", kind=kind, backend=self.backend.name):
+                text = self.backend.generate(build_prompt(kind, inp))
+        except Exception as e:
+            logger.warning(f"summary {kind} failed: {type(e).__name__}: {e}")
+            with self._lock:
+                self._counts["errors"] += 1
+            return None     # 실패는 캐시하지 않음 (다음 요청에서 재시도)
+        self.cache.put(key, text, {"kind": kind, "version": settings.SUMMARY_PROMPT_VERSION,
+                                   "backend": self.backend.name})
+        with self._lock:
+            self._counts["generated"] += 1
+        return text
+
+    def submit(self, record: Mapping[str, Any], kind: str) -> Future:
+        """캐시 hit이면 완료된 Future, 아니면 (같은 키 진행 중이면 그 Future에 합류) 생성 작업."""
+        fut: Future = Future()
+        inp = _inputs(record, kind)
+        if inp is None:
+            fut.set_result(None)
+            return fut
+        key = cache_key(kind, inp, self.backend.name)
+        text = self.cache.get(key)
+        with self._lock:
+            if text is not None:
+                self._counts["hits"] += 1
+                fut.set_result(text)
+                return fut
+            running = self._inflight.get(key)
+            if running is not None:
+                self._counts["coalesced"] += 1
+                return running
+            self._counts["misses"] += 1
+            fut = self._pool.submit(self._generate, key, kind, inp)
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda _f, k=key: self._forget(k))
+        return fut
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def summarize(self, records: Sequence[Mapping[str, Any]], kinds: Iterable[str]) -> List[Dict[str, Optional[str]]]:
+        """records × kinds 요약 (블로킹). 모든 항목을 먼저 제출해 병렬로 생성한다."""
+        kinds = list(kinds)
+        for k in kinds:
+            if k not in KINDS:
+                raise ValueError(f"unknown summary kind: {k} (expected one of {KINDS})")
+        with span("summary", records=len(records), kinds=len(kinds)):
+            futs = [[self.submit(r, k) for k in kinds] for r in records]
+            return [{k: f.result() for k, f in zip(kinds, row)} for row in futs]
+
+    def precompute(self, records: Iterable[Mapping[str, Any]], kinds: Iterable[str]) -> Dict[str, int]:
+        """카탈로그 일괄 생성. 이미 캐시된 항목은 건너뛴다."""
+        kinds = list(kinds)
+        before = dict(self._counts)
+        futs, empty = [], 0
+        for r in records:
+            for k in kinds:
+                if _inputs(r, k) is None:
+                    empty += 1
+                    continue
+                futs.append(self.submit(r, k))
+        for f in futs:
+            f.result()
+        after = self._counts
+        return {
+            "requested": len(futs) + empty,
+            "cached": after["hits"] - before.get("hits", 0),
+            "generated": after["generated"] - before.get("generated", 0),
+            "errors": after["errors"] - before.get("errors", 0),
+            "empty": empty,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.backend.name, "version": settings.SUMMARY_PROMPT_VERSION,
+                    "concurrency": self.concurrency, "inflight": len(self._inflight), **dict(self._counts)}
+
+
+_service: Optional[SummaryService] = None
+_service_lock = threading.Lock()
+
+
+def get_summaries() -> SummaryService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SummaryService()
+    return _service
+
+
+def stats() -> Optional[Dict[str, Any]]:
+    """/stats용. 아직 한 번도 쓰지 않았으면 None (백엔드를 만들지 않음)."""
+    return _service.stats() if _service is not None else None
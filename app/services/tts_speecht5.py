@@ -1,12 +1,14 @@
 # app/services/tts_speecht5.py
 from __future__ import annotations
 
+import inspect
 import io
+import logging
 import os
-import shutil
-import subprocess
+import re
+import threading
 from functools import lru_cache
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -18,32 +20,21 @@ from transformers import (
 )
 
 from app.core.config import settings
+from app.core.hardware import resolve_device
+from app.core.tracing import span
+from .audio_encode import encode_pcm
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------
-# Config / device / ffmpeg
+# Config / device
 # -----------------------------
 DEFAULT_SR = 16000
 
 def _pick_device() -> str:
-    dev = (settings.FW_DEVICE or "cpu").lower()
+    dev = resolve_device()
     return "cuda" if dev.startswith("cuda") and torch.cuda.is_available() else "cpu"
 
-def _pick_ffmpeg_bin() -> str:
-    env_bin = os.getenv("FFMPEG_BIN") or os.getenv("FFMPEG_PATH")
-    if env_bin:
-        return env_bin
-    for c in [
-        "/root/miniforge3/envs/server/bin/ffmpeg",
-        "/usr/bin/ffmpeg",
-        "/usr/local/bin/ffmpeg",
-        "/opt/homebrew/bin/ffmpeg",
-    ]:
-        if os.path.exists(c):
-            return c
-    return shutil.which("ffmpeg") or "ffmpeg"
-
-FFMPEG_BIN = _pick_ffmpeg_bin()
-
 # -----------------------------
 # Model loaders (cached)
 # -----------------------------
@@ -63,100 +54,258 @@ def _load_models(device: str):
 # -----------------------------
 # Speaker embedding
 # -----------------------------
+# 프리셋 = SPEECHT5_SPEAKER_DIR/<이름>.npy (scripts/export_speaker_presets.py로 CMU ARCTIC x-vector에서 생성).
+# 파일이 없는 이름은 ValueError. 단 "default"만은 파일이 없어도 고정 seed 임베딩으로 동작한다
+# (실제 화자 x-vector가 아니므로 음색 품질은 보장되지 않음 → 처음 쓸 때 한 번 경고).
+DEFAULT_PRESET = "default"
+_DEFAULT_SEED = 0
+
+_EMB_CACHE: Dict[str, Tuple[int, torch.Tensor]] = {}   # abspath -> (mtime_ns, (1,512))
+_PRESET_CACHE: Dict[str, torch.Tensor] = {}
+_EMB_LOCK = threading.Lock()
+
+
+def _as_speaker_tensor(arr: np.ndarray, what: str) -> torch.Tensor:
+    arr = np.asarray(arr, dtype=np.float32)
+    if arr.ndim == 1:  # (512,)
+        arr = arr[None, :]
+    assert arr.shape == (1, 512), f"{what} must be (1,512), got {arr.shape}"
+    return torch.from_numpy(np.ascontiguousarray(arr))
+
+
+def _load_npy_cached(path: str) -> torch.Tensor:
+    """경로별 캐시. 파일 mtime이 바뀌면 다시 읽는다."""
+    key = os.path.abspath(path)
+    mtime = os.stat(key).st_mtime_ns
+    with _EMB_LOCK:
+        hit = _EMB_CACHE.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    t = _as_speaker_tensor(np.load(key), "speaker_embedding(.npy)")
+    with _EMB_LOCK:
+        _EMB_CACHE[key] = (mtime, t)
+    return t
+
+
+def _seeded_default() -> torch.Tensor:
+    with _EMB_LOCK:
+        t = _PRESET_CACHE.get(DEFAULT_PRESET)
+        if t is None:
+            logger.warning(
+                f"SpeechT5 preset file {DEFAULT_PRESET}.npy not found in {settings.SPEECHT5_SPEAKER_DIR}; "
+                "using a fixed synthetic embedding (run scripts/export_speaker_presets.py for a real voice)"
+            )
+            v = np.random.default_rng(_DEFAULT_SEED).standard_normal(512).astype(np.float32)
+            v /= np.linalg.norm(v)  # x-vector처럼 L2 정규화
+            t = _PRESET_CACHE[DEFAULT_PRESET] = _as_speaker_tensor(v, "preset")
+    return t
+
+
+def available_presets() -> List[str]:
+    try:
+        names = sorted(f[:-4] for f in os.listdir(settings.SPEECHT5_SPEAKER_DIR) if f.endswith(".npy"))
+    except FileNotFoundError:
+        names = []
+    return names if DEFAULT_PRESET in names else [DEFAULT_PRESET] + names
+
+
+def _resolve_preset(name: str) -> torch.Tensor:
+    if name.endswith(".npy"):
+        return _load_npy_cached(name)
+    path = os.path.join(settings.SPEECHT5_SPEAKER_DIR, f"{name}.npy")
+    if os.path.exists(path):
+        return _load_npy_cached(path)
+    if name == DEFAULT_PRESET:
+        return _seeded_default()
+    raise ValueError(
+        f"SpeechT5 speaker preset not found: {path} (available: {', '.join(available_presets())}; "
+        f"create it with scripts/export_speaker_presets.py --preset {name}=<index>)"
+    )
+
+
 def _resolve_speaker_embedding(
     emb: Optional[np.ndarray] = None,
     emb_path: Optional[str] = None,
+    speaker: Optional[str] = None,
 ) -> torch.Tensor:
     """
     Return speaker embedding tensor of shape (1, 512).
-    Priority: explicit emb -> .npy path -> random.
+    Priority: explicit emb -> .npy path -> preset name (default: SPEECHT5_SPEAKER).
+    같은 화자는 요청마다 같은 임베딩을 사용한다 (랜덤 화자 없음).
     """
     if emb is not None:
-        arr = np.asarray(emb, dtype=np.float32)
-        if arr.ndim == 1:  # (512,)
-            arr = arr[None, :]
-        assert arr.shape == (1, 512), f"speaker_embedding must be (1,512), got {arr.shape}"
-        return torch.from_numpy(arr)
-
+        return _as_speaker_tensor(emb, "speaker_embedding")
     if emb_path and os.path.exists(emb_path):
-        arr = np.load(emb_path).astype(np.float32)
-        if arr.ndim == 1:
-            arr = arr[None, :]
-        assert arr.shape == (1, 512), f"speaker_embedding(.npy) must be (1,512), got {arr.shape}"
-        return torch.from_numpy(arr)
+        return _load_npy_cached(emb_path)
+    return _resolve_preset(speaker or settings.SPEECHT5_SPEAKER)
+
+# -----------------------------
+# Sentence splitting
+# -----------------------------
+_SENT_END = re.compile(r"(?<=[.!?。！？…])\s+|\n+")
+_SOFT_BREAK = re.compile(r"\s+")
+SENTENCE_GAP_S = 0.15  # 문장 사이 무음
+
 
-    # fallback: random speaker (demo)
-    return torch.randn(1, 512, dtype=torch.float32)
+def split_sentences(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """문장 단위로 나누고, max_chars보다 긴 문장은 공백 기준으로 다시 자른다."""
+    max_chars = max_chars or settings.SPEECHT5_MAX_CHARS
+    out: List[str] = []
+    for sent in _SENT_END.split(text.strip()):
+        sent = sent.strip()
+        if not sent:
+            continue
+        if len(sent) <= max_chars:
+            out.append(sent)
+            continue
+        cur = ""
+        for piece in _SOFT_BREAK.split(sent):
+            if not piece:
+                continue
+            if cur and len(cur) + 1 + len(piece) > max_chars:
+                out.append(cur)
+                cur = piece
+            else:
+                cur = f"{cur} {piece}" if cur else piece
+        if cur:
+            out.append(cur)
+    return out
 
 # -----------------------------
 # Core synthesis
 # -----------------------------
-def synthesize_wav(
+@lru_cache(maxsize=None)
+def _supports_batch(model_cls: type) -> bool:
+    """generate_speech가 attention_mask(배치 생성)를 받는지 (transformers >= 4.37)."""
+    return "attention_mask" in inspect.signature(model_cls.generate_speech).parameters
+
+def _generate_batch(processor, model, vocoder, texts: List[str], spk: torch.Tensor, device: str) -> List[np.ndarray]:
+    """문장 여러 개를 한 번의 generate_speech(+vocoder)로 합성."""
+    inputs = processor(text=texts, return_tensors="pt", padding=True)
+    ids = inputs["input_ids"].to(device)
+    mask = inputs["attention_mask"].to(device)
+    spk = spk.to(device)
+    if not _supports_batch(type(model)):
+        # transformers < 4.37: 배치 생성 미지원 -> 문장별로 생성
+        out = []
+        for i in range(len(texts)):
+            n = int(mask[i].sum())
+            w = model.generate_speech(ids[i:i + 1, :n], speaker_embeddings=spk, vocoder=vocoder)
+            out.append(w.detach().cpu().numpy().astype(np.float32))
+        return out
+
+    wavs, lengths = model.generate_speech(
+        ids,
+        speaker_embeddings=spk.expand(len(texts), -1),
+        attention_mask=mask,
+        vocoder=vocoder,
+        return_output_lengths=True,
+    )
+
+    wavs = wavs.detach().cpu().numpy().astype(np.float32)
+    if wavs.ndim == 1:
+        wavs = wavs[None, :]
+    if not isinstance(lengths, (list, tuple)):
+        lengths = [int(lengths)]
+    return [wavs[i, : int(lengths[i])] for i in range(len(texts))]
+
+
+def synthesize_pcm(
     text: str,
     speaker_embedding: Optional[np.ndarray] = None,
     speaker_embedding_path: Optional[str] = None,
     sample_rate: int = DEFAULT_SR,
-) -> bytes:
+    speaker: Optional[str] = None,
+) -> np.ndarray:
     """
-    SpeechT5 + HiFi-GAN으로 음성을 합성하여 **WAV 바이트**를 반환합니다.
-    - text: 입력 문장 (길면 여러 번 호출하여 이어붙이는 방식을 권장)
-    - speaker_embedding(_path): (1,512) 임베딩 또는 .npy 파일 (없으면 랜덤)
+    SpeechT5 + HiFi-GAN으로 음성을 합성하여 float32 mono PCM(sample_rate)을 반환합니다.
+    SPEECHT5_ENGINE=onnx면 ONNX Runtime 엔진(tts_speecht5_onnx)으로 같은 배치 생성을 수행합니다.
+    - text: 입력 문장 (문장 단위로 나눠 SPEECHT5_BATCH_SIZE개씩 배치 생성 후 이어붙임)
+    - speaker_embedding(_path): (1,512) 임베딩 또는 .npy 파일
+    - speaker: 화자 프리셋 이름 (기본 SPEECHT5_SPEAKER)
     - sample_rate: 기본 16000
     """
     if not text or not text.strip():
-        return b""
+        return np.zeros(0, dtype=np.float32)
 
-    device = _pick_device()
-    processor, model, vocoder = _load_models(device)
+    spk = _resolve_speaker_embedding(speaker_embedding, speaker_embedding_path, speaker)
+    if settings.SPEECHT5_ENGINE == "onnx":
+        from .tts_speecht5_onnx import get_engine
+        onnx_engine = get_engine()
+        spk_np = spk.numpy()
+        generate = lambda texts: onnx_engine.generate(texts, spk_np)  # noqa: E731
+    else:
+        device = _pick_device()
+        processor, model, vocoder = _load_models(device)
+        generate = lambda texts: _generate_batch(processor, model, vocoder, texts, spk, device)  # noqa: E731
 
-    inputs = processor(text=[text], return_tensors="pt")
-    spk = _resolve_speaker_embedding(speaker_embedding, speaker_embedding_path)
+    sentences = split_sentences(text)
+    # 길이가 비슷한 문장끼리 묶어 패딩 낭비를 줄이고, 합성 후 원래 순서로 되돌린다
+    order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+    bs = max(1, settings.SPEECHT5_BATCH_SIZE)
+    pieces: List[Optional[np.ndarray]] = [None] * len(sentences)
 
-    with torch.no_grad():
-        waveform = model.generate_speech(
-            inputs["input_ids"].to(device),
-            speaker_embeddings=spk.to(device),
-            vocoder=vocoder,
-        )
+    with span("tts.speecht5.generate", engine=settings.SPEECHT5_ENGINE, chars=len(text),
+              sentences=len(sentences)), torch.no_grad():
+        for b in range(0, len(order), bs):
+            idx = order[b:b + bs]
+            for i, w in zip(idx, generate([sentences[i] for i in idx])):
+                pieces[i] = w
 
-    # waveform: (T,) float32-ish tensor on device
-    wav = waveform.detach().cpu().numpy().astype(np.float32)
+    gap = np.zeros(int(sample_rate * SENTENCE_GAP_S), dtype=np.float32)
+    parts: List[np.ndarray] = []
+    for i, w in enumerate(pieces):
+        if i:
+            parts.append(gap)
+        parts.append(w)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
 
-    # write WAV to bytes
+def synthesize_wav(
+    text: str,
+    speaker_embedding: Optional[np.ndarray] = None,
+    speaker_embedding_path: Optional[str] = None,
+    sample_rate: int = DEFAULT_SR,
+    speaker: Optional[str] = None,
+) -> bytes:
+    """SpeechT5 합성 결과를 **WAV 바이트**로 반환합니다."""
+    wav = synthesize_pcm(text, speaker_embedding, speaker_embedding_path, sample_rate, speaker)
+    if wav.size == 0:
+        return b""
     buf = io.BytesIO()
     sf.write(buf, wav, samplerate=sample_rate, format="WAV")
     return buf.getvalue()
 
-def _wav_to_mp3_bytes(wav_bytes: bytes, bitrate: str = "192k") -> bytes:
+def synthesize_audio(
+    text: str,
+    audio_format: Optional[str] = None,
+    speaker_embedding: Optional[np.ndarray] = None,
+    speaker_embedding_path: Optional[str] = None,
+    sample_rate: int = DEFAULT_SR,
+    speaker: Optional[str] = None,
+) -> bytes:
     """
-    ffmpeg로 WAV 바이트를 MP3 바이트로 변환 (libmp3lame 필요).
+    SpeechT5 합성 결과를 audio_format("mp3" | "ogg_opus" | "wav", 기본 TTS_AUDIO_FORMAT)으로
+    프로세스 내에서 바로 인코딩해 반환합니다 (WAV 중간 버퍼/ffmpeg 프로세스 없음).
     """
-    p = subprocess.Popen(
-        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-f", "mp3", "-b:a", bitrate, "pipe:1"],
-        stdin=subprocess.PIPE, stdout=subprocess.PIPE
-    )
-    out, _ = p.communicate(input=wav_bytes)
-    if p.returncode != 0 or not out:
-        raise RuntimeError("ffmpeg mp3 encode failed (check ffmpeg & libmp3lame).")
-    return out
+    wav = synthesize_pcm(text, speaker_embedding, speaker_embedding_path, sample_rate, speaker)
+    if wav.size == 0:
+        return b""
+    return encode_pcm(wav, sample_rate, audio_format or settings.TTS_AUDIO_FORMAT)
 
 def synthesize_mp3(
     text: str,
     speaker_embedding: Optional[np.ndarray] = None,
     speaker_embedding_path: Optional[str] = None,
     sample_rate: int = DEFAULT_SR,
-    bitrate: str = "192k",
+    bitrate: Optional[str] = None,
+    speaker: Optional[str] = None,
 ) -> bytes:
     """
-    SpeechT5 + HiFi-GAN으로 **MP3 바이트**를 반환합니다.
-    내부적으로 WAV 생성 후 ffmpeg로 MP3로 변환합니다.
+    SpeechT5 합성 결과를 저비트레이트 **MP3 바이트**로 반환합니다.
+    - bitrate: ffmpeg 인코딩 경로의 비트레이트 (예: "192k", 기본 TTS_MP3_BITRATE).
+      libsndfile로 프로세스 내 인코딩할 때는 무시되고 TTS_COMPRESSION_LEVEL을 따릅니다.
     """
-    wav_bytes = synthesize_wav(
-        text=text,
-        speaker_embedding=speaker_embedding,
-        speaker_embedding_path=speaker_embedding_path,
-        sample_rate=sample_rate,
-    )
-    if not wav_bytes:
+    wav = synthesize_pcm(text, speaker_embedding, speaker_embedding_path, sample_rate, speaker)
+    if wav.size == 0:
         return b""
-    return _wav_to_mp3_bytes(wav_bytes, bitrate=bitrate)
+    return encode_pcm(wav, sample_rate, "mp3", bitrate=bitrate)
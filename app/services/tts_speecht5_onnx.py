@@ -0,0 +1,416 @@
+# app/services/tts_speecht5_onnx.py
+"""
+SpeechT5 + HiFi-GAN ONNX Runtime 엔진 (CPU 노드용, SPEECHT5_ENGINE=onnx).
+
+그래프 구성 (SPEECHT5_ONNX_DIR):
+  encoder.onnx       : input_ids, attention_mask -> encoder_hidden_states
+  decoder_init.onnx  : 첫 스텝 (prenet + decoder + feat_out/prob_out) -> spectrum, prob, present.*
+  decoder_step.onnx  : 이후 스텝 (past.* self/cross K/V 캐시 입력)
+  postnet.onnx       : spectrogram -> spectrogram (residual conv postnet)
+  vocoder.onnx       : spectrogram -> waveform (HiFi-GAN)
+  *.int8.onnx        : onnxruntime dynamic int8 양자화본 (MatMul/Gemm 가중치)
+
+디코딩 루프는 transformers의 _generate_speech와 같은 순서로 numpy에서 돈다
+(threshold/minlenratio/maxlenratio, 배치 내 종료 시점별 postnet 적용, 보코더 길이 계산).
+prenet의 consistent dropout은 추론 시에도 켜져 있으므로(원본 동작) 출력은 매 호출 달라진다.
+따라서 parity_check는 결정적인 그래프(encoder/postnet/vocoder)는 수치로, 전체 합성은 길이 비율로 비교한다.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPSET = 17
+THRESHOLD = 0.5
+MINLENRATIO = 0.0
+MAXLENRATIO = 20.0
+
+GRAPHS = ("encoder", "decoder_init", "decoder_step", "postnet", "vocoder")
+_QUANTIZED = ("encoder", "decoder_init", "decoder_step")   # vocoder/postnet은 conv 위주라 기본 fp32 유지
+
+
+def _graph_path(out_dir: str, name: str, int8: bool) -> str:
+    return os.path.join(out_dir, f"{name}.int8.onnx" if int8 else f"{name}.onnx")
+
+
+def is_exported(out_dir: Optional[str] = None) -> bool:
+    d = out_dir or settings.SPEECHT5_ONNX_DIR
+    return os.path.exists(os.path.join(d, "meta.json")) and all(
+        os.path.exists(_graph_path(d, g, False)) for g in GRAPHS
+    )
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def _wrappers(model, vocoder):
+    import torch
+
+    n_layers = model.config.decoder_layers
+    r = model.config.reduction_factor
+    n_mels = model.config.num_mel_bins
+
+    class Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = model.speecht5.encoder
+
+        def forward(self, input_ids, attention_mask):
+            return self.encoder(input_values=input_ids, attention_mask=attention_mask, return_dict=True).last_hidden_state
+
+    class DecoderStep(torch.nn.Module):
+        def __init__(self, with_past: bool):
+            super().__init__()
+            self.prenet = model.speecht5.decoder.prenet
+            self.decoder = model.speecht5.decoder.wrapped_decoder
+            self.feat_out = model.speech_decoder_postnet.feat_out
+            self.prob_out = model.speech_decoder_postnet.prob_out
+            self.with_past = with_past
+
+        def forward(self, output_sequence, speaker_embeddings, encoder_hidden_states, encoder_attention_mask, *past):
+            h = self.prenet(output_sequence, speaker_embeddings)[:, -1:]
+            pkv = tuple(tuple(past[4 * i: 4 * i + 4]) for i in range(n_layers)) if self.with_past else None
+            out = self.decoder(
+                hidden_states=h,
+                attention_mask=None,
+                encoder_hidden_states=encoder_hidden_states,
+                encoder_attention_mask=encoder_attention_mask,
+                past_key_values=pkv,
+                use_cache=True,
+                return_dict=True,
+            )
+            last = out.last_hidden_state.squeeze(1)
+            spectrum = self.feat_out(last).view(last.size(0), r, n_mels)
+            prob = torch.sigmoid(self.prob_out(last))
+            present = out.past_key_values
+            if hasattr(present, "to_legacy_cache"):
+                present = present.to_legacy_cache()
+            return (spectrum, prob, *[t for layer in present for t in layer])
+
+    class Postnet(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.postnet = model.speech_decoder_postnet.postnet
+
+        def forward(self, spectrogram):
+            return self.postnet(spectrogram)
+
+    class Vocoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vocoder = vocoder
+
+        def forward(self, spectrogram):
+            return self.vocoder(spectrogram)
+
+    return Encoder(), DecoderStep(False), DecoderStep(True), Postnet(), Vocoder()
+
+
+def _kv_names(prefix: str, n_layers: int) -> List[str]:
+    return [f"{prefix}.{i}.{k}" for i in range(n_layers) for k in ("self_key", "self_value", "cross_key", "cross_value")]
+
+
+def export_onnx(out_dir: Optional[str] = None, quantize: bool = True, quantize_vocoder: bool = False) -> str:
+    """eager SpeechT5/HiFi-GAN을 ONNX로 내보내고(필요 시 int8 양자화) out_dir을 반환."""
+    import torch
+    from app.services.tts_speecht5 import _load_models
+
+    out_dir = out_dir or settings.SPEECHT5_ONNX_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    processor, model, vocoder = _load_models("cpu")
+    model, vocoder = model.to("cpu").eval(), vocoder.to("cpu").eval()
+    enc_w, init_w, step_w, post_w, voc_w = _wrappers(model, vocoder)
+
+    n_layers = model.config.decoder_layers
+    n_mels = model.config.num_mel_bins
+    past_names = _kv_names("past", n_layers)
+    present_names = _kv_names("present", n_layers)
+
+    ids = processor(text=["export warmup sentence."], return_tensors="pt")["input_ids"]
+    mask = torch.ones_like(ids)
+    spk = torch.randn(1, 512)
+    t0 = time.perf_counter()
+
+    with torch.no_grad():
+        hidden = enc_w(ids, mask)
+        torch.onnx.export(
+            enc_w, (ids, mask), os.path.join(out_dir, "encoder.onnx"),
+            input_names=["input_ids", "attention_mask"], output_names=["encoder_hidden_states"],
+            dynamic_axes={"input_ids": {0: "batch", 1: "src"}, "attention_mask": {0: "batch", 1: "src"},
+                          "encoder_hidden_states": {0: "batch", 1: "src"}},
+            opset_version=OPSET,
+        )
+
+        dec_inputs = ["output_sequence", "speaker_embeddings", "encoder_hidden_states", "encoder_attention_mask"]
+        dec_axes: Dict[str, Dict[int, str]] = {
+            "output_sequence": {0: "batch", 1: "steps"},
+            "speaker_embeddings": {0: "batch"},
+            "encoder_hidden_states": {0: "batch", 1: "src"},
+            "encoder_attention_mask": {0: "batch", 1: "src"},
+            "spectrum": {0: "batch"},
+            "prob": {0: "batch"},
+        }
+        for names in (past_names, present_names):
+            for n in names:
+                dec_axes[n] = {0: "batch", 2: "src" if "cross" in n else ("past" if n.startswith("past") else "total")}
+
+        seq0 = torch.zeros(1, 1, n_mels)
+        init_out = init_w(seq0, spk, hidden, mask)
+        torch.onnx.export(
+            init_w, (seq0, spk, hidden, mask), os.path.join(out_dir, "decoder_init.onnx"),
+            input_names=dec_inputs, output_names=["spectrum", "prob", *present_names],
+            dynamic_axes={k: v for k, v in dec_axes.items() if not k.startswith("past")},
+            opset_version=OPSET,
+        )
+
+        seq1 = torch.cat([seq0, init_out[0][:, -1:, :]], dim=1)
+        past = tuple(init_out[2:])
+        torch.onnx.export(
+            step_w, (seq1, spk, hidden, mask, *past), os.path.join(out_dir, "decoder_step.onnx"),
+            input_names=dec_inputs + past_names, output_names=["spectrum", "prob", *present_names],
+            dynamic_axes=dec_axes,
+            opset_version=OPSET,
+        )
+
+        spec = torch.randn(1, 40, n_mels)
+        for name, mod in (("postnet", post_w), ("vocoder", voc_w)):
+            torch.onnx.export(
+                mod, (spec,), os.path.join(out_dir, f"{name}.onnx"),
+                input_names=["spectrogram"], output_names=["spectrogram_out" if name == "postnet" else "waveform"],
+                dynamic_axes={"spectrogram": {0: "batch", 1: "frames"},
+                              ("spectrogram_out" if name == "postnet" else "waveform"): {0: "batch", 1: "samples"}},
+                opset_version=OPSET,
+            )
+
+    processor.save_pretrained(os.path.join(out_dir, "processor"))
+    meta = {
+        "reduction_factor": model.config.reduction_factor,
+        "num_mel_bins": n_mels,
+        "decoder_layers": n_layers,
+        "past_names": past_names,
+        "opset": OPSET,
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    logger.info(f"SpeechT5 ONNX export done in {time.perf_counter() - t0:.1f}s -> {out_dir}")
+
+    if quantize:
+        quantize_graphs(out_dir, include_vocoder=quantize_vocoder)
+    return out_dir
+
+
+def quantize_graphs(out_dir: str, include_vocoder: bool = False) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    names = list(_QUANTIZED) + (["vocoder"] if include_vocoder else [])
+    for name in names:
+        src = _graph_path(out_dir, name, False)
+        dst = _graph_path(out_dir, name, True)
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8, op_types_to_quantize=["MatMul", "Gemm"])
+        logger.info(f"quantized {name}: {os.path.getsize(src) / 1e6:.1f}MB -> {os.path.getsize(dst) / 1e6:.1f}MB")
+
+
+# -----------------------------
+# Runtime
+# -----------------------------
+class OnnxSpeechT5:
+    """tts_speecht5._generate_batch와 같은 입출력: 문장 리스트 -> 문장별 float32 PCM."""
+
+    def __init__(self, model_dir: Optional[str] = None, int8: Optional[bool] = None, threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import SpeechT5Processor
+
+        self.model_dir = model_dir or settings.SPEECHT5_ONNX_DIR
+        with open(os.path.join(self.model_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.r = int(meta["reduction_factor"])
+        self.n_mels = int(meta["num_mel_bins"])
+        self.past_names: List[str] = list(meta["past_names"])
+        self.int8 = settings.SPEECHT5_ONNX_INT8 if int8 is None else bool(int8)
+        self.threads = int(threads or settings.SPEECHT5_ONNX_THREADS)
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = self.threads
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        def load(name: str):
+            path = _graph_path(self.model_dir, name, True)
+            if not (self.int8 and os.path.exists(path)):
+                path = _graph_path(self.model_dir, name, False)
+            return ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+        self.encoder = load("encoder")
+        self.decoder_init = load("decoder_init")
+        self.decoder_step = load("decoder_step")
+        self.postnet = load("postnet")
+        self.vocoder = load("vocoder")
+        self.processor = SpeechT5Processor.from_pretrained(os.path.join(self.model_dir, "processor"))
+
+    def encode(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.encoder.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+    def generate(self, texts: Sequence[str], speaker_embedding: np.ndarray) -> List[np.ndarray]:
+        inputs = self.processor(text=list(texts), return_tensors="np", padding=True)
+        ids = inputs["input_ids"].astype(np.int64)
+        mask = inputs["attention_mask"].astype(np.int64)
+        bsz = ids.shape[0]
+        hidden = self.encode(ids, mask)
+        spk = np.repeat(np.asarray(speaker_embedding, dtype=np.float32).reshape(1, -1), bsz, axis=0)
+
+        maxlen = int(hidden.shape[1] * MAXLENRATIO / self.r)
+        minlen = int(hidden.shape[1] * MINLENRATIO / self.r)
+        seq = np.zeros((bsz, 1, self.n_mels), dtype=np.float32)
+        spectra: List[np.ndarray] = []
+        done: Dict[int, np.ndarray] = {}
+        past: Optional[List[np.ndarray]] = None
+        idx = 0
+        while True:
+            idx += 1
+            feeds: Dict[str, Any] = {
+                "output_sequence": seq,
+                "speaker_embeddings": spk,
+                "encoder_hidden_states": hidden,
+                "encoder_attention_mask": mask,
+            }
+            if past is None:
+                outs = self.decoder_init.run(None, feeds)
+            else:
+                feeds.update(zip(self.past_names, past))
+                outs = self.decoder_step.run(None, feeds)
+            spectrum, prob, past = outs[0], outs[1], outs[2:]
+            spectra.append(spectrum)
+            seq = np.concatenate([seq, spectrum[:, -1:, :]], axis=1)
+            if idx < minlen:
+                continue
+            meet = prob.sum(axis=-1) >= THRESHOLD
+            if idx >= maxlen:
+                meet[:] = True
+            new = [int(i) for i in np.nonzero(meet)[0] if int(i) not in done]
+            if new:
+                stacked = np.stack(spectra, axis=1).reshape(bsz, -1, self.n_mels)
+                stacked = self.postnet.run(None, {"spectrogram": stacked})[0]
+                for i in new:
+                    done[i] = stacked[i]
+            if len(done) >= bsz:
+                break
+
+        specs = [done[i] for i in range(bsz)]
+        lengths = [s.shape[0] for s in specs]
+        frames = max(lengths)
+        padded = np.zeros((bsz, frames, self.n_mels), dtype=np.float32)
+        for i, s in enumerate(specs):
+            padded[i, : s.shape[0]] = s
+        wav = self.vocoder.run(None, {"spectrogram": padded})[0]
+        if wav.ndim == 1:
+            wav = wav[None, :]
+        hop = wav.shape[1] // frames
+        return [np.ascontiguousarray(wav[i, : hop * lengths[i]], dtype=np.float32) for i in range(bsz)]
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> OnnxSpeechT5:
+    """ONNX 엔진 싱글톤. 내보낸 그래프가 없으면 처음 한 번 export(+양자화)한다."""
+    if not is_exported():
+        logger.info(f"SpeechT5 ONNX graphs not found in {settings.SPEECHT5_ONNX_DIR}; exporting now")
+        export_onnx(quantize=settings.SPEECHT5_ONNX_INT8)
+    return OnnxSpeechT5()
+
+
+# -----------------------------
+# Parity check (eager vs ONNX)
+# -----------------------------
+def _snr_db(ref: np.ndarray, got: np.ndarray) -> float:
+    n = min(len(ref), len(got))
+    ref, got = ref[:n].astype(np.float64), got[:n].astype(np.float64)
+    noise = float(np.sum((ref - got) ** 2))
+    return float("inf") if noise == 0.0 else 10.0 * np.log10(float(np.sum(ref ** 2)) / noise)
+
+
+def parity_check(
+    texts: Sequence[str],
+    speaker: Optional[str] = None,
+    engine: Optional[OnnxSpeechT5] = None,
+    min_encoder_cos: float = 0.98,
+    min_vocoder_snr_db: float = 25.0,
+    duration_ratio: Sequence[float] = (0.75, 1.33),
+) -> Dict[str, Any]:
+    """
+    eager(PyTorch fp32) 경로와 ONNX 경로 비교.
+      - encoder  : 유효 토큰별 코사인 유사도 최소값
+      - postnet  : 같은 멜 입력에 대한 최대 절대 오차
+      - vocoder  : 같은 멜 입력에 대한 파형 SNR(dB)
+      - end2end  : 문장별 합성 길이 비율(ONNX/eager)과 CPU RTF
+    """
+    import torch
+    from app.services import tts_speecht5 as t5
+
+    eng = engine or get_engine()
+    processor, model, vocoder = t5._load_models("cpu")
+    spk = t5._resolve_speaker_embedding(speaker=speaker)
+    sr = t5.DEFAULT_SR
+    report: Dict[str, Any] = {"int8": eng.int8, "threads": eng.threads, "texts": len(texts)}
+
+    with torch.no_grad():
+        enc = processor(text=list(texts), return_tensors="pt", padding=True)
+        ref_h = model.speecht5.encoder(
+            input_values=enc["input_ids"], attention_mask=enc["attention_mask"], return_dict=True
+        ).last_hidden_state.numpy()
+        got_h = eng.encode(enc["input_ids"].numpy().astype(np.int64), enc["attention_mask"].numpy().astype(np.int64))
+        valid = enc["attention_mask"].numpy().astype(bool)
+        a, b = ref_h[valid], got_h[valid]
+        cos = np.sum(a * b, axis=-1) / (np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1) + 1e-9)
+        report["encoder_min_cos"] = round(float(cos.min()), 5)
+
+        # 결정적 그래프: eager 합성에서 얻은 멜을 공통 입력으로 사용
+        mel = model.generate_speech(enc["input_ids"][:1, : int(valid[0].sum())], speaker_embeddings=spk)
+        mel_np = mel.numpy()[None].astype(np.float32)
+        ref_post = model.speech_decoder_postnet.postnet(mel[None]).numpy()
+        got_post = eng.postnet.run(None, {"spectrogram": mel_np})[0]
+        report["postnet_max_abs"] = round(float(np.max(np.abs(ref_post - got_post))), 6)
+        ref_wav = vocoder(mel[None]).numpy().reshape(-1)
+        got_wav = eng.vocoder.run(None, {"spectrogram": mel_np})[0].reshape(-1)
+        report["vocoder_snr_db"] = round(_snr_db(ref_wav, got_wav), 2)
+
+    rows = []
+    eager_s = onnx_s = eager_audio = onnx_audio = 0.0
+    for text in texts:
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            w_ref = model.generate_speech(processor(text=text, return_tensors="pt")["input_ids"],
+                                          speaker_embeddings=spk, vocoder=vocoder).numpy()
+        t1 = time.perf_counter()
+        w_got = eng.generate([text], spk.numpy())[0]
+        t2 = time.perf_counter()
+        eager_s += t1 - t0
+        onnx_s += t2 - t1
+        eager_audio += len(w_ref) / sr
+        onnx_audio += len(w_got) / sr
+        rows.append({"chars": len(text), "ratio": round(len(w_got) / max(1, len(w_ref)), 3)})
+
+    ratios = [r["ratio"] for r in rows]
+    report["duration_ratios"] = ratios
+    report["eager_rtf"] = round(eager_s / eager_audio, 4) if eager_audio else None
+    report["onnx_rtf"] = round(onnx_s / onnx_audio, 4) if onnx_audio else None
+    report["speedup"] = round(report["eager_rtf"] / report["onnx_rtf"], 2) if report["eager_rtf"] and report["onnx_rtf"] else None
+
+    lo, hi = duration_ratio
+    report["checks"] = {
+        "encoder": report["encoder_min_cos"] >= min_encoder_cos,
+        "postnet": report["postnet_max_abs"] <= 1e-2,
+        "vocoder": report["vocoder_snr_db"] >= min_vocoder_snr_db,
+        "duration": all(lo <= r <= hi for r in ratios),
+    }
+    report["ok"] = all(report["checks"].values())
+    return report
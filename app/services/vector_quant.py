@@ -0,0 +1,191 @@
+# app/services/vector_quant.py
+"""
+스냅샷 임베딩 양자화 (int8 스칼라 / product quantization).
+
+근사 점수로 후보를 넉넉히 고른 뒤(limit × SNAPSHOT_RESCORE) 원본 float32 행으로
+정확히 재채점하는 용도다. 자주 읽는 것은 양자화 코드뿐이고 float32 행렬은 후보 행만
+페이지 인 되므로, 상주 메모리는 대략 코드 크기로 줄어든다.
+
+  int8  quant_int8.npy        int8 (N, D)      행별 대칭 스케일 (|x|max → 127)
+        quant_int8_scale.npy  float32 (N,)
+  pq    quant_pq_codes.npy    uint8 (M, N)     부분공간별 centroid 번호 (열 방향 연속)
+        quant_pq_books.npy    float32 (M, 256, D/M)
+
+로드는 np.load(mmap_mode="r")뿐이며 파싱이 없다.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+QUANT_KINDS = ("none", "int8", "pq")
+
+# int8 → float32 변환을 캐시에 들어가는 블록 단위로 (한 번에 변환하면 N×D float32 임시 배열이 생김)
+_INT8_BLOCK_ROWS = 256
+_PQ_CENTROIDS = 256
+
+
+def _save_npy_atomic(path: str, arr: np.ndarray) -> None:
+    tmp = path + ".tmp.npy"
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+class Int8Codes:
+    """행별 스케일 int8 스칼라 양자화. 점수 ≈ (codes · q) × scale."""
+
+    kind = "int8"
+    CODES_FILE = "quant_int8.npy"
+    SCALE_FILE = "quant_int8_scale.npy"
+
+    def __init__(self, codes: np.ndarray, scale: np.ndarray):
+        self.codes = codes
+        self.scale = scale
+
+    @classmethod
+    def build(cls, emb: np.ndarray) -> "Int8Codes":
+        n, d = emb.shape
+        codes = np.empty((n, d), dtype=np.int8)
+        scale = np.empty(n, dtype=np.float32)
+        for a in range(0, n, 4096):
+            blk = np.asarray(emb[a:a + 4096], dtype=np.float32)
+            s = np.abs(blk).max(axis=1) / 127.0
+            s[s == 0] = 1.0
+            codes[a:a + len(blk)] = np.clip(np.rint(blk / s[:, None]), -127, 127)
+            scale[a:a + len(blk)] = s
+        return cls(codes, scale)
+
+    def save(self, out_dir: str) -> None:
+        _save_npy_atomic(os.path.join(out_dir, self.CODES_FILE), np.ascontiguousarray(self.codes))
+        _save_npy_atomic(os.path.join(out_dir, self.SCALE_FILE), np.ascontiguousarray(self.scale))
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> Optional["Int8Codes"]:
+        paths = [os.path.join(snapshot_dir, f) for f in (cls.CODES_FILE, cls.SCALE_FILE)]
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        return cls(np.load(paths[0], mmap_mode="r"), np.load(paths[1], mmap_mode="r"))
+
+    def scores(self, q: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if rows is not None:
+            return (self.codes[rows].astype(np.float32) @ q) * self.scale[rows]
+        n = self.codes.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        # 블록 버퍼는 호출마다 따로 (검색은 워커 스레드에서 동시에 돈다)
+        buf = np.empty((_INT8_BLOCK_ROWS, self.codes.shape[1]), dtype=np.float32)
+        for a in range(0, n, _INT8_BLOCK_ROWS):
+            b = min(n, a + _INT8_BLOCK_ROWS)
+            blk = buf[: b - a]
+            np.copyto(blk, self.codes[a:b], casting="unsafe")
+            np.dot(blk, q, out=out[a:b])
+        out *= self.scale
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scale.nbytes)
+
+
+class PQCodes:
+    """
+    Product quantization: D차원을 M개 부분공간으로 나눠 각각 256개 centroid(k-means) 중 하나로 부호화.
+    점수 = Σ_m LUT[m, code_m] (LUT[m] = 부분공간 centroid · 쿼리 부분벡터).
+    """
+
+    kind = "pq"
+    CODES_FILE = "quant_pq_codes.npy"
+    BOOKS_FILE = "quant_pq_books.npy"
+
+    def __init__(self, codes: np.ndarray, books: np.ndarray):
+        self.codes = codes   # (M, N) uint8
+        self.books = books   # (M, 256, ds)
+        self.m, _, self.ds = books.shape
+
+    @classmethod
+    def build(cls, emb: np.ndarray, m: int = 64, iters: int = 12, sample: int = 20000, seed: int = 0) -> "PQCodes":
+        n, d = emb.shape
+        if d % m:
+            raise ValueError(f"PQ subspaces ({m}) must divide the embedding dim ({d})")
+        ds = d // m
+        rng = np.random.default_rng(seed)
+        train_idx = np.sort(rng.choice(n, size=min(n, sample), replace=False))
+        train = np.asarray(emb[train_idx], dtype=np.float32)
+        k = min(_PQ_CENTROIDS, len(train))
+
+        books = np.zeros((m, _PQ_CENTROIDS, ds), dtype=np.float32)
+        for j in range(m):
+            books[j, :k] = _kmeans(train[:, j * ds:(j + 1) * ds], k, iters, rng)
+
+        codes = np.empty((m, n), dtype=np.uint8)
+        for a in range(0, n, 4096):
+            blk = np.asarray(emb[a:a + 4096], dtype=np.float32)
+            for j in range(m):
+                codes[j, a:a + len(blk)] = _assign(blk[:, j * ds:(j + 1) * ds], books[j, :k])
+        return cls(codes, books)
+
+    def save(self, out_dir: str) -> None:
+        _save_npy_atomic(os.path.join(out_dir, self.CODES_FILE), np.ascontiguousarray(self.codes))
+        _save_npy_atomic(os.path.join(out_dir, self.BOOKS_FILE), np.ascontiguousarray(self.books))
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> Optional["PQCodes"]:
+        paths = [os.path.join(snapshot_dir, f) for f in (cls.CODES_FILE, cls.BOOKS_FILE)]
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        return cls(np.load(paths[0], mmap_mode="r"), np.load(paths[1], mmap_mode="r"))
+
+    def scores(self, q: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        lut = np.einsum("mkd,md->mk", self.books, q.reshape(self.m, self.ds))
+        codes = self.codes if rows is None else self.codes[:, rows]
+        out = np.zeros(codes.shape[1], dtype=np.float32)
+        # 부분공간마다 연속된 코드 행 하나를 take → N×M 임시 배열 없이 누적
+        for j in range(self.m):
+            out += lut[j].take(codes[j])
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.books.nbytes)
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # argmin ||x - c||² = argmax (x·c - ||c||²/2)
+    return np.argmax(x @ centroids.T - 0.5 * (centroids ** 2).sum(axis=1), axis=1)
+
+
+def _kmeans(x: np.ndarray, k: int, iters: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=x[:, j], minlength=k) for j in range(x.shape[1])], axis=1)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # 빈 클러스터는 임의의 점으로 다시 시작
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), size=int(empty.sum()), replace=False)]
+    return centroids
+
+
+Quantizer = Union[Int8Codes, PQCodes]
+_CLASSES = {"int8": Int8Codes, "pq": PQCodes}
+
+
+def build_quantizer(kind: str, emb: np.ndarray, **kwargs) -> Optional[Quantizer]:
+    """kind="none"이면 None."""
+    if kind not in QUANT_KINDS:
+        raise ValueError(f"unknown quantization: {kind} (expected one of {QUANT_KINDS})")
+    if kind == "none":
+        return None
+    return _CLASSES[kind].build(emb, **kwargs)
+
+
+def load_quantizer(snapshot_dir: str, kind: str) -> Optional[Quantizer]:
+    """kind="none"이거나 파일이 없으면 None."""
+    if kind not in QUANT_KINDS:
+        raise ValueError(f"unknown quantization: {kind} (expected one of {QUANT_KINDS})")
+    if kind == "none":
+        return None
+    return _CLASSES[kind].load(snapshot_dir)
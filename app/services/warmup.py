@@ -0,0 +1,140 @@
+# app/services/warmup.py
+"""
+서버 기동 시 워밍업.
+
+모델 객체 생성만으로는 첫 요청이 치르는 비용(CTranslate2/CUDA 커널 준비, PolicySearch의
+CSV/임베더/Qdrant 로드, SpeechT5 모델 로드, Edge TTS 첫 핸드셰이크)이 사라지지 않으므로,
+실제 요청과 같은 경로로 합성 입력을 한 번씩 흘려보낸다.
+
+- run_warmup(...) : 동기 함수. 단계별 {ok, seconds, error} 리포트를 반환
+- 서버는 이를 백그라운드 스레드에서 실행하고, 끝나면 /readyz를 200으로 전환한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALL_STAGES = ("fw", "ow", "policy", "speecht5", "edge_tts")
+
+_WARMUP_QUERY = "청년 주거 지원 정책 알려줘"
+_WARMUP_TTS_KO = "안녕하세요. 복지 정책 안내 서비스입니다."
+_WARMUP_TTS_EN = "Hello, this is a warmup sentence."
+
+
+def _synthetic_wav(seconds: float = 2.0, sr: int = 16000) -> np.ndarray:
+    """디코더까지 실제로 돌도록 무음이 아닌 톤+노이즈 신호."""
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    rng = np.random.default_rng(0)
+    wav = 0.1 * np.sin(2 * np.pi * 220.0 * t) + 0.01 * rng.standard_normal(t.shape[0])
+    return wav.astype(np.float32)
+
+
+def parse_stages(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return list(ALL_STAGES)
+    stages = [s.strip() for s in raw.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in ALL_STAGES]
+    if unknown:
+        logger.warning(f"unknown warmup stages ignored: {unknown}")
+    return [s for s in stages if s in ALL_STAGES]
+
+
+def _warm_asr(asr) -> None:
+    wav = _synthetic_wav()
+    # 첫 호출: 커널/그래프 준비, 두 번째: 캐시된 상태 확인용
+    asr.transcribe(wav, language=settings.LANGUAGE)
+    asr.transcribe(wav, language=settings.LANGUAGE)
+
+
+def _warm_policy() -> None:
+    # 라우터의 lazy singleton을 그대로 채워야 첫 요청이 재사용한다
+    from app.routers import pipeline
+    pipeline._policy().search(_WARMUP_QUERY, topk=settings.TOPK_DEFAULT)
+
+
+def _warm_speecht5() -> None:
+    from app.routers import pipeline
+    pipeline.speecht5_synthesize(_WARMUP_TTS_EN)
+
+
+def _warm_edge_tts(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    from app.services import edge_tts
+
+    async def _run():
+        # 요청 경로와 같은 공유 클라이언트를 데워 첫 요청이 풀의 WebSocket을 재사용한다.
+        # fallback은 이 호출에서만 끈다 (SpeechT5로 대신 성공하면 Edge가 죽어 있어도 ok로 보이므로)
+        await asyncio.wait_for(
+            edge_tts.get_client().synthesize(_WARMUP_TTS_KO, voice=settings.TTS_VOICE_DEFAULT, fallback=None),
+            timeout=settings.WARMUP_EDGE_TIMEOUT_S,
+        )
+
+    if loop is not None:
+        # 연결 풀은 이벤트 루프에 묶이므로 서버 루프에서 실행한다 (워밍업 스레드는 결과만 기다림)
+        asyncio.run_coroutine_threadsafe(_run(), loop).result()
+        return
+
+    async def _run_standalone():
+        # 서버 밖(스크립트)에서는 임시 루프가 끝나면 연결도 쓸 수 없으므로 닫는다
+        try:
+            await _run()
+        finally:
+            await edge_tts.get_client().close()
+
+    asyncio.run(_run_standalone())
+
+
+def run_warmup(
+    fw=None,
+    ow=None,
+    stages: Optional[Iterable[str]] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    engines: Optional[Mapping[str, Any]] = None,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    설정된 단계를 순서대로 실행한다. 한 단계의 실패가 다음 단계를 막지 않는다.
+    on_stage(name, result)는 단계가 끝날 때마다 호출된다 (진행 상황 노출용).
+    engines(lazy 레지스트리)를 주면 fw/ow 단계에서 엔진 빌드 시간까지 포함해 채운다.
+    loop(서버 이벤트 루프)를 주면 Edge TTS 단계를 그 루프에서 돌려 공유 연결 풀을 채운다.
+    """
+    def _asr_stage(name: str, eng) -> Optional[Callable[[], None]]:
+        if eng is not None:
+            return lambda: _warm_asr(eng)
+        if engines is not None and name in engines:
+            return lambda: _warm_asr(engines[name])
+        return None
+
+    runners: Dict[str, Callable[[], None]] = {
+        "fw": _asr_stage("fw", fw),
+        "ow": _asr_stage("ow", ow),
+        "policy": _warm_policy,
+        "speecht5": _warm_speecht5,
+        "edge_tts": lambda: _warm_edge_tts(loop),
+    }
+    report: Dict[str, Dict[str, Any]] = {}
+    for name in (stages if stages is not None else ALL_STAGES):
+        fn = runners.get(name)
+        if fn is None:
+            continue
+        t0 = time.perf_counter()
+        try:
+            fn()
+            res = {"ok": True, "seconds": round(time.perf_counter() - t0, 3), "error": None}
+        except Exception as e:
+            res = {"ok": False, "seconds": round(time.perf_counter() - t0, 3), "error": f"{type(e).__name__}: {e}"}
+        report[name] = res
+        if res["ok"]:
+            logger.info(f"warmup {name}: {res['seconds']:.2f}s")
+        else:
+            logger.warning(f"warmup {name} failed after {res['seconds']:.2f}s: {res['error']}")
+        if on_stage:
+            on_stage(name, res)
+    return report
@@ -1,78 +1,218 @@
 """
 ASR 서비스 로깅 설정
 모든 로그에 시간 정보를 포함하도록 설정
+
+요청 경로에서 로그 I/O가 이벤트 루프를 막지 않도록 로거에는 QueueHandler만 붙이고,
+실제 출력(stdout / 크기 기준 rotating 파일)은 백그라운드 QueueListener 스레드가 담당한다.
+fork된 자식 프로세스는 os.register_at_fork로 자체 리스너를 다시 띄운다. 단 serve_multiproc처럼
+여러 자식이 같은 파일에 쓰면 프로세스마다 따로 rotation해서 레코드가 섞이거나 사라지므로, fork 전에
+share_with_forked_children()을 부르면 자식은 multiprocessing 큐로 레코드를 부모에게 보내고
+부모의 리스너만 파일에 쓴다 (writer가 하나라 rotation이 안전).
+
+환경 변수:
+  LOG_LEVEL         : 기본 INFO
+  LOG_JSON          : 1이면 JSON lines 출력 (ts, level, logger, msg[, exc])
+  LOG_QUEUE         : 0이면 큐 없이 동기 출력 (디버깅용)
+  LOG_FILE          : 로그 파일 경로 (기본 $ASR_LOG_DIR/asr_service.log, 빈 값이면 파일 출력 안 함)
+  LOG_MAX_BYTES     : 파일 rotation 크기 (기본 50MB)
+  LOG_BACKUP_COUNT  : 보존할 rotation 파일 수 (기본 5)
 """
 
+import atexit
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+# 한국 시간 (UTC+9) - 레코드마다 만들지 않도록 모듈 단위로 한 번만
+KST = timezone(timedelta(hours=9))
+
+LOG_FORMAT = '%(timestamp)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_child_queue = None      # share_with_forked_children(): 자식 → 부모 multiprocessing 큐
+_child_listener = None   # 부모에서 _child_queue를 읽어 같은 출력 핸들러로 쓰는 리스너
+_ts_cache = {}
+
+
+def _kst_seconds(created: float) -> str:
+    """record.created의 초 단위 KST 문자열 (같은 초는 캐시 재사용)."""
+    sec = int(created)
+    s = _ts_cache.get(sec)
+    if s is None:
+        _ts_cache.clear()
+        s = _ts_cache[sec] = datetime.fromtimestamp(sec, KST).strftime('%Y-%m-%d %H:%M:%S')
+    return s
+
+
 class TimestampFormatter(logging.Formatter):
-    """시간 정보를 포함한 커스텀 포매터 (한국 시간)"""
-    
+    """시간 정보를 포함한 커스텀 포매터 (한국 시간, 레코드 생성 시각 기준)"""
+
     def format(self, record):
-        # 한국 시간으로 변환 (UTC+9)
-        kst = timezone(timedelta(hours=9))
-        kst_time = datetime.now(kst)
-        record.timestamp = kst_time.strftime('%Y-%m-%d %H:%M:%S KST')
+        record.timestamp = _kst_seconds(record.created) + ' KST'
         return super().format(record)
 
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON (로그 수집기용)"""
+
+    def format(self, record):
+        doc = {
+            "ts": f"{_kst_seconds(record.created)}.{int(record.msecs):03d}+09:00",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, ensure_ascii=False)
+
+
+def _make_formatter() -> logging.Formatter:
+    if os.getenv("LOG_JSON", "0") == "1":
+        return JsonFormatter()
+    return TimestampFormatter(LOG_FORMAT)
+
+
+def _output_handlers(level: int):
+    """실제 출력 핸들러: stdout + (선택) 크기 기준 rotating 파일"""
+    fmt = _make_formatter()
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(fmt)
+    handlers = [console_handler]
+
+    log_dir = os.getenv("ASR_LOG_DIR", "/root/asr-service/logs")
+    log_file = os.getenv("LOG_FILE", str(Path(log_dir) / "asr_service.log"))
+    if log_file:
+        try:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+                backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+                encoding="utf-8",
+            )
+            file_handler.setLevel(level)
+            file_handler.setFormatter(fmt)
+            handlers.append(file_handler)
+        except Exception:
+            # 파일 로깅 실패 시 콘솔만 사용
+            pass
+    return handlers
+
+
+def stop_logging():
+    """큐에 남은 레코드를 모두 출력하고 리스너 스레드를 멈춘다 (프로세스 종료 시 자동 호출)."""
+    global _listener, _child_listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _child_listener is not None:
+        _child_listener.stop()
+        _child_listener = None
+    elif _child_queue is not None:
+        # 자식: 부모에게 아직 못 보낸 레코드를 보낸다 (os._exit 전에 호출)
+        _child_queue.close()
+        _child_queue.join_thread()
+
+
+def _root_queue_handlers(q):
+    return [h for h in logging.getLogger().handlers
+            if isinstance(h, logging.handlers.QueueHandler) and h.queue is q]
+
+
+def share_with_forked_children():
+    """
+    이후 fork되는 자식의 로그를 이 프로세스의 출력 핸들러로 모은다 (fork 전에 부모에서 호출).
+    부모 자신은 기존 큐를 그대로 쓴다 — 부모가 multiprocessing 큐에 put하면 feeder 스레드 상태가
+    fork로 복사되어 자식의 put이 전달되지 않으므로 자식 전용 큐를 따로 둔다.
+    """
+    global _child_queue, _child_listener
+    if _listener is None or _child_queue is not None:
+        return  # LOG_QUEUE=0 (동기 출력) 또는 이미 설정됨
+    import multiprocessing
+    _child_queue = multiprocessing.get_context("fork").Queue()
+    _child_listener = logging.handlers.QueueListener(
+        _child_queue, *_listener.handlers, respect_handler_level=_listener.respect_handler_level,
+    )
+    _child_listener.start()
+
+
+def _restart_listener_in_child():
+    """
+    fork된 자식에는 리스너 스레드가 없어 큐에 쌓이기만 한다 (serve_multiproc은 app.server import 후 fork).
+    자식은 새 큐 + 새 리스너로 갈아탄다. fork 시점에 큐에 남아 있던 레코드는 부모가 출력하므로 버린다.
+    """
+    global _listener, _child_listener
+    if _listener is None:
+        return
+    old = _listener
+    if _child_queue is not None:
+        # 부모가 파일을 쓰는 유일한 writer → 자식은 리스너 없이 부모에게 보내기만 한다
+        for handler in _root_queue_handlers(old.queue):
+            handler.queue = _child_queue
+        _listener = _child_listener = None
+        return
+    new_queue = queue.SimpleQueue()
+    for handler in _root_queue_handlers(old.queue):
+        handler.queue = new_queue
+    _listener = logging.handlers.QueueListener(
+        new_queue, *old.handlers, respect_handler_level=old.respect_handler_level,
+    )
+    _listener.start()
+
+
 def setup_comprehensive_logging():
     """포괄적인 로깅 설정"""
-    
-    # 로그 포맷 정의
-    log_format = '%(timestamp)s - %(name)s - %(levelname)s - %(message)s'
-    
+    global _listener
+    stop_logging()
+
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    outputs = _output_handlers(level)
+
+    if os.getenv("LOG_QUEUE", "1") == "1":
+        # 로거 → QueueHandler(put만) → 리스너 스레드 → stdout/파일
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *outputs, respect_handler_level=True)
+        _listener.start()
+        entry_handlers = [logging.handlers.QueueHandler(log_queue)]
+    else:
+        entry_handlers = outputs
+
     # 루트 로거 설정
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    
+    root_logger.setLevel(level)
+
     # 기존 핸들러 제거
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
-    # 콘솔 핸들러 추가
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(TimestampFormatter(log_format))
-    root_logger.addHandler(console_handler)
-    
-    # 파일 핸들러 추가 (선택적)
-    try:
-        log_dir = Path("/root/asr-service/logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_dir / "asr_service.log")
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(TimestampFormatter(log_format))
-        root_logger.addHandler(file_handler)
-    except Exception as e:
-        # 파일 로깅 실패 시 콘솔만 사용
-        pass
-    
-    # uvicorn 관련 로거들 설정
+    for handler in entry_handlers:
+        root_logger.addHandler(handler)
+
+    # uvicorn 관련 로거들 설정: 자체 핸들러를 떼고 루트(큐)로 전달
     uvicorn_loggers = [
         'uvicorn',
-        'uvicorn.access', 
+        'uvicorn.access',
         'uvicorn.error',
         'uvicorn.asgi',
         'fastapi'
     ]
-    
+
     for logger_name in uvicorn_loggers:
         logger = logging.getLogger(logger_name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(level)
         # 기존 핸들러 제거
         for handler in logger.handlers[:]:
             logger.removeHandler(handler)
-        # 새로운 핸들러 추가
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(TimestampFormatter(log_format))
-        logger.addHandler(handler)
-        logger.propagate = False  # 중복 방지
-    
+        logger.propagate = True
+
     # ASR 서비스 관련 로거들 설정
     service_loggers = [
         'app.services.asr_fw',
@@ -82,12 +222,12 @@ def setup_comprehensive_logging():
         'app.services.audio_io',
         'app.routers.pipeline'
     ]
-    
+
     for logger_name in service_loggers:
         logger = logging.getLogger(logger_name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(level)
         logger.propagate = True
-    
+
     # 외부 라이브러리 로거들 설정 (에러만 표시)
     external_loggers = [
         'httpx',
@@ -99,7 +239,7 @@ def setup_comprehensive_logging():
         'faster_whisper',
         'whisper'
     ]
-    
+
     for logger_name in external_loggers:
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.WARNING)  # 에러만 표시
@@ -111,3 +251,6 @@ def get_logger(name: str) -> logging.Logger:
 
 # 로깅 설정 실행
 setup_comprehensive_logging()
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
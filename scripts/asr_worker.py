@@ -0,0 +1,156 @@
+"""
+독립 ASR inference 워커 (app.services.asr_remote 프로토콜 서버).
+
+API 서버와 분리된 추론 박스에서 실행하고, API 서버에는
+ASR_BACKEND=remote, ASR_REMOTE_WORKERS=host1:9001,host2:9001 처럼 지정한다.
+
+예:
+    PYTHONPATH=. python scripts/asr_worker.py --port 9001 --engines fw
+    PYTHONPATH=. python scripts/asr_worker.py --unix /tmp/asr-0.sock --engines fw,ow --concurrency 2
+
+    # GPU 없이 로컬에서 워커 여러 개로 라우팅/풀링 확인
+    for p in 9001 9002 9003; do PYTHONPATH=. python scripts/asr_worker.py --port $p --stub & done
+    ASR_BACKEND=remote ASR_REMOTE_WORKERS=127.0.0.1:9001,127.0.0.1:9002,127.0.0.1:9003 uvicorn app.server:app
+"""
+import argparse
+import logging
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Dict
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.asr_remote import recv_frame, send_frame
+
+logger = logging.getLogger("asr_worker")
+
+
+class WorkerState:
+    def __init__(self, engines: Dict[str, Any], concurrency: int):
+        self.engines = engines
+        self.sem = threading.Semaphore(max(1, concurrency))
+        self.inflight = 0
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> None:
+        with self._lock:
+            self.inflight += 1
+
+    def leave(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self.served += 1
+
+
+STATE: WorkerState = None  # type: ignore[assignment]
+
+
+def load_engines(names, stub: bool) -> Dict[str, Any]:
+    engines: Dict[str, Any] = {}
+    for name in names:
+        if stub:
+            from app.services.stub_engines import StubASR
+            engines[name] = StubASR()
+        elif name == "fw":
+            from app.services.asr_fw import FasterWhisperASR
+            engines[name] = FasterWhisperASR()
+        elif name == "fw_small":
+            from app.services.asr_fw import FasterWhisperASR
+            engines[name] = FasterWhisperASR(model_dir=settings.FW_SMALL_MODEL_DIR, model_name=settings.FW_SMALL_MODEL)
+        elif name == "ow":
+            from app.services.asr_ow import OpenAIWhisperASR
+            engines[name] = OpenAIWhisperASR()
+        else:
+            raise ValueError(f"unknown engine: {name}")
+    return engines
+
+
+class Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        sock: socket.socket = self.request
+        if sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                header, payload = recv_frame(sock)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                send_frame(sock, self._dispatch(header, payload))
+            except (ConnectionError, OSError):
+                return
+
+    def _dispatch(self, header: Dict[str, Any], payload: bytearray) -> Dict[str, Any]:
+        op = header.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "engines": list(STATE.engines),
+                    "inflight": STATE.inflight, "served": STATE.served}
+        if op != "transcribe":
+            return {"ok": False, "error": f"unknown op: {op}", "inflight": STATE.inflight}
+
+        engine = STATE.engines.get(header.get("engine", "fw"))
+        if engine is None:
+            return {"ok": False, "error": f"engine not loaded: {header.get('engine')}", "inflight": STATE.inflight}
+        # 수신 버퍼를 그대로 float32 view로 사용 (추가 복사 없음)
+        wav = np.frombuffer(payload, dtype="<f4")
+        STATE.enter()
+        try:
+            with STATE.sem:
+                text, meta = engine.transcribe(
+                    wav, language=header.get("language"), beam_size=header.get("beam_size"),
+                    domain=header.get("domain"),
+                )
+            return {"ok": True, "text": text, "meta": meta, "inflight": STATE.inflight - 1}
+        except Exception as e:
+            logger.exception("transcribe failed")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}", "inflight": STATE.inflight - 1}
+        finally:
+            STATE.leave()
+
+
+class TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    global STATE
+    ap = argparse.ArgumentParser(description="Standalone ASR inference worker")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=9001)
+    ap.add_argument("--unix", default=None, help="TCP 대신 Unix 소켓 경로")
+    ap.add_argument("--engines", default="fw", help="미리 로드할 엔진 (쉼표 구분: fw,fw_small,ow)")
+    ap.add_argument("--concurrency", type=int, default=1, help="동시에 모델을 실행할 요청 수")
+    ap.add_argument("--stub", action="store_true", help="StubASR 사용 (GPU/모델 없이 테스트)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    names = [e.strip() for e in args.engines.split(",") if e.strip()]
+    STATE = WorkerState(load_engines(names, args.stub), args.concurrency)
+
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        server = UnixServer(args.unix, Handler)
+        where = f"unix:{args.unix}"
+    else:
+        server = TCPServer((args.host, args.port), Handler)
+        where = f"{args.host}:{args.port}"
+    logger.info(f"ASR worker ready on {where} (engines={names}, concurrency={args.concurrency}, "
+                f"lang={settings.LANGUAGE}, stub={args.stub})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+벤치마크 스크립트 공통 유틸 (표준 라이브러리 + numpy만 사용).
+"""
+import json
+import math
+import os
+import platform
+import struct
+import time
+import wave
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".aac", ".ogg", ".flac", ".webm")
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """선형 보간 percentile (q: 0~100). 빈 입력이면 None."""
+    if not values:
+        return None
+    xs = sorted(values)
+    if len(xs) == 1:
+        return float(xs[0])
+    pos = (len(xs) - 1) * (q / 100.0)
+    lo, hi = int(math.floor(pos)), int(math.ceil(pos))
+    return float(xs[lo] + (xs[hi] - xs[lo]) * (pos - lo))
+
+
+def summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """count/mean/p50/p95/p99/max 요약."""
+    n = len(values)
+    return {
+        "count": n,
+        "mean": (sum(values) / n) if n else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if n else None,
+    }
+
+
+def _fmt(v: Any) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.3f}" if abs(v) < 1000 else f"{v:.0f}"
+    return str(v)
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    """dict 리스트를 고정폭 표로 출력."""
+    if not rows:
+        print("(no rows)")
+        return
+    cells = [[_fmt(r.get(c)) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def list_audio_files(corpus_dir: str) -> List[str]:
+    out = []
+    for root, _, files in os.walk(corpus_dir):
+        for f in sorted(files):
+            if f.lower().endswith(AUDIO_EXTS):
+                out.append(os.path.join(root, f))
+    return sorted(out)
+
+
+def reference_text(audio_path: str) -> Optional[str]:
+    """같은 이름의 .txt가 있으면 정답 전사로 사용 (WER 계산용)."""
+    txt = os.path.splitext(audio_path)[0] + ".txt"
+    if os.path.exists(txt):
+        with open(txt, encoding="utf-8") as f:
+            return f.read().strip()
+    return None
+
+
+def write_synthetic_wav(path: str, seconds: float, sr: int = 16000, freq: float = 220.0) -> str:
+    """
+    모델/네트워크 없이 쓸 수 있는 합성 WAV(16-bit mono): 톤 + 약한 노이즈.
+    음성 인식 정확도 측정용이 아니라 디코드/전송/지연 측정용이다.
+    """
+    import random
+    n = int(seconds * sr)
+    rnd = random.Random(int(seconds * 1000) + int(freq))
+    frames = bytearray()
+    for i in range(n):
+        v = 0.3 * math.sin(2 * math.pi * freq * i / sr) + 0.02 * (rnd.random() - 0.5)
+        frames += struct.pack("<h", int(max(-1.0, min(1.0, v)) * 32767))
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(bytes(frames))
+    return path
+
+
+def make_synthetic_corpus(out_dir: str, durations: Iterable[float] = (2.0, 5.0, 10.0)) -> List[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for d in durations:
+        p = os.path.join(out_dir, f"synthetic_{d:.1f}s.wav")
+        if not os.path.exists(p):
+            write_synthetic_wav(p, d)
+        paths.append(p)
+    return paths
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_json(path: str, doc: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def pct_change(new: Optional[float], old: Optional[float]) -> Optional[float]:
+    if new is None or old in (None, 0):
+        return None
+    return round((new - old) / old * 100.0, 1)
@@ -0,0 +1,388 @@
+"""
+HTTP API 부하/벤치마크 하니스.
+
+오디오 코퍼스를 /transcribe, /stt_search_tts, /synthesize 에 재생하며
+처리량, 엔드포인트/단계별 p50/p95/p99 지연, 오류율을 측정하고 JSON으로 저장한다.
+
+  - closed loop: --concurrency N 개의 워커가 응답을 받는 즉시 다음 요청 (최대 처리량 측정)
+  - open loop  : --rate R (req/s) 포아송 도착. 지연은 '예정 도착 시각' 기준으로 재므로
+                 서버가 밀릴 때 대기시간까지 포함된다 (coordinated omission 방지)
+
+--self-host 를 주면 GPU/네트워크 없이 완전 오프라인으로 돈다:
+  STUB_ENGINES=1 로 서버를 띄우고(ASR/검색/SpeechT5 stub), Edge TTS는
+  scripts/fake_edge_tts_server.py 로 띄운 로컬 fake 서버를 바라보게 한다.
+
+예:
+    PYTHONPATH=. python scripts/bench_http.py --self-host --mode closed --concurrency 4 --requests 200
+    PYTHONPATH=. python scripts/bench_http.py --base-url http://localhost:8000 --mode open --rate 2 --duration 60 \\
+        --corpus data/bench_audio --out logs/bench/run.json --compare logs/bench/baseline.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+
+from scripts.bench_common import (
+    environment_info, list_audio_files, load_json, make_synthetic_corpus,
+    pct_change, print_table, summarize, write_json,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("transcribe", "stt_search_tts", "synthesize")
+TTS_TEXT = "추천 정책은 청년월세 한시 특별지원 입니다. 무주택 청년에게 월세를 지원합니다."
+
+
+# -----------------------------
+# Self-hosted offline server
+# -----------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_http(url: str, timeout_s: float) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"server did not become healthy: {url}")
+
+
+@contextlib.contextmanager
+def self_hosted(args) -> Iterator[str]:
+    """fake Edge TTS 서버 + stub 엔진 모드 API 서버를 띄우고 base URL을 넘긴다."""
+    edge_port, api_port = _free_port(), _free_port()
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": ROOT,
+        "STUB_ENGINES": "1",
+        "STUB_ASR_RTF": str(args.stub_asr_rtf),
+        "STUB_SEARCH_MS": str(args.stub_search_ms),
+        "EDGE_TTS_WSS_URL": f"ws://127.0.0.1:{edge_port}/edge/v1?TrustedClientToken=fake",
+    })
+    procs = []
+    try:
+        procs.append(subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "scripts", "fake_edge_tts_server.py"),
+             "--port", str(edge_port), "--latency-ms", str(args.fake_edge_latency_ms)],
+            env=env, cwd=ROOT,
+        ))
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.server:app",
+             "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"],
+            env=env, cwd=ROOT,
+        ))
+        base = f"http://127.0.0.1:{api_port}"
+        _wait_http(f"{base}/healthz", timeout_s=180)
+        yield base
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+# -----------------------------
+# Requests
+# -----------------------------
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+    return s
+
+
+def _stages_from_timings(timings: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
+    """서버가 돌려준 span 목록을 {span 이름: 초} 로 합산."""
+    stages: Dict[str, float] = defaultdict(float)
+    for t in timings or []:
+        stages[t["name"]] += float(t["duration_ms"]) / 1000.0
+    return dict(stages)
+
+
+def do_request(base: str, endpoint: str, audio: Dict[str, Any], args) -> Dict[str, Any]:
+    s = _session()
+    stages: Dict[str, float] = {}
+    if endpoint == "transcribe":
+        r = s.post(
+            f"{base}/transcribe",
+            files={"audio": (audio["name"], audio["data"], "application/octet-stream")},
+            data={"engine": args.engine, "beam_size": str(args.beam_size)},
+            timeout=args.timeout,
+        )
+        if r.ok:
+            stages["decode_s"] = float(r.json().get("decode_s") or 0.0)
+    elif endpoint == "stt_search_tts":
+        r = s.post(
+            f"{base}/stt_search_tts",
+            files={"audio": (audio["name"], audio["data"], "application/octet-stream")},
+            data={
+                "engine": args.engine, "beam_size": str(args.beam_size), "topk": str(args.topk),
+                "tts_engine": args.tts_engine, "timings": "true",
+            },
+            headers={"X-Trace": "1"},
+            timeout=args.timeout,
+        )
+        if r.ok:
+            stages = _stages_from_timings(r.json().get("timings"))
+    else:
+        r = s.post(
+            f"{base}/synthesize",
+            json={"text": args.tts_text, "voice": args.voice},
+            timeout=args.timeout,
+        )
+    return {"status": r.status_code, "ok": r.ok, "bytes": len(r.content), "stages": stages}
+
+
+def _run_one(base: str, endpoint: str, audio: Dict[str, Any], args, t_sched: float) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {"endpoint": endpoint, "audio": audio["name"], "t_sched": t_sched}
+    try:
+        rec.update(do_request(base, endpoint, audio, args))
+        rec["error"] = None if rec["ok"] else f"HTTP {rec['status']}"
+    except requests.RequestException as e:
+        rec.update({"status": None, "ok": False, "bytes": 0, "stages": {}, "error": type(e).__name__})
+    rec["latency_s"] = time.perf_counter() - t_sched
+    return rec
+
+
+def _workload(args, audios: List[Dict[str, Any]]) -> Iterator[tuple]:
+    i = 0
+    while True:
+        yield args.endpoints[i % len(args.endpoints)], audios[i % len(audios)]
+        i += 1
+
+
+def run_closed(base: str, args, audios) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    work = _workload(args, audios)
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    issued = [0]
+
+    def worker():
+        while True:
+            with lock:
+                if (args.requests and issued[0] >= args.requests) or (deadline and time.perf_counter() >= deadline):
+                    return
+                issued[0] += 1
+                endpoint, audio = next(work)
+            rec = _run_one(base, endpoint, audio, args, time.perf_counter())
+            with lock:
+                records.append(rec)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return records
+
+
+def run_open(base: str, args, audios) -> List[Dict[str, Any]]:
+    rnd = random.Random(args.seed)
+    work = _workload(args, audios)
+    futures = []
+    t0 = time.perf_counter()
+    t_next = t0
+    n = 0
+    with ThreadPoolExecutor(max_workers=args.max_inflight) as ex:
+        while True:
+            if args.requests and n >= args.requests:
+                break
+            if args.duration and t_next - t0 >= args.duration:
+                break
+            now = time.perf_counter()
+            if t_next > now:
+                time.sleep(t_next - now)
+            endpoint, audio = next(work)
+            futures.append(ex.submit(_run_one, base, endpoint, audio, args, t_next))
+            n += 1
+            t_next += rnd.expovariate(args.rate)
+        return [f.result() for f in futures]
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def build_report(records: List[Dict[str, Any]], elapsed_s: float, args) -> Dict[str, Any]:
+    by_ep: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in records:
+        by_ep[r["endpoint"]].append(r)
+
+    endpoints = {}
+    for ep, recs in by_ep.items():
+        ok = [r for r in recs if r["ok"]]
+        stage_vals: Dict[str, List[float]] = defaultdict(list)
+        for r in ok:
+            for name, v in r["stages"].items():
+                stage_vals[name].append(v)
+        errors = defaultdict(int)
+        for r in recs:
+            if not r["ok"]:
+                errors[r["error"]] += 1
+        endpoints[ep] = {
+            "requests": len(recs),
+            "errors": len(recs) - len(ok),
+            "error_rate": round((len(recs) - len(ok)) / len(recs), 4) if recs else 0.0,
+            "throughput_rps": round(len(ok) / elapsed_s, 3) if elapsed_s > 0 else None,
+            "latency_s": summarize([r["latency_s"] for r in ok]),
+            "stages_s": {k: summarize(v) for k, v in sorted(stage_vals.items())},
+            "error_kinds": dict(errors),
+        }
+
+    n_ok = sum(1 for r in records if r["ok"])
+    return {
+        "config": {
+            k: getattr(args, k) for k in (
+                "mode", "concurrency", "rate", "requests", "duration", "endpoints",
+                "engine", "beam_size", "topk", "tts_engine", "self_host", "base_url",
+            )
+        },
+        "env": environment_info(),
+        "overall": {
+            "requests": len(records),
+            "errors": len(records) - n_ok,
+            "error_rate": round((len(records) - n_ok) / len(records), 4) if records else 0.0,
+            "elapsed_s": round(elapsed_s, 3),
+            "throughput_rps": round(n_ok / elapsed_s, 3) if elapsed_s > 0 else None,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    o = report["overall"]
+    print(f"\n== overall: {o['requests']} req, {o['errors']} err ({o['error_rate']*100:.1f}%), "
+          f"{o['throughput_rps']} req/s over {o['elapsed_s']}s")
+    rows = []
+    for ep, e in report["endpoints"].items():
+        lat = e["latency_s"]
+        rows.append({"endpoint": ep, "n": e["requests"], "err%": round(e["error_rate"] * 100, 2),
+                     "rps": e["throughput_rps"], "p50_s": lat["p50"], "p95_s": lat["p95"], "p99_s": lat["p99"]})
+    print_table(rows, ["endpoint", "n", "err%", "rps", "p50_s", "p95_s", "p99_s"])
+
+    rows = []
+    for ep, e in report["endpoints"].items():
+        for name, st in e["stages_s"].items():
+            rows.append({"endpoint": ep, "stage": name, "n": st["count"],
+                         "p50_s": st["p50"], "p95_s": st["p95"], "p99_s": st["p99"]})
+    if rows:
+        print("\n== server-side stages")
+        print_table(rows, ["endpoint", "stage", "n", "p50_s", "p95_s", "p99_s"])
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    rows = []
+    for ep, e in report["endpoints"].items():
+        b = baseline.get("endpoints", {}).get(ep)
+        if not b:
+            continue
+        rows.append({
+            "endpoint": ep,
+            "rps_%": pct_change(e["throughput_rps"], b["throughput_rps"]),
+            "p50_%": pct_change(e["latency_s"]["p50"], b["latency_s"]["p50"]),
+            "p95_%": pct_change(e["latency_s"]["p95"], b["latency_s"]["p95"]),
+            "p99_%": pct_change(e["latency_s"]["p99"], b["latency_s"]["p99"]),
+            "err_rate": f"{b['error_rate']} -> {e['error_rate']}",
+        })
+    print("\n== vs baseline (% change; latency lower is better)")
+    print_table(rows, ["endpoint", "rps_%", "p50_%", "p95_%", "p99_%", "err_rate"])
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="HTTP API load test / benchmark")
+    ap.add_argument("--base-url", default="http://127.0.0.1:8000")
+    ap.add_argument("--self-host", action="store_true", help="stub 엔진 + fake Edge TTS로 서버를 직접 띄워 오프라인 측정")
+    ap.add_argument("--corpus", default=None, help="오디오 디렉토리 (없으면 합성 WAV 생성)")
+    ap.add_argument("--endpoints", default=",".join(ENDPOINTS), help="쉼표 구분: transcribe,stt_search_tts,synthesize")
+    ap.add_argument("--mode", choices=["closed", "open"], default="closed")
+    ap.add_argument("--concurrency", type=int, default=4, help="closed loop 동시 워커 수")
+    ap.add_argument("--rate", type=float, default=2.0, help="open loop 도착률 (req/s)")
+    ap.add_argument("--max-inflight", type=int, default=256, help="open loop 최대 동시 요청")
+    ap.add_argument("--requests", type=int, default=100, help="총 요청 수 (0이면 --duration 기준)")
+    ap.add_argument("--duration", type=float, default=0.0, help="측정 시간(초), 0이면 --requests 기준")
+    ap.add_argument("--warmup", type=int, default=3, help="측정 전 엔드포인트별 워밍업 요청 수")
+    ap.add_argument("--engine", default="fw")
+    ap.add_argument("--beam-size", type=int, default=1)
+    ap.add_argument("--topk", type=int, default=3)
+    ap.add_argument("--tts-engine", default="edge_tts")
+    ap.add_argument("--voice", default="ko-KR-SunHiNeural")
+    ap.add_argument("--tts-text", default=TTS_TEXT)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--stub-asr-rtf", type=float, default=0.05)
+    ap.add_argument("--stub-search-ms", type=float, default=20.0)
+    ap.add_argument("--fake-edge-latency-ms", type=float, default=150.0)
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    ap.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args(argv)
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    bad = [e for e in args.endpoints if e not in ENDPOINTS]
+    if bad:
+        ap.error(f"unknown endpoints: {bad}")
+    if not args.requests and not args.duration:
+        ap.error("--requests 또는 --duration 중 하나는 필요합니다.")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.corpus:
+        paths = list_audio_files(args.corpus)
+        if not paths:
+            sys.exit(f"no audio files under {args.corpus}")
+    else:
+        paths = make_synthetic_corpus(os.path.join(tempfile.gettempdir(), "asr_bench_corpus"))
+    audios = []
+    for p in paths:
+        with open(p, "rb") as f:
+            audios.append({"name": os.path.basename(p), "data": f.read()})
+
+    ctx = self_hosted(args) if args.self_host else contextlib.nullcontext(args.base_url.rstrip("/"))
+    with ctx as base:
+        for ep in args.endpoints:
+            for i in range(args.warmup):
+                _run_one(base, ep, audios[i % len(audios)], args, time.perf_counter())
+
+        t0 = time.perf_counter()
+        records = run_open(base, args, audios) if args.mode == "open" else run_closed(base, args, audios)
+        elapsed = time.perf_counter() - t0
+
+    report = build_report(records, elapsed, args)
+    print_report(report)
+    if args.compare:
+        print_comparison(report, load_json(args.compare))
+    if args.out:
+        write_json(args.out, report)
+        print(f"\nsaved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+정책 스냅샷 색인 벤치마크: float32 vs int8 vs PQ (+ float32 정확 재채점).
+
+색인 종류 × 재채점 배수(SNAPSHOT_RESCORE)마다 상주 코드 크기 / 디스크 크기 / 로드 시간 /
+쿼리 지연(p50·p95) / float32 brute-force 대비 recall@k를 재고, 같은 쿼리를 --threads개 스레드로
+동시에 검색해 순차 결과와 같은지(concurrent_same) 확인한다. 모델 없이 돌도록
+쿼리는 카탈로그 벡터에 잡음을 섞어 만든다 (실제 쿼리처럼 정답 근처에 이웃이 몰려 있음).
+
+기본은 군집 구조가 있는 합성 임베딩이며, --snapshot으로 실제 스냅샷(build_policy_index.py --snapshot)을
+줄 수 있다. 실제 스냅샷은 임시 디렉토리에 링크해서 쓰므로 원본은 바뀌지 않는다.
+
+예:
+    PYTHONPATH=. python scripts/bench_index.py
+    PYTHONPATH=. python scripts/bench_index.py --n 100000 --dim 1024 --kinds none,int8,pq --rescore 2,4,8
+    PYTHONPATH=. python scripts/bench_index.py --snapshot data/policy_snapshot --filters '{"target_group":["청년"]}' \\
+        --out logs/bench/index.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import policy_snapshot as ps
+from app.services.policy_filters import AttributeIndex, TARGET_GROUPS, parse_filters
+from app.services.vector_quant import QUANT_KINDS
+from scripts.bench_common import environment_info, print_table, summarize, write_json
+
+COLUMNS = ["index", "rescore", "hot_mb", "disk_mb", "build_s", "load_ms", "p50_ms", "p95_ms", "recall@1", "recall@k",
+           "concurrent_same"]
+
+_SUPPORT_TYPES = ["현금", "현물", "서비스", "이용권", "현금,현물"]
+_AGENCIES = ["서울특별시 강남구", "서울특별시 종로구", "부산광역시", "주민센터", "국민연금공단", "경기도 수원시"]
+
+
+def write_synthetic_snapshot(out_dir: str, n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """군집(가우시안 혼합) 임베딩 + 최소 레코드로 스냅샷 디렉토리를 만든다."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    emb = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    groups = list(TARGET_GROUPS)
+
+    records = []
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    with open(os.path.join(out_dir, ps.REC_FILE), "wb") as f:
+        for i in range(n):
+            rec = {
+                "service_id": str(i), "service_name": f"정책 {i}", "tags": [], "support": "", "url": None,
+                "support_type": _SUPPORT_TYPES[i % len(_SUPPORT_TYPES)],
+                "receiving_agency": _AGENCIES[(i // 7) % len(_AGENCIES)],
+                "target_beneficiaries": groups[(i // 3) % len(groups)],
+            }
+            records.append(rec)
+            blob = json.dumps(rec, ensure_ascii=False).encode("utf-8")
+            f.write(blob)
+            offsets[i + 1] = offsets[i] + len(blob)
+    np.save(os.path.join(out_dir, ps.EMB_FILE), emb)
+    np.save(os.path.join(out_dir, ps.IDX_FILE), offsets)
+    AttributeIndex.build(records).save(out_dir)
+    with open(os.path.join(out_dir, ps.META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"count": n, "dim": dim, "embed_model": "synthetic", "quant": "none"}, f)
+    return emb
+
+
+def link_snapshot(src: str, out_dir: str) -> np.ndarray:
+    """실제 스냅샷을 임시 디렉토리에 링크 (양자화 코드와 meta.json만 새로 쓴다)."""
+    for name in os.listdir(src):
+        if name == ps.META_FILE:
+            shutil.copy(os.path.join(src, name), os.path.join(out_dir, name))
+        elif not name.startswith("quant_"):
+            os.symlink(os.path.abspath(os.path.join(src, name)), os.path.join(out_dir, name))
+    return np.load(os.path.join(out_dir, ps.EMB_FILE), mmap_mode="r")
+
+
+def make_queries(emb: np.ndarray, count: int, noise: float, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    q = np.asarray(emb[rng.choice(emb.shape[0], size=count, replace=False)], dtype=np.float32)
+    q = q + noise * rng.standard_normal(q.shape).astype(np.float32) / np.sqrt(q.shape[1])
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def exact_topk(emb: np.ndarray, queries: np.ndarray, k: int, mask: np.ndarray = None) -> List[List[int]]:
+    out = []
+    for q in queries:
+        scores = np.asarray(emb @ q)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        top = np.argpartition(-scores, k - 1)[:k]
+        out.append(top[np.argsort(-scores[top])].tolist())
+    return out
+
+
+def _file_bytes(snapshot_dir: str, names: List[str]) -> int:
+    return sum(os.path.getsize(os.path.join(snapshot_dir, n)) for n in names if os.path.exists(os.path.join(snapshot_dir, n)))
+
+
+def run_case(snapshot_dir: str, kind: str, queries: np.ndarray, truth: List[List[int]], k: int,
+             filters: Dict[str, List[str]], build_s: float, threads: int) -> Dict[str, Any]:
+    # 쿼리 벡터는 스레드별로 (동시 검색 확인에서 서로 덮어쓰지 않도록)
+    current = threading.local()
+    t0 = time.perf_counter()
+    searcher = ps.SnapshotPolicySearch(encode_fn=lambda texts: current.q[None, :], snapshot_dir=snapshot_dir, quant=kind)
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    def search(q: np.ndarray) -> List[int]:
+        current.q = q
+        return [int(r["service_id"]) for r in searcher.search("bench", topk=k, filters=filters or None)]
+
+    lat, hit1, hitk, sequential = [], 0, 0, []
+    for q, exact in zip(queries, truth):
+        t = time.perf_counter()
+        got = search(q)
+        lat.append((time.perf_counter() - t) * 1000)
+        sequential.append(got)
+        hit1 += bool(got) and got[0] == exact[0]
+        hitk += len(set(got) & set(exact))
+
+    # 동시 검색 (서버는 asyncio.to_thread로 검색을 병렬 실행) → 순차 결과와 같아야 한다
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        concurrent = list(ex.map(search, queries))
+    same = sum(a == b for a, b in zip(sequential, concurrent))
+
+    emb_bytes = _file_bytes(snapshot_dir, [ps.EMB_FILE])
+    hot = searcher.quant.nbytes if searcher.quant is not None else emb_bytes
+    stats = summarize(lat)
+    return {
+        "index": kind,
+        "hot_mb": round(hot / 2 ** 20, 2),
+        "disk_mb": round((emb_bytes + (searcher.quant.nbytes if searcher.quant is not None else 0)) / 2 ** 20, 2),
+        "build_s": round(build_s, 2),
+        "load_ms": round(load_ms, 2),
+        "p50_ms": stats["p50"],
+        "p95_ms": stats["p95"],
+        "recall@1": round(hit1 / len(queries), 4),
+        "recall@k": round(hitk / (len(queries) * k), 4),
+        "concurrent_same": round(same / len(queries), 4),
+    }
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Quantized snapshot index benchmark (size / latency / recall)")
+    ap.add_argument("--snapshot", default=None, help="실제 스냅샷 디렉토리 (없으면 합성 임베딩)")
+    ap.add_argument("--n", type=int, default=50000, help="합성 카탈로그 크기")
+    ap.add_argument("--dim", type=int, default=1024, help="합성 임베딩 차원 (bge-m3=1024)")
+    ap.add_argument("--clusters", type=int, default=500, help="합성 임베딩 군집 수")
+    ap.add_argument("--kinds", default=",".join(QUANT_KINDS), help=f"쉼표 구분 ({', '.join(QUANT_KINDS)})")
+    ap.add_argument("--rescore", default=str(settings.SNAPSHOT_RESCORE), help="재채점 배수 목록 (쉼표 구분)")
+    ap.add_argument("--pq-m", type=int, default=settings.SNAPSHOT_PQ_M)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--noise", type=float, default=0.5, help="쿼리 = 카탈로그 벡터 + 잡음 (L2, 정규화 전)")
+    ap.add_argument("--topk", type=int, default=10, help="recall@k의 k")
+    ap.add_argument("--threads", type=int, default=8, help="동시 검색 확인 스레드 수")
+    ap.add_argument("--filters", default=None, help='필터 JSON (예: {"target_group":["청년"]})')
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in QUANT_KINDS]
+    if unknown:
+        raise SystemExit(f"unknown kinds: {unknown} (expected one of {list(QUANT_KINDS)})")
+    rescores = [float(r) for r in args.rescore.split(",") if r.strip()]
+    filters = parse_filters(args.filters)
+    settings.SNAPSHOT_PQ_M = args.pq_m
+
+    work = tempfile.mkdtemp(prefix="bench_index_")
+    rows = []
+    try:
+        if args.snapshot:
+            emb = link_snapshot(args.snapshot, work)
+        else:
+            emb = write_synthetic_snapshot(work, args.n, args.dim, args.clusters)
+        attrs = AttributeIndex.load(work) or AttributeIndex.build(ps.RecordStore(work).get(i) for i in range(emb.shape[0]))
+        mask = attrs.mask(filters)
+        print(f"{emb.shape[0]} vectors × {emb.shape[1]} dims, queries={args.queries}, k={args.topk}, "
+              f"filters={filters or '-'} ({emb.shape[0] if mask is None else int(mask.sum())} rows)")
+
+        queries = make_queries(emb, args.queries, args.noise)
+        truth = exact_topk(emb, queries, args.topk, mask)
+
+        for kind in kinds:
+            t0 = time.perf_counter()
+            ps.quantize_snapshot(work, kind)
+            build_s = time.perf_counter() - t0
+            for r in (rescores if kind != "none" else [None]):
+                if r is not None:
+                    settings.SNAPSHOT_RESCORE = r
+                row = run_case(work, kind, queries, truth, args.topk, filters, build_s, args.threads)
+                row["rescore"] = r
+                rows.append(row)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print_table(rows, COLUMNS)
+    broken = [r["index"] for r in rows if r["concurrent_same"] < 1.0]
+    if broken:
+        print(f"WARNING: concurrent searches differ from sequential results: {broken}")
+    if args.out:
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "results": rows})
+        print(f"saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+로깅 경로 마이크로벤치마크 (모델/네트워크 불필요).
+
+요청 스레드 입장에서 logger.info() 한 번에 드는 비용(µs/record)과, 출력이 디스크까지 끝나는 총 시간을 비교한다.
+
+  legacy     : 이전 logging_config (레코드마다 timezone 생성 + datetime.now(), stdout/FileHandler 동기 쓰기)
+  queue      : 현재 logging_config (QueueHandler → QueueListener 스레드, 캐시된 KST 포맷, RotatingFileHandler)
+  queue_json : 현재 logging_config + LOG_JSON=1
+  sync       : 현재 포매터/핸들러를 큐 없이 동기로 (LOG_QUEUE=0)
+
+stdout은 /dev/null로, 파일은 임시 디렉토리로 보낸다.
+
+예:
+    PYTHONPATH=. python scripts/bench_logging.py
+    PYTHONPATH=. python scripts/bench_logging.py --records 50000 --threads 4 --out logs/bench/logging.json
+"""
+import argparse
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from scripts.bench_common import environment_info, print_table, summarize, write_json
+
+COLUMNS = ["variant", "records", "threads", "call_us_mean", "call_us_p99", "total_s", "vs_legacy_pct"]
+
+
+class LegacyTimestampFormatter(logging.Formatter):
+    """이전 구현 그대로 (비교 기준)."""
+
+    def format(self, record):
+        kst = timezone(timedelta(hours=9))
+        kst_time = datetime.now(kst)
+        record.timestamp = kst_time.strftime('%Y-%m-%d %H:%M:%S KST')
+        return super().format(record)
+
+
+def _reset_root() -> None:
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+
+
+def setup_legacy(tmp: str, stdout) -> None:
+    _reset_root()
+    fmt = '%(timestamp)s - %(name)s - %(levelname)s - %(message)s'
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    for h in (logging.StreamHandler(stdout), logging.FileHandler(os.path.join(tmp, "legacy.log"))):
+        h.setFormatter(LegacyTimestampFormatter(fmt))
+        root.addHandler(h)
+
+
+def setup_current(tmp: str, stdout, name: str, json_lines: bool, use_queue: bool):
+    _reset_root()
+    os.environ["LOG_FILE"] = os.path.join(tmp, f"{name}.log")
+    os.environ["LOG_JSON"] = "1" if json_lines else "0"
+    os.environ["LOG_QUEUE"] = "1" if use_queue else "0"
+    real_stdout, sys.stdout = sys.stdout, stdout
+    try:
+        import logging_config
+        importlib.reload(logging_config)   # 모듈 import 시 설정이 실행된다
+    finally:
+        sys.stdout = real_stdout
+    return logging_config
+
+
+def drive(records: int, threads: int) -> List[float]:
+    """threads개 스레드가 records/threads개씩 로그를 남기며 호출당 시간(µs)을 잰다."""
+    log = logging.getLogger("app.routers.pipeline")
+    per = records // threads
+    lat: List[List[float]] = [[] for _ in range(threads)]
+
+    def work(i: int) -> None:
+        out = lat[i]
+        for n in range(per):
+            t = time.perf_counter()
+            log.info("stt_search_tts done rid=%s engine=%s decode_s=%.3f", "0123456789abcdef", "fw", n * 1e-3)
+            out.append((time.perf_counter() - t) * 1e6)
+
+    ts = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return [x for xs in lat for x in xs]
+
+
+def run_variant(name: str, tmp: str, stdout, records: int, threads: int) -> Dict[str, Any]:
+    mod = None
+    if name == "legacy":
+        setup_legacy(tmp, stdout)
+    else:
+        mod = setup_current(tmp, stdout, name, json_lines=(name == "queue_json"), use_queue=(name != "sync"))
+    t0 = time.perf_counter()
+    lat = drive(records, threads)
+    if mod is not None:
+        mod.stop_logging()   # 큐가 다 빠질 때까지 포함
+    for h in logging.getLogger().handlers:
+        h.flush()
+    total = time.perf_counter() - t0
+    s = summarize(lat)
+    return {"variant": name, "records": len(lat), "threads": threads,
+            "call_us_mean": s["mean"], "call_us_p99": s["p99"], "total_s": total}
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Per-record logging cost: legacy vs queue-based logging_config")
+    ap.add_argument("--records", type=int, default=20000)
+    ap.add_argument("--threads", type=int, default=1, help="동시에 로그를 남기는 스레드 수")
+    ap.add_argument("--variants", default="legacy,sync,queue,queue_json")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        for name in [v.strip() for v in args.variants.split(",") if v.strip()]:
+            rows.append(run_variant(name, tmp, devnull, args.records, args.threads))
+    _reset_root()
+
+    base = next((r for r in rows if r["variant"] == "legacy"), None)
+    for r in rows:
+        r["vs_legacy_pct"] = (
+            round((r["call_us_mean"] - base["call_us_mean"]) / base["call_us_mean"] * 100.0, 1) if base else None
+        )
+
+    print_table(rows, COLUMNS)
+    if args.out:
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "results": rows})
+        print(f"\nsaved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
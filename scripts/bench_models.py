@@ -0,0 +1,360 @@
+"""
+모델 단위 마이크로 벤치마크 (FW / OW / 임베딩 / SpeechT5).
+
+입력 길이, 배치 크기, beam, compute type, 스레드 수를 스윕하며
+실시간 배수(RTF), 지연 percentile, 피크 RSS, 정확도(WER, jiwer)를 표로 출력한다.
+각 조합은 새 프로세스(spawn)에서 실행하므로 피크 RSS에 모델 로드 비용이 그대로 잡히고
+스레드 설정(OMP_NUM_THREADS / torch.set_num_threads)이 조합 간에 섞이지 않는다.
+
+코퍼스(--corpus)는 오디오 파일과 같은 이름의 .txt(정답 전사)를 두면 WER을 계산한다.
+  - --lengths full      : 코퍼스 클립 원본 그대로 (WER 계산)
+  - --lengths 5,10,15   : 클립을 이어붙여 지정 길이로 자른 입력 (지연/RTF만)
+
+예:
+    PYTHONPATH=. python scripts/bench_models.py --engines fw --device cpu \\
+        --compute-types int8,float32 --beams 1,5 --threads 4,8 --lengths full,5,15 --corpus data/bench_audio
+    PYTHONPATH=. python scripts/bench_models.py --engines embed --batch-sizes 1,16,64 --threads 4,8
+    PYTHONPATH=. python scripts/bench_models.py --engines speecht5 --text-lengths 30,120 --out logs/bench/models.json
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from scripts.bench_common import (
+    environment_info, list_audio_files, make_synthetic_corpus, print_table,
+    reference_text, summarize, write_json,
+)
+
+SR = 16000
+_KO_SENTENCE = "청년이 주거 관련해서 받을 수 있는 지원 정책이 있는지 알려주세요. "
+
+COLUMNS = [
+    "engine", "device", "compute", "beam", "threads", "batch", "input",
+    "n", "load_s", "p50_ms", "p95_ms", "p99_ms", "rtf", "items_per_s", "wer", "peak_rss_mb",
+]
+
+# SpeechT5 응답 인코딩 (포맷별 인코딩 시간/크기)
+ENCODE_COLUMNS = [
+    "input", "mp3_enc_ms", "mp3_kb", "ogg_opus_enc_ms", "ogg_opus_kb", "wav_enc_ms", "wav_kb",
+]
+
+
+# -----------------------------
+# Inputs
+# -----------------------------
+def _load_corpus(corpus: Optional[str]) -> List[Dict[str, Any]]:
+    from app.services.audio_io import to_f32_16k_mono
+
+    if corpus:
+        paths = list_audio_files(corpus)
+    else:
+        paths = make_synthetic_corpus(os.path.join(tempfile.gettempdir(), "asr_bench_corpus"))
+    clips = []
+    for p in paths:
+        with open(p, "rb") as f:
+            wav = to_f32_16k_mono(f.read())
+        clips.append({"name": os.path.basename(p), "wav": wav, "ref": reference_text(p)})
+    return clips
+
+
+def _inputs_for_length(clips: List[Dict[str, Any]], length: str) -> List[Dict[str, Any]]:
+    """'full'이면 원본 클립, 숫자면 클립을 이어붙여 length초로 자른 입력 1개."""
+    import numpy as np
+
+    if length == "full":
+        return clips
+    n = int(float(length) * SR)
+    joined = np.concatenate([c["wav"] for c in clips])
+    reps = int(np.ceil(n / max(1, joined.shape[0])))
+    wav = np.tile(joined, reps)[:n].astype(np.float32, copy=False)
+    return [{"name": f"{length}s", "wav": wav, "ref": None}]
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return round(rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0, 1)
+
+
+def _wer(refs: List[str], hyps: List[str]) -> Optional[float]:
+    pairs = [(r, h) for r, h in zip(refs, hyps) if r]
+    if not pairs:
+        return None
+    import jiwer
+    return round(float(jiwer.wer([r for r, _ in pairs], [h for _, h in pairs])), 4)
+
+
+def _timed(fn, repeats: int) -> List[float]:
+    fn()  # 워밍업 1회 (측정 제외)
+    out = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _latency_cols(lat_s: List[float]) -> Dict[str, Any]:
+    s = summarize(lat_s)
+    return {
+        "n": s["count"],
+        "p50_ms": s["p50"] * 1000 if s["p50"] is not None else None,
+        "p95_ms": s["p95"] * 1000 if s["p95"] is not None else None,
+        "p99_ms": s["p99"] * 1000 if s["p99"] is not None else None,
+    }
+
+
+# -----------------------------
+# Engine runners (child process)
+# -----------------------------
+def _bench_asr(case: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.asr_fw import FasterWhisperASR
+    from app.services.asr_ow import OpenAIWhisperASR
+    from app.core.config import settings
+
+    t0 = time.perf_counter()
+    if case["engine"] == "fw":
+        asr = FasterWhisperASR(
+            model_dir=case.get("model_dir") or settings.FW_MODEL_DIR,
+            device=case["device"], compute_type=case["compute"], beam_size=case["beam"],
+            cpu_threads=int(case.get("threads") or 0) or None,
+        )
+    else:
+        asr = OpenAIWhisperASR(model_dir=case.get("model_dir") or settings.OW_MODEL_DIR, device=case["device"])
+    load_s = time.perf_counter() - t0
+
+    inputs = _inputs_for_length(_load_corpus(case["corpus"]), case["input"])
+    lat, audio_s, refs, hyps = [], 0.0, [], []
+    for item in inputs:
+        hyp: Dict[str, str] = {}
+
+        def run(item=item, hyp=hyp):
+            hyp["text"], _ = asr.transcribe(item["wav"], language=case["language"])
+
+        lat.extend(_timed(run, case["repeats"]))
+        audio_s += item["wav"].shape[0] / SR * case["repeats"]
+        refs.append(item["ref"])
+        hyps.append(hyp.get("text", ""))
+
+    return {
+        "load_s": load_s,
+        **_latency_cols(lat),
+        "rtf": round(sum(lat) / audio_s, 4) if audio_s else None,
+        "items_per_s": round(len(lat) / sum(lat), 3) if lat else None,
+        "wer": _wer(refs, hyps),
+    }
+
+
+def _bench_embed(case: Dict[str, Any]) -> Dict[str, Any]:
+    from sentence_transformers import SentenceTransformer
+    from app.core.config import settings
+
+    t0 = time.perf_counter()
+    model = SentenceTransformer(case.get("model") or settings.EMBED_MODEL, device=case["device"])
+    load_s = time.perf_counter() - t0
+
+    n_chars = int(case["input"])
+    text = (_KO_SENTENCE * (n_chars // len(_KO_SENTENCE) + 1))[:n_chars]
+    batch = [text] * case["batch"]
+    lat = _timed(
+        lambda: model.encode(batch, batch_size=case["batch"], normalize_embeddings=True, show_progress_bar=False),
+        case["repeats"],
+    )
+    return {
+        "load_s": load_s,
+        **_latency_cols(lat),
+        "items_per_s": round(case["batch"] * len(lat) / sum(lat), 2) if lat else None,
+    }
+
+
+def _bench_speecht5(case: Dict[str, Any]) -> Dict[str, Any]:
+    import io
+    import soundfile as sf
+    from app.services import tts_speecht5
+
+    t0 = time.perf_counter()
+    tts_speecht5._load_models(tts_speecht5._pick_device())
+    load_s = time.perf_counter() - t0
+
+    n_chars = int(case["input"])
+    # SpeechT5(microsoft/speecht5_tts)는 영어 토크나이저라 영어 문장으로 측정
+    base = "The recommended policy provides monthly rent support for young people. "
+    text = (base * (n_chars // len(base) + 1))[:n_chars]
+    out: Dict[str, bytes] = {}
+
+    def run():
+        out["wav"] = tts_speecht5.synthesize_wav(text)
+
+    lat = _timed(run, case["repeats"])
+    audio_s = sf.info(io.BytesIO(out["wav"])).duration if out.get("wav") else 0.0
+
+    # 응답 인코딩 비용/크기 (프로세스 내 인코더, 포맷별)
+    from app.services.audio_encode import FORMATS, encode_pcm
+    pcm, _ = sf.read(io.BytesIO(out["wav"]), dtype="float32") if out.get("wav") else (None, None)
+    enc: Dict[str, Any] = {}
+    for fmt in FORMATS:
+        if pcm is None:
+            break
+        t0 = time.perf_counter()
+        data = encode_pcm(pcm, tts_speecht5.DEFAULT_SR, fmt)
+        enc[f"{fmt}_enc_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+        enc[f"{fmt}_kb"] = round(len(data) / 1024.0, 1)
+    return {
+        "load_s": load_s,
+        **_latency_cols(lat),
+        "rtf": round((sum(lat) / len(lat)) / audio_s, 4) if audio_s else None,
+        "items_per_s": round(len(lat) / sum(lat), 3) if lat else None,
+        **enc,
+    }
+
+
+_RUNNERS = {"fw": _bench_asr, "ow": _bench_asr, "embed": _bench_embed, "speecht5": _bench_speecht5}
+
+
+def _child(case: Dict[str, Any], q) -> None:
+    try:
+        threads = case.get("threads")
+        if threads:
+            try:
+                import torch
+                torch.set_num_threads(int(threads))
+            except ImportError:
+                pass
+        res = _RUNNERS[case["engine"]](case)
+        res["peak_rss_mb"] = _peak_rss_mb()
+        q.put({"ok": True, **res})
+    except Exception as e:  # 조합 하나의 실패가 전체 스윕을 멈추지 않도록
+        q.put({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+
+def run_case(case: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    env_backup = os.environ.get("OMP_NUM_THREADS")
+    if case.get("threads"):
+        # CTranslate2(cpu_threads=0)는 OMP_NUM_THREADS를 따른다 → spawn 자식에 상속
+        os.environ["OMP_NUM_THREADS"] = str(case["threads"])
+    try:
+        p = ctx.Process(target=_child, args=(case, q))
+        p.start()
+        try:
+            res = q.get(timeout=timeout_s)
+        except Exception:
+            res = {"ok": False, "error": "timeout"}
+        p.join(timeout=10)
+        if p.is_alive():
+            p.kill()
+    finally:
+        if env_backup is None:
+            os.environ.pop("OMP_NUM_THREADS", None)
+        else:
+            os.environ["OMP_NUM_THREADS"] = env_backup
+    return res
+
+
+# -----------------------------
+# Sweep
+# -----------------------------
+def _csv_list(s: str, cast=str) -> List[Any]:
+    return [cast(x.strip()) for x in s.split(",") if x.strip()]
+
+
+def build_cases(args) -> List[Dict[str, Any]]:
+    common = {"device": args.device, "repeats": args.repeats, "corpus": args.corpus, "language": args.language}
+    cases: List[Dict[str, Any]] = []
+    for engine in args.engines:
+        if engine == "fw":
+            for compute, beam, threads, length in itertools.product(
+                args.compute_types, args.beams, args.threads, args.lengths
+            ):
+                cases.append({**common, "engine": "fw", "compute": compute, "beam": beam,
+                              "threads": threads, "batch": 1, "input": length, "model_dir": args.fw_model_dir})
+        elif engine == "ow":
+            for threads, length in itertools.product(args.threads, args.lengths):
+                cases.append({**common, "engine": "ow", "compute": "fp16" if args.device == "cuda" else "float32",
+                              "beam": None, "threads": threads, "batch": 1, "input": length,
+                              "model_dir": args.ow_model_dir})
+        elif engine == "embed":
+            for batch, threads, chars in itertools.product(args.batch_sizes, args.threads, args.text_lengths):
+                cases.append({**common, "engine": "embed", "compute": "float32", "beam": None,
+                              "threads": threads, "batch": batch, "input": str(chars), "model": args.embed_model})
+        elif engine == "speecht5":
+            for threads, chars in itertools.product(args.threads, args.text_lengths):
+                cases.append({**common, "engine": "speecht5", "compute": "float32", "beam": None,
+                              "threads": threads, "batch": 1, "input": str(chars)})
+    return cases
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Model-level micro benchmark for ASR / embedding / TTS engines")
+    ap.add_argument("--engines", default="fw", help="쉼표 구분: fw,ow,embed,speecht5")
+    ap.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    ap.add_argument("--corpus", default=None, help="오디오(+.txt 정답) 디렉토리, 없으면 합성 WAV")
+    ap.add_argument("--language", default="ko")
+    ap.add_argument("--lengths", default="full,5,15", help="ASR 입력: full 또는 초 단위 길이")
+    ap.add_argument("--text-lengths", default="30,120", help="embed/speecht5 입력 문자 수")
+    ap.add_argument("--batch-sizes", default="1,16", help="embed 배치 크기")
+    ap.add_argument("--beams", default="1,5", help="FW beam_size")
+    ap.add_argument("--compute-types", default="int8,float32", help="FW compute_type")
+    ap.add_argument("--threads", default="0", help="스레드 수 (0=라이브러리 기본값)")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--fw-model-dir", default=None)
+    ap.add_argument("--ow-model-dir", default=None)
+    ap.add_argument("--embed-model", default=None)
+    ap.add_argument("--timeout", type=float, default=1800.0, help="조합당 제한 시간(초)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    ap.add_argument("--csv", default=None, help="결과 CSV 경로")
+    args = ap.parse_args(argv)
+    args.engines = _csv_list(args.engines)
+    args.lengths = _csv_list(args.lengths)
+    args.text_lengths = _csv_list(args.text_lengths, int)
+    args.batch_sizes = _csv_list(args.batch_sizes, int)
+    args.beams = _csv_list(args.beams, int)
+    args.compute_types = _csv_list(args.compute_types)
+    args.threads = _csv_list(args.threads, int)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = build_cases(args)
+    rows: List[Dict[str, Any]] = []
+    for i, case in enumerate(cases, start=1):
+        label = f"{case['engine']} compute={case['compute']} beam={case['beam']} threads={case['threads']} " \
+                f"batch={case['batch']} input={case['input']}"
+        print(f"[{i}/{len(cases)}] {label}", flush=True)
+        res = run_case(case, args.timeout)
+        if not res.get("ok"):
+            print(f"    ! failed: {res.get('error')}", flush=True)
+        row = {k: case.get(k) for k in ("engine", "device", "compute", "beam", "threads", "batch", "input")}
+        row.update({k: v for k, v in res.items() if k != "ok"})
+        rows.append(row)
+
+    print()
+    print_table([r for r in rows if "error" not in r], COLUMNS)
+    enc_rows = [r for r in rows if "error" not in r and "mp3_kb" in r]
+    if enc_rows:
+        print()
+        print_table(enc_rows, ENCODE_COLUMNS)
+
+    if args.out:
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "results": rows})
+        print(f"\nsaved: {args.out}")
+    if args.csv:
+        os.makedirs(os.path.dirname(os.path.abspath(args.csv)), exist_ok=True)
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=COLUMNS + ENCODE_COLUMNS[1:] + ["error"], extrasaction="ignore")
+            w.writeheader()
+            w.writerows(rows)
+        print(f"saved: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
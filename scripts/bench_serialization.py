@@ -0,0 +1,132 @@
+"""
+파이프라인 응답 직렬화 벤치마크 (모델/네트워크 불필요).
+
+합성 PipelineResponse(긴 한국어 카탈로그 필드 + MP3 크기의 오디오)를
+json / msgpack / multipart 각각으로, 필드 프로젝션(--fields) 유무와 gzip 압축까지 포함해
+직렬화 시간(p50)과 전송 바이트를 비교한다. 라우터와 같은 경로(app.services.response_codec)를 사용한다.
+
+예:
+    PYTHONPATH=. python scripts/bench_serialization.py
+    PYTHONPATH=. python scripts/bench_serialization.py --items 10 --audio-kb 60 --fields service_name,url \\
+        --out logs/bench/serialization.json
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.pipeline import PipelineResponse, SearchItem, SearchResult, STTResult, TTSResult
+from app.services.response_codec import _HAS_MSGPACK, pack, parse_fields, project_results
+from scripts.bench_common import environment_info, print_table, summarize, write_json
+
+COLUMNS = ["format", "fields", "ser_p50_ms", "bytes", "gzip_ms", "gzip_bytes", "wire_vs_json_pct", "ser_vs_json_pct"]
+
+_LONG = (
+    "무주택 청년에게 월 최대 20만원의 월세를 최장 12개월간 지원합니다. 신청일 기준 만 19세~34세 이하이며 "
+    "부모와 별도 거주하는 무주택자로서 청년가구 소득이 기준 중위소득 60% 이하이고 원가구 소득이 기준 중위소득 "
+    "100% 이하인 경우 신청할 수 있습니다. "
+)
+
+
+def build_response(items: int, audio: bytes) -> Tuple[PipelineResponse, bytes]:
+    results = []
+    for i in range(items):
+        results.append(SearchItem(
+            rank=i + 1, service_id=f"청년월세 한시 특별지원 {i}", service_name=f"청년월세 한시 특별지원 {i}",
+            score=0.8 - i * 0.01, tags=["청년", "주거", "월세"], support=_LONG * 2,
+            url=f"https://www.gov.kr/portal/rcvfvrSvc/dtlEx/{100000 + i}",
+            application_deadline="상시신청", contact="주민센터 / 보건복지상담센터 129",
+            application_method="온라인(복지로) 또는 주민센터 방문 신청", receiving_agency="읍면동 행정복지센터",
+            support_type="현금", target_beneficiaries=_LONG, selection_criteria=_LONG,
+            required_documents="신청서, 임대차계약서 사본, 월세 이체 내역, 가족관계증명서, 소득 증빙 서류",
+        ))
+    resp = PipelineResponse(
+        stt=STTResult(text="청년 주거 지원 정책 알려줘", engine="fw", decode_s=0.42, audio_sec=3.1),
+        search=SearchResult(query="청년 주거 지원 정책 알려줘", topk=items, results=results),
+        summary=f"추천 정책은 청년월세 한시 특별지원 입니다. 요약: {_LONG}",
+        tts=TTSResult(voice="ko-KR-SunHiNeural", mp3_b64="", duration_est_s=9.5),
+        request_id="0123456789abcdef",
+    )
+    return resp, audio
+
+
+def _json(resp: PipelineResponse, audio: bytes, fields: Optional[List[str]]) -> bytes:
+    # 라우터 JSON 경로: base64 + model_dump + json 인코딩
+    resp.tts.mp3_b64 = base64.b64encode(audio).decode("ascii")
+    body = project_results(resp.model_dump(mode="json"), fields)
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _binary(fmt: str) -> Callable[[PipelineResponse, bytes, Optional[List[str]]], bytes]:
+    def run(resp: PipelineResponse, audio: bytes, fields: Optional[List[str]]) -> bytes:
+        resp.tts.mp3_b64 = ""
+        body = project_results(resp.model_dump(mode="json"), fields)
+        return pack(body, audio, fmt, "audio/mpeg")[0]
+    return run
+
+
+def measure(fn, resp, audio, fields, repeats: int, level: int) -> Dict[str, Any]:
+    lat = []
+    out = b""
+    for _ in range(repeats):
+        t = time.perf_counter()
+        out = fn(resp, audio, fields)
+        lat.append((time.perf_counter() - t) * 1000.0)
+    t = time.perf_counter()
+    gz = gzip.compress(out, compresslevel=level)
+    return {
+        "ser_p50_ms": summarize(lat)["p50"],
+        "bytes": len(out),
+        "gzip_ms": (time.perf_counter() - t) * 1000.0,
+        "gzip_bytes": len(gz),
+    }
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Serialization / wire-size benchmark for pipeline responses")
+    ap.add_argument("--items", type=int, default=5, help="search.results 항목 수")
+    ap.add_argument("--audio-kb", type=float, default=40.0, help="오디오 바이트 크기(KB, 압축 불가한 난수)")
+    ap.add_argument("--fields", default="service_name,url", help="프로젝션 필드 (쉼표 구분)")
+    ap.add_argument("--repeats", type=int, default=200)
+    ap.add_argument("--gzip-level", type=int, default=settings.RESPONSE_GZIP_LEVEL)
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    audio = os.urandom(int(args.audio_kb * 1024))
+    resp, audio = build_response(args.items, audio)
+    fields = parse_fields(args.fields)
+
+    formats = [("json", _json), ("multipart", _binary("multipart"))]
+    if _HAS_MSGPACK:
+        formats.insert(1, ("msgpack", _binary("msgpack")))
+    else:
+        print("msgpack not installed; skipping msgpack rows")
+
+    rows: List[Dict[str, Any]] = []
+    for name, fn in formats:
+        for proj in (None, fields):
+            row = {"format": name, "fields": ",".join(proj) if proj else "all"}
+            row.update(measure(fn, resp, audio, proj, args.repeats, args.gzip_level))
+            rows.append(row)
+
+    base = rows[0]
+    for r in rows:
+        wire = min(r["bytes"], r["gzip_bytes"])
+        r["wire_vs_json_pct"] = round((wire - base["bytes"]) / base["bytes"] * 100.0, 1)
+        r["ser_vs_json_pct"] = round((r["ser_p50_ms"] - base["ser_p50_ms"]) / base["ser_p50_ms"] * 100.0, 1)
+
+    print_table(rows, COLUMNS)
+    if args.out:
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "results": rows})
+        print(f"\nsaved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
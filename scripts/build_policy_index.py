@@ -1,17 +1,25 @@
 import sys
 import time
 from app.services.policy_search import PolicySearch
+from app.services.policy_snapshot import export_snapshot
 
 def main():
+    # --snapshot: 멀티 프로세스 서빙용 mmap 스냅샷만 (재)생성 (Qdrant 인덱스는 없을 때만 색인)
+    # POLICY_SNAPSHOT_QUANT=int8|pq 이면 양자화 코드도 함께 생성 (app.services.vector_quant)
+    snapshot_only = "--snapshot" in sys.argv[1:]
     try:
         print("🚀 Starting policy index build...")
         start_time = time.time()
         
         ps = PolicySearch()   # settings에서 CSV/Qdrant/모델 자동 참조
-        ps.rebuild()          # 드롭 후 전체 재색인
+        if not snapshot_only:
+            ps.rebuild()      # 드롭 후 전체 재색인
         
         elapsed_time = time.time() - start_time
         print(f"✅ Policy index rebuilt successfully in {elapsed_time:.2f} seconds.")
+
+        out = export_snapshot(ps)
+        print(f"✅ Policy snapshot exported to {out} in {time.time() - start_time - elapsed_time:.2f} seconds.")
         
     except FileNotFoundError as e:
         print(f"❌ Error: CSV file not found - {e}")
@@ -21,4 +29,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
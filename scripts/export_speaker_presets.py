@@ -0,0 +1,53 @@
+"""
+SpeechT5 화자 프리셋(.npy) 내보내기.
+
+CMU ARCTIC x-vector 데이터셋에서 지정한 인덱스의 임베딩을 SPEECHT5_SPEAKER_DIR/<이름>.npy 로 저장한다.
+tts_speecht5는 이 파일만 프리셋으로 쓴다 (mtime이 바뀌면 자동 재로드). 파일이 없으면
+"default"는 고정 seed 임베딩(실제 화자 아님)으로 동작하고, 다른 이름은 오류가 난다.
+
+예:
+    PYTHONPATH=. python scripts/export_speaker_presets.py
+    PYTHONPATH=. python scripts/export_speaker_presets.py --preset default=7306 --preset speaker_1=1138
+"""
+import argparse
+import os
+
+import numpy as np
+
+from app.core.config import settings
+
+# --preset을 주지 않았을 때 내보내는 기본 프리셋: 이름 -> 데이터셋(validation) 인덱스
+DEFAULT_PRESETS = {
+    "default": 7306,
+    "speaker_1": 1138,
+    "speaker_2": 5799,
+    "speaker_3": 2271,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export SpeechT5 speaker presets from CMU ARCTIC x-vectors")
+    ap.add_argument("--preset", action="append", default=[], help="이름=데이터셋 인덱스 (반복 가능)")
+    ap.add_argument("--out-dir", default=settings.SPEECHT5_SPEAKER_DIR)
+    ap.add_argument("--dataset", default="Matthijs/cmu-arctic-xvectors")
+    args = ap.parse_args()
+
+    from datasets import load_dataset  # 이 스크립트에서만 필요
+
+    presets = {}
+    for item in args.preset:
+        name, idx = item.split("=", 1)
+        presets[name.strip()] = int(idx)
+    presets = presets or dict(DEFAULT_PRESETS)
+
+    ds = load_dataset(args.dataset, split="validation")
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, idx in presets.items():
+        vec = np.asarray(ds[idx]["xvector"], dtype=np.float32)[None, :]
+        path = os.path.join(args.out_dir, f"{name}.npy")
+        np.save(path, vec)
+        print(f"  {name:<12} <- #{idx:<5} {path}")
+
+
+if __name__ == "__main__":
+    main()
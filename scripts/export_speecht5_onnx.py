@@ -0,0 +1,62 @@
+"""
+SpeechT5 + HiFi-GAN을 ONNX로 내보내고(int8 동적 양자화) eager 경로와 parity를 확인한다.
+
+예:
+    PYTHONPATH=. python scripts/export_speecht5_onnx.py                 # export + int8 + parity
+    PYTHONPATH=. python scripts/export_speecht5_onnx.py --check-only --threads 8
+    PYTHONPATH=. python scripts/export_speecht5_onnx.py --no-int8 --out logs/bench/speecht5_onnx_fp32.json
+
+서버에서는 SPEECHT5_ENGINE=onnx 로 사용 (SPEECHT5_ONNX_DIR / SPEECHT5_ONNX_INT8 / SPEECHT5_ONNX_THREADS).
+"""
+import argparse
+import sys
+
+from app.core.config import settings
+from app.services.tts_speecht5_onnx import OnnxSpeechT5, export_onnx, is_exported, parity_check
+
+# microsoft/speecht5_tts는 영어 토크나이저라 영어 문장으로 비교
+_TEXTS = [
+    "The recommended policy provides monthly rent support.",
+    "Young people without a home can receive up to two hundred thousand won per month for twelve months.",
+    "Please visit your local community center to apply.",
+]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export SpeechT5 to ONNX (int8) and run an eager-vs-ONNX parity check")
+    ap.add_argument("--out-dir", default=settings.SPEECHT5_ONNX_DIR)
+    ap.add_argument("--no-int8", action="store_true", help="양자화하지 않고 fp32 그래프만 사용")
+    ap.add_argument("--quantize-vocoder", action="store_true", help="vocoder도 int8 양자화 (품질 저하 주의)")
+    ap.add_argument("--threads", type=int, default=settings.SPEECHT5_ONNX_THREADS)
+    ap.add_argument("--check-only", action="store_true", help="export 없이 기존 그래프로 parity만 확인")
+    ap.add_argument("--skip-check", action="store_true")
+    ap.add_argument("--speaker", default=None, help="화자 프리셋 (기본 SPEECHT5_SPEAKER)")
+    ap.add_argument("--out", default=None, help="parity 결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    if not args.check_only:
+        export_onnx(args.out_dir, quantize=not args.no_int8, quantize_vocoder=args.quantize_vocoder)
+    elif not is_exported(args.out_dir):
+        sys.exit(f"no exported graphs in {args.out_dir}")
+    if args.skip_check:
+        return
+
+    import torch
+    torch.set_num_threads(args.threads)  # eager 기준도 같은 스레드 수로 측정
+    engine = OnnxSpeechT5(args.out_dir, int8=not args.no_int8, threads=args.threads)
+    report = parity_check(_TEXTS, speaker=args.speaker, engine=engine)
+
+    for k in ("int8", "threads", "encoder_min_cos", "postnet_max_abs", "vocoder_snr_db",
+              "duration_ratios", "eager_rtf", "onnx_rtf", "speedup"):
+        print(f"  {k:<16} {report[k]}")
+    for name, ok in report["checks"].items():
+        print(f"  check {name:<10} {'ok' if ok else 'FAILED'}")
+    if args.out:
+        from scripts.bench_common import environment_info, write_json
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "report": report})
+        print(f"\nsaved: {args.out}")
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+로컬 fake Edge TTS 서버 (벤치마크/오프라인 테스트용).
+
+edge-tts 클라이언트가 쓰는 WebSocket 프로토콜의 최소 부분만 구현한다.
+  client → speech.config(text), ssml(text)
+  server → turn.start(text), audio(binary, 2바이트 헤더 길이 + 헤더 + MP3 데이터)..., turn.end(text)
+
+사용 예:
+    python scripts/fake_edge_tts_server.py --port 8765 --latency-ms 150 --slow-rate 0.05 --slow-ms 2000
+    EDGE_TTS_WSS_URL="ws://127.0.0.1:8765/edge/v1?TrustedClientToken=fake" \
+    EDGE_TTS_VOICES_URL="http://127.0.0.1:8765/voices" uvicorn app.server:app
+
+aiohttp는 edge-tts의 의존성이므로 추가 설치가 필요 없다.
+"""
+import argparse
+import asyncio
+import re
+import uuid
+
+from aiohttp import web, WSMsgType
+
+# 24kbps MP3 ≈ 3000 bytes/s, 한국어 ≈ 8자/초 (서버의 duration_est와 같은 가정)
+_BYTES_PER_SEC = 3000
+_CHARS_PER_SEC = 8.0
+_FRAME_BYTES = 4096
+_SSML_TEXT = re.compile(r"<prosody[^>]*>(.*?)</prosody>", re.S)
+
+
+def _text_frame(request_id: str, path: str, body: str = "{}") -> str:
+    return (
+        f"X-RequestId:{request_id}\r\n"
+        "Content-Type:application/json; charset=utf-8\r\n"
+        f"Path:{path}\r\n\r\n{body}"
+    )
+
+
+def _audio_frame(request_id: str, data: bytes) -> bytes:
+    header = (
+        f"X-RequestId:{request_id}\r\n"
+        "Content-Type:audio/mpeg\r\n"
+        f"X-StreamId:{request_id}\r\n"
+        "Path:audio\r\n"
+    ).encode("utf-8")
+    return len(header).to_bytes(2, "big") + header + data
+
+
+def make_app(
+    latency_ms: float, bytes_per_char: float, fail_rate: float, slow_rate: float = 0.0, slow_ms: float = 0.0,
+) -> web.Application:
+    import random
+
+    async def ws_handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(compress=True)
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT or "Path:ssml" not in msg.data:
+                continue
+            if fail_rate > 0 and random.random() < fail_rate:
+                await ws.close()
+                break
+            m = _SSML_TEXT.search(msg.data)
+            text = m.group(1) if m else ""
+            rid = uuid.uuid4().hex
+            await ws.send_str(_text_frame(rid, "turn.start"))
+            # 첫 바이트 지연(네트워크/합성) 흉내, slow_rate 확률로 꼬리 지연(hedging 테스트용)
+            delay = latency_ms + (slow_ms if slow_rate > 0 and random.random() < slow_rate else 0.0)
+            await asyncio.sleep(delay / 1000.0)
+            payload = b"\xff\xf3" + b"\x00" * max(1, int(len(text) * bytes_per_char))
+            for i in range(0, len(payload), _FRAME_BYTES):
+                await ws.send_bytes(_audio_frame(rid, payload[i:i + _FRAME_BYTES]))
+            await ws.send_str(_text_frame(rid, "turn.end"))
+        return ws
+
+    async def voices_handler(request: web.Request) -> web.Response:
+        return web.json_response([
+            {"Name": "Microsoft Server Speech Text to Speech Voice (ko-KR, SunHiNeural)",
+             "ShortName": "ko-KR-SunHiNeural", "Gender": "Female", "Locale": "ko-KR"},
+            {"Name": "Microsoft Server Speech Text to Speech Voice (ko-KR, InJoonNeural)",
+             "ShortName": "ko-KR-InJoonNeural", "Gender": "Male", "Locale": "ko-KR"},
+        ])
+
+    app = web.Application()
+    app.router.add_get("/voices", voices_handler)
+    app.router.add_get("/{tail:.*}", ws_handler)
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake Edge TTS WebSocket server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=150.0, help="turn.start 이후 첫 오디오까지 지연")
+    ap.add_argument("--bytes-per-char", type=float, default=_BYTES_PER_SEC / _CHARS_PER_SEC)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="연결을 끊어버릴 확률 (장애 주입)")
+    ap.add_argument("--slow-rate", type=float, default=0.0, help="첫 바이트를 --slow-ms만큼 더 늦출 확률 (꼬리 지연 주입)")
+    ap.add_argument("--slow-ms", type=float, default=2000.0)
+    args = ap.parse_args()
+    web.run_app(
+        make_app(args.latency_ms, args.bytes_per_char, args.fail_rate, args.slow_rate, args.slow_ms),
+        host=args.host, port=args.port, print=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Faster-Whisper CPU 자동 튜닝 실행/확인.
+
+서버 기동 시(FW_AUTOTUNE=1, CPU)에도 자동으로 수행되지만, 배포 전에 미리 돌려
+FW_AUTOTUNE_PROFILE에 프로파일을 캐시해 두면 첫 기동이 빨라진다.
+
+예:
+    PYTHONPATH=. python scripts/fw_autotune.py --clip data/calib/ko_10s.wav     # 같은 이름 .txt가 정답 전사
+    PYTHONPATH=. python scripts/fw_autotune.py --force --compute-types int8,int8_float32,float32
+"""
+import argparse
+import os
+
+from app.core.config import settings
+from app.core.hardware import detect_hardware
+from app.services.fw_autotune import DEFAULT_COMPUTE_TYPES, profile_key, run_probe, save_profile, load_cached_profile
+from scripts.bench_common import print_table
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Probe Faster-Whisper CPU compute types / thread splits and cache the best profile")
+    ap.add_argument("--clip", default=settings.FW_AUTOTUNE_CLIP, help="보정 클립 (기본 FW_AUTOTUNE_CLIP)")
+    ap.add_argument("--compute-types", default=",".join(DEFAULT_COMPUTE_TYPES))
+    ap.add_argument("--repeats", type=int, default=settings.FW_AUTOTUNE_REPEATS)
+    ap.add_argument("--force", action="store_true", help="캐시된 프로파일이 있어도 다시 측정")
+    args = ap.parse_args()
+
+    model_dir = settings.FW_MODEL_DIR
+    model_id = model_dir if (os.path.isdir(model_dir) and os.listdir(model_dir)) else "large-v3"
+    computes = [c.strip() for c in args.compute_types.split(",") if c.strip()]
+    # 서버와 같은 캐시 키를 쓰도록 FW_AUTOTUNE_CLIP을 덮어쓴다
+    settings.FW_AUTOTUNE_CLIP = args.clip
+
+    print(f"hardware: {detect_hardware()}")
+    key = profile_key(model_id, args.clip, computes)
+    prof = None if args.force else load_cached_profile(key)
+    if prof is None:
+        prof = run_probe(model_id, os.path.dirname(model_dir), clip=args.clip,
+                         compute_types=computes, repeats=args.repeats)
+        save_profile(key, prof)
+        print(f"saved profile [{key}] -> {settings.FW_AUTOTUNE_PROFILE}\n")
+    else:
+        print(f"cached profile [{key}] ({prof['created']})\n")
+
+    print_table(prof["probe"], ["compute_type", "cpu_threads", "num_workers", "load_s", "rtf", "throughput", "wer", "error"])
+    print(f"\nselected ({prof['objective']}, reference={prof['reference']}): "
+          f"compute={prof['compute_type']} threads={prof['cpu_threads']} workers={prof['num_workers']} "
+          f"wer={prof['wer']} rtf={prof['rtf']} throughput={prof['throughput']}")
+
+
+if __name__ == "__main__":
+    main()
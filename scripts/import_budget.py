@@ -0,0 +1,106 @@
+"""
+app import 시간 예산 점검 (`python -X importtime` 기반).
+
+새 인터프리터에서 대상 모듈을 import하고 stderr의 importtime 기록을 최상위 패키지별 self 시간으로 합산한다.
+무거운 엔진 모듈(torch/transformers/faster_whisper/...)이 import 시점에 끌려오면 표시되고,
+전체 import 시간이 --budget-ms를 넘으면 exit 1 (CI/배포 전 점검용).
+
+예:
+    PYTHONPATH=. python scripts/import_budget.py
+    PYTHONPATH=. python scripts/import_budget.py --module app.server --env STUB_ENGINES=1 --budget-ms 1500 \\
+        --out logs/bench/import_budget.json
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.engine_registry import HEAVY_MODULES
+from scripts.bench_common import environment_info, print_table, write_json
+
+COLUMNS = ["package", "self_ms", "modules", "share_pct"]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """[(module, self_us, cumulative_us)]"""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cum_us, name = rest.split("|", 2)
+            out.append((name.strip(), int(self_us), int(cum_us)))
+        except ValueError:
+            continue
+    return out
+
+
+def measure(module: str, env: Dict[str, str]) -> Tuple[List[Tuple[str, int, int]], float]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env={**os.environ, **env}, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-15:])
+        raise SystemExit(f"import {module} failed:\n{tail}")
+    rows = parse_importtime(proc.stderr)
+    total = next((cum for name, _, cum in rows if name == module), sum(s for _, s, _ in rows))
+    return rows, total / 1000.0
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time budget report for the API app")
+    ap.add_argument("--module", default="app.server")
+    ap.add_argument("--env", action="append", default=[], help="KEY=VALUE (반복 가능), 예: STUB_ENGINES=1")
+    ap.add_argument("--repeats", type=int, default=3, help="가장 빠른 실행 기준 (디스크 캐시 영향 제거)")
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=settings.IMPORT_BUDGET_MS)
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = dict(kv.split("=", 1) for kv in args.env)
+    # import 예산 점검 중에는 로그 파일/디렉토리를 만들지 않도록
+    env.setdefault("LOG_FILE", "")
+
+    best = None
+    for _ in range(max(1, args.repeats)):
+        rows, total_ms = measure(args.module, env)
+        if best is None or total_ms < best[1]:
+            best = (rows, total_ms)
+    rows, total_ms = best
+
+    by_pkg: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+    for name, self_us, _ in rows:
+        pkg = name.split(".")[0]
+        by_pkg[pkg]["self_ms"] += self_us / 1000.0
+        by_pkg[pkg]["modules"] += 1
+    table = sorted(
+        ({"package": k, **v, "share_pct": round(v["self_ms"] / total_ms * 100.0, 1)} for k, v in by_pkg.items()),
+        key=lambda r: r["self_ms"], reverse=True,
+    )
+    loaded = {name for name, _, _ in rows}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+
+    print_table(table[: args.top], COLUMNS)
+    print(f"\nimport {args.module}: {total_ms:.0f}ms (budget {args.budget_ms:g}ms)")
+    print(f"heavy engine modules at import: {heavy or 'none'}")
+
+    if args.out:
+        write_json(args.out, {
+            "env": environment_info(), "args": vars(args), "total_ms": total_ms,
+            "heavy_modules": heavy, "packages": table,
+        })
+        print(f"saved: {args.out}")
+    if args.budget_ms and total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+정책 카탈로그 전체 요약 일괄 생성 (SUMMARY_CACHE_DIR 디스크 캐시 채우기).
+
+POLICY_CSV_PATH의 모든 정책에 대해 지정한 kind 요약을 SUMMARY_CONCURRENCY개 병렬로 만든다.
+이미 캐시된 (내용 해시, kind, 프롬프트 버전, 모델) 조합은 건너뛰므로 중단 후 다시 실행해도 이어서 처리된다.
+
+예:
+    PYTHONPATH=. python scripts/precompute_summaries.py
+    PYTHONPATH=. python scripts/precompute_summaries.py --kinds policy,tts --limit 100 --concurrency 16
+    SUMMARY_BACKEND=stub PYTHONPATH=. python scripts/precompute_summaries.py --out logs/bench/summaries.json
+"""
+import argparse
+import csv
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.services.policy_records import record_from_row
+from app.services.summaries import KINDS, SummaryService
+from scripts.bench_common import environment_info, write_json
+
+
+def load_records(path: str, limit: int = 0) -> List[Dict[str, Any]]:
+    csv.field_size_limit(sys.maxsize)
+    out = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            out.append(record_from_row(lambda col, default, r=row: r.get(col) or default))
+            if limit and len(out) >= limit:
+                break
+    return out
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Precompute policy summaries into the on-disk cache")
+    ap.add_argument("--csv", default=settings.POLICY_CSV_PATH)
+    ap.add_argument("--kinds", default=",".join(KINDS), help=f"쉼표 구분 ({', '.join(KINDS)})")
+    ap.add_argument("--limit", type=int, default=0, help="앞에서부터 N개 정책만 (0=전체)")
+    ap.add_argument("--concurrency", type=int, default=settings.SUMMARY_CONCURRENCY)
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        raise SystemExit(f"unknown kinds: {unknown} (expected one of {list(KINDS)})")
+
+    records = load_records(args.csv, args.limit)
+    svc = SummaryService(concurrency=args.concurrency)
+    print(f"{len(records)} policies × {len(kinds)} kinds, backend={svc.backend.name}, "
+          f"version={settings.SUMMARY_PROMPT_VERSION}, concurrency={svc.concurrency}")
+
+    t0 = time.perf_counter()
+    result = svc.precompute(records, kinds)
+    elapsed = time.perf_counter() - t0
+    print(f"done in {elapsed:.1f}s: {result}")
+    print(f"cache: {svc.cache.root}")
+
+    if args.out:
+        write_json(args.out, {"env": environment_info(), "args": vars(args), "elapsed_s": elapsed, "result": result})
+        print(f"saved: {args.out}")
+    if result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
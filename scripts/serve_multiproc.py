@@ -0,0 +1,204 @@
+"""
+멀티 프로세스 서빙 supervisor (Linux, fork 기반).
+
+  supervisor
+   ├─ inference 프로세스 × K (spawn)   : FW / OW / 임베더 / SpeechT5 를 여기에만 로드
+   └─ 요청 워커 × N (fork)             : FastAPI(uvicorn), 같은 listen 소켓을 공유
+        · 정책 레코드/임베딩 행렬은 mmap 스냅샷 → 페이지 캐시로 워커 간 공유
+        · 모델 호출은 공유 request queue → 먼저 비는 inference 프로세스가 처리
+
+`uvicorn --workers N`은 워커마다 모델을 따로 올리지만, 이 모드는 RAM을 워커 수만큼 늘리지 않고
+요청 처리(디코드/직렬화/Edge TTS I/O)를 코어 수만큼 확장한다.
+
+죽은 요청 워커는 같은 큐로 다시 fork한다. inference 프로세스가 죽으면(크래시 / OOM kill) 큐의 잠금을
+쥔 채 죽었을 수 있으므로 큐를 새로 만들고 inference 프로세스 전체를 다시 띄운 뒤, 요청 워커도 새 큐로
+교체한다 (SIGTERM, RECYCLE_GRACE_S 안에 안 끝나면 SIGKILL).
+
+예:
+    PYTHONPATH=. python scripts/serve_multiproc.py --workers 8 --inference-procs 2 --port 8000
+"""
+import os
+import sys
+
+# settings는 import 시점에 env를 읽으므로 app 모듈보다 먼저 지정
+os.environ["ASR_SERVING_MODE"] = "multiproc"
+
+import argparse
+import multiprocessing as mp
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECYCLE_GRACE_S = 10.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker_main(idx: int, sock: socket.socket, req_q, resp_q, log_level: str) -> None:
+    """fork된 요청 워커: 자신의 InferenceClient를 등록한 뒤 공유 소켓으로 uvicorn 실행."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    import uvicorn
+    from app.services.inference_pool import InferenceClient, install_client
+
+    install_client(InferenceClient(req_q, resp_q, idx))
+    from app.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on"))
+    server.run(sockets=[sock])
+
+
+def main():
+    from app.core.config import settings
+
+    ap = argparse.ArgumentParser(description="Pre-fork multi-process server with shared model processes")
+    ap.add_argument("--host", default=settings.HOST)
+    ap.add_argument("--port", type=int, default=settings.PORT)
+    ap.add_argument("--workers", type=int, default=settings.SERVING_WORKERS, help="요청 워커 수")
+    ap.add_argument("--inference-procs", type=int, default=settings.INFERENCE_PROCS, help="모델 전용 프로세스 수")
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args()
+
+    from app.services.policy_snapshot import snapshot_exists
+    if not snapshot_exists():
+        # 임베더를 supervisor 메모리에 올리지 않도록 별도 프로세스로 스냅샷 생성
+        print("📦 policy snapshot missing → building...", flush=True)
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, "scripts", "build_policy_index.py"), "--snapshot"],
+            check=True, cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT},
+        )
+
+    from app.services.inference_pool import inference_main
+
+    spawn = mp.get_context("spawn")
+    # 큐 배선은 inference 프로세스가 재시작될 때 통째로 바뀐다 → 워커는 fork 시점의 wiring을 받는다
+    wiring = {}
+    infer_procs = {}  # pid -> (k, Process). os.wait()가 이들도 거두므로 pid로 추적
+
+    def start_inference() -> None:
+        wiring["req_q"] = spawn.Queue()
+        wiring["resp_qs"] = [spawn.Queue() for _ in range(args.workers)]
+        for k in range(args.inference_procs):
+            p = spawn.Process(target=inference_main, args=(wiring["req_q"], wiring["resp_qs"], k),
+                              name=f"inference-{k}", daemon=True)
+            p.start()
+            infer_procs[p.pid] = (k, p)
+
+    start_inference()
+
+    sock = _bind(args.host, args.port)
+
+    # 모델을 올리지 않는 multiproc 모드의 앱을 미리 import → 모듈/코드 페이지를 fork로 공유
+    import app.server  # noqa: F401
+    # 워커 로그는 supervisor가 모아서 쓴다 (LOG_FILE rotation을 한 프로세스만 하도록)
+    logging_config = sys.modules.get("logging_config")
+    if logging_config is not None:
+        logging_config.share_with_forked_children()
+
+    children = {}
+    recycling = set()  # 새 큐로 교체하려고 종료시킨 워커 pid
+
+    def fork_worker(idx: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker_main(idx, sock, wiring["req_q"], wiring["resp_qs"][idx], args.log_level)
+            except BaseException:
+                code = 1
+            finally:
+                if logging_config is not None:
+                    logging_config.stop_logging()  # supervisor로 못 보낸 레코드 flush
+                os._exit(code)
+        children[pid] = idx
+
+    for i in range(args.workers):
+        fork_worker(i)
+    print(f"✅ serving on {args.host}:{args.port} with {args.workers} workers, "
+          f"{args.inference_procs} inference procs", flush=True)
+
+    stopping = {"flag": False}
+
+    def _kill_stragglers(pids) -> None:
+        for pid in pids:
+            if pid in children:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def rebuild_inference() -> None:
+        for _k, p in infer_procs.values():
+            p.terminate()
+        infer_procs.clear()
+        start_inference()
+        # 기존 워커는 옛 큐에 묶여 있으므로 교체 (진행 중 요청은 grace 동안 마무리)
+        old = set(children)
+        recycling.update(old)
+        for pid in old:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        threading.Timer(RECYCLE_GRACE_S, _kill_stragglers, args=(old,)).start()
+
+    def _stop(signum, frame):
+        stopping["flag"] = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid in infer_procs:
+            k, _p = infer_procs.pop(pid)
+            if not stopping["flag"]:
+                print(f"⚠️ inference {k} (pid={pid}) exited with {status}; "
+                      "rebuilding inference procs/queues and recycling workers", flush=True)
+                time.sleep(1.0)
+                rebuild_inference()
+            continue
+        idx = children.pop(pid, None)
+        if idx is None:
+            continue  # 교체 전 inference 프로세스 등
+        if pid in recycling:
+            recycling.discard(pid)
+            if not stopping["flag"]:
+                fork_worker(idx)
+        elif not stopping["flag"]:
+            print(f"⚠️ worker {idx} (pid={pid}) exited with {status}; restarting", flush=True)
+            time.sleep(1.0)
+            fork_worker(idx)
+
+    procs = [p for _k, p in infer_procs.values()]
+    for _ in procs:
+        wiring["req_q"].put(None)
+    for p in procs:
+        p.join(timeout=10)
+        if p.is_alive():
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
-import os, time
+import os, sys, time
 from app.core.config import settings
 from app.services.asr_fw import FasterWhisperASR
 from app.services.asr_ow import OpenAIWhisperASR
+from app.services.warmup import run_warmup, parse_stages
 
 os.makedirs(settings.FW_MODEL_DIR, exist_ok=True)
 os.makedirs(settings.OW_MODEL_DIR, exist_ok=True)
 
-t0=time.time(); FasterWhisperASR(settings.FW_MODEL_DIR); t1=time.time()
-OpenAIWhisperASR(settings.OW_MODEL_DIR); t2=time.time()
+t0=time.time(); fw = FasterWhisperASR(settings.FW_MODEL_DIR); t1=time.time()
+ow = OpenAIWhisperASR(settings.OW_MODEL_DIR); t2=time.time()
 print(f"FW ready in {t1-t0:.1f}s, OW ready in {t2-t1:.1f}s")
+
+# 모델 다운로드/생성 이후 서버와 같은 경로로 각 단계를 한 번씩 실행 (모델 캐시/다운로드 확인용)
+stages = parse_stages(sys.argv[1] if len(sys.argv) > 1 else settings.WARMUP_STAGES)
+report = run_warmup(fw, ow, stages)
+for name, res in report.items():
+    status = "ok" if res["ok"] else f"FAILED ({res['error']})"
+    print(f"  {name:<9} {res['seconds']:>7.2f}s  {status}")
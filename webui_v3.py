@@ -1,15 +1,16 @@
-import io
 import base64
+import hashlib
+import json
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import numpy as np
 import streamlit as st
-from openai import OpenAI
+from requests.adapters import HTTPAdapter
 
 # streamlit-audio-recorder로 마이크 녹음
 from st_audiorec import st_audiorec
-import tempfile
-import os
 
 st.set_page_config(page_title="통합 STT→정책검색→TTS", layout="centered")
 st.title("👩🏻‍💼 음성 복지정책 도우미")
@@ -19,248 +20,197 @@ st.title("👩🏻‍💼 음성 복지정책 도우미")
 # -----------------------------
 st.sidebar.header("서버 & 옵션")
 # 배포된 서버 주소로 기본값 설정
-API_BASE = st.sidebar.text_input("API Base URL", "http://165.132.46.88:31180") 
+API_BASE = st.sidebar.text_input("API Base URL", "http://165.132.46.88:31180")
 ENGINE = st.sidebar.selectbox("STT 엔진", ["fw", "ow"], index=0)
 LANG = st.sidebar.text_input("언어", "ko")
 VOICE = st.sidebar.selectbox("TTS 음성", ["ko-KR-SunHiNeural", "ko-KR-InJoonNeural"], index=0)
 TOPK = st.sidebar.number_input("검색 TopK", min_value=1, max_value=10, value=3)
 BEAM = st.sidebar.number_input("Faster-Whisper beam_size", min_value=1, max_value=10, value=5)
 TIMEOUT = st.sidebar.number_input("요청 타임아웃(sec)", min_value=5, max_value=300, value=120)
+# GPT 요약은 서버의 /summaries가 생성/캐시 (OpenAI 키는 서버 설정 OPENAI_API_KEY)
+USE_SUMMARY = st.sidebar.checkbox("GPT 요약 사용", value=True)
+
+# 같은 녹음/결과를 다시 요청하지 않도록 캐시 (초)
+CACHE_TTL_S = 3600
+
+FIELDS = [
+    ("support", "📋 지원내용"),
+    ("target_beneficiaries", "👥 신청대상"),
+    ("application_deadline", "📅 신청기간"),
+    ("application_method", "📝 신청방법"),
+    ("required_documents", "📄 필요서류"),
+    ("contact", "📞 문의처"),
+]
+FIELD_KINDS = [f"field:{f}" for f, _ in FIELDS]
 
-# OpenAI API Key 설정
-OPENAI_API_KEY = "Enter your key"
-# STT, 검색, TTS 통합 파이프라인 엔드포인트 사용
-PIPELINE_URL = f"{API_BASE}/stt_search_tts"
 
 # -----------------------------
-# OpenAI를 사용한 자연스러운 문장 생성 함수
+# HTTP: 세션 하나를 재사용 (keep-alive 연결 풀)
 # -----------------------------
-def generate_policy_summary(service_data):
-    """정책 정보를 핵심 요약으로 변환"""
-    if not OPENAI_API_KEY:
-        return None
-    
+@st.cache_resource
+def http_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _multipart_parts(content: bytes, content_type: str) -> dict:
+    """multipart/mixed 응답 → {part name: bytes} (서버 response_format=multipart)."""
+    boundary = content_type.split("boundary=", 1)[1].strip().strip('"').encode("ascii")
+    parts = {}
+    for chunk in content.split(b"--" + boundary)[1:]:
+        if chunk.startswith(b"--"):
+            break
+        head, _, body = chunk.partition(b"\r\n\r\n")
+        m = re.search(rb'name="([^"]+)"', head)
+        if m:
+            parts[m.group(1).decode("ascii")] = body[:-2] if body.endswith(b"\r\n") else body
+    return parts
+
+
+def _read_audio_response(res: requests.Response, tts_key: str = None):
+    """
+    (메타 dict, 오디오 바이트). multipart면 오디오가 raw로 오고,
+    JSON(구버전 서버)이면 base64를 여기서 한 번만 디코딩한다.
+    """
+    res.raise_for_status()
+    ctype = res.headers.get("content-type", "")
+    if ctype.startswith("multipart/"):
+        parts = _multipart_parts(res.content, ctype)
+        return json.loads(parts["meta"]), parts.get("audio", b"")
+    js = res.json()
+    tts = js.get(tts_key, {}) if tts_key else js
+    b64 = tts.pop("mp3_b64", None) or tts.pop("audio_mp3_b64", None) or ""
+    return js, base64.b64decode(b64) if b64 else b""
+
+
+# -----------------------------
+# 서버 호출 (결과는 st.cache_data로 캐시 → Streamlit rerun마다 다시 요청하지 않음)
+# -----------------------------
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL_S, max_entries=32)
+def run_pipeline(api_base, audio_key, _audio, engine, language, beam_size, topk, voice, timeout):
+    """녹음(내용 해시 audio_key) → /stt_search_tts. 오디오는 multipart로 base64 없이 받는다."""
+    data = {
+        "engine": engine,
+        "language": language,
+        "beam_size": int(beam_size),
+        "topk": int(topk),
+        "voice": voice,
+        "response_format": "multipart",
+    }
+    files = {"audio": ("input.wav", _audio, "audio/wav")}
+    t0 = time.time()
+    res = http_session().post(f"{api_base}/stt_search_tts", files=files, data=data, timeout=timeout)
+    js, audio = _read_audio_response(res, tts_key="tts")
+    js["elapsed_s"] = round(time.time() - t0, 3)
+    return js, audio
+
+
+def _summaries(api_base, items, kinds, timeout):
+    """/summaries 한 번으로 items × kinds 요약 (서버 디스크 캐시). 실패하면 None."""
+    fields = ("service_id", "service_name") + tuple(f for f, _ in FIELDS)
+    payload = {"items": [{k: it.get(k) or "" for k in fields} for it in items], "kinds": list(kinds)}
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"""
-다음 정책 정보를 핵심 내용만 요약해서 설명해주세요:
-
-서비스명: {service_data.get('service_name', 'N/A')}
-지원내용: {service_data.get('support', 'N/A')}
-신청대상: {service_data.get('target_beneficiaries', 'N/A')}
-신청기간: {service_data.get('application_deadline', 'N/A')}
-신청방법: {service_data.get('application_method', 'N/A')}
-문의처: {service_data.get('contact', 'N/A')}
-필요서류: {service_data.get('required_documents', 'N/A')}
-
-요구사항:
-1. 어떤 정책인지 (지원내용)
-2. 신청 대상
-3. 신청 기간
-4. 신청 방법
-5. 필요한 서류
-6. 문의처
-이 6가지 핵심 정보를 간결하게 정리해서 설명
-
-핵심 요약:
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 정부 정책의 핵심 정보를 명확하게 정리하는 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.5
-        )
-        
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"정책 요약 생성 중 오류: {e}")
+        res = http_session().post(f"{api_base}/summaries", json=payload, timeout=timeout)
+        res.raise_for_status()
+        return [row["summaries"] for row in res.json()["items"]]
+    except (requests.RequestException, ValueError, KeyError):
         return None
 
-def generate_field_summary(service_data, field_name):
-    """특정 필드의 내용을 요약"""
-    if not OPENAI_API_KEY:
-        return None
-    
+
+def _synthesize(api_base, text, voice, timeout):
+    """/synthesize (multipart → MP3 바이트)"""
+    body = {"text": text, "voice": voice, "rate": "+0%", "volume": "+0%", "pitch": "+0Hz"}
+    t0 = time.time()
+    res = http_session().post(
+        f"{api_base}/synthesize", params={"response_format": "multipart"}, json=body, timeout=timeout,
+    )
+    meta, audio = _read_audio_response(res)
+    return audio, meta.get("mime_type") or "audio/mpeg", round(time.time() - t0, 3)
+
+
+def _spoken_summary(api_base, top_item, voice, timeout):
+    """
+    Top-1 정책의 음성 안내 요약 → 합성. (text, audio, mime, synthesis_s, ok)
+    요약이 없으면 text=None, 요약/합성 요청이 실패하면 ok=False.
+    """
+    rows = _summaries(api_base, [top_item], ["tts"], timeout)
+    if rows is None:
+        return None, None, None, None, False
+    text = rows[0].get("tts")
+    if not text:
+        return None, None, None, None, True
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        field_value = service_data.get(field_name, 'N/A')
-        if field_value == 'N/A' or not field_value:
-            return None
-        
-        field_labels = {
-            'support': '지원내용',
-            'target_beneficiaries': '신청대상',
-            'application_deadline': '신청기간',
-            'application_method': '신청방법',
-            'required_documents': '필요서류',
-            'contact': '문의처'
-        }
-        
-        field_label = field_labels.get(field_name, field_name)
-        
-        prompt = f"""
-다음 정보를 간결하고 이해하기 쉽게 요약해주세요:
-
-{field_value}
-
-요구사항:
-1. 핵심 내용만 간결하게 정리
-2. 이해하기 쉬운 문장으로 작성
-3. 불필요한 반복 제거
-4. 한국어로 작성
-
-요약:
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": f"당신은 {field_label} 정보를 간결하게 요약하는 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.3
-        )
-        
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return None
+        audio, mime, dt = _synthesize(api_base, text, voice, timeout)
+    except requests.RequestException:
+        return text, None, None, None, False
+    return text, audio, mime, dt, True
 
-def generate_tts_summary(service_data):
-    """TTS용 4줄 요약 생성"""
-    if not OPENAI_API_KEY:
-        return None
-    
+
+class _Degraded(Exception):
+    """일부 요청이 실패한 enrich 결과. 예외로 빠져나가야 st.cache_data가 캐시하지 않는다."""
+
+    def __init__(self, result):
+        super().__init__("enrich_results degraded")
+        self.result = result
+
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL_S, max_entries=64)
+def _enrich_cached(api_base, results_json, voice, timeout):
+    results = json.loads(results_json)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_fields = ex.submit(_summaries, api_base, results, FIELD_KINDS, timeout)
+        f_tts = ex.submit(_spoken_summary, api_base, results[0], voice, timeout)
+        fields = f_fields.result()
+        tts_text, tts_audio, tts_mime, synthesis_s, tts_ok = f_tts.result()
+    extra = {
+        "fields": fields or [{} for _ in results],
+        "tts_text": tts_text,
+        "tts_audio": tts_audio,
+        "tts_mime": tts_mime,
+        "synthesis_s": synthesis_s,
+    }
+    if fields is None or not tts_ok:
+        raise _Degraded(extra)
+    return extra
+
+
+def enrich_results(api_base, results_json, voice, timeout):
+    """
+    검색 결과에 대한 필드 요약 + 음성 안내 요약/합성.
+    서로 독립인 두 작업(필드 요약 / 요약→합성)을 동시에 실행한다.
+    성공한 결과만 캐시하고, 실패가 섞인 결과(원문 표시 / 기본 음성)는 이번 표시에만 쓴다
+    → 서버가 회복되면 다음 요청에서 다시 시도된다.
+    """
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"""
-다음 정책 정보를 4줄 이내의 자연스러운 문장으로 요약해주세요:
-
-서비스명: {service_data.get('service_name', 'N/A')}
-지원내용: {service_data.get('support', 'N/A')}
-신청대상: {service_data.get('target_beneficiaries', 'N/A')}
-신청방법: {service_data.get('application_method', 'N/A')}
-필요서류: {service_data.get('required_documents', 'N/A')}
-문의처: {service_data.get('contact', 'N/A')}
-
-요구사항:
-0. []안에는 정책 정보 채워넣기
-1. "추천하는 정책은 [정책명]입니다."로 시작
-2. "대상은 [신청대상]이며"로 이어짐
-3. "신청 방법은 [신청방법]이고"로 이어짐
-4. "[필요서류]를 통해 [신청방법]으로 신청하면 됩니다. 문의처는 [문의처]입니다."로 마무리
-5. 4줄 이내의 자연스러운 문장으로 작성
-6. 음성으로 읽기 좋게 작성
-
-요약:
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 정책 정보를 음성으로 읽기 좋은 자연스러운 문장으로 요약하는 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return None
+        return _enrich_cached(api_base, results_json, voice, timeout)
+    except _Degraded as e:
+        return e.result
+
 
-def display_policy_info(service_data, index):
-    """정책 정보를 Streamlit UI 스타일로 표시"""
+def display_policy_info(service_data, summaries, index):
+    """정책 정보를 Streamlit UI 스타일로 표시 (요약이 있으면 요약, 없으면 원문)"""
     service_name = service_data.get('service_name', 'N/A')
-    
+
     # 카드 형태로 표시
     with st.container():
         st.markdown(f"### {index+1}. {service_name}")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**📋 지원내용**")
-            if OPENAI_API_KEY:
-                with st.spinner("지원내용 요약 중..."):
-                    support_summary = generate_field_summary(service_data, 'support')
-                    st.write(support_summary if support_summary else service_data.get('support', 'N/A'))
-            else:
-                st.write(service_data.get('support', 'N/A'))
-            
-            st.markdown("**👥 신청대상**")
-            if OPENAI_API_KEY:
-                with st.spinner("신청대상 요약 중..."):
-                    target_summary = generate_field_summary(service_data, 'target_beneficiaries')
-                    st.write(target_summary if target_summary else service_data.get('target_beneficiaries', 'N/A'))
-            else:
-                st.write(service_data.get('target_beneficiaries', 'N/A'))
-            
-            st.markdown("**📅 신청기간**")
-            if OPENAI_API_KEY:
-                with st.spinner("신청기간 요약 중..."):
-                    deadline_summary = generate_field_summary(service_data, 'application_deadline')
-                    st.write(deadline_summary if deadline_summary else service_data.get('application_deadline', 'N/A'))
-            else:
-                st.write(service_data.get('application_deadline', 'N/A'))
-        
-        with col2:
-            st.markdown("**📝 신청방법**")
-            if OPENAI_API_KEY:
-                with st.spinner("신청방법 요약 중..."):
-                    method_summary = generate_field_summary(service_data, 'application_method')
-                    st.write(method_summary if method_summary else service_data.get('application_method', 'N/A'))
-            else:
-                st.write(service_data.get('application_method', 'N/A'))
-            
-            st.markdown("**📄 필요서류**")
-            if OPENAI_API_KEY:
-                with st.spinner("필요서류 요약 중..."):
-                    docs_summary = generate_field_summary(service_data, 'required_documents')
-                    st.write(docs_summary if docs_summary else service_data.get('required_documents', 'N/A'))
-            else:
-                st.write(service_data.get('required_documents', 'N/A'))
-            
-            st.markdown("**📞 문의처**")
-            if OPENAI_API_KEY:
-                with st.spinner("문의처 요약 중..."):
-                    contact_summary = generate_field_summary(service_data, 'contact')
-                    st.write(contact_summary if contact_summary else service_data.get('contact', 'N/A'))
-            else:
-                st.write(service_data.get('contact', 'N/A'))
-        
-        st.markdown("---")
 
-# -----------------------------
-# streamlit-audio-recorder 기반 오디오 수집
-# -----------------------------
-def save_audio_to_temp_file(audio_data, filename="tmp_input.wav"):
-    """오디오 데이터를 임시 파일로 저장"""
-    if audio_data is None:
-        return None
-    
-    try:
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        temp_file.write(audio_data)
-        temp_file.close()
-        
-        return temp_file.name
-    except Exception as e:
-        st.error(f"오디오 파일 저장 중 오류: {e}")
-        return None
+        cols = st.columns(2)
+        for i, (field, label) in enumerate(FIELDS):
+            with cols[i // 3]:
+                st.markdown(f"**{label}**")
+                st.write(summaries.get(f"field:{field}") or service_data.get(field) or 'N/A')
+
+        st.markdown("---")
 
 # 상태 저장
-if "last_json" not in st.session_state:
-    st.session_state.last_json = None
-if "recorded_audio" not in st.session_state:
-    st.session_state.recorded_audio = None
+if "last" not in st.session_state:
+    st.session_state.last = None
+if "recorded_key" not in st.session_state:
+    st.session_state.recorded_key = None
 
 # -----------------------------
 # 마이크 녹음 (streamlit-audio-recorder 사용)
@@ -274,101 +224,52 @@ wav_audio_data = st_audiorec()
 # 녹음된 오디오가 있으면 자동으로 서버에 전송
 if wav_audio_data is not None:
     # 새로 녹음된 오디오인지 확인 (이전과 다른 경우에만 전송)
-    if st.session_state.recorded_audio != wav_audio_data:
-        st.session_state.recorded_audio = wav_audio_data
-        
-        # 자동으로 서버에 전송
+    audio_key = hashlib.sha256(wav_audio_data).hexdigest()
+    if st.session_state.recorded_key != audio_key:
+        st.session_state.recorded_key = audio_key
+
         try:
-            # 임시 파일로 저장
-            path = save_audio_to_temp_file(st.session_state.recorded_audio)
-            if not path:
-                st.warning("오디오 파일 생성에 실패했습니다.")
-            else:
-                with open(path, "rb") as f:
-                    files = {"audio": ("input.wav", f, "audio/wav")}
-                    data = {
-                        "engine": ENGINE,
-                        "language": LANG,
-                        "beam_size": int(BEAM),
-                        "topk": int(TOPK),
-                        "voice": VOICE,
-                    }
-                    
-                    # 1단계: 검색 결과 받기
-                    with st.spinner("서버에 요청 중..."):
-                        t0 = time.time()
-                        res = requests.post(PIPELINE_URL, files=files, data=data, timeout=TIMEOUT)
-                        dt = time.time() - t0
-                    
-                    # 2단계: GPT 요약 생성 후 TTS 요청
-                    if res.ok and OPENAI_API_KEY:
-                        search_results = res.json().get("search", {}).get("results", [])
-                        if search_results:
-                            with st.spinner("GPT 요약 생성 중..."):
-                                tts_summary = generate_tts_summary(search_results[0])
-                                if tts_summary:
-                                    # GPT 요약 텍스트로 /synthesize 엔드포인트에 TTS 요청
-                                    synthesize_url = f"{API_BASE}/synthesize"
-                                    tts_data = {
-                                        "text": tts_summary,
-                                        "voice": VOICE,
-                                        "rate": "+0%",
-                                        "volume": "+0%",
-                                        "pitch": "+0Hz"
-                                    }
-                                    
-                                    with st.spinner("GPT 요약으로 음성 생성 중..."):
-                                        t0 = time.time()
-                                        tts_res = requests.post(synthesize_url, json=tts_data, timeout=TIMEOUT)
-                                        dt = time.time() - t0
-                                        
-                                        if tts_res.ok:
-                                            # TTS 결과를 기존 응답에 병합
-                                            tts_result = tts_res.json()
-                                            response_data = res.json()
-                                            if "tts" not in response_data:
-                                                response_data["tts"] = {}
-                                            response_data["tts"]["audio_mp3_b64"] = tts_result.get("mp3_b64", "")
-                                            response_data["tts"]["spoken_text"] = tts_summary
-                                            response_data["tts"]["voice"] = VOICE
-                                            response_data["tts"]["synthesis_s"] = dt
-                                            
-                                            # 세션에 병합된 결과 저장
-                                            st.session_state.last_json = response_data
-                                        else:
-                                            st.warning(f"TTS 생성 실패: {tts_res.status_code}")
-                                            # 기존 결과 그대로 사용
-                                            st.session_state.last_json = res.json()
-                    
-                    if res.ok:
-                        # GPT TTS가 처리되지 않은 경우에만 기본 결과 저장
-                        if not (OPENAI_API_KEY and res.json().get("search", {}).get("results", [])):
-                            st.session_state.last_json = res.json()
-                        
-                        # 임시 파일 정리
-                        try:
-                            os.remove(path)
-                        except:
-                            pass
-                    else:
-                        st.error(f"오류: {res.status_code} {res.text}")
-                        
+            # 1단계: STT → 검색 → 기본 TTS (같은 녹음 + 옵션이면 캐시)
+            with st.spinner("서버에 요청 중..."):
+                js, audio = run_pipeline(
+                    API_BASE, audio_key, wav_audio_data, ENGINE, LANG, int(BEAM), int(TOPK), VOICE, TIMEOUT,
+                )
+            tts = js.get("tts", {})
+            last = {"js": js, "audio": audio, "mime": tts.get("mime_type") or "audio/mpeg",
+                    "spoken_text": js.get("summary"), "fields": None}
+
+            # 2단계: GPT 필드 요약과 음성 안내 요약→합성을 동시에
+            results = js.get("search", {}).get("results", [])
+            if USE_SUMMARY and results:
+                with st.spinner("GPT 요약 생성 중..."):
+                    extra = enrich_results(
+                        API_BASE, json.dumps(results, ensure_ascii=False, sort_keys=True), VOICE, TIMEOUT,
+                    )
+                last["fields"] = extra["fields"]
+                if extra["tts_audio"]:
+                    last.update(audio=extra["tts_audio"], mime=extra["tts_mime"], spoken_text=extra["tts_text"])
+                elif extra["tts_text"]:
+                    st.warning("GPT 요약 음성 생성 실패: 기본 음성을 재생합니다.")
+            st.session_state.last = last
+        except requests.HTTPError as e:
+            st.error(f"오류: {e.response.status_code} {e.response.text}")
         except Exception as e:
             st.error(f"전송 중 오류: {e}")
 
 # -----------------------------
-# 결과 표시/재생
+# 결과 표시/재생 (세션에 저장된 결과만 사용 - rerun 시 서버 호출 없음)
 # -----------------------------
 st.divider()
 
-if st.session_state.last_json:
-    js = st.session_state.last_json
+if st.session_state.last:
+    last = st.session_state.last
+    js = last["js"]
 
     # STT 결과
     st.markdown("### 📝 인식된 음성")
     stt_data = js.get("stt", {})
     recognized_text = stt_data.get("text", "음성을 인식하지 못했습니다.")
-    
+
     # 인식된 텍스트를 깔끔하게 표시
     if recognized_text and recognized_text.strip():
         st.markdown(f'> "{recognized_text}"')
@@ -377,65 +278,22 @@ if st.session_state.last_json:
 
     # 검색 결과
     st.markdown("### 🔎 지원 정책 검색 결과")
-    # 서버 응답 구조: js['search']['results'] 
-    results = js.get("search", {}).get("results", []) 
+    # 서버 응답 구조: js['search']['results']
+    results = js.get("search", {}).get("results", [])
     if results:
+        field_summaries = last["fields"] or [{} for _ in results]
         for i, item in enumerate(results):
-            # 검색 결과에서 필요한 필드를 안전하게 추출
-            service_name = item.get('service_name') or item.get('서비스명', 'N/A')
-            support_content = item.get('support') or item.get('지원내용', 'N/A')
-            target_beneficiaries = item.get('target_beneficiaries', 'N/A')
-            application_deadline = item.get('application_deadline', 'N/A')
-            application_method = item.get('application_method', 'N/A')
-            contact = item.get('contact', 'N/A')
-            required_documents = item.get('required_documents', 'N/A')
-
-            # 새로운 함수를 사용하여 정책 정보 표시
-            display_policy_info(item, i)
+            display_policy_info(item, field_summaries[i] if i < len(field_summaries) else {}, i)
     else:
         st.info("검색 결과가 없습니다.")
 
-    # 합성 음성
+    # 합성 음성 (이미 디코딩된 바이트를 그대로 재생)
     st.markdown("### 🔊 음성 지원")
-    tts = js.get("tts", {})
-    # 서버별 키 호환: audio_mp3_b64 또는 mp3_b64
-    b64 = tts.get("audio_mp3_b64") or tts.get("mp3_b64")
-
-    # GPT API로 4줄 요약 생성
-    if results and OPENAI_API_KEY:
-        with st.spinner("음성용 정책 요약 생성 중..."):
-            tts_summary = generate_tts_summary(results[0])  # 첫 번째 결과 사용
-            spoken_text = tts_summary if tts_summary else tts.get("spoken_text") or js.get("summary", "읽어줄 문장이 없습니다.")
-    else:
-        spoken_text = tts.get("spoken_text") or js.get("summary", "읽어줄 문장이 없습니다.")
-
-    def safe_b64_decode(s: str) -> bytes:
-        if not isinstance(s, str):
-            raise ValueError("base64 문자열이 아님")
-        clean = s.strip().replace("\n", "").replace("\r", "")
-        # 공백이 '+'로 잘려온 경우 보정
-        clean = clean.replace(" ", "+")
-        # 패딩 보정
-        pad = (-len(clean)) % 4
-        if pad:
-            clean += "=" * pad
-        return base64.b64decode(clean)
-
-    if b64:
-        try:
-            audio_bytes = safe_b64_decode(b64)
-            # Base64 인코딩된 오디오를 HTML audio 태그로 자동 재생
-            audio_base64 = base64.b64encode(audio_bytes).decode()
-            audio_html = f"""
-            <audio controls autoplay>
-                <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-                Your browser does not support the audio element.
-            </audio>
-            """
-            st.markdown(audio_html, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"오디오 디코딩 오류: {e}")
+    if last.get("spoken_text"):
+        st.caption(last["spoken_text"])
+    if last["audio"]:
+        st.audio(last["audio"], format=last["mime"], autoplay=True)
     else:
-        st.error("오디오 데이터가 서버에서 생성되지 않았습니다. (서버 측 TTS 키(audio_mp3_b64/mp3_b64) 확인 필요)")
+        st.error("오디오 데이터가 서버에서 생성되지 않았습니다.")
 else:
     st.info("아직 결과가 없습니다. 위 탭에서 마이크 녹음 또는 파일 업로드 후 전송하세요.")